@@ -0,0 +1,68 @@
+"""
+Rollup diario de validaciones
+Contadores por día y fuente para el dashboard de validación
+
+Revision ID: 009_validation_daily_stats
+Revises: 008_performance_optimizations
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009_validation_daily_stats'
+down_revision = '008_performance_optimizations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Crea validation_daily_stats y la rellena con el histórico"""
+
+    op.create_table(
+        'validation_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('validations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('flagged', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'source')
+    )
+
+    # Totales diarios: un GROUP BY con conteo condicional
+    op.execute("""
+        INSERT INTO validation_daily_stats (day, source, validations, flagged)
+        SELECT
+            date_trunc('day', checked_at)::date,
+            'ALL',
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_sanctioned)
+        FROM validation_results
+        WHERE checked_at IS NOT NULL
+        GROUP BY 1
+    """)
+
+    # Por fuente: fuentes consultadas y fuentes con match (match_details)
+    op.execute("""
+        INSERT INTO validation_daily_stats (day, source, validations, flagged)
+        SELECT
+            date_trunc('day', r.checked_at)::date,
+            s.source,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE EXISTS (
+                SELECT 1
+                FROM json_array_elements(COALESCE(r.match_details, '[]'::json)) m
+                WHERE m->>'source' = s.source
+            ))
+        FROM validation_results r
+        CROSS JOIN LATERAL json_array_elements_text(
+            COALESCE(r.sources_checked, '[]'::json)
+        ) AS s(source)
+        WHERE r.checked_at IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+    print("✅ Rollup diario de validaciones creado")
+
+
+def downgrade():
+    """Elimina el rollup diario de validaciones"""
+    op.drop_table('validation_daily_stats')
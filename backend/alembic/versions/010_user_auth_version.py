@@ -0,0 +1,28 @@
+"""
+Versión de autenticación de usuarios
+Contador que invalida tokens y la caché de usuarios autenticados
+
+Revision ID: 010_user_auth_version
+Revises: 009_validation_daily_stats
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010_user_auth_version'
+down_revision = '009_validation_daily_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Añade users.auth_version (se incrementa al cambiar rol o estado)"""
+    op.add_column(
+        'users',
+        sa.Column('auth_version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade():
+    """Elimina users.auth_version"""
+    op.drop_column('users', 'auth_version')
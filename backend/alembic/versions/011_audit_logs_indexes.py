@@ -0,0 +1,118 @@
+"""
+Índices y particionado de audit_logs
+Paginación keyset, exportaciones por rango de fechas y particiones mensuales
+
+Revision ID: 011_audit_logs_indexes
+Revises: 010_user_auth_version
+
+El particionado por rango de ``timestamp`` es opcional: se activa con
+``AUDIT_LOGS_PARTITIONING=monthly`` al ejecutar la migración. Reescribe la
+tabla, así que en instalaciones grandes conviene lanzarlo en una ventana de
+mantenimiento. La migración sólo crea las particiones de los próximos 12
+meses: el backend debe arrancar con la misma variable
+(``AUDIT_LOGS_PARTITIONING=monthly``) para que su job diario siga llamando a
+``ensure_audit_log_partitions``; sin él las filas acaban en
+``audit_logs_default`` y ya no se puede crear la partición de ese mes.
+"""
+import os
+
+from alembic import op
+
+# revision identifiers
+revision = '011_audit_logs_indexes'
+down_revision = '010_user_auth_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Índices de audit_logs y, opcionalmente, particiones mensuales"""
+
+    if os.getenv("AUDIT_LOGS_PARTITIONING", "").lower() == "monthly":
+        _partition_monthly()
+
+    # B-tree compuesto: paginación keyset sobre (timestamp, id)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp_id
+        ON audit_logs (timestamp, id)
+    """)
+
+    # BRIN: la tabla es append-only y timestamp crece con el orden físico;
+    # índice de pocos KB para los rangos de las exportaciones
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp_brin
+        ON audit_logs USING brin (timestamp) WITH (pages_per_range = 64)
+    """)
+
+    print("✅ Índices de audit_logs creados")
+
+
+def _partition_monthly():
+    """Convierte audit_logs en tabla particionada por mes de timestamp"""
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+
+    # La clave de partición debe formar parte de la clave primaria
+    op.execute("""
+        CREATE TABLE audit_logs (
+            LIKE audit_logs_legacy INCLUDING DEFAULTS,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("""
+        ALTER TABLE audit_logs
+        ADD FOREIGN KEY (user_id) REFERENCES users (id)
+    """)
+    op.execute("ALTER SEQUENCE IF EXISTS audit_logs_id_seq OWNED BY audit_logs.id")
+
+    # Crea las particiones mensuales que falten hasta ``months_ahead`` meses
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_audit_log_partitions(
+            from_month DATE,
+            months_ahead INT DEFAULT 12
+        )
+        RETURNS void AS $$
+        DECLARE
+            month_start DATE := date_trunc('month', from_month)::date;
+            last_month DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + INTERVAL '1 month')::date
+                );
+                month_start := (month_start + INTERVAL '1 month')::date;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        SELECT ensure_audit_log_partitions(
+            COALESCE((SELECT MIN(timestamp) FROM audit_logs_legacy)::date, CURRENT_DATE)
+        )
+    """)
+    # Red de seguridad para inserciones fuera de las particiones creadas
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute("""
+        INSERT INTO audit_logs
+        SELECT * FROM audit_logs_legacy
+    """)
+    op.execute("DROP TABLE audit_logs_legacy")
+
+    # Índices de búsqueda del modelo
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_timestamp ON audit_logs (timestamp)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_user_id ON audit_logs (user_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_action ON audit_logs (action)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_resource_id ON audit_logs (resource_id)")
+
+    print("✅ audit_logs particionada por mes")
+
+
+def downgrade():
+    """Elimina los índices de audit_logs (el particionado no se revierte)"""
+    op.execute("DROP INDEX IF EXISTS idx_audit_logs_timestamp_brin")
+    op.execute("DROP INDEX IF EXISTS idx_audit_logs_timestamp_id")
@@ -0,0 +1,52 @@
+"""
+Índices de listado de documentos
+Paginación keyset sobre (created_at, id) con filtros de estado,
+clasificación y departamento
+
+Revision ID: 012_documents_keyset_indexes
+Revises: 011_audit_logs_indexes
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '012_documents_keyset_indexes'
+down_revision = '011_audit_logs_indexes'
+branch_labels = None
+depends_on = None
+
+# Nombre -> columnas (el filtro de igualdad delante del orden keyset)
+KEYSET_INDEXES = {
+    'idx_documents_created_id': ['created_at', 'id'],
+    'idx_documents_status_created_id': ['status', 'created_at', 'id'],
+    'idx_documents_classification_created_id': ['classification', 'created_at', 'id'],
+    'idx_documents_department_created_id': ['department', 'created_at', 'id'],
+}
+
+
+def upgrade():
+    """Crea los índices sin bloquear escrituras (CONCURRENTLY, fuera de transacción)"""
+    with op.get_context().autocommit_block():
+        for name, columns in KEYSET_INDEXES.items():
+            op.create_index(name, 'documents', columns, postgresql_concurrently=True)
+
+        # Parcial: cola de documentos pendientes o en proceso
+        op.create_index(
+            'idx_documents_in_progress_created_id',
+            'documents',
+            ['created_at', 'id'],
+            postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"),
+            postgresql_concurrently=True
+        )
+
+    # Estadísticas al día para el total estimado del listado
+    op.execute("ANALYZE documents")
+
+    print("✅ Índices de listado de documentos creados")
+
+
+def downgrade():
+    """Elimina los índices de listado"""
+    op.drop_index('idx_documents_in_progress_created_id', table_name='documents')
+    for name in reversed(list(KEYSET_INDEXES)):
+        op.drop_index(name, table_name='documents')
@@ -13,7 +13,7 @@ from .types import (
     DocumentConnection,
     SearchResult,
 )
-from .resolvers import Query, Mutation
+from .resolvers import Query, Mutation, Subscription
 
 __all__ = [
     "schema",
@@ -26,4 +26,5 @@ __all__ = [
     "SearchResult",
     "Query",
     "Mutation",
+    "Subscription",
 ]
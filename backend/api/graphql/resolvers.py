@@ -1,10 +1,11 @@
 """
 GraphQL Resolvers
-Implements Query and Mutation resolvers for the GraphQL API.
+Implements Query, Mutation and Subscription resolvers for the GraphQL API.
 """
 
-from typing import List, Optional
+from typing import AsyncGenerator, List, Optional
 from datetime import datetime
+from uuid import UUID
 import strawberry
 from strawberry.types import Info
 from strawberry.file_uploads import Upload
@@ -20,6 +21,7 @@ from .types import (
     PageInfo,
     SearchResult,
     RAGResponse,
+    RAGStreamEvent,
     UploadResult,
     DeleteResult,
     AnnotationResult,
@@ -31,6 +33,51 @@ from .types import (
 )
 
 
+# DB status values without a GraphQL counterpart
+_STATUS_FROM_DB = {
+    "failed": DocumentStatus.ERROR,
+    "archived": DocumentStatus.COMPLETED,
+}
+
+
+def _to_document(doc) -> Document:
+    """Map a ``models.database_models.Document`` row to the GraphQL type."""
+    db_status = doc.status.value if doc.status else "pending"
+    return Document(
+        id=str(doc.id),
+        filename=doc.title,
+        mime_type=doc.mime_type,
+        size=doc.file_size_bytes,
+        status=_STATUS_FROM_DB.get(db_status) or DocumentStatus(db_status),
+        uploaded_by=str(doc.owner_id) if doc.owner_id else "",
+        uploaded_at=doc.created_at,
+        confidence_score=doc.classification_confidence,
+        classification=doc.classification.value if doc.classification else None,
+        department=doc.department,
+        metadata=doc.metadata_json,
+    )
+
+
+def _document_filters(filter: Optional[DocumentFilter]) -> dict:
+    """Translate a ``DocumentFilter`` into ``document_service`` filters."""
+    if filter is None:
+        return {}
+    status = None
+    if filter.status is not None:
+        status = "failed" if filter.status == DocumentStatus.ERROR else filter.status.value
+    return {
+        "status": status,
+        "classification": filter.classification,
+        "department": filter.department,
+        "owner_id": UUID(filter.uploaded_by) if filter.uploaded_by else None,
+        "mime_type": filter.mime_type,
+        "created_after": filter.uploaded_after,
+        "created_before": filter.uploaded_before,
+        "min_confidence": filter.min_confidence,
+        "title_contains": filter.search_query,
+    }
+
+
 @strawberry.type
 class Query:
     """GraphQL Query root"""
@@ -59,7 +106,7 @@ class Query:
         document_service = info.context.get("document_service")
         if document_service:
             doc = await document_service.get_by_id(id)
-            return doc
+            return _to_document(doc) if doc else None
         return None
     
     @strawberry.field
@@ -100,13 +147,13 @@ class Query:
         document_service = info.context.get("document_service")
         if document_service:
             docs = await document_service.list_documents(
-                filter=filter,
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
                 order_desc=order_desc,
+                **_document_filters(filter),
             )
-            return docs
+            return [_to_document(doc) for doc in docs]
         return []
     
     @strawberry.field
@@ -126,7 +173,8 @@ class Query:
             filter: Document filter criteria
             
         Returns:
-            DocumentConnection with edges and pageInfo
+            DocumentConnection with edges and pageInfo (totalCount is the
+            query planner's estimate, not an exact count)
             
         Example:
             query {
@@ -148,11 +196,11 @@ class Query:
             result = await document_service.list_paginated(
                 first=first,
                 after=after,
-                filter=filter,
+                **_document_filters(filter),
             )
             
             edges = [
-                DocumentEdge(cursor=item["cursor"], node=item["node"])
+                DocumentEdge(cursor=item["cursor"], node=_to_document(item["node"]))
                 for item in result["edges"]
             ]
             
@@ -671,3 +719,49 @@ class Mutation:
                 success=False,
                 message=f"Failed to delete annotation: {str(e)}",
             )
+
+
+@strawberry.type
+class Subscription:
+    """GraphQL Subscription root"""
+    
+    @strawberry.subscription
+    async def rag_query_stream(
+        self,
+        info: Info,
+        question: str,
+        conversation_id: Optional[str] = None,
+        max_chunks: int = 5,
+    ) -> AsyncGenerator[RAGStreamEvent, None]:
+        """
+        Query documents using RAG, receiving the answer as it is generated.
+        
+        Tokens are forwarded as the LLM produces them, citations as soon as
+        their [DOC-X] label is complete, and the confidence of the
+        anti-hallucination check in the final `done` event.
+        
+        Example:
+            subscription {
+              ragQueryStream(question: "¿Cuál es el monto total de los contratos?") {
+                event
+                text
+                data
+              }
+            }
+        """
+        rag_service = info.context.get("rag_service")
+        if not rag_service:
+            yield RAGStreamEvent(event="error", data={"detail": "RAG service not available"})
+            return
+        
+        # Imports diferidos: el esquema se carga sin el paquete backend en sys.path
+        from core.database import async_session_maker
+        from models.schemas import RAGQuery
+        
+        query = RAGQuery(question=question, conversation_id=conversation_id, top_k=max_chunks)
+        # El router rechaza las peticiones anónimas: siempre hay usuario (filtro de acceso de la búsqueda)
+        current_user = info.context.get("current_user")
+        
+        async with async_session_maker() as db:
+            async for event, data in rag_service.stream_query(query, db, current_user.id):
+                yield RAGStreamEvent(event=event, text=data.get("text"), data=data)
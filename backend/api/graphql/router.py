@@ -4,9 +4,14 @@ FastAPI router for GraphQL endpoint with Strawberry integration.
 """
 
 from typing import Optional
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request, status
 from strawberry.fastapi import GraphQLRouter as StrawberryGraphQLRouter
 
+from core.auth import get_current_user
+from core.database import async_session_maker
+from services.lazy import rag_service
+from services.document_service import document_service
+
 from .schema import schema
 from .context import get_graphql_context, GraphQLContext
 
@@ -23,11 +28,10 @@ class FinanciaGraphQLRouter(StrawberryGraphQLRouter):
         """
         Get context for GraphQL execution.
         
-        Override this method to customize context creation.
-        For now, returns a basic context. In production, you would:
-        1. Extract authentication from request headers
-        2. Inject all required services
-        3. Add user permissions
+        The caller is resolved from the JWT in the Authorization header
+        (same rules as the REST API, ``core.auth.get_current_user``).
+        Anonymous or invalid tokens are rejected before any service is
+        wired into the context.
         
         Args:
             request: FastAPI request
@@ -35,21 +39,35 @@ class FinanciaGraphQLRouter(StrawberryGraphQLRouter):
             
         Returns:
             GraphQL context
+            
+        Raises:
+            HTTPException: 401 without a valid bearer token
         """
-        # TODO: Extract user from JWT token in Authorization header
-        # auth_header = request.headers.get("Authorization")
-        # current_user = await authenticate_user(auth_header)
+        current_user = await self._authenticate(request)
         
-        # For now, mock services (replace with real service injection)
+        # Services should be injected via dependency injection
         context = await get_graphql_context(
             request=request,
-            # Services should be injected via dependency injection
-            # document_service=...,
+            document_service=document_service,
+            rag_service=rag_service,
+            current_user=current_user,
             # entity_service=...,
             # etc.
         )
         
         return context
+    
+    async def _authenticate(self, request: Request):
+        """Usuario del token Bearer de la petición (401 si falta o no es válido)"""
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        async with async_session_maker() as db:
+            return await get_current_user(token=token, db=db)
 
 
 # Create the main GraphQL router using Strawberry
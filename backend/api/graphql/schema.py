@@ -4,13 +4,14 @@ Main schema definition for the FinancIA GraphQL API.
 """
 
 import strawberry
-from .resolvers import Query, Mutation
+from .resolvers import Query, Mutation, Subscription
 
 
 # Create the GraphQL schema
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
+    subscription=Subscription,
 )
 
 
@@ -92,6 +93,15 @@ type Mutation {
   deleteAnnotation(id: ID!): DeleteResult!
 }
 
+type Subscription {
+  \"\"\"Query documents using RAG, streaming tokens, citations and the final confidence\"\"\"
+  ragQueryStream(
+    question: String!
+    conversationId: ID
+    maxChunks: Int = 5
+  ): RAGStreamEvent!
+}
+
 type Document {
   id: ID!
   filename: String!
@@ -106,6 +116,8 @@ type Document {
   pageCount: Int
   language: String
   confidenceScore: Float
+  classification: String
+  department: String
   version: Int!
   metadata: JSON
   
@@ -189,6 +201,13 @@ type RAGResponse {
   metadata: JSON
 }
 
+\"\"\"Event of a streamed RAG answer: start, token, citation, done or error\"\"\"
+type RAGStreamEvent {
+  event: String!
+  text: String
+  data: JSON
+}
+
 type ValidationResult {
   field: String!
   rule: String!
@@ -240,6 +259,8 @@ input DocumentFilter {
   uploadedBefore: DateTime
   minConfidence: Float
   searchQuery: String
+  classification: String
+  department: String
 }
 
 input AnnotationInput {
@@ -128,6 +128,8 @@ class Document:
     page_count: Optional[int] = None
     language: Optional[str] = None
     confidence_score: Optional[float] = None
+    classification: Optional[str] = None
+    department: Optional[str] = None
     version: int = 1
     metadata: Optional[strawberry.scalars.JSON] = None
     
@@ -231,6 +233,14 @@ class RAGResponse:
     metadata: Optional[strawberry.scalars.JSON] = None
 
 
+@strawberry.type
+class RAGStreamEvent:
+    """Event of a streamed RAG answer (start, token, citation, done, error)"""
+    event: str
+    text: Optional[str] = None
+    data: Optional[strawberry.scalars.JSON] = None
+
+
 @strawberry.type
 class UploadResult:
     """Result of document upload"""
@@ -266,6 +276,8 @@ class DocumentFilter:
     uploaded_before: Optional[datetime] = None
     min_confidence: Optional[float] = None
     search_query: Optional[str] = None
+    classification: Optional[str] = None
+    department: Optional[str] = None
 
 
 @strawberry.input
@@ -17,7 +17,7 @@ from models.schemas import (
     UserUpdate, TokenData
 )
 from models.database_models import User
-from core.auth import verify_password, create_access_token
+from core.auth import verify_password, create_access_token, get_current_user as resolve_current_user
 # from services.auth_service import AuthService  # To be implemented
 
 logger = logging.getLogger(__name__)
@@ -106,7 +106,7 @@ async def login(
     # Create access token
     access_token_expires = timedelta(minutes=30)  # 30 minutes
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role},
+        data={"sub": user.email, "role": user.role, "ver": user.auth_version},
         expires_delta=access_token_expires
     )
     
@@ -150,58 +150,10 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    current_user: UserResponse = Depends(resolve_current_user)
 ):
     """Get current authenticated user"""
-    from jose import JWTError, jwt
-    from sqlalchemy import select
-    
-    try:
-        # Decode JWT token
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.email == email)
-    )
-    user = result.scalar_one_or_none()
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return {
-        "id": str(user.id),
-        "email": user.email,
-        "full_name": user.full_name,
-        "role": user.role,
-        "department": user.department,
-        "mfa_enabled": user.mfa_enabled or False,
-        "is_active": user.is_active,
-        "created_at": user.created_at,
-        "last_login": user.last_login
-    }
+    return current_user
 
 
 @router.put("/me", response_model=UserResponse)
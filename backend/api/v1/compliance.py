@@ -2,8 +2,10 @@
 Compliance Router
 Rule-based compliance checks and auditing
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 import logging
@@ -13,9 +15,11 @@ from core.database import get_db
 from models.schemas import (
     ComplianceCheckResponse, ComplianceRuleExecution,
     DataSubjectRequestCreate, DataSubjectRequestResponse,
-    AuditLogResponse, AuditLogQuery
+    AuditLogResponse, AuditLogQuery, UserResponse
 )
 from api.v1.auth import oauth2_scheme
+from core.auth import require_role
+from services.audit_service import EXPORT_FORMATS, audit_service
 from services.eu_regulatory_service import get_eu_regulatory_service
 from core.config import settings
 
@@ -223,11 +227,12 @@ async def list_data_subject_requests(
 @router.post("/audit/query", response_model=List[AuditLogResponse])
 async def query_audit_logs(
     query: AuditLogQuery,
-    token: str = Depends(oauth2_scheme),
+    response: Response,
+    current_user: UserResponse = Depends(require_role("auditor")),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Query audit logs
+    Query audit logs (auditor or admin role)
     
     Filters:
     - user_id
@@ -235,31 +240,76 @@ async def query_audit_logs(
     - resource_type
     - date range
     
+    Results are ordered newest first and paginated by keyset over
+    (timestamp, id): pass the `X-Next-Cursor` response header as `cursor`
+    to get the next page.
+    
     Note: Logs are immutable (append-only)
     Retention: 2+ years
     """
-    # TODO: Implement audit log query
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Audit log query not yet implemented"
-    )
+    if query.offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offset pagination is not supported: use the X-Next-Cursor header as cursor"
+        )
+    try:
+        records, next_cursor = await audit_service.query(
+            db,
+            limit=query.limit,
+            cursor=query.cursor,
+            user_id=query.user_id,
+            action=query.action,
+            resource_type=query.resource_type,
+            start_date=query.start_date,
+            end_date=query.end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
 
 
 @router.get("/audit/export")
 async def export_audit_logs(
-    start_date: str,
-    end_date: str,
-    format: str = "json",  # json, csv
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    start_date: datetime,
+    end_date: datetime,
+    format: str = "json",  # json, jsonl, csv
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    user_id: Optional[UUID] = None,
+    current_user: UserResponse = Depends(require_role("auditor"))
 ):
     """
-    Export audit logs for SIEM integration
+    Export audit logs for SIEM integration (auditor or admin role)
     
     Formats: JSON Lines, CSV
+    
+    Rows are streamed in chronological order from a server-side cursor,
+    so exports of any size run in constant memory.
     """
-    # TODO: Implement audit log export
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Audit log export not yet implemented"
+    if not settings.AUDIT_LOG_EXPORT_ENABLED:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Audit log export disabled via feature flag")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if end_date <= start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must be after start_date")
+    
+    extension = "csv" if format == "csv" else "jsonl"
+    filename = f"audit_logs_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{extension}"
+    return StreamingResponse(
+        audit_service.stream_export(
+            start_date,
+            end_date,
+            format=format,
+            action=action,
+            resource_type=resource_type,
+            user_id=user_id
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
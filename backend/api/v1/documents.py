@@ -3,19 +3,26 @@ Documents Router
 Handles document upload, retrieval, update, delete
 Enhanced with ontology-based classification and validation
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
+from urllib.parse import quote
 from uuid import UUID
 import logging
 
+from core.config import settings
 from core.database import get_db
+from models.database_models import Document, DocumentStatus
 from models.schemas import (
     DocumentResponse, DocumentCreate, DocumentUpdate,
-    DocumentUploadResponse, EntityResponse, ChunkResponse
+    DocumentUploadResponse, EntityResponse, ChunkResponse, UserResponse
 )
 from api.v1.auth import oauth2_scheme
-from services import classification_service
+from core.auth import can_access_document, document_scope, get_current_user
+from services.lazy import classification_service, ingest_service
+from services.document_service import MAX_PAGE_SIZE, document_service
+from services.document_storage import RangeNotSatisfiable, parse_range
 
 logger = logging.getLogger(__name__)
 
@@ -64,10 +71,6 @@ async def upload_document(
         if current_user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
-        # Initialize ingest service
-        from services.ingest_service import IngestService
-        ingest_service = IngestService()
-        
         # Prepare metadata
         metadata = {
             "title": title or file.filename,
@@ -122,28 +125,75 @@ async def get_document(
 
 @router.get("/", response_model=List[DocumentResponse])
 async def list_documents(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     doc_status: Optional[str] = Query(None, alias="status"),
     classification: Optional[str] = None,
     department: Optional[str] = None,
-    token: str = Depends(oauth2_scheme),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     List documents with filters
     
-    - **skip**: Pagination offset
     - **limit**: Max results (max 100)
+    - **cursor**: `X-Next-Cursor` header of the previous page
     - **doc_status**: Filter by status
     - **classification**: Filter by classification
     - **department**: Filter by department
+    
+    Results are ordered newest first and paginated by keyset over
+    (created_at, id), so deep pages cost the same as the first one.
+    `X-Total-Estimate` carries the planner's row estimate for the filters.
+    
+    Non-admin users only see their department's documents (or their own
+    documents when they have no department).
     """
-    # TODO: Implement list documents with filters
-    from fastapi import status as http_status
-    raise HTTPException(
-        status_code=http_status.HTTP_501_NOT_IMPLEMENTED,
-        detail="List documents not yet implemented"
+    scope = {"department": department, **document_scope(current_user)}
+    if department and scope["department"] != department:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+    if skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offset pagination is not supported: use the X-Next-Cursor header as cursor"
+        )
+    try:
+        page = await document_service.list_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=doc_status,
+            classification=classification,
+            **scope
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    response.headers["X-Total-Estimate"] = str(page["estimated_total"])
+    return [_document_response(document) for document in page["items"]]
+
+
+def _document_response(document: Document) -> DocumentResponse:
+    """DocumentResponse de un Document (metadata_json -> metadata)"""
+    return DocumentResponse(
+        id=document.id,
+        title=document.title,
+        mime_type=document.mime_type,
+        department=document.department,
+        file_size_bytes=document.file_size_bytes,
+        checksum_sha256=document.checksum_sha256,
+        classification=document.classification.value if document.classification else None,
+        classification_confidence=document.classification_confidence,
+        status=document.status.value if document.status else DocumentStatus.PENDING.value,
+        owner_id=document.owner_id,
+        retention_until=document.retention_until,
+        metadata=document.metadata_json,
+        created_at=document.created_at,
+        updated_at=document.updated_at
     )
 
 
@@ -187,19 +237,88 @@ async def delete_document(
 @router.get("/{document_id}/download")
 async def download_document(
     document_id: UUID,
-    token: str = Depends(oauth2_scheme),
+    request: Request,
+    redirect: Optional[bool] = None,
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Download original document file"""
-    # TODO: Implement download from MinIO
-    # Check permissions
-    # Stream file from MinIO
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Download document not yet implemented"
+    """
+    Download original document file
+    
+    - **redirect**: `true` redirects to a presigned MinIO URL, `false` streams
+      through the API; by default files of `DOWNLOAD_REDIRECT_MIN_BYTES` or
+      more are redirected
+    
+    Streamed downloads honour a single-range `Range` header (206 Partial
+    Content) so PDF viewers can fetch pages on demand.
+    
+    Only admins, the owner and users of the document's department can
+    download it.
+    """
+    document = await db.get(Document, document_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if not can_access_document(document, current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+    
+    try:
+        stat = await ingest_service.stat_document(document)
+    except Exception as e:
+        logger.error(f"Document {document_id} not found in storage: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document content not found")
+    
+    disposition = _content_disposition(document.title or str(document.id))
+    if redirect or (redirect is None and stat.size >= settings.DOWNLOAD_REDIRECT_MIN_BYTES):
+        url = ingest_service.get_presigned_url(
+            document,
+            expires=settings.DOWNLOAD_PRESIGNED_URL_TTL_SECONDS,
+            response_headers={"response-content-disposition": disposition}
+        )
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    
+    etag = f'"{stat.etag}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": disposition,
+    }
+    
+    # If-Range: el rango sólo vale si el objeto no ha cambiado
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, stat.size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{stat.size}"}
+        )
+    
+    if byte_range is None:
+        offset, length, status_code = 0, stat.size, status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        offset, length, status_code = start, end - start + 1, status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    headers["Content-Length"] = str(length)
+    
+    return StreamingResponse(
+        ingest_service.iter_document_content(document, offset=offset, length=length),
+        status_code=status_code,
+        media_type=document.mime_type or "application/octet-stream",
+        headers=headers
     )
 
 
+def _content_disposition(filename: str) -> str:
+    """Content-Disposition inline con nombre ASCII y UTF-8 (RFC 6266)"""
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace('"', "'")
+    return f'inline; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename)}'
+
+
 @router.get("/{document_id}/entities", response_model=List[EntityResponse])
 async def get_document_entities(
     document_id: UUID,
@@ -2,15 +2,14 @@
 API Endpoints para Machine Learning y GPU Monitoring
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-import torch
 
 from core.auth import get_current_active_user
+from core.config import settings
+from core.service_registry import service_registry
 from models.database_models import User
-from ml.embeddings import EmbeddingModel
-from ml.ner_model import NERModel
-from ml.classifier import ClassifierModel
+from ml.lazy import embedding_model
 from core.logging_config import logger
 
 
@@ -66,13 +65,6 @@ class EmbeddingResponse(BaseModel):
     processing_time: str
 
 
-# ===== Inicializar modelos (lazy loading) =====
-
-embedding_model = EmbeddingModel()
-ner_model = NERModel()  # Asumiendo que existe
-classifier_model = ClassifierModel()  # Asumiendo que existe
-
-
 # ===== Endpoints =====
 
 @router.get("/gpu-info", response_model=GPUInfoResponse)
@@ -165,6 +157,8 @@ async def get_system_info(
     Obtiene información completa del sistema ML
     """
     try:
+        import torch
+        
         system_info = {
             "gpu": embedding_model.get_gpu_info(),
             "torch": {
@@ -194,38 +188,56 @@ async def get_system_info(
 
 @router.post("/warmup")
 async def warmup_models(
+    role: Optional[str] = Query(None, description="Rol cuyos servicios precargar (por defecto SERVICE_ROLE)"),
+    services: Optional[List[str]] = Query(None, description="Servicios concretos a precargar"),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Precarga todos los modelos ML para optimizar rendimiento
+    Precarga servicios y modelos ML del registro para optimizar rendimiento
+    
+    Sin parámetros se precargan los servicios del rol del pod (SERVICE_ROLE).
     """
     try:
         logger.info(f"Warming up ML models for user {current_user.username}")
         
-        results = {}
-        
-        # Warmup embedding model
-        try:
-            embedding_model._load_model()
-            results["embedding_model"] = "loaded"
-        except Exception as e:
-            results["embedding_model"] = f"error: {str(e)}"
+        unknown = set(services or []) - set(service_registry.names())
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown services: {sorted(unknown)}"
+            )
         
-        # TODO: Agregar warmup para otros modelos cuando estén implementados
-        # ner_model._load_model()
-        # classifier_model._load_model()
+        results = await service_registry.warmup(
+            names=services,
+            role=role or settings.SERVICE_ROLE
+        )
         
         logger.info("ML models warmup completed")
         
         return {
             "message": "Models warmup completed",
             "results": results,
-            "gpu_info": embedding_model.get_gpu_info()
+            "services": service_registry.status()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error warming up models: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error warming up models: {str(e)}"
         )
+
+
+@router.get("/services")
+async def get_services_status(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Estado de carga de los servicios y modelos registrados
+    """
+    return {
+        "role": settings.SERVICE_ROLE,
+        "services": service_registry.status()
+    }
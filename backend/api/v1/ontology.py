@@ -8,6 +8,8 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Dict, Any, Optional
 import logging
 
+from core.config import settings
+from core.sparql_executor import SPARQLBusyError, SPARQLTimeoutError, sparql_executor
 from services.ontology_service import ontology_service
 
 logger = logging.getLogger(__name__)
@@ -117,6 +119,12 @@ class InferRiskResponse(BaseModel):
 class SPARQLQueryRequest(BaseModel):
     """Request para ejecutar consulta SPARQL."""
     query: str = Field(..., description="Consulta SPARQL a ejecutar")
+    timeout: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=settings.SPARQL_TIMEOUT_SECONDS,
+        description="Plazo de la consulta en segundos (por defecto SPARQL_TIMEOUT_SECONDS)"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -365,15 +373,22 @@ async def execute_sparql_query(request: SPARQLQueryRequest):
         ?doc rdfs:label ?label .
     }
     ```
+    
+    Las consultas se ejecutan en un pool propio con plazo y los resultados
+    se cachean por consulta normalizada y versión de la ontología.
     """
     try:
-        results = ontology_service.query_sparql(request.query)
+        results = await sparql_executor.query(ontology_service, request.query, timeout=request.timeout)
         
         return SPARQLQueryResponse(
             results=results,
             count=len(results)
         )
         
+    except SPARQLTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except SPARQLBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error ejecutando SPARQL: {str(e)}")
         raise HTTPException(
@@ -579,7 +594,7 @@ async def list_all_classes(
                 }
                 ORDER BY ?label
             """
-            results = ontology_service.query_sparql(query)
+            results = await sparql_executor.query(ontology_service, query)
             classes = [
                 {
                     "uri": r["class"],
@@ -3,14 +3,17 @@ RAG Router
 Retrieval-Augmented Generation for conversational queries
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 import logging
 
-from core.database import get_db
-from models.schemas import RAGQuery, RAGResponse
-from api.v1.auth import oauth2_scheme
+from core.database import async_session_maker, get_db
+from models.schemas import RAGQuery, RAGResponse, UserResponse
+from api.v1.auth import oauth2_scheme, resolve_current_user
+from services.lazy import rag_service
+from services.rag_stream import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -54,6 +57,33 @@ async def rag_query(
     )
 
 
+@router.post("/query/stream")
+async def rag_query_stream(
+    rag_query: RAGQuery,
+    current_user: UserResponse = Depends(resolve_current_user)
+):
+    """
+    Ask questions about documents using RAG, streaming the answer (SSE)
+    
+    Events (`text/event-stream`, JSON data):
+    - **start**: conversation_id and documents_count
+    - **token**: next fragment of the answer, as generated by the LLM
+    - **citation**: cited document, as soon as its [DOC-X] label is complete
+    - **done**: confidence from the anti-hallucination check of the full answer
+    - **error**: the query could not be completed
+    
+    The first token arrives after retrieval instead of after the whole
+    generation. The stream uses its own database session, so it stays
+    valid while the response is being sent.
+    """
+    async def events():
+        async with async_session_maker() as db:
+            async for event, data in rag_service.stream_query(rag_query, db, current_user.id):
+                yield sse_event(event, data)
+    
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
 @router.get("/conversations/{conversation_id}")
 async def get_conversation(
     conversation_id: UUID,
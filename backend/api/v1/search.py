@@ -4,12 +4,14 @@ Handles document search (lexical, semantic, hybrid)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import Optional
 import logging
 
 from core.database import get_db
-from models.schemas import SearchQuery, SearchResponse
+from models.schemas import SearchFacets, SearchQuery, SearchResponse
 from api.v1.auth import oauth2_scheme
+from services.lazy import search_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -58,23 +60,47 @@ async def suggest_queries(
     )
 
 
-@router.get("/facets")
+@router.get("/facets", response_model=SearchFacets)
 async def get_facets(
     q: Optional[str] = None,
+    classification: Optional[str] = None,
+    department: Optional[str] = None,
+    uploaded_by: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    interval: str = Query("month", pattern="^(day|week|month|quarter|year)$"),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get facets for filtering
     
-    Returns available filters:
+    Returns available filters with document counts for the query (or the
+    whole index when `q` is empty), narrowed by the filters already applied:
     - Classifications
     - Departments
-    - Date ranges
+    - Date ranges (histogram by `interval`)
     - Authors
+    
+    All facets are computed in a single OpenSearch aggregation request;
+    the empty query and popular queries are served from cache.
     """
-    # TODO: Implement facets
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Facets not yet implemented"
-    )
+    filters = {
+        "classification": classification,
+        "department": department,
+        "uploaded_by": uploaded_by,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+    }
+    try:
+        return await search_service.get_facets(
+            query=q,
+            filters={name: value for name, value in filters.items() if value},
+            interval=interval
+        )
+    except Exception as e:
+        logger.error(f"Error computing search facets: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search backend unavailable"
+        )
@@ -9,11 +9,13 @@ Este paquete contiene conectores para integración con sistemas enterprise:
 """
 
 from .base_connector import BaseConnector
+from .sync_state import ConnectorStateStore
 from .sharepoint_connector import SharePointConnector
 from .sap_dms_connector import SAPDMSConnector
 
 __all__ = [
     "BaseConnector",
+    "ConnectorStateStore",
     "SharePointConnector",
     "SAPDMSConnector",
 ]
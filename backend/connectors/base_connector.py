@@ -5,11 +5,18 @@ Todos los conectores deben heredar de esta clase y implementar los métodos abst
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Tuple
 from datetime import datetime
+from uuid import UUID
+import asyncio
+import hashlib
 import logging
+import os
+import tempfile
 from pydantic import BaseModel
 
+from .sync_state import ConnectorStateStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +47,16 @@ class ConnectorConfig(BaseModel):
     retry_attempts: int = 3
     timeout_seconds: int = 300
     batch_size: int = 100
+    max_concurrency: int = 8
+    state_path: str = "data/connectors/sync_state.db"
+    # Usuario de FinancIA propietario de lo ingerido (por defecto CONNECTOR_SERVICE_ACCOUNT_ID)
+    service_account_id: Optional[str] = None
+
+
+# Callable de ingesta: (documento, ruta del contenido descargado, metadata) -> resultado
+IngestCallable = Callable[[ConnectorDocument, str, Dict[str, Any]], Awaitable[Any]]
+# Callable de borrado: (id del documento en el origen) -> documentos eliminados en FinancIA
+DeleteCallable = Callable[[str], Awaitable[int]]
 
 
 class BaseConnector(ABC):
@@ -54,6 +71,19 @@ class BaseConnector(ABC):
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._authenticated = False
+        self._state_store: Optional[ConnectorStateStore] = None
+        # Cursores delta obtenidos durante la sync en curso; se persisten
+        # sólo si la sync termina sin errores
+        self._pending_delta_tokens: Dict[str, str] = {}
+        # Documentos borrados en el origen (delta) detectados durante la sync
+        self._pending_deletions: List[str] = []
+    
+    @property
+    def state_store(self) -> ConnectorStateStore:
+        """Estado persistente de sincronización (delta tokens, eTags, hashes)"""
+        if self._state_store is None:
+            self._state_store = ConnectorStateStore(self.config.state_path)
+        return self._state_store
     
     @abstractmethod
     async def authenticate(self) -> bool:
@@ -131,6 +161,64 @@ class BaseConnector(ABC):
         """
         pass
     
+    async def iter_document_content(self, document_id: str) -> AsyncIterator[bytes]:
+        """
+        Descargar el contenido de un documento por fragmentos.
+        
+        La implementación base descarga el documento completo; los conectores
+        con descarga en streaming deben sobrescribirla.
+        
+        Args:
+            document_id: ID del documento
+            
+        Yields:
+            bytes: Fragmentos del contenido
+        """
+        yield await self.download_document(document_id)
+    
+    async def download_document_to_file(
+        self,
+        document_id: str,
+        destination: Optional[str] = None
+    ) -> str:
+        """
+        Descargar un documento a disco sin cargarlo completo en memoria.
+        
+        Args:
+            document_id: ID del documento
+            destination: Ruta destino (por defecto un fichero temporal)
+            
+        Returns:
+            str: Ruta del fichero descargado
+        """
+        path, size, _ = await self._spool_document(document_id, destination)
+        self.logger.info(f"Downloaded {size} bytes to {path}")
+        return path
+    
+    async def _spool_document(
+        self,
+        document_id: str,
+        destination: Optional[str] = None
+    ) -> Tuple[str, int, str]:
+        """Volcar el contenido a fichero calculando tamaño y SHA-256 por el camino"""
+        if destination is None:
+            fd, destination = tempfile.mkstemp(prefix="connector_")
+            os.close(fd)
+        
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(destination, "wb") as f:
+                async for chunk in self.iter_document_content(document_id):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(destination)
+            raise
+        
+        return destination, size, digest.hexdigest()
+    
     @abstractmethod
     async def upload_document(
         self,
@@ -153,82 +241,304 @@ class BaseConnector(ABC):
         """
         pass
     
+    async def iter_changes(
+        self,
+        repository_id: str,
+        filters: Optional[Dict[str, Any]] = None,
+        start_position: int = 0
+    ) -> AsyncIterator[ConnectorDocument]:
+        """
+        Iterar los documentos candidatos a sincronizar.
+        
+        La implementación base recorre el listado completo; los conectores que
+        soporten consultas incrementales (delta) deben sobrescribirla y dejar
+        sus cursores en ``self._pending_delta_tokens`` y los ids de los
+        documentos borrados en ``self._pending_deletions``.
+        
+        Args:
+            repository_id: ID del repositorio
+            filters: Filtros de documentos
+            start_position: Número de documentos ya procesados a omitir
+                (reanudación desde checkpoint)
+            
+        Yields:
+            ConnectorDocument: Documentos nuevos o potencialmente modificados
+        """
+        documents = await self.list_documents(repository_id, filters=filters)
+        for doc in documents[start_position:]:
+            yield doc
+    
     async def sync_to_financia(
         self,
         repository_id: str,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        ingest: Optional[IngestCallable] = None,
+        resume: bool = True,
+        delete: Optional[DeleteCallable] = None
     ) -> Dict[str, Any]:
         """
         Sincronizar documentos desde sistema externo a FinancIA.
         
-        Este método provee una implementación base que puede ser
-        sobrescrita por conectores específicos si necesitan lógica custom.
+        Los documentos se consumen en streaming desde ``iter_changes`` y se
+        descargan e ingieren con concurrencia acotada (``max_concurrency``).
+        Se omiten los documentos cuyo eTag o hash de contenido coincide con
+        el de la última ingesta.
+        
+        El progreso se guarda como checkpoint cada ``batch_size`` documentos
+        (posición hasta la que todo está procesado y último documento). Si
+        una sync anterior quedó a medias y ``resume`` es True, se reanuda
+        desde esa posición en lugar de empezar de cero.
+        
+        Los documentos borrados en el origen se archivan también en FinancIA.
         
         Args:
             repository_id: ID del repositorio a sincronizar
             filters: Filtros para documentos a sincronizar
+            ingest: Callable de ingesta (por defecto IngestService, con la
+                cuenta de servicio del conector como propietaria)
+            resume: Reanudar desde el checkpoint de una sync interrumpida
+            delete: Callable de borrado (por defecto archiva con IngestService)
             
         Returns:
             Dict: Estadísticas de sincronización
         """
-        from backend.services.ingest_service import IngestService
-        
-        self.logger.info(f"Starting sync from {repository_id}")
+        if ingest is None:
+            # Sin cuenta de servicio no se ingiere nada (evita propietarios nulos)
+            self._service_account_id()
         
+        source = self.config.name
+        checkpoint = self.state_store.get_checkpoint(source, repository_id) if resume else None
+        start_position = 0
         stats = {
             "total_documents": 0,
             "synced": 0,
             "skipped": 0,
+            "deleted": 0,
             "errors": 0,
+            "bytes_downloaded": 0,
             "start_time": datetime.now().isoformat(),
         }
         
-        try:
-            # Listar documentos
-            documents = await self.list_documents(repository_id, filters=filters)
-            stats["total_documents"] = len(documents)
-            
-            ingest_service = IngestService()
-            
-            # Procesar cada documento
-            for doc in documents:
+        if checkpoint and checkpoint["status"] == "running":
+            start_position = checkpoint["position"]
+            stats["resumed_from"] = start_position
+            self.logger.info(f"Resuming sync from {repository_id} at position {start_position}")
+        else:
+            self.logger.info(f"Starting sync from {repository_id}")
+        
+        self.state_store.save_checkpoint(
+            source, repository_id, "running", start_position,
+            last_item_id=checkpoint["last_item_id"] if start_position else None,
+            stats=stats, started_at=stats["start_time"]
+        )
+        
+        ingest = ingest or self._ingest_document
+        delete = delete or self._delete_document
+        concurrency = max(1, self.config.max_concurrency)
+        checkpoint_every = max(1, self.config.batch_size)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        self._pending_delta_tokens = {}
+        self._pending_deletions = []
+        
+        # Marca de agua: todos los documentos con posición < watermark están procesados
+        progress = {"watermark": start_position, "last_item_id": None, "saved": start_position}
+        done: Dict[int, str] = {}
+        
+        def mark_done(position: int, doc_id: str):
+            done[position] = doc_id
+            while progress["watermark"] in done:
+                progress["last_item_id"] = done.pop(progress["watermark"])
+                progress["watermark"] += 1
+            if progress["watermark"] - progress["saved"] >= checkpoint_every:
+                self.state_store.save_checkpoint(
+                    source, repository_id, "running", progress["watermark"],
+                    last_item_id=progress["last_item_id"], stats=stats
+                )
+                progress["saved"] = progress["watermark"]
+        
+        async def worker():
+            while True:
+                item = await queue.get()
                 try:
-                    # Descargar contenido
-                    content = await self.download_document(doc.id)
-                    
-                    # Preparar metadata
-                    metadata = {
-                        "source": self.config.type,
-                        "source_id": doc.id,
-                        "source_url": doc.url,
-                        **doc.metadata
-                    }
-                    
-                    # Ingerir en FinancIA
-                    await ingest_service.upload(
-                        filename=doc.name,
-                        content=content,
-                        metadata=metadata
-                    )
-                    
-                    stats["synced"] += 1
-                    self.logger.debug(f"Synced document: {doc.name}")
-                    
-                except Exception as e:
-                    stats["errors"] += 1
-                    self.logger.error(f"Error syncing {doc.name}: {e}")
-            
-            stats["end_time"] = datetime.now().isoformat()
-            self.logger.info(
-                f"Sync completed: {stats['synced']}/{stats['total_documents']} documents"
-            )
-            
+                    if item is None:
+                        return
+                    position, doc = item
+                    await self._sync_document(doc, ingest, stats)
+                    mark_done(position, doc.id)
+                finally:
+                    queue.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        
+        try:
+            position = start_position
+            async for doc in self.iter_changes(
+                repository_id, filters=filters, start_position=start_position
+            ):
+                stats["total_documents"] += 1
+                await queue.put((position, doc))
+                position += 1
         except Exception as e:
             self.logger.error(f"Sync failed: {e}")
             stats["error"] = str(e)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        
+        # Propagar los borrados del origen
+        for source_id in self._pending_deletions:
+            await self._sync_deletion(source_id, delete, stats)
+        self._pending_deletions = []
+        
+        # Sólo avanzar los cursores delta si no se perdió ningún cambio
+        if stats["errors"] == 0 and "error" not in stats:
+            self.state_store.set_delta_tokens(self.config.name, self._pending_delta_tokens)
+        self._pending_delta_tokens = {}
+        
+        stats["end_time"] = datetime.now().isoformat()
+        
+        # Una sync interrumpida queda en "running" para reanudarse en la próxima ejecución
+        self.state_store.save_checkpoint(
+            source, repository_id,
+            "running" if "error" in stats else "completed",
+            progress["watermark"],
+            last_item_id=progress["last_item_id"], stats=stats
+        )
+        self.logger.info(
+            f"Sync completed: {stats['synced']}/{stats['total_documents']} documents "
+            f"({stats['skipped']} unchanged, {stats['deleted']} deleted, {stats['errors']} errors)"
+        )
         
         return stats
     
+    async def _sync_document(
+        self,
+        doc: ConnectorDocument,
+        ingest: IngestCallable,
+        stats: Dict[str, Any]
+    ):
+        """Descargar e ingerir un documento si cambió desde la última sync"""
+        source = self.config.name
+        version = doc.metadata.get("e_tag")
+        
+        try:
+            stored = self.state_store.get_item_version(source, doc.id)
+            if stored and version and stored[0] == version:
+                stats["skipped"] += 1
+                return
+            
+            # Descargar en streaming a un fichero temporal (hash y tamaño por trozos)
+            path, size, content_hash = await self._spool_document(doc.id)
+            try:
+                stats["bytes_downloaded"] += size
+                
+                if stored and stored[1] == content_hash:
+                    # Sólo cambió la metadata: actualizar versión sin reingerir
+                    self.state_store.set_item_version(source, doc.id, version, content_hash)
+                    stats["skipped"] += 1
+                    return
+                
+                # Preparar metadata
+                metadata = {
+                    "source": self.config.type,
+                    "source_id": doc.id,
+                    "source_url": doc.url,
+                    **doc.metadata
+                }
+                
+                # Ingerir en FinancIA
+                await ingest(doc, path, metadata)
+            finally:
+                os.remove(path)
+            
+            self.state_store.set_item_version(source, doc.id, version, content_hash)
+            stats["synced"] += 1
+            self.logger.debug(f"Synced document: {doc.name}")
+            
+        except Exception as e:
+            stats["errors"] += 1
+            self.logger.error(f"Error syncing {doc.name}: {e}")
+    
+    async def _sync_deletion(self, source_id: str, delete: DeleteCallable, stats: Dict[str, Any]):
+        """Eliminar en FinancIA un documento borrado en el origen"""
+        try:
+            stats["deleted"] += await delete(source_id) or 0
+        except Exception as e:
+            stats["errors"] += 1
+            self.logger.error(f"Error deleting {source_id}: {e}")
+    
+    def _service_account_id(self) -> UUID:
+        """Usuario de servicio propietario de los documentos ingeridos"""
+        from core.config import settings
+        
+        user_id = self.config.service_account_id or settings.CONNECTOR_SERVICE_ACCOUNT_ID
+        if not user_id:
+            raise ValueError(
+                f"Connector '{self.config.name}' has no service account: "
+                "set service_account_id or CONNECTOR_SERVICE_ACCOUNT_ID"
+            )
+        return UUID(str(user_id))
+    
+    async def _ingest_document(
+        self,
+        doc: ConnectorDocument,
+        path: str,
+        metadata: Dict[str, Any]
+    ) -> Any:
+        """
+        Ingesta por defecto a través de IngestService (lee el fichero por trozos).
+        
+        Un elemento modificado en el origen llega con otro contenido y crea un
+        documento nuevo: las versiones anteriores del mismo ``source_id`` se
+        archivan para que sólo quede activa la última.
+        """
+        from core.database import AsyncSessionLocal
+        from services.lazy import ingest_service
+        
+        async with AsyncSessionLocal() as db:
+            with open(path, "rb") as file:
+                document = await ingest_service.ingest_document(
+                    file=file,
+                    filename=doc.name,
+                    user_id=self._service_account_id(),
+                    db=db,
+                    metadata=metadata
+                )
+            archived = await self._archive_source_documents(db, metadata["source_id"], keep=document.id)
+            if archived:
+                self.logger.info(f"Archived {archived} previous version(s) of {metadata['source_id']}")
+            return document
+    
+    async def _delete_document(self, source_id: str) -> int:
+        """Borrado por defecto: archiva los documentos ingeridos desde ``source_id``"""
+        from core.database import AsyncSessionLocal
+        
+        async with AsyncSessionLocal() as db:
+            return await self._archive_source_documents(db, source_id)
+    
+    async def _archive_source_documents(self, db: Any, source_id: str, keep: Optional[UUID] = None) -> int:
+        """Archivar los documentos activos ingeridos desde ``source_id`` salvo ``keep``"""
+        from sqlalchemy import select
+        from models.database_models import Document, DocumentStatus
+        from services.lazy import ingest_service
+        
+        query = select(Document).where(
+            Document.metadata_json["source"].astext == self.config.type,
+            Document.metadata_json["source_id"].astext == source_id,
+            Document.status != DocumentStatus.ARCHIVED
+        )
+        if keep is not None:
+            query = query.where(Document.id != keep)
+        
+        result = await db.execute(query)
+        archived = 0
+        for document in result.scalars().all():
+            if not await ingest_service.delete_document(document, db):
+                raise RuntimeError(f"Could not delete document {document.id}")
+            archived += 1
+        return archived
+    
     def _map_metadata(self, source_metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Mapear metadata del sistema externo a formato FinancIA.
@@ -10,12 +10,11 @@ Conecta con SAP DMS para:
 """
 
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime
 import asyncio
 import logging
-import requests
-from requests.auth import HTTPBasicAuth
+import httpx
 import json
 
 from .base_connector import (
@@ -36,6 +35,7 @@ class SAPDMSConfig(ConnectorConfig):
     password: Optional[str] = None
     client: Optional[str] = "100"
     repositories: List[Dict[str, Any]] = []
+    download_chunk_size: int = 1024 * 1024  # 1MB
 
 
 class SAPDMSConnector(BaseConnector):
@@ -67,7 +67,7 @@ class SAPDMSConnector(BaseConnector):
     def __init__(self, config: SAPDMSConfig):
         super().__init__(config)
         self.config: SAPDMSConfig = config
-        self.session: Optional[requests.Session] = None
+        self.session: Optional[httpx.AsyncClient] = None
         
         # Mapeo de campos SAP a FinancIA
         self.SAP_TO_FINANCIA_MAPPING = {
@@ -96,29 +96,30 @@ class SAPDMSConnector(BaseConnector):
         try:
             self.logger.info(f"Authenticating with SAP DMS at {self.config.url}")
             
-            # Crear sesión HTTP
-            self.session = requests.Session()
-            
             if self.config.auth_type == "basic":
                 # Autenticación básica
                 if not self.config.username or not self.config.password:
                     raise ValueError("Username and password required for basic auth")
                 
-                self.session.auth = HTTPBasicAuth(
-                    self.config.username,
-                    self.config.password
+                # Cliente HTTP asíncrono con pool de conexiones keep-alive
+                await self.close()
+                self.session = httpx.AsyncClient(
+                    auth=httpx.BasicAuth(self.config.username, self.config.password),
+                    headers={
+                        "Content-Type": "application/json",
+                        "Accept": "application/json",
+                        "sap-client": self.config.client or "100"
+                    },
+                    timeout=httpx.Timeout(self.config.timeout_seconds, connect=30),
+                    limits=httpx.Limits(
+                        max_connections=self.config.max_concurrency * 2,
+                        max_keepalive_connections=self.config.max_concurrency
+                    )
                 )
                 
-                # Headers comunes SAP
-                self.session.headers.update({
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "sap-client": self.config.client or "100"
-                })
-                
                 # Probar autenticación con endpoint de prueba
                 test_url = f"{self.config.url}/sap/bc/srt/scs_ext/sap/managedocumentcontentservice"
-                response = self.session.get(test_url, timeout=30)
+                response = await self.session.get(test_url, timeout=30)
                 
                 if response.status_code == 401:
                     self.logger.error("Authentication failed: Invalid credentials")
@@ -194,7 +195,7 @@ class SAPDMSConnector(BaseConnector):
             # Endpoint para listar repositorios (puede variar según versión SAP)
             endpoint = f"{self.config.url}/sap/opu/odata/sap/DOCUMENTSERVICE/Repositories"
             
-            response = self.session.get(endpoint, timeout=30)
+            response = await self.session.get(endpoint, timeout=30)
             
             if response.status_code == 404:
                 # Endpoint no disponible, usar configuración
@@ -233,6 +234,9 @@ class SAPDMSConnector(BaseConnector):
         """
         Buscar documentos en SAP DMS por metadata.
         
+        Recorre todas las páginas del resultado; para repositorios grandes
+        usar ``iter_documents`` y procesar en streaming.
+        
         Args:
             repository_id: ID del repositorio
             filters: Filtros de búsqueda (status, document_type, etc)
@@ -241,58 +245,7 @@ class SAPDMSConnector(BaseConnector):
             List[ConnectorDocument]: Lista de documentos encontrados
         """
         try:
-            if not self.session:
-                raise Exception("Not authenticated")
-            
-            self.logger.info(f"Searching documents in repository {repository_id}")
-            
-            # Construir query OData
-            endpoint = f"{self.config.url}/sap/opu/odata/sap/DOCUMENTSERVICE/Documents"
-            
-            # Construir filtros OData
-            odata_filters = []
-            
-            if filters:
-                if "status" in filters:
-                    statuses = filters["status"]
-                    if isinstance(statuses, list):
-                        status_filter = " or ".join([f"DOKST eq '{s}'" for s in statuses])
-                        odata_filters.append(f"({status_filter})")
-                    else:
-                        odata_filters.append(f"DOKST eq '{statuses}'")
-                
-                if "document_type" in filters:
-                    doc_types = filters["document_type"]
-                    if isinstance(doc_types, list):
-                        type_filter = " or ".join([f"DOKAR eq '{t}'" for t in doc_types])
-                        odata_filters.append(f"({type_filter})")
-                    else:
-                        odata_filters.append(f"DOKAR eq '{doc_types}'")
-            
-            # Agregar filtro de repositorio si es necesario
-            # odata_filters.append(f"RepositoryId eq '{repository_id}'")
-            
-            # Construir URL con filtros
-            params = {}
-            if odata_filters:
-                params["$filter"] = " and ".join(odata_filters)
-            
-            params["$top"] = self.config.batch_size or 100
-            params["$format"] = "json"
-            
-            self.logger.debug(f"OData query: {params}")
-            
-            response = self.session.get(endpoint, params=params, timeout=60)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            documents = []
-            if "d" in data and "results" in data["d"]:
-                for doc_data in data["d"]["results"]:
-                    doc = self._parse_sap_document(doc_data, repository_id)
-                    documents.append(doc)
-            
+            documents = [doc async for doc in self.iter_documents(repository_id, filters)]
             self.logger.info(f"Found {len(documents)} documents")
             return documents
             
@@ -300,6 +253,105 @@ class SAPDMSConnector(BaseConnector):
             self.logger.error(f"Error searching documents: {e}")
             return []
     
+    async def iter_documents(
+        self,
+        repository_id: str,
+        filters: Optional[Dict[str, Any]] = None,
+        start_position: int = 0
+    ) -> AsyncIterator[ConnectorDocument]:
+        """
+        Iterar todos los documentos que cumplen los filtros, página a página.
+        
+        Sigue el enlace ``__next`` de OData (paginación del servidor) y, si el
+        servicio no lo devuelve, avanza con ``$skip`` hasta agotar resultados.
+        
+        Args:
+            repository_id: ID del repositorio
+            filters: Filtros de búsqueda (status, document_type, etc)
+            start_position: Posición inicial ($skip) en el resultado
+            
+        Yields:
+            ConnectorDocument: Documentos encontrados
+        """
+        if not self.session:
+            raise Exception("Not authenticated")
+        
+        self.logger.info(f"Searching documents in repository {repository_id}")
+        
+        endpoint = f"{self.config.url}/sap/opu/odata/sap/DOCUMENTSERVICE/Documents"
+        page_size = self.config.batch_size or 100
+        
+        params = {}
+        odata_filter = self._build_odata_filter(filters)
+        if odata_filter:
+            params["$filter"] = odata_filter
+        params["$top"] = page_size
+        # Orden estable: las posiciones de $skip deben ser reproducibles para reanudar
+        params["$orderby"] = "DOKAR,DOKNR,DOKVR"
+        params["$format"] = "json"
+        
+        skip = start_position
+        next_url: Optional[str] = None
+        
+        while True:
+            if next_url:
+                response = await self.session.get(next_url, timeout=60)
+            else:
+                page_params = dict(params, **({"$skip": skip} if skip else {}))
+                self.logger.debug(f"OData query: {page_params}")
+                response = await self.session.get(endpoint, params=page_params, timeout=60)
+            response.raise_for_status()
+            
+            data = response.json().get("d", {})
+            results = data.get("results", [])
+            
+            for doc_data in results:
+                yield self._parse_sap_document(doc_data, repository_id)
+            
+            # Filas consumidas, también las de páginas __next: si el servidor deja
+            # de enviar __next se continúa con $skip desde la posición real
+            skip += len(results)
+            next_url = data.get("__next")
+            if next_url:
+                continue
+            if len(results) < page_size:
+                break
+    
+    async def iter_changes(
+        self,
+        repository_id: str,
+        filters: Optional[Dict[str, Any]] = None,
+        start_position: int = 0
+    ) -> AsyncIterator[ConnectorDocument]:
+        """Streaming de documentos para sync_to_financia (sin materializar la lista)"""
+        async for doc in self.iter_documents(repository_id, filters, start_position=start_position):
+            yield doc
+    
+    def _build_odata_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Construir expresión $filter de OData a partir de los filtros"""
+        if not filters:
+            return None
+        
+        odata_filters = []
+        
+        if "status" in filters:
+            statuses = filters["status"]
+            if isinstance(statuses, list):
+                status_filter = " or ".join([f"DOKST eq '{s}'" for s in statuses])
+                odata_filters.append(f"({status_filter})")
+            else:
+                odata_filters.append(f"DOKST eq '{statuses}'")
+        
+        if "document_type" in filters:
+            doc_types = filters["document_type"]
+            if isinstance(doc_types, list):
+                type_filter = " or ".join([f"DOKAR eq '{t}'" for t in doc_types])
+                odata_filters.append(f"({type_filter})")
+            else:
+                odata_filters.append(f"DOKAR eq '{doc_types}'")
+        
+        return " and ".join(odata_filters) if odata_filters else None
+    
     async def list_documents(
         self,
         repository_id: str,
@@ -361,6 +413,8 @@ class SAPDMSConnector(BaseConnector):
                 metadata[financia_field] = doc_data[sap_field]
         
         metadata["repository_id"] = repository_id
+        # Huella de versión para omitir documentos sin cambios en la sync
+        metadata["e_tag"] = f"{doc_version}:{doc_data.get('AEDAT', '')}"
         
         return ConnectorDocument(
             id=document_id,
@@ -429,7 +483,7 @@ class SAPDMSConnector(BaseConnector):
             
             params = {"$format": "json"}
             
-            response = self.session.get(endpoint, params=params, timeout=30)
+            response = await self.session.get(endpoint, params=params, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -444,10 +498,47 @@ class SAPDMSConnector(BaseConnector):
             self.logger.error(f"Error getting document: {e}")
             raise
     
+    def _content_endpoint(self, document_id: str) -> str:
+        """URL del contenido ($value) de un documento"""
+        parts = document_id.split("|")
+        if len(parts) != 5:
+            raise ValueError("Invalid document_id format")
+        
+        repository_id, doc_type, doc_number, doc_version, doc_part = parts
+        
+        # Nota: Este endpoint puede variar según la versión de SAP DMS
+        return f"{self.config.url}/sap/opu/odata/sap/DOCUMENTSERVICE/Documents(DocumentType='{doc_type}',DocumentNumber='{doc_number}',DocumentVersion='{doc_version}',DocumentPart='{doc_part}')/$value"
+    
+    async def iter_document_content(self, document_id: str) -> AsyncIterator[bytes]:
+        """
+        Descargar el contenido de un documento en streaming.
+        
+        Args:
+            document_id: ID en formato "repo|type|number|version|part"
+            
+        Yields:
+            bytes: Fragmentos de ``download_chunk_size`` bytes
+        """
+        if not self.session:
+            raise Exception("Not authenticated")
+        
+        endpoint = self._content_endpoint(document_id)
+        
+        self.logger.info(f"Downloading document {document_id.split('|')[2]} from SAP")
+        
+        async with self.session.stream("GET", endpoint) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(self.config.download_chunk_size):
+                yield chunk
+    
     async def download_document(self, document_id: str) -> bytes:
         """
         Descargar contenido de un documento desde SAP.
         
+        Devuelve el documento completo en memoria; para ficheros grandes usar
+        ``iter_document_content`` o ``download_document_to_file`` (es lo que
+        hace ``sync_to_financia``).
+        
         Args:
             document_id: ID en formato "repo|type|number|version|part"
             
@@ -455,29 +546,12 @@ class SAPDMSConnector(BaseConnector):
             bytes: Contenido del documento
         """
         try:
-            if not self.session:
-                raise Exception("Not authenticated")
-            
-            # Parsear document_id
-            parts = document_id.split("|")
-            if len(parts) != 5:
-                raise ValueError("Invalid document_id format")
-            
-            repository_id, doc_type, doc_number, doc_version, doc_part = parts
-            
-            self.logger.info(f"Downloading document {doc_number} from SAP")
-            
-            # Endpoint para descargar contenido
-            # Nota: Este endpoint puede variar según la versión de SAP DMS
-            endpoint = f"{self.config.url}/sap/opu/odata/sap/DOCUMENTSERVICE/Documents(DocumentType='{doc_type}',DocumentNumber='{doc_number}',DocumentVersion='{doc_version}',DocumentPart='{doc_part}')/$value"
-            
-            response = self.session.get(endpoint, timeout=300)  # 5 min timeout para archivos grandes
-            response.raise_for_status()
-            
-            content = response.content
+            content = bytearray()
+            async for chunk in self.iter_document_content(document_id):
+                content.extend(chunk)
             
             self.logger.info(f"Downloaded {len(content)} bytes")
-            return content
+            return bytes(content)
             
         except Exception as e:
             self.logger.error(f"Error downloading document: {e}")
@@ -526,7 +600,7 @@ class SAPDMSConnector(BaseConnector):
             
             # Crear documento
             headers = {"Content-Type": "application/json"}
-            response = self.session.post(
+            response = await self.session.post(
                 endpoint,
                 json=doc_data,
                 headers=headers,
@@ -542,9 +616,9 @@ class SAPDMSConnector(BaseConnector):
             # Subir contenido
             content_endpoint = f"{endpoint}(DocumentType='{doc_type}',DocumentNumber='{doc_number}',DocumentVersion='{doc_version}',DocumentPart='{doc_part}')/$value"
             
-            content_response = self.session.put(
+            content_response = await self.session.put(
                 content_endpoint,
-                data=content,
+                content=content,
                 headers={"Content-Type": "application/octet-stream"},
                 timeout=300
             )
@@ -584,6 +658,16 @@ class SAPDMSConnector(BaseConnector):
                 mapped[financia_field] = source_metadata[financia_field]
         
         return mapped
+    
+    async def close(self):
+        """Cerrar el pool de conexiones HTTP"""
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        await self.close()
 
 
 # Alias for easier import
@@ -10,10 +10,11 @@ Conecta con SharePoint usando Microsoft Graph API para:
 """
 
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime, timedelta
 import asyncio
 import logging
+import httpx
 import requests
 
 try:
@@ -49,6 +50,7 @@ class SharePointConfig(ConnectorConfig):
     sites: List[Dict[str, Any]] = []
     webhook_enabled: bool = False
     webhook_expiration_days: int = 30
+    download_chunk_size: int = 1024 * 1024  # 1MB
 
 
 class SharePointConnector(BaseConnector):
@@ -89,6 +91,8 @@ class SharePointConnector(BaseConnector):
         self.client: Optional[GraphServiceClient] = None
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[datetime] = None
+        # Cliente HTTP para las URLs de descarga pre-autenticadas
+        self.download_session: Optional[httpx.AsyncClient] = None
     
     async def authenticate(self) -> bool:
         """
@@ -216,6 +220,9 @@ class SharePointConnector(BaseConnector):
         """
         Listar documentos en una biblioteca de SharePoint.
         
+        Recorre las carpetas de forma recursiva siguiendo la paginación
+        (``@odata.nextLink``) de cada nivel.
+        
         Args:
             repository_id: ID del sitio SharePoint
             path: Ruta específica o nombre de biblioteca (ej: "Shared Documents")
@@ -243,47 +250,12 @@ class SharePointConnector(BaseConnector):
                 if path and drive.name != path:
                     continue
                 
-                # Listar items del drive
-                items_response = await self.client.sites.by_site_id(repository_id).drives.by_drive_id(drive.id).root.children.get()
-                
-                for item in items_response.value:
-                    # Solo procesar archivos, no carpetas
-                    if item.file is None:
+                async for item, parent_path in self._walk_drive(repository_id, drive):
+                    if not self._matches_filters(item, filters):
                         continue
-                    
-                    # Aplicar filtros si se especificaron
-                    if filters:
-                        if "file_types" in filters:
-                            ext = os.path.splitext(item.name)[1].lower()
-                            if ext not in filters["file_types"]:
-                                continue
-                        
-                        if "modified_after" in filters:
-                            if item.last_modified_date_time < filters["modified_after"]:
-                                continue
-                    
-                    # Crear ConnectorDocument
-                    doc = ConnectorDocument(
-                        id=item.id,
-                        name=item.name,
-                        size=item.size or 0,
-                        mime_type=item.file.mime_type or "application/octet-stream",
-                        created_at=item.created_date_time,
-                        modified_at=item.last_modified_date_time,
-                        created_by=item.created_by.user.display_name if item.created_by and item.created_by.user else None,
-                        modified_by=item.last_modified_by.user.display_name if item.last_modified_by and item.last_modified_by.user else None,
-                        path=f"{drive.name}/{item.name}",
-                        url=item.web_url,
-                        metadata={
-                            "drive_id": drive.id,
-                            "drive_name": drive.name,
-                            "site_id": repository_id,
-                            "site_name": site.display_name,
-                            "e_tag": item.e_tag,
-                        }
+                    documents.append(
+                        self._to_connector_document(item, drive, repository_id, site.display_name, parent_path)
                     )
-                    
-                    documents.append(doc)
             
             self.logger.info(f"Found {len(documents)} documents")
             return documents
@@ -292,6 +264,184 @@ class SharePointConnector(BaseConnector):
             self.logger.error(f"Error listing documents: {e}")
             return []
     
+    async def _walk_drive(self, site_id: str, drive: Any) -> AsyncIterator[Any]:
+        """
+        Recorrer recursivamente los archivos de un drive.
+        
+        Yields:
+            Tuplas (DriveItem, ruta de la carpeta padre relativa al drive)
+        """
+        drive_builder = self.client.sites.by_site_id(site_id).drives.by_drive_id(drive.id)
+        pending = [(drive_builder.root.children, "")]
+        
+        while pending:
+            children_builder, folder_path = pending.pop()
+            page = await children_builder.get()
+            
+            while page is not None:
+                for item in page.value or []:
+                    if item.file is not None:
+                        yield item, folder_path
+                    elif getattr(item, "folder", None) is not None:
+                        pending.append((
+                            drive_builder.items.by_drive_item_id(item.id).children,
+                            f"{folder_path}/{item.name}"
+                        ))
+                
+                next_link = self._next_link(page)
+                page = await children_builder.with_url(next_link).get() if next_link else None
+    
+    async def iter_changes(
+        self,
+        repository_id: str,
+        filters: Optional[Dict[str, Any]] = None,
+        start_position: int = 0
+    ) -> AsyncIterator[ConnectorDocument]:
+        """
+        Iterar cambios de un sitio mediante delta queries de Microsoft Graph.
+        
+        Por cada biblioteca se reanuda desde el ``@odata.deltaLink`` guardado
+        en la última sync completa; sin token se obtiene el estado completo.
+        El delta de la raíz es recursivo, así que incluye subcarpetas. Los
+        nuevos deltaLinks quedan pendientes hasta que la sync termina bien.
+        
+        Al reanudar una sync interrumpida se reinicia el delta desde el último
+        token guardado y se omiten los ``start_position`` primeros cambios
+        (Graph no permite saltar posiciones en el servidor).
+        
+        Args:
+            repository_id: ID del sitio SharePoint
+            filters: Filtros adicionales (file_types, modified_after, library)
+            start_position: Número de cambios ya procesados a omitir
+            
+        Yields:
+            ConnectorDocument: Archivos creados o modificados
+        """
+        await self._refresh_token_if_needed()
+        
+        if not self.client:
+            raise Exception("Not authenticated")
+        
+        site = await self.client.sites.by_site_id(repository_id).get()
+        drives_response = await self.client.sites.by_site_id(repository_id).drives.get()
+        libraries = self._configured_libraries(repository_id, filters)
+        position = 0
+        
+        for drive in drives_response.value:
+            if libraries and drive.name not in libraries:
+                continue
+            
+            scope = f"{repository_id}|{drive.id}"
+            delta_builder = self.client.drives.by_drive_id(drive.id).items.by_drive_item_id("root").delta
+            delta_link = self.state_store.get_delta_token(self.config.name, scope)
+            
+            self.logger.info(
+                f"Delta sync of drive {drive.name} ({'incremental' if delta_link else 'full'})"
+            )
+            page = await (delta_builder.with_url(delta_link) if delta_link else delta_builder).get()
+            
+            while page is not None:
+                for item in page.value or []:
+                    if getattr(item, "deleted", None) is not None:
+                        item_id = f"{repository_id}|{drive.id}|{item.id}"
+                        self.state_store.delete_item_version(self.config.name, item_id)
+                        self._pending_deletions.append(item_id)
+                        continue
+                    
+                    if item.file is None or not self._matches_filters(item, filters):
+                        continue
+                    
+                    position += 1
+                    if position <= start_position:
+                        continue
+                    
+                    yield self._to_connector_document(
+                        item, drive, repository_id, site.display_name, self._relative_parent_path(item)
+                    )
+                
+                next_link = self._next_link(page)
+                if next_link:
+                    page = await delta_builder.with_url(next_link).get()
+                else:
+                    delta_link = getattr(page, "odata_delta_link", None)
+                    if isinstance(delta_link, str):
+                        self._pending_delta_tokens[scope] = delta_link
+                    page = None
+    
+    def _configured_libraries(
+        self,
+        site_id: str,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[str]:
+        """Bibliotecas a sincronizar: filtro explícito o configuración del sitio"""
+        if filters and filters.get("library"):
+            return [filters["library"]]
+        for site_config in self.config.sites:
+            if site_config.get("site_id") == site_id:
+                return site_config.get("libraries", [])
+        return []
+    
+    @staticmethod
+    def _next_link(page: Any) -> Optional[str]:
+        next_link = getattr(page, "odata_next_link", None)
+        return next_link if isinstance(next_link, str) else None
+    
+    @staticmethod
+    def _relative_parent_path(item: Any) -> str:
+        """Ruta de la carpeta padre relativa al drive ('/drives/x/root:/A/B' -> '/A/B')"""
+        parent = getattr(item, "parent_reference", None)
+        parent_path = getattr(parent, "path", None) if parent else None
+        if not isinstance(parent_path, str) or ":" not in parent_path:
+            return ""
+        return parent_path.split(":", 1)[1]
+    
+    @staticmethod
+    def _matches_filters(item: Any, filters: Optional[Dict[str, Any]]) -> bool:
+        """Aplicar filtros de tipo de archivo y fecha de modificación"""
+        if not filters:
+            return True
+        
+        if "file_types" in filters:
+            ext = os.path.splitext(item.name)[1].lower()
+            if ext not in filters["file_types"]:
+                return False
+        
+        if "modified_after" in filters:
+            if item.last_modified_date_time < filters["modified_after"]:
+                return False
+        
+        return True
+    
+    def _to_connector_document(
+        self,
+        item: Any,
+        drive: Any,
+        site_id: str,
+        site_name: Optional[str],
+        parent_path: str = ""
+    ) -> ConnectorDocument:
+        """Convertir un DriveItem de archivo a ConnectorDocument"""
+        return ConnectorDocument(
+            id=f"{site_id}|{drive.id}|{item.id}",
+            name=item.name,
+            size=item.size or 0,
+            mime_type=item.file.mime_type or "application/octet-stream",
+            created_at=item.created_date_time,
+            modified_at=item.last_modified_date_time,
+            created_by=item.created_by.user.display_name if item.created_by and item.created_by.user else None,
+            modified_by=item.last_modified_by.user.display_name if item.last_modified_by and item.last_modified_by.user else None,
+            path=f"{drive.name}{parent_path}/{item.name}",
+            url=item.web_url,
+            metadata={
+                "drive_id": drive.id,
+                "drive_name": drive.name,
+                "site_id": site_id,
+                "site_name": site_name,
+                "e_tag": item.e_tag,
+                "item_id": item.id,
+            }
+        )
+    
     async def get_document(self, document_id: str) -> ConnectorDocument:
         """
         Obtener metadata completa de un documento.
@@ -351,10 +501,60 @@ class SharePointConnector(BaseConnector):
             self.logger.error(f"Error getting document: {e}")
             raise
     
+    async def iter_document_content(self, document_id: str) -> AsyncIterator[bytes]:
+        """
+        Descargar el contenido de un documento en streaming.
+        
+        ``content.get()`` del SDK de Graph devuelve el fichero completo en
+        memoria; se descarga desde ``@microsoft.graph.downloadUrl`` (URL
+        pre-autenticada de corta duración) leyendo por trozos.
+        
+        Args:
+            document_id: ID del documento en formato "site_id|drive_id|item_id"
+            
+        Yields:
+            bytes: Fragmentos de ``download_chunk_size`` bytes
+        """
+        await self._refresh_token_if_needed()
+        
+        if not self.client:
+            raise Exception("Not authenticated")
+        
+        parts = document_id.split("|")
+        if len(parts) != 3:
+            raise ValueError("Invalid document_id format")
+        
+        site_id, drive_id, item_id = parts
+        
+        item = await self.client.sites.by_site_id(site_id).drives.by_drive_id(drive_id).items.by_drive_item_id(item_id).get()
+        download_url = (item.additional_data or {}).get("@microsoft.graph.downloadUrl") if item else None
+        if not download_url:
+            raise ValueError(f"Item {item_id} has no downloadable content")
+        
+        self.logger.info(f"Downloading document {item_id}")
+        
+        if self.download_session is None:
+            self.download_session = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.config.timeout_seconds, connect=30),
+                limits=httpx.Limits(
+                    max_connections=self.config.max_concurrency * 2,
+                    max_keepalive_connections=self.config.max_concurrency
+                )
+            )
+        
+        async with self.download_session.stream("GET", download_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(self.config.download_chunk_size):
+                yield chunk
+    
     async def download_document(self, document_id: str) -> bytes:
         """
         Descargar contenido de un documento.
         
+        Devuelve el documento completo en memoria; para ficheros grandes usar
+        ``iter_document_content`` o ``download_document_to_file`` (es lo que
+        hace ``sync_to_financia``).
+        
         Args:
             document_id: ID del documento en formato "site_id|drive_id|item_id"
             
@@ -362,27 +562,12 @@ class SharePointConnector(BaseConnector):
             bytes: Contenido del documento
         """
         try:
-            await self._refresh_token_if_needed()
-            
-            if not self.client:
-                raise Exception("Not authenticated")
-            
-            parts = document_id.split("|")
-            if len(parts) != 3:
-                raise ValueError("Invalid document_id format")
-            
-            site_id, drive_id, item_id = parts
-            
-            self.logger.info(f"Downloading document {item_id}")
-            
-            # Descargar contenido
-            content_stream = await self.client.sites.by_site_id(site_id).drives.by_drive_id(drive_id).items.by_drive_item_id(item_id).content.get()
-            
-            # Leer stream completo
-            content = await content_stream.read()
+            content = bytearray()
+            async for chunk in self.iter_document_content(document_id):
+                content.extend(chunk)
             
             self.logger.info(f"Downloaded {len(content)} bytes")
-            return content
+            return bytes(content)
             
         except Exception as e:
             self.logger.error(f"Error downloading document: {e}")
@@ -569,6 +754,16 @@ class SharePointConnector(BaseConnector):
             "sharepoint_url": source_metadata.get("url"),
             "sharepoint_etag": source_metadata.get("e_tag"),
         }
+    
+    async def close(self):
+        """Cerrar el pool de conexiones de descarga"""
+        if self.download_session is not None:
+            await self.download_session.aclose()
+            self.download_session = None
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        await self.close()
 
 
 # Alias for easier import
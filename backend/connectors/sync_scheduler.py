@@ -0,0 +1,271 @@
+"""
+Connector Sync Scheduler - Ejecución programada de sincronizaciones
+
+Lee ``config/connectors.yaml`` y programa, para cada fuente habilitada, una
+sincronización según su ``sync_schedule`` (cron). Cada ejecución recorre los
+repositorios configurados llamando a ``sync_to_financia``, que guarda
+checkpoints y reanuda las syncs interrumpidas.
+
+Métricas por fuente: documentos y bytes procesados, duración, throughput
+y lag (segundos desde la última sync correcta).
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import yaml
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from core.config import settings
+
+from .base_connector import BaseConnector, ConnectorConfig
+from .sharepoint_connector import SharePointConnector, SharePointConfig
+from .sap_dms_connector import SAPDMSConnector, SAPDMSConfig
+from monitoring.metrics import (
+    connector_documents_synced_total,
+    connector_bytes_downloaded_total,
+    connector_sync_duration_seconds,
+    connector_sync_throughput_docs_per_second,
+    connector_sync_last_success_timestamp,
+    connector_sync_lag_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Tipos de conector soportados: type -> (clase de conector, clase de configuración)
+CONNECTOR_TYPES: Dict[str, Tuple[Type[BaseConnector], Type[ConnectorConfig]]] = {
+    "sharepoint": (SharePointConnector, SharePointConfig),
+    "sap_dms": (SAPDMSConnector, SAPDMSConfig),
+}
+
+
+class ConnectorSyncScheduler:
+    """
+    Scheduler de sincronizaciones de conectores.
+
+    - Un job por fuente con su cron; ``max_instances=1`` evita solapar
+      ejecuciones de la misma fuente.
+    - ``global.max_concurrent_syncs`` limita las fuentes sincronizando a la vez.
+    - Si una sync falla se reintenta con backoff exponencial; el reintento
+      continúa desde el último checkpoint en lugar de empezar de cero.
+    """
+
+    def __init__(self, config_path: str = "config/connectors.yaml"):
+        self.config_path = config_path
+        self.scheduler = AsyncIOScheduler()
+        self.is_running = False
+        self.settings: Dict[str, Any] = {}
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self._last_success: Dict[str, float] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def load_config(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Cargar la configuración de conectores.
+
+        Las variables ``${VAR}`` se sustituyen desde el entorno. Se ignoran las
+        fuentes deshabilitadas y los tipos sin conector implementado.
+
+        Returns:
+            Dict: Configuración de las fuentes a sincronizar, por clave del YAML
+        """
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            raw = yaml.safe_load(os.path.expandvars(f.read())) or {}
+
+        self.settings = raw.pop("global", {}) or {}
+        self.sources = {}
+
+        if not self.settings.get("enabled", True):
+            logger.info("Connectors globally disabled")
+            return self.sources
+
+        for key, source in raw.items():
+            if not isinstance(source, dict) or not source.get("enabled", False):
+                continue
+            if source.get("type") not in CONNECTOR_TYPES:
+                logger.warning(f"Connector type not supported, skipping: {key} ({source.get('type')})")
+                continue
+            source.setdefault("retry_attempts", self.settings.get("default_retry_attempts", 3))
+            source.setdefault("timeout_seconds", self.settings.get("default_timeout_seconds", 300))
+            self.sources[key] = source
+
+        return self.sources
+
+    def start(self):
+        """Inicia el scheduler con un job por fuente configurada."""
+        if self.is_running:
+            logger.warning("Connector sync scheduler already running")
+            return
+
+        self.load_config()
+        self._semaphore = asyncio.Semaphore(max(1, int(self.settings.get("max_concurrent_syncs", 3))))
+
+        for key, source in self.sources.items():
+            connector_sync_lag_seconds.labels(source=key).set_function(
+                lambda key=key: time.time() - self._last_success[key]
+                if key in self._last_success else float("nan")
+            )
+
+            if not source.get("sync_schedule"):
+                logger.info(f"Connector {key} has no sync_schedule, not scheduled")
+                continue
+
+            self.scheduler.add_job(
+                self.run_source,
+                trigger=CronTrigger.from_crontab(source["sync_schedule"]),
+                args=[key],
+                id=f"connector_sync_{key}",
+                name=f"Sincronizar {source.get('name', key)}",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
+        self.scheduler.start()
+        self.is_running = True
+        logger.info(f"Connector sync scheduler started ({len(self.sources)} sources)")
+
+    def stop(self):
+        """Detiene el scheduler."""
+        if not self.is_running:
+            logger.warning("Connector sync scheduler not running")
+            return
+
+        self.scheduler.shutdown(wait=True)
+        self.is_running = False
+        logger.info("Connector sync scheduler stopped")
+
+    def create_connector(self, key: str) -> BaseConnector:
+        """Instanciar el conector de una fuente a partir de su configuración"""
+        source = self.sources[key]
+        connector_class, config_class = CONNECTOR_TYPES[source["type"]]
+        return connector_class(config_class(**source))
+
+    def repositories(self, key: str) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Repositorios a sincronizar de una fuente: [(repository_id, filtros)]"""
+        source = self.sources[key]
+        if source["type"] == "sharepoint":
+            return [(site["site_id"], None) for site in source.get("sites", []) if site.get("site_id")]
+        return [
+            (repo["id"], repo.get("sync_filters"))
+            for repo in source.get("repositories", [])
+            if repo.get("id")
+        ]
+
+    async def run_source(self, key: str) -> Dict[str, Any]:
+        """
+        Sincronizar todos los repositorios de una fuente.
+
+        Args:
+            key: Clave de la fuente en connectors.yaml
+
+        Returns:
+            Dict: Estadísticas por repositorio
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, int(self.settings.get("max_concurrent_syncs", 3))))
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            results: Dict[str, Any] = {}
+
+            connector = self.create_connector(key)
+            try:
+                async with connector:
+                    for repository_id, filters in self.repositories(key):
+                        results[repository_id] = await self._sync_with_retry(
+                            key, connector, repository_id, filters
+                        )
+            except Exception as e:
+                logger.error(f"Connector sync failed for {key}: {e}")
+                results["error"] = str(e)
+
+            elapsed = time.perf_counter() - start
+            failed = "error" in results or any("error" in r for r in results.values() if isinstance(r, dict))
+            self._record_metrics(key, results, elapsed, failed)
+            return results
+
+    async def _sync_with_retry(
+        self,
+        key: str,
+        connector: BaseConnector,
+        repository_id: str,
+        filters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Ejecutar una sync reintentando (desde el checkpoint) si se interrumpe"""
+        attempts = max(1, int(self.sources[key].get("retry_attempts", 1)))
+        delay = float(self.settings.get("default_retry_delay_seconds", 5))
+        backoff = float(self.settings.get("default_retry_backoff_multiplier", 2.0))
+        totals: Dict[str, Any] = {}
+
+        for attempt in range(1, attempts + 1):
+            try:
+                stats = await connector.sync_to_financia(repository_id, filters=filters)
+            except Exception as e:
+                stats = {"error": str(e)}
+
+            for field in ("total_documents", "synced", "skipped", "errors", "bytes_downloaded"):
+                totals[field] = totals.get(field, 0) + stats.get(field, 0)
+            totals.pop("error", None)
+            if "error" not in stats:
+                break
+
+            totals["error"] = stats["error"]
+            if attempt < attempts:
+                logger.warning(
+                    f"Sync of {key}/{repository_id} interrupted (attempt {attempt}/{attempts}): "
+                    f"{stats['error']} - resuming in {delay:.0f}s"
+                )
+                await asyncio.sleep(delay)
+                delay *= backoff
+
+        totals["attempts"] = attempt
+        return totals
+
+    def _record_metrics(self, key: str, results: Dict[str, Any], elapsed: float, failed: bool):
+        processed = 0
+        for stats in results.values():
+            if not isinstance(stats, dict):
+                continue
+            for result in ("synced", "skipped", "errors"):
+                count = stats.get(result, 0)
+                processed += count
+                if count:
+                    connector_documents_synced_total.labels(source=key, result=result).inc(count)
+            if stats.get("bytes_downloaded"):
+                connector_bytes_downloaded_total.labels(source=key).inc(stats["bytes_downloaded"])
+
+        connector_sync_duration_seconds.labels(
+            source=key, status="failed" if failed else "success"
+        ).observe(elapsed)
+        connector_sync_throughput_docs_per_second.labels(source=key).set(
+            processed / elapsed if elapsed > 0 else 0
+        )
+
+        if not failed:
+            self._last_success[key] = time.time()
+            connector_sync_last_success_timestamp.labels(source=key).set(self._last_success[key])
+
+        logger.info(
+            f"Connector sync {key} {'failed' if failed else 'completed'}: "
+            f"{processed} documents in {elapsed:.1f}s"
+        )
+
+
+# Instancia global del scheduler
+connector_sync_scheduler = ConnectorSyncScheduler(settings.CONNECTOR_CONFIG_PATH)
+
+
+def start_connector_scheduler():
+    """Inicia el scheduler global de conectores."""
+    connector_sync_scheduler.start()
+
+
+def stop_connector_scheduler():
+    """Detiene el scheduler global de conectores."""
+    connector_sync_scheduler.stop()
@@ -0,0 +1,211 @@
+"""
+Sync State Store - Persistent state for incremental connector syncs
+
+Guarda en SQLite (un fichero local por despliegue) el estado que permite
+sincronizaciones incrementales:
+- Tokens/cursores delta por fuente y ámbito (p. ej. deltaLink por drive)
+- Versión (eTag) y hash de contenido de cada documento ya ingerido
+- Checkpoints de cada sync (posición y último documento procesado) para
+  reanudar tras una caída
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectorStateStore:
+    """
+    Almacén de estado de sincronización.
+
+    Las operaciones son pequeñas y síncronas (SQLite en modo WAL), por lo que
+    pueden invocarse desde corrutinas sin bloquear el event loop de forma
+    apreciable.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS delta_tokens (
+                    source TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source, scope)
+                );
+                CREATE TABLE IF NOT EXISTS item_versions (
+                    source TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    version TEXT,
+                    content_hash TEXT,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source, item_id)
+                );
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    source TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    last_item_id TEXT,
+                    stats TEXT,
+                    started_at TEXT,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source, scope)
+                );
+                """
+            )
+
+    # ------------------------------------------------------------------
+    # Delta tokens
+    # ------------------------------------------------------------------
+
+    def get_delta_token(self, source: str, scope: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT token FROM delta_tokens WHERE source = ? AND scope = ?",
+                (source, scope)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_delta_tokens(self, source: str, tokens: Dict[str, str]):
+        """Guarda varios tokens en una única transacción"""
+        if not tokens:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                """
+                INSERT INTO delta_tokens (source, scope, token, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (source, scope) DO UPDATE
+                SET token = excluded.token, updated_at = excluded.updated_at
+                """,
+                [(source, scope, token) for scope, token in tokens.items()]
+            )
+            self._conn.execute("COMMIT")
+
+    def clear_delta_tokens(self, source: str):
+        """Fuerza una resincronización completa en la próxima ejecución"""
+        with self._lock:
+            self._conn.execute("DELETE FROM delta_tokens WHERE source = ?", (source,))
+
+    # ------------------------------------------------------------------
+    # Item versions
+    # ------------------------------------------------------------------
+
+    def get_item_version(self, source: str, item_id: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Devuelve (version, content_hash) del último contenido ingerido"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, content_hash FROM item_versions WHERE source = ? AND item_id = ?",
+                (source, item_id)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_item_version(
+        self,
+        source: str,
+        item_id: str,
+        version: Optional[str],
+        content_hash: Optional[str]
+    ):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO item_versions (source, item_id, version, content_hash, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (source, item_id) DO UPDATE
+                SET version = excluded.version,
+                    content_hash = excluded.content_hash,
+                    updated_at = excluded.updated_at
+                """,
+                (source, item_id, version, content_hash)
+            )
+
+    def delete_item_version(self, source: str, item_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM item_versions WHERE source = ? AND item_id = ?",
+                (source, item_id)
+            )
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def get_checkpoint(self, source: str, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el checkpoint de una sync.
+
+        ``status`` es "running" mientras la sync no ha terminado (una caída
+        lo deja así y la siguiente ejecución reanuda desde ``position``) y
+        "completed" cuando terminó.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT status, position, last_item_id, stats, started_at, updated_at
+                FROM checkpoints WHERE source = ? AND scope = ?
+                """,
+                (source, scope)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "status": row[0],
+            "position": row[1],
+            "last_item_id": row[2],
+            "stats": json.loads(row[3]) if row[3] else {},
+            "started_at": row[4],
+            "updated_at": row[5],
+        }
+
+    def save_checkpoint(
+        self,
+        source: str,
+        scope: str,
+        status: str,
+        position: int,
+        last_item_id: Optional[str] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        started_at: Optional[str] = None
+    ):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO checkpoints
+                    (source, scope, status, position, last_item_id, stats, started_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (source, scope) DO UPDATE
+                SET status = excluded.status,
+                    position = excluded.position,
+                    last_item_id = excluded.last_item_id,
+                    stats = excluded.stats,
+                    started_at = COALESCE(excluded.started_at, checkpoints.started_at),
+                    updated_at = excluded.updated_at
+                """,
+                (source, scope, status, position, last_item_id,
+                 json.dumps(stats, default=str) if stats is not None else None, started_at)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
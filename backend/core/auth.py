@@ -2,17 +2,23 @@
 Authentication and Authorization Module
 Handles JWT tokens, user authentication, and role-based access control
 """
-from typing import Optional, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple, TYPE_CHECKING
 from datetime import datetime, timedelta
+import hashlib
+import time
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
 from core.database import get_db
-from models.database_models import User
+from models.database_models import Document, User
+from monitoring.metrics import cache_requests_total
 
 if TYPE_CHECKING:
     from models.schemas import UserResponse
@@ -41,10 +47,124 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    # Identificador del token: clave de la caché de usuarios autenticados
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+class PrincipalCache:
+    """
+    Caché en memoria de usuarios autenticados por token.
+
+    Las entradas se indexan por ``(sub, jti)`` y caducan a los ``ttl``
+    segundos (o antes, si expira el token). Cada entrada guarda el
+    ``auth_version`` del usuario: al cambiar su rol o desactivarlo la versión
+    sube y las entradas anteriores dejan de servirse.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Tuple[float, str, int, Any]]" = OrderedDict()
+        self._by_user: Dict[str, Set[Tuple]] = {}
+        self._versions: Dict[str, int] = {}
+        self._stats = {"hit": 0, "miss": 0, "stale": 0, "invalidated": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Usuario cacheado para el token, si sigue vigente"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._record("miss")
+            return None
+        expires_at, user_id, version, principal = entry
+        if expires_at <= time.monotonic() or self._versions.get(user_id, version) != version:
+            self._remove(key)
+            self._record("stale")
+            return None
+        self._entries.move_to_end(key)
+        self._record("hit")
+        return principal
+
+    def put(self, key: Tuple, user_id: str, version: int, principal: Any, token_exp: Optional[float] = None):
+        """Guardar el usuario resuelto para el token"""
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + token_exp - time.time())
+        self._versions[user_id] = max(version, self._versions.get(user_id, version))
+        self._entries[key] = (expires_at, user_id, version, principal)
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str, version: Optional[int] = None):
+        """Descartar las entradas de un usuario (y recordar su nueva versión)"""
+        if version is not None:
+            self._versions[user_id] = version
+        for key in list(self._by_user.get(user_id, ())):
+            self._remove(key)
+            self._stats["invalidated"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_user.clear()
+        self._versions.clear()
+
+    def stats(self) -> Dict:
+        """Aciertos, fallos y entradas descartadas"""
+        lookups = self._stats["hit"] + self._stats["miss"] + self._stats["stale"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "hit_ratio": round(self._stats["hit"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[1]]
+
+    def _record(self, result: str):
+        self._stats[result] += 1
+        cache_requests_total.labels(cache_name="auth_principal", result=result).inc()
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE
+)
+
+
+@event.listens_for(User, "before_update")
+def _bump_auth_version(mapper, connection, target: User):
+    """
+    Subir ``auth_version`` al cambiar el rol o el estado de un usuario.
+
+    Sólo cubre actualizaciones por el ORM; con ``update()`` masivos hay que
+    incrementar la columna en la misma sentencia.
+    """
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        target.auth_version = (target.auth_version or 1) + 1
+        principal_cache.invalidate_user(str(target.id), target.auth_version)
+
+
+def _token_cache_key(payload: Dict, token: str) -> Tuple[str, Hashable]:
+    jti = payload.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return payload["sub"], jti
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email from database"""
     from sqlalchemy import select
@@ -83,12 +203,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
     
+    # Usuario ya resuelto para este token: sin consulta (ni conexión) a la BD
+    cache_key = _token_cache_key(payload, token)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+    
     user = await get_user_by_email(db, email)
     if user is None:
         raise credentials_exception
     
+    # Token emitido antes de un cambio de rol o desactivación
+    token_version = payload.get("ver")
+    if token_version is not None and token_version < user.auth_version:
+        raise credentials_exception
+    
     # Return UserResponse schema
-    return UserResponse(
+    principal = UserResponse(
         id=str(user.id),
         email=user.email,
         full_name=user.full_name,
@@ -99,6 +230,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         created_at=user.created_at,
         last_login=user.last_login
     )
+    principal_cache.put(cache_key, str(user.id), user.auth_version, principal, payload.get("exp"))
+    return principal
 
 
 async def get_current_active_user(current_user: "UserResponse" = Depends(get_current_user)):
@@ -118,3 +251,28 @@ def require_role(required_role: str):
             )
         return current_user
     return role_checker
+
+
+def can_access_document(document: Document, user: "UserResponse") -> bool:
+    """
+    Acceso a un documento: administradores, su propietario o usuarios de su departamento
+    """
+    if user.role == "admin":
+        return True
+    if document.owner_id is not None and str(document.owner_id) == str(user.id):
+        return True
+    return bool(document.department) and document.department == user.department
+
+
+def document_scope(user: "UserResponse") -> Dict[str, Any]:
+    """
+    Filtros de ``document_service`` con los documentos visibles para el usuario
+
+    Vacío para administradores; el departamento del usuario o, si no tiene,
+    sus propios documentos.
+    """
+    if user.role == "admin":
+        return {}
+    if user.department:
+        return {"department": user.department}
+    return {"owner_id": uuid.UUID(str(user.id))}
@@ -0,0 +1,119 @@
+"""
+Bulk Insert
+Inserción masiva con COPY binario de PostgreSQL (asyncpg)
+
+Los valores se codifican directamente al formato binario de COPY según el
+tipo de cada columna del modelo ORM; los vectores pgvector se escriben desde
+el array NumPy (float32 big-endian) sin pasar por listas de Python. Con otros
+drivers se usa un INSERT multi-fila.
+"""
+import json
+import struct
+from typing import Any, AsyncIterator, Callable, List, Sequence
+
+import numpy as np
+from sqlalchemy import BigInteger, Boolean, Float, Integer, String, Text, insert
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from pgvector.sqlalchemy import Vector
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_NULL = struct.pack(">i", -1)
+
+# Filas codificadas por mensaje enviado al servidor
+COPY_BATCH_ROWS = 500
+
+
+def _encode_vector(value: Any) -> bytes:
+    vector = np.asarray(value, dtype=">f4")
+    return struct.pack(">HH", vector.shape[0], 0) + vector.tobytes()
+
+
+def _encode_text(value: Any) -> bytes:
+    return str(value).encode("utf-8")
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # Formato binario de jsonb: versión 1 + texto JSON
+    return b"\x01" + json.dumps(value, default=str).encode("utf-8")
+
+
+def _field_encoder(column_type: Any) -> Callable[[Any], bytes]:
+    """Codificador binario para el tipo SQLAlchemy de una columna"""
+    if isinstance(column_type, Vector):
+        return _encode_vector
+    if isinstance(column_type, UUID):
+        return lambda value: value.bytes
+    if isinstance(column_type, BigInteger):
+        return lambda value: struct.pack(">q", value)
+    if isinstance(column_type, Integer):
+        return lambda value: struct.pack(">i", value)
+    if isinstance(column_type, Float):
+        return lambda value: struct.pack(">d", value)
+    if isinstance(column_type, Boolean):
+        return lambda value: b"\x01" if value else b"\x00"
+    if isinstance(column_type, JSONB):
+        return _encode_jsonb
+    if isinstance(column_type, (String, Text)):
+        return _encode_text
+    raise TypeError(f"Unsupported column type for binary COPY: {column_type!r}")
+
+
+def encode_copy_rows(encoders: Sequence[Callable[[Any], bytes]], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Codificar filas en formato COPY binario (sin cabecera ni trailer)"""
+    field_count = struct.pack(">h", len(encoders))
+    parts: List[bytes] = []
+    for row in rows:
+        parts.append(field_count)
+        for encode, value in zip(encoders, row):
+            if value is None:
+                parts.append(_NULL)
+            else:
+                data = encode(value)
+                parts.append(struct.pack(">i", len(data)))
+                parts.append(data)
+    return b"".join(parts)
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model: Any,
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]]
+) -> int:
+    """
+    Insertar ``rows`` (valores en el orden de ``columns``) en la tabla de ``model``.
+
+    Se ejecuta en la transacción de la sesión: el commit sigue siendo del
+    llamador.
+
+    Returns:
+        int: Filas insertadas
+    """
+    if not rows:
+        return 0
+
+    conn = await db.connection()
+    if conn.dialect.driver != "asyncpg":
+        await db.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+        return len(rows)
+
+    table = model.__table__
+    encoders = [_field_encoder(table.c[name].type) for name in columns]
+
+    async def payload() -> AsyncIterator[bytes]:
+        yield _COPY_HEADER
+        for i in range(0, len(rows), COPY_BATCH_ROWS):
+            yield encode_copy_rows(encoders, rows[i:i + COPY_BATCH_ROWS])
+        yield _COPY_TRAILER
+
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_to_table(
+        table.name,
+        source=payload(),
+        columns=list(columns),
+        schema_name=table.schema,
+        format="binary"
+    )
+    return len(rows)
@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     VERSION: str = "1.0.0"
     ENVIRONMENT: str = "development"  # development, staging, production
+    SERVICE_ROLE: str = "api"  # api, ingest-worker, process-worker, index-worker
+    WARMUP_ON_STARTUP: bool = False  # Precargar en el arranque los servicios del rol
     
     # API
     API_V1_PREFIX: str = "/api/v1"
@@ -40,6 +42,10 @@ class Settings(BaseSettings):
     OPENSEARCH_INDEX: str = "documents"
     OPENSEARCH_USE_SSL: bool = False  # For local development
     OPENSEARCH_VERIFY_CERTS: bool = False  # For local development
+    SEARCH_FACET_SIZE: int = 20  # Valores por faceta de términos
+    SEARCH_FACET_CACHE_TTL_SECONDS: int = 60
+    SEARCH_FACET_CACHE_SIZE: int = 512
+    SEARCH_FACET_CACHE_MIN_HITS: int = 2  # Peticiones para cachear una consulta no vacía
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -49,6 +55,23 @@ class Settings(BaseSettings):
     KAFKA_BOOTSTRAP_SERVERS: List[str] = ["localhost:9092"]
     KAFKA_TOPIC_PREFIX: str = "financia"
     
+    # Workers
+    INGEST_WORKER_CONCURRENCY: int = 16  # Mensajes en curso por pod del ingest-worker
+    PROCESS_WORKER_CONCURRENCY: int = 4  # Documentos en curso por pod del process-worker
+    PROCESS_WORKER_CPU_PROCESSES: int = 0  # Procesos del pool de CPU (0 = nº de cores)
+    INDEX_WORKER_CONCURRENCY: int = 8  # Documentos en curso por pod del index-worker
+    WORKER_FETCH_TIMEOUT_MS: int = 1000  # Espera máxima de getmany
+    WORKER_COMMIT_INTERVAL_MS: int = 1000  # Intervalo entre commits de offsets
+    WORKER_METRICS_PORT: int = 0  # Puerto /metrics de los workers (0 = desactivado)
+    WORKER_RETRY_ATTEMPTS: int = 3  # Reintentos (topics <topic>.retry.N) antes del DLQ
+    WORKER_RETRY_BASE_DELAY_S: float = 30.0  # Espera del primer reintento
+    WORKER_RETRY_BACKOFF_FACTOR: float = 4.0  # Multiplicador de la espera (30s, 2m, 8m)
+    
+    # Conectores enterprise (SharePoint, SAP DMS)
+    CONNECTOR_SERVICE_ACCOUNT_ID: Optional[str] = None  # Usuario propietario de los documentos sincronizados
+    CONNECTOR_SCHEDULER_ENABLED: bool = False  # Programar las syncs de connectors.yaml al arrancar el backend
+    CONNECTOR_CONFIG_PATH: str = "config/connectors.yaml"
+    
     # MinIO (S3-compatible)
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_HOST: str = "localhost"
@@ -58,12 +81,17 @@ class Settings(BaseSettings):
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "documents"
     MINIO_BUCKET_NAME: str = "documents"
+    STORAGE_STREAM_CHUNK_BYTES: int = 1024 * 1024  # Trozo de lectura de objetos en streaming
+    DOWNLOAD_REDIRECT_MIN_BYTES: int = 100 * 1024 * 1024  # Desde aquí, descarga por URL prefirmada
+    DOWNLOAD_PRESIGNED_URL_TTL_SECONDS: int = 300
     
     # Authentication
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # 0 desactiva la caché de usuarios autenticados
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
     
     # Keycloak (SSO)
     KEYCLOAK_SERVER_URL: Optional[str] = None
@@ -100,14 +128,24 @@ class Settings(BaseSettings):
     
     # Embeddings
     EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+    EMBEDDING_MODEL_VERSION: str = "1"  # Cambiar al actualizar pesos: invalida el embedding store
     EMBEDDING_BATCH_SIZE: int = 32
     
     # NER Model
     SPACY_MODEL: str = "es_core_news_lg"
+    NER_BATCH_SIZE: int = 64  # Segmentos por lote de nlp.pipe
+    NER_N_PROCESS: int = 1  # Procesos de nlp.pipe (nodos CPU: nº de cores)
+    NER_SEGMENT_WORDS: int = 1000  # Tamaño de segmento (por frases) enviado al NER
+    NER_MAX_BATCH_DOCS: int = 8  # Documentos en cola agrupados en una pasada
+    NER_BATCH_WAIT_MS: int = 50  # Ventana de espera para agrupar documentos
     
     # Classification Model
     CLASSIFICATION_MODEL: str = "dccuchile/bert-base-spanish-wwm-cased"
     CLASSIFICATION_THRESHOLD: float = 0.8
+    CLASSIFICATION_BACKEND: str = "torch"  # torch, int8 (cuantización dinámica, CPU), onnx (ONNX Runtime)
+    CLASSIFICATION_MAX_LENGTH: int = 512
+    CLASSIFICATION_BATCH_SIZE: int = 16  # Textos por forward pass
+    CLASSIFICATION_BATCH_WAIT_MS: int = 25  # Ventana para agrupar documentos en cola
     
     # OCR
     TESSERACT_PATH: Optional[str] = None
@@ -137,12 +175,17 @@ class Settings(BaseSettings):
     ]
     CHUNK_SIZE: int = 512
     CHUNK_OVERLAP: int = 50
+    CHUNK_USE_MODEL_TOKENIZER: bool = False  # Medir chunks con el tokenizer del modelo (por defecto palabras)
     
     # RAG
     RAG_TOP_K: int = 5
     RAG_SCORE_THRESHOLD: float = 0.5
     RAG_ENABLE_RERANKER: bool = False
     RAG_CITATION_REQUIRED: bool = True
+    RAG_ANSWER_CACHE_TTL_SECONDS: int = 3600
+    RAG_ANSWER_CACHE_SIZE: int = 1000  # 0 desactiva la caché de respuestas
+    RAG_ANSWER_CACHE_SEMANTIC: bool = False  # Reutilizar respuestas de preguntas casi idénticas
+    RAG_ANSWER_CACHE_SIMILARITY: float = 0.95  # Similitud coseno mínima de la búsqueda semántica
     
     # Risk Scoring Weights
     RISK_WEIGHT_LEGAL: float = 0.25
@@ -157,9 +200,18 @@ class Settings(BaseSettings):
     EU_REGULATORY_API_ENABLED: bool = True
     EUR_LEX_SPARQL_ENDPOINT: str = "http://publications.europa.eu/webapi/rdf/sparql"
     
+    # Ontology SPARQL (pool propio: las consultas no bloquean la API)
+    SPARQL_MAX_WORKERS: int = 2
+    SPARQL_TIMEOUT_SECONDS: float = 10.0
+    SPARQL_CACHE_SIZE: int = 256
+    SPARQL_CACHE_TTL_SECONDS: float = 600.0
+    
     # Audit
     AUDIT_LOG_RETENTION_DAYS: int = 730  # 2 years
     AUDIT_LOG_EXPORT_ENABLED: bool = True
+    AUDIT_EXPORT_BATCH_SIZE: int = 2000  # Filas por lote del cursor de servidor en exportaciones
+    AUDIT_LOGS_PARTITIONING: str = ""  # "monthly": audit_logs particionada (migración 011); el backend crea las particiones futuras
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 12  # Meses de particiones creados por adelantado cada día
     
     # Observability
     PROMETHEUS_ENABLED: bool = True
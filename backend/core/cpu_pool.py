@@ -0,0 +1,62 @@
+"""
+CPU Pool
+Pool de procesos para las etapas CPU-bound del pipeline
+
+Los workers configuran el pool al arrancar (``configure_cpu_pool``) y las
+etapas CPU-bound (extracción de texto/OCR, puntuación de riesgos por
+patrones) se envían con ``run_cpu_bound``. Sin pool configurado la función
+se ejecuta en el executor de hilos por defecto: la API y los tests no crean
+procesos.
+
+Las funciones y sus argumentos deben ser serializables (funciones de nivel
+de módulo, tipos simples): no se envían objetos de SQLAlchemy.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from core.logging_config import logger
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+
+
+def configure_cpu_pool(max_workers: Optional[int] = None) -> int:
+    """
+    Crear el pool de procesos del proceso actual.
+
+    Args:
+        max_workers: Procesos del pool (``None`` o 0: nº de cores)
+
+    Returns:
+        int: Procesos del pool
+    """
+    global _pool, _pool_size
+    if _pool is None:
+        _pool_size = max_workers or os.cpu_count() or 1
+        # spawn: el proceso padre tiene hilos (event loop, torch) y fork no es seguro
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_size,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"⚙️ CPU pool started with {_pool_size} processes")
+    return _pool_size
+
+
+async def run_cpu_bound(fn: Callable[..., Any], *args: Any) -> Any:
+    """Ejecutar ``fn(*args)`` en el pool de procesos (o en un hilo si no hay pool)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool, functools.partial(fn, *args))
+
+
+def shutdown_cpu_pool():
+    """Cerrar el pool esperando a las tareas en curso"""
+    global _pool, _pool_size
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+        _pool_size = 0
+        logger.info("CPU pool stopped")
@@ -26,6 +26,7 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+async_session_maker = AsyncSessionLocal  # Nombre usado por los workers y métricas
 
 # Base class for models
 Base = declarative_base()
@@ -0,0 +1,342 @@
+"""
+Kafka Consumer Runtime
+Consumo de Kafka con backpressure compartido por los workers
+
+- ``getmany`` por lotes, limitado a los huecos libres de procesamiento
+- Hasta ``max_in_flight`` mensajes en curso en tareas concurrentes
+- Con el worker saturado se pausan las particiones asignadas (deja de
+  traer mensajes) y se reanudan al bajar a ``resume_at`` mensajes en curso
+- Offsets confirmados manualmente tras procesar (``OffsetTracker``); en un
+  rebalanceo se espera a los mensajes de las particiones revocadas
+- Con ``RetryPolicy`` los mensajes que fallan se reenvían a topics de
+  reintento con backoff y, agotados los intentos, al dead-letter topic; los
+  mensajes de reintento no se procesan antes de su hora
+- Métricas por topic: procesados, errores, duración, lag y mensajes en curso
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from aiokafka.abc import ConsumerRebalanceListener
+
+from core.logging_config import logger
+from core.offset_tracker import OffsetTracker
+from core.retry_topics import (
+    NonRetryableError,
+    RetryPolicy,
+    dead_letter,
+    retry_attempt,
+    retry_due_at,
+    retry_headers,
+)
+from monitoring.metrics import (
+    kafka_consumer_in_flight,
+    kafka_consumer_lag,
+    kafka_consumer_paused_partitions,
+    kafka_message_processing_seconds,
+    kafka_messages_processed_total,
+)
+
+MessageHandler = Callable[[Any], Awaitable[None]]
+
+
+class _RebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, runtime: "KafkaConsumerRuntime"):
+        self.runtime = runtime
+
+    async def on_partitions_revoked(self, revoked):
+        await self.runtime._on_revoked(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        self.runtime._on_assigned(assigned)
+
+
+class KafkaConsumerRuntime:
+    """
+    Bucle de consumo con concurrencia acotada y commits manuales.
+
+    El consumer se crea con ``enable_auto_commit=False`` y sin topics: el
+    runtime lo suscribe (con su listener de rebalanceo) en ``start``. El
+    handler recibe cada mensaje; si lanza una excepción el mensaje se
+    reenvía según ``retry`` (con ``producer``) o, sin política, sólo se
+    registra el error. En ambos casos el offset se confirma.
+    """
+
+    def __init__(
+        self,
+        consumer: Any,
+        topics: Iterable[str],
+        handler: MessageHandler,
+        group: str,
+        max_in_flight: int = 8,
+        resume_at: Optional[int] = None,
+        fetch_timeout_ms: int = 1000,
+        commit_interval_ms: int = 1000,
+        revoke_timeout: float = 30.0,
+        retry: Optional[RetryPolicy] = None,
+        producer: Any = None
+    ):
+        self.consumer = consumer
+        self.topics = list(topics)
+        self.handler = handler
+        self.group = group
+        self.max_in_flight = max_in_flight
+        self.resume_at = max_in_flight // 2 if resume_at is None else resume_at
+        self.fetch_timeout_ms = fetch_timeout_ms
+        self.commit_interval = commit_interval_ms / 1000
+        self.revoke_timeout = revoke_timeout
+        self.retry = retry
+        self.producer = producer
+
+        self.offsets = OffsetTracker()
+        self.running = False
+        self.paused = False
+
+        self._started = False
+        self._started_at = time.monotonic()
+        self._last_commit = 0.0
+        self._tasks: Dict[asyncio.Task, Any] = {}
+        self._capacity = asyncio.Event()
+        self._lag: Dict[Any, int] = {}
+        self._delayed: Dict[Any, asyncio.TimerHandle] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    async def start(self):
+        """Suscribir el consumer y conectarlo al grupo"""
+        self.consumer.subscribe(self.topics, listener=_RebalanceListener(self))
+        await self.consumer.start()
+        self._started = True
+        self._started_at = time.monotonic()
+        self.running = True
+
+    async def run(self):
+        """Consumir hasta ``stop``"""
+        while self.running:
+            await self._fetch()
+            if self.running:
+                await self._commit()
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Dejar de consumir, terminar los mensajes en curso y confirmar offsets"""
+        self.running = False
+        for handle in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
+        if self._started:
+            self._started = False
+            await self._commit(force=True)
+            await self.consumer.stop()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> Dict:
+        """Contadores por topic, throughput, lag y estado de backpressure"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "group": self.group,
+            "in_flight": self.in_flight,
+            "paused": self.paused,
+            "topics": {
+                topic: {**counts, "throughput_per_second": round(counts["processed"] / elapsed, 3)}
+                for topic, counts in self._counts.items()
+            },
+            "lag": {f"{tp.topic}[{tp.partition}]": lag for tp, lag in self._lag.items()},
+        }
+
+    async def _fetch(self):
+        if self.in_flight >= self.max_in_flight:
+            self._pause()
+        elif self.paused and self.in_flight <= self.resume_at:
+            self._resume()
+
+        if self.paused:
+            await self._wait_for_capacity()
+            return
+
+        batches = await self.consumer.getmany(
+            timeout_ms=self.fetch_timeout_ms,
+            max_records=self.max_in_flight - self.in_flight
+        )
+        for partition, messages in batches.items():
+            for message in messages:
+                if self._defer_until_due(partition, message):
+                    break
+                self._dispatch(partition, message)
+
+    def _dispatch(self, partition: Any, message: Any):
+        self.offsets.start(partition, message.offset)
+        self._topic_counts(partition.topic)["consumed"] += 1
+        task = asyncio.create_task(self._process(partition, message))
+        self._tasks[task] = partition
+        task.add_done_callback(self._task_done)
+        kafka_consumer_in_flight.labels(group=self.group).set(self.in_flight)
+
+    async def _process(self, partition: Any, message: Any):
+        start = time.perf_counter()
+        status = "success"
+        try:
+            await self.handler(message)
+        except Exception as e:
+            status = "error"
+            logger.error(
+                f"❌ [{self.group}] Error processing {partition.topic}[{partition.partition}]"
+                f"@{message.offset}: {e}",
+                exc_info=True
+            )
+            if self.retry is not None:
+                status = await self._route_failure(message, e)
+        finally:
+            self.offsets.done(partition, message.offset)
+            counts = self._topic_counts(partition.topic)
+            counts["processed" if status == "success" else "failed"] += 1
+            if status in ("retry", "dead_letter"):
+                counts["retried" if status == "retry" else "dead_lettered"] += 1
+            kafka_messages_processed_total.labels(
+                group=self.group, topic=partition.topic, status=status
+            ).inc()
+            kafka_message_processing_seconds.labels(
+                group=self.group, topic=partition.topic
+            ).observe(time.perf_counter() - start)
+
+    async def _route_failure(self, message: Any, error: Exception) -> str:
+        """Reenviar un mensaje fallido al siguiente reintento o al DLQ"""
+        attempt = retry_attempt(message)
+        retryable = not isinstance(error, NonRetryableError)
+        topic, delay = self.retry.next_step(attempt, retryable)
+        try:
+            if delay is None:
+                value, headers = dead_letter(message, self.group, attempt, error)
+                await self.producer.send_and_wait(topic, value=value, key=message.key, headers=headers)
+                logger.error(f"☠️ [{self.group}] Message sent to {topic} after {attempt + 1} attempts: {error}")
+                return "dead_letter"
+
+            await self.producer.send_and_wait(
+                topic,
+                value=message.value,
+                key=message.key,
+                headers=retry_headers(message, attempt + 1, delay, error)
+            )
+            logger.warning(
+                f"🔁 [{self.group}] Retry {attempt + 1}/{self.retry.max_attempts} "
+                f"in {delay:.0f}s via {topic}"
+            )
+            return "retry"
+        except Exception as e:
+            # Sin broker no hay dónde reenviarlo: queda registrado en el log
+            logger.critical(
+                f"[{self.group}] Could not route failed message from {message.topic}"
+                f"@{message.offset} ({e}); event: {message.value}"
+            )
+            return "error"
+
+    def _defer_until_due(self, partition: Any, message: Any) -> bool:
+        """
+        Pausar la partición de un reintento que aún no toca procesar.
+
+        Se vuelve al offset del mensaje para leerlo de nuevo al reanudar; los
+        topics de reintento tienen una espera fija, así que los siguientes
+        mensajes de la partición tampoco están listos.
+        """
+        if self.retry is None:
+            return False
+        due = retry_due_at(message)
+        delay = due - time.time() if due is not None else 0
+        if delay <= 0:
+            return False
+
+        self.consumer.seek(partition, message.offset)
+        self.consumer.pause(partition)
+        self._delayed[partition] = asyncio.get_running_loop().call_later(
+            delay, self._resume_delayed, partition
+        )
+        return True
+
+    def _resume_delayed(self, partition: Any):
+        self._delayed.pop(partition, None)
+        if not self.paused and partition in self.consumer.assignment():
+            self.consumer.resume(partition)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.pop(task, None)
+        kafka_consumer_in_flight.labels(group=self.group).set(self.in_flight)
+        self._capacity.set()
+
+    async def _wait_for_capacity(self):
+        self._capacity.clear()
+        try:
+            await asyncio.wait_for(self._capacity.wait(), timeout=self.fetch_timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+    def _pause(self):
+        if self.paused:
+            return
+        partitions = self.consumer.assignment()
+        self.consumer.pause(*partitions)
+        self.paused = True
+        kafka_consumer_paused_partitions.labels(group=self.group).set(len(partitions))
+        logger.info(f"⏸️ [{self.group}] Saturated ({self.in_flight} in flight): {len(partitions)} partitions paused")
+
+    def _resume(self):
+        # Las particiones de reintentos no vencidos siguen pausadas
+        partitions = [p for p in self.consumer.paused() if p not in self._delayed]
+        self.consumer.resume(*partitions)
+        self.paused = False
+        kafka_consumer_paused_partitions.labels(group=self.group).set(0)
+        logger.info(f"▶️ [{self.group}] Resumed {len(partitions)} partitions ({self.in_flight} in flight)")
+
+    async def _commit(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_commit < self.commit_interval:
+            return
+        self._last_commit = now
+
+        offsets = self.offsets.committable()
+        if offsets:
+            try:
+                await self.consumer.commit(offsets)
+                self.offsets.mark_committed(offsets)
+            except Exception as e:
+                logger.warning(f"[{self.group}] Offset commit failed: {e}")
+        self._update_lag()
+
+    def _update_lag(self):
+        for partition in self.consumer.assignment():
+            highwater = self.consumer.highwater(partition)
+            position = self.offsets.committed(partition)
+            if highwater is None or position is None:
+                continue
+            lag = max(highwater - position, 0)
+            self._lag[partition] = lag
+            kafka_consumer_lag.labels(
+                group=self.group, topic=partition.topic, partition=str(partition.partition)
+            ).set(lag)
+
+    async def _on_revoked(self, revoked):
+        revoked = set(revoked)
+        pending = [task for task, partition in self._tasks.items() if partition in revoked]
+        if pending:
+            logger.info(f"[{self.group}] Rebalance: waiting for {len(pending)} messages of revoked partitions")
+            await asyncio.wait(pending, timeout=self.revoke_timeout)
+        await self._commit(force=True)
+        self.offsets.forget(revoked)
+        for partition in revoked:
+            self._lag.pop(partition, None)
+            handle = self._delayed.pop(partition, None)
+            if handle is not None:
+                handle.cancel()
+
+    def _on_assigned(self, assigned):
+        if self.paused and assigned:
+            self.consumer.pause(*assigned)
+
+    def _topic_counts(self, topic: str) -> Dict[str, int]:
+        if topic not in self._counts:
+            self._counts[topic] = {
+                "consumed": 0, "processed": 0, "failed": 0, "retried": 0, "dead_lettered": 0
+            }
+        return self._counts[topic]
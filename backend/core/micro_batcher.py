@@ -0,0 +1,118 @@
+"""
+Micro Batcher
+Agrupa peticiones concurrentes en lotes para la inferencia de modelos
+
+Las corrutinas llaman a ``submit(item)``; el batcher espera como mucho
+``max_wait_ms`` a que lleguen más peticiones (hasta ``max_batch_size``),
+procesa el lote con una función síncrona en un executor (sin bloquear el
+event loop) y devuelve a cada llamador su resultado.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+from core.logging_config import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Lotes de ventana corta sobre una función ``process_batch(items) -> results``.
+
+    ``process_batch`` debe devolver un resultado por elemento y en el mismo
+    orden. Si lanza una excepción, todos los llamadores del lote la reciben.
+    Los lotes se procesan de uno en uno.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], List[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 20.0,
+        name: str = "batch",
+        executor: Optional[Executor] = None
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.executor = executor
+        self.stats = {"batches": 0, "items": 0}
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, item: T) -> R:
+        """Encolar un elemento y esperar su resultado"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self):
+        """Detener el worker (las peticiones pendientes se cancelan)"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            if self._loop is not loop:
+                self._queue = asyncio.Queue()
+                self._loop = loop
+            self._worker = loop.create_task(self._run(), name=f"micro-batcher-{self.name}")
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+        """Primer elemento (bloqueante) y los que lleguen dentro de la ventana"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Llamadores que ya se cancelaron no se procesan
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(self.executor, self.process_batch, items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: process_batch returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                logger.error(f"❌ {self.name} batch of {len(items)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["items"] += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
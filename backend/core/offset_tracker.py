@@ -0,0 +1,68 @@
+"""
+Offset Tracker
+Confirmación manual de offsets de Kafka con procesamiento concurrente
+
+Los mensajes de una partición se procesan en paralelo y terminan en
+cualquier orden. Sólo se confirma hasta el primer offset que sigue en curso
+en cada partición: tras un reinicio o un rebalanceo nunca se salta un
+mensaje sin procesar (entrega at-least-once).
+"""
+from typing import Any, Dict, Iterable, Optional
+
+
+class OffsetTracker:
+    """
+    Offsets en curso por partición.
+
+    ``start`` debe llamarse en el orden de consumo (offsets crecientes por
+    partición), que es el orden en que Kafka entrega los mensajes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Any, Dict[int, None]] = {}
+        self._next: Dict[Any, int] = {}
+        self._committed: Dict[Any, int] = {}
+
+    def start(self, partition: Any, offset: int):
+        """Registrar un mensaje que empieza a procesarse"""
+        self._in_flight.setdefault(partition, {})[offset] = None
+        self._next[partition] = max(self._next.get(partition, 0), offset + 1)
+
+    def done(self, partition: Any, offset: int):
+        """Registrar un mensaje terminado (con éxito o ya gestionado)"""
+        in_flight = self._in_flight.get(partition)
+        if in_flight is not None:
+            in_flight.pop(offset, None)
+
+    @property
+    def in_flight(self) -> int:
+        """Mensajes en curso en todas las particiones"""
+        return sum(len(offsets) for offsets in self._in_flight.values())
+
+    def committable(self) -> Dict[Any, int]:
+        """
+        Offsets a confirmar: por partición, el siguiente mensaje a leer tras un
+        reinicio. Sólo incluye las particiones que han avanzado.
+        """
+        offsets = {}
+        for partition, next_offset in self._next.items():
+            in_flight = self._in_flight.get(partition)
+            position = next(iter(in_flight)) if in_flight else next_offset
+            if position > self._committed.get(partition, -1):
+                offsets[partition] = position
+        return offsets
+
+    def mark_committed(self, offsets: Dict[Any, int]):
+        """Registrar los offsets confirmados en Kafka"""
+        self._committed.update(offsets)
+
+    def committed(self, partition: Any) -> Optional[int]:
+        """Último offset confirmado de la partición (None si aún no hay commit)"""
+        return self._committed.get(partition)
+
+    def forget(self, partitions: Iterable[Any]):
+        """Olvidar particiones revocadas en un rebalanceo"""
+        for partition in partitions:
+            self._in_flight.pop(partition, None)
+            self._next.pop(partition, None)
+            self._committed.pop(partition, None)
@@ -0,0 +1,142 @@
+"""
+Retry Topics
+Reintentos con backoff exponencial y dead-letter topic para los workers
+
+Un mensaje que falla se publica en el siguiente topic de reintento
+(``<topic>.retry.<n>``) con la hora a la que debe reprocesarse; el runtime
+de consumo pausa esa partición hasta entonces. Agotados los intentos (o ante
+un ``NonRetryableError``) el mensaje va a ``<topic>.dlq`` con el contexto
+del fallo.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+
+ATTEMPT_HEADER = "x-retry-attempt"
+RETRY_AT_HEADER = "x-retry-at"
+ORIGINAL_TOPIC_HEADER = "x-original-topic"
+ERROR_HEADER = "x-error"
+
+
+class NonRetryableError(Exception):
+    """Fallo permanente: el mensaje va directamente al dead-letter topic"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Topics de reintento de un topic de origen.
+
+    Args:
+        topic: Topic de origen
+        delays: Espera (segundos) antes de cada reintento
+    """
+    topic: str
+    delays: Tuple[float, ...] = (30.0, 120.0, 480.0)
+
+    @classmethod
+    def exponential(cls, topic: str, attempts: int, base_delay: float, factor: float) -> "RetryPolicy":
+        return cls(topic, tuple(base_delay * factor ** i for i in range(attempts)))
+
+    @classmethod
+    def from_settings(cls, topic: str) -> "RetryPolicy":
+        return cls.exponential(
+            topic,
+            settings.WORKER_RETRY_ATTEMPTS,
+            settings.WORKER_RETRY_BASE_DELAY_S,
+            settings.WORKER_RETRY_BACKOFF_FACTOR
+        )
+
+    @property
+    def max_attempts(self) -> int:
+        return len(self.delays)
+
+    @property
+    def retry_topics(self) -> List[str]:
+        return [self.retry_topic(attempt) for attempt in range(1, self.max_attempts + 1)]
+
+    @property
+    def dlq_topic(self) -> str:
+        return f"{self.topic}.dlq"
+
+    @property
+    def topics(self) -> List[str]:
+        """Topics a los que se suscribe el worker (origen y reintentos)"""
+        return [self.topic] + self.retry_topics
+
+    def retry_topic(self, attempt: int) -> str:
+        return f"{self.topic}.retry.{attempt}"
+
+    def next_step(self, attempt: int, retryable: bool = True) -> Tuple[str, Optional[float]]:
+        """
+        Destino de un mensaje que ha fallado en el intento ``attempt`` (0 = original).
+
+        Returns:
+            Tuple[str, Optional[float]]: Topic y espera (``None`` para el DLQ)
+        """
+        if retryable and attempt < self.max_attempts:
+            return self.retry_topic(attempt + 1), self.delays[attempt]
+        return self.dlq_topic, None
+
+
+def header(message: Any, name: str) -> Optional[str]:
+    """Valor de una cabecera del mensaje"""
+    for key, value in getattr(message, "headers", None) or ():
+        if key == name:
+            return value.decode("utf-8") if isinstance(value, bytes) else value
+    return None
+
+
+def retry_attempt(message: Any) -> int:
+    """Intento al que corresponde el mensaje (0 = original)"""
+    return int(header(message, ATTEMPT_HEADER) or 0)
+
+
+def retry_due_at(message: Any) -> Optional[float]:
+    """Instante (epoch, segundos) a partir del que se puede reprocesar"""
+    value = header(message, RETRY_AT_HEADER)
+    return float(value) if value else None
+
+
+def retry_headers(message: Any, attempt: int, delay: float, error: Exception) -> List[Tuple[str, bytes]]:
+    """Cabeceras de un mensaje reenviado a un topic de reintento"""
+    return _merge_headers(message, {
+        ATTEMPT_HEADER: str(attempt),
+        RETRY_AT_HEADER: f"{time.time() + delay:.3f}",
+        ORIGINAL_TOPIC_HEADER: header(message, ORIGINAL_TOPIC_HEADER) or message.topic,
+        ERROR_HEADER: f"{type(error).__name__}: {error}"[:500],
+    })
+
+
+def dead_letter(message: Any, group: str, attempt: int, error: Exception) -> Tuple[Dict, List[Tuple[str, bytes]]]:
+    """Valor y cabeceras del mensaje para el dead-letter topic"""
+    original_topic = header(message, ORIGINAL_TOPIC_HEADER) or message.topic
+    value = {
+        "event": message.value,
+        "source_topic": original_topic,
+        "failed_topic": message.topic,
+        "partition": message.partition,
+        "offset": message.offset,
+        "attempts": attempt + 1,
+        "error": str(error),
+        "error_type": type(error).__name__,
+        "retryable": not isinstance(error, NonRetryableError),
+        "worker_group": group,
+        "failed_at": datetime.utcnow().isoformat(),
+    }
+    headers = _merge_headers(message, {
+        ATTEMPT_HEADER: str(attempt),
+        ORIGINAL_TOPIC_HEADER: original_topic,
+        ERROR_HEADER: f"{type(error).__name__}: {error}"[:500],
+    })
+    return value, headers
+
+
+def _merge_headers(message: Any, values: Dict[str, str]) -> List[Tuple[str, bytes]]:
+    headers: Sequence = getattr(message, "headers", None) or ()
+    merged = [(key, value) for key, value in headers if key not in values]
+    merged.extend((key, value.encode("utf-8")) for key, value in values.items())
+    return merged
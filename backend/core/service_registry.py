@@ -0,0 +1,170 @@
+"""
+Service Registry
+Registro de servicios y modelos con carga perezosa
+
+Los singletons pesados (modelos spaCy/transformers, clientes de OpenSearch o
+LLM) no se crean al importar: se crean en su primer uso o en una fase
+explícita de warmup. Cada servicio declara los roles que lo usan (``api``,
+``ingest-worker``, ``process-worker``, ``index-worker``) y un pod sólo
+precarga los de su rol (``SERVICE_ROLE``).
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.logging_config import logger
+
+
+@dataclass
+class _Entry:
+    factory: Callable[[], Any]
+    roles: Tuple[str, ...]
+    warmup: Optional[Callable[[Any], None]] = None
+    instance: Any = None
+    load_seconds: Optional[float] = None
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+
+class LazyService:
+    """Proxy que crea el servicio registrado al acceder a su primer atributo"""
+
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: "ServiceRegistry", name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __delattr__(self, attr: str):
+        delattr(self._registry.get(self._name), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._registry.is_loaded(self._name) else "lazy"
+        return f"<LazyService {self._name} ({state})>"
+
+
+class ServiceRegistry:
+    """Registro de factorías de servicios con instancia única y carga perezosa"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._proxies: Dict[str, LazyService] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        roles: Iterable[str] = (),
+        warmup: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Registrar un servicio.
+
+        Args:
+            name: Nombre del servicio
+            factory: Crea (o importa) la instancia; se llama una sola vez
+            roles: Roles que usan el servicio (para el warmup por rol)
+            warmup: Carga adicional en el warmup (p.ej. ``model._load_model()``)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.instance is not None:
+                return
+            self._entries[name] = _Entry(factory=factory, roles=tuple(roles), warmup=warmup)
+
+    def proxy(self, name: str) -> LazyService:
+        """Proxy del servicio (no lo crea)"""
+        with self._lock:
+            if name not in self._proxies:
+                self._proxies[name] = LazyService(self, name)
+            return self._proxies[name]
+
+    def get(self, name: str) -> Any:
+        """Instancia del servicio, creándola en el primer uso"""
+        entry = self._entry(name)
+        if entry.instance is None:
+            with entry.lock:
+                if entry.instance is None:
+                    start = time.perf_counter()
+                    try:
+                        instance = entry.factory()
+                    except Exception as e:
+                        logger.error(f"❌ Failed to load service {name}: {e}")
+                        raise
+                    entry.load_seconds = time.perf_counter() - start
+                    entry.instance = instance
+                    logger.info(f"✅ Service {name} loaded in {entry.load_seconds:.2f}s")
+        return entry.instance
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.instance is not None
+
+    def names(self, role: Optional[str] = None) -> List[str]:
+        """Servicios registrados (de un rol si se indica)"""
+        return [
+            name for name, entry in self._entries.items()
+            if role is None or role in entry.roles
+        ]
+
+    async def warmup(
+        self,
+        names: Optional[Iterable[str]] = None,
+        role: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Crear los servicios indicados (o los del rol) fuera del event loop.
+
+        Se cargan de uno en uno para no sumar picos de memoria ni competir
+        por el lock de importación.
+
+        Returns:
+            Dict[str, str]: "loaded" o el error de cada servicio
+        """
+        targets = list(names) if names is not None else self.names(role)
+        loop = asyncio.get_running_loop()
+        results = {}
+        for name in targets:
+            try:
+                await loop.run_in_executor(None, self._warm, name)
+                results[name] = "loaded"
+            except Exception as e:
+                results[name] = f"error: {e}"
+        return results
+
+    def status(self) -> Dict[str, Dict]:
+        """Estado de carga de cada servicio"""
+        return {
+            name: {
+                "loaded": entry.instance is not None,
+                "load_seconds": round(entry.load_seconds, 3) if entry.load_seconds is not None else None,
+                "roles": list(entry.roles),
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def _warm(self, name: str):
+        instance = self.get(name)
+        entry = self._entries[name]
+        if entry.warmup is not None:
+            start = time.perf_counter()
+            entry.warmup(instance)
+            logger.info(f"🔥 Service {name} warmed up in {time.perf_counter() - start:.2f}s")
+
+    def _entry(self, name: str) -> _Entry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Service not registered: {name}") from None
+
+
+# Registro global del proceso
+service_registry = ServiceRegistry()
@@ -0,0 +1,209 @@
+"""
+SPARQL Executor
+Ejecución de consultas SPARQL sobre la ontología fuera del event loop
+
+- Pool de hilos propio y acotado: una consulta pesada (``rdfs:subClassOf*``)
+  no ocupa el executor por defecto ni bloquea el resto de peticiones
+- Plazo por consulta: el servicio deja de iterar resultados al vencer y la
+  petición responde con ``SPARQLTimeoutError``
+- Un hilo no se puede matar: una consulta que vence mientras rdflib evalúa
+  sigue ocupando su hilo. Mientras esas consultas ocupen todo el pool no se
+  encolan más (``SPARQLBusyError``), y una consulta que espera en cola más
+  que su plazo no llega a ejecutarse
+- Caché LRU con TTL por consulta normalizada y versión de la ontología;
+  consultas idénticas concurrentes comparten una sola ejecución y cada
+  llamada recibe su propia copia del resultado
+"""
+import asyncio
+import copy
+import functools
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from core.config import settings
+from core.logging_config import logger
+
+# Literales, IRIs y comentarios: los literales e IRIs se conservan tal cual
+_TOKENS = re.compile(
+    r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>\s]*>)'
+    r'|(?:\s|#[^\n]*)+'
+)
+
+
+class SPARQLTimeoutError(TimeoutError):
+    """La consulta SPARQL superó su plazo"""
+
+
+class SPARQLBusyError(RuntimeError):
+    """Todos los hilos del pool siguen ocupados por consultas que ya vencieron"""
+
+
+def normalize_query(query: str) -> str:
+    """Consulta sin comentarios y con los espacios colapsados (clave de caché)"""
+    return _TOKENS.sub(lambda m: m.group(1) or " ", query).strip()
+
+
+class SPARQLExecutor:
+    """
+    Ejecuta consultas de ``OntologyService`` en un pool acotado con caché.
+
+    Args:
+        max_workers: Hilos del pool (consultas simultáneas)
+        timeout: Plazo por defecto de cada consulta (segundos)
+        cache_size: Entradas máximas de la caché (0 la desactiva)
+        cache_ttl: Vida de cada entrada (segundos)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 10.0,
+        cache_size: int = 256,
+        cache_ttl: float = 600.0
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        # Consultas vencidas cuyo hilo sigue ejecutando rdflib
+        self._runaway = 0
+        self._stats = {"hits": 0, "misses": 0, "timeouts": 0, "errors": 0, "rejected": 0}
+
+    @classmethod
+    def from_settings(cls) -> "SPARQLExecutor":
+        return cls(
+            max_workers=settings.SPARQL_MAX_WORKERS,
+            timeout=settings.SPARQL_TIMEOUT_SECONDS,
+            cache_size=settings.SPARQL_CACHE_SIZE,
+            cache_ttl=settings.SPARQL_CACHE_TTL_SECONDS
+        )
+
+    async def query(self, service: Any, sparql_query: str, timeout: Optional[float] = None) -> List[Dict]:
+        """Filas de ``service.query_sparql`` (lista de diccionarios)"""
+        return await self._run(service, "query_sparql", sparql_query, timeout)
+
+    async def execute(self, service: Any, sparql_query: str, timeout: Optional[float] = None) -> Dict:
+        """Columnas y filas de ``service.execute_sparql``"""
+        return await self._run(service, "execute_sparql", sparql_query, timeout)
+
+    def stats(self) -> Dict:
+        """Aciertos de caché, plazos vencidos y tamaño de la caché"""
+        return {
+            **self._stats,
+            "cached": len(self._cache),
+            "running": len(self._pending),
+            "runaway": self._runaway
+        }
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def shutdown(self):
+        """Cerrar el pool sin esperar a las consultas en curso (vencen solas)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, service: Any, method: str, sparql_query: str, timeout: Optional[float]) -> Any:
+        key = (method, _version(service), normalize_query(sparql_query))
+
+        # Copia por llamada: quien modifique las filas no altera la caché
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return copy.deepcopy(cached)
+        self._stats["misses"] += 1
+
+        # Una consulta idéntica ya en curso: esperar a su resultado
+        pending = self._pending.get(key)
+        if pending is None:
+            if self._runaway >= self.max_workers:
+                self._stats["rejected"] += 1
+                raise SPARQLBusyError(
+                    f"{self._runaway} timed out SPARQL queries still running, try again later"
+                )
+            pending = asyncio.ensure_future(self._execute(service, method, sparql_query, timeout, key))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return copy.deepcopy(await asyncio.shield(pending))
+
+    async def _execute(self, service: Any, method: str, sparql_query: str, timeout: Optional[float], key: Tuple):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        future = asyncio.get_running_loop().run_in_executor(
+            self._get_pool(),
+            functools.partial(_call_before_deadline, getattr(service, method), sparql_query, deadline)
+        )
+        try:
+            # Margen para que el servicio corte por su cuenta al vencer el plazo
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=timeout + 1.0)
+        except SPARQLTimeoutError:
+            # El servicio cortó por su cuenta: el hilo ya está libre
+            self._stats["timeouts"] += 1
+            logger.warning(f"⏱️ SPARQL query exceeded {timeout:.1f}s: {key[2][:200]}")
+            raise SPARQLTimeoutError(f"SPARQL query exceeded {timeout:.1f}s")
+        except asyncio.TimeoutError:
+            # El hilo sigue ocupado hasta que rdflib devuelva la siguiente fila
+            self._runaway += 1
+            future.add_done_callback(self._runaway_done)
+            self._stats["timeouts"] += 1
+            logger.warning(f"⏱️ SPARQL query exceeded {timeout:.1f}s and is still running: {key[2][:200]}")
+            raise SPARQLTimeoutError(f"SPARQL query exceeded {timeout:.1f}s")
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+        self._cache_put(key, result)
+        return result
+
+    def _runaway_done(self, future: asyncio.Future):
+        self._runaway -= 1
+        if not future.cancelled():
+            # Recoger la excepción (normalmente el plazo vencido) para no registrarla como perdida
+            future.exception()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sparql")
+        return self._pool
+
+    def _cache_get(self, key: Tuple) -> Any:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: Tuple, value: Any):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def _call_before_deadline(method: Any, sparql_query: str, deadline: float) -> Any:
+    """Ejecutar en el pool salvo que el plazo venciera mientras esperaba en cola"""
+    if time.monotonic() > deadline:
+        raise SPARQLTimeoutError("SPARQL query deadline exceeded while queued")
+    return method(sparql_query, deadline=deadline)
+
+
+def _version(service: Any) -> Hashable:
+    version = getattr(service, "version", None)
+    return version if isinstance(version, Hashable) else id(service)
+
+
+sparql_executor = SPARQLExecutor.from_settings()
@@ -17,6 +17,8 @@ from core.config import settings
 from core.database import engine, Base
 from core.logging_config import setup_logging
 from core.phoenix_config import initialize_phoenix
+from core.service_registry import service_registry
+from core.sparql_executor import sparql_executor
 
 # Setup logging
 setup_logging()
@@ -46,6 +48,24 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
     
     logger.info("✅ Database tables created/verified")
+    
+    # Los modelos se cargan en su primer uso; opcionalmente, los del rol al arrancar
+    if settings.WARMUP_ON_STARTUP:
+        results = await service_registry.warmup(role=settings.SERVICE_ROLE)
+        logger.info(f"🔥 Warmup ({settings.SERVICE_ROLE}): {results}")
+    
+    # Sincronizaciones programadas de conectores enterprise (SharePoint, SAP DMS)
+    if settings.CONNECTOR_SCHEDULER_ENABLED:
+        from connectors.sync_scheduler import start_connector_scheduler
+        start_connector_scheduler()
+        logger.info("✅ Connector sync scheduler started")
+    
+    # Particiones mensuales futuras de audit_logs (migración 011 en modo monthly)
+    if settings.AUDIT_LOGS_PARTITIONING.lower() == "monthly":
+        from services.audit_service import start_partition_scheduler
+        start_partition_scheduler()
+        logger.info("✅ Audit log partition scheduler started")
+    
     logger.info("✅ Application started successfully")
     
     yield
@@ -62,6 +82,15 @@ async def lifespan(app: FastAPI):
     except:
         pass
     
+    if settings.CONNECTOR_SCHEDULER_ENABLED:
+        from connectors.sync_scheduler import stop_connector_scheduler
+        stop_connector_scheduler()
+    
+    if settings.AUDIT_LOGS_PARTITIONING.lower() == "monthly":
+        from services.audit_service import stop_partition_scheduler
+        stop_partition_scheduler()
+    
+    sparql_executor.shutdown()
     await engine.dispose()
     logger.info("✅ Application shutdown complete")
 
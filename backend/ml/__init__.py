@@ -1,16 +1,47 @@
 """
 Modelos ML - FinancIA 2030
+
+Los modelos se registran en el registro de servicios: se crean en su primer
+uso y los pesos se cargan en el warmup (``_load_model``). Los proxies
+perezosos están en ``ml.lazy`` (``from ml.lazy import embedding_model``).
 """
+import importlib
+
+from core.service_registry import service_registry
+
+# Modelo -> (módulo, roles que lo precargan)
+_MODELS = {
+    "ner_model": ("ner_model", ()),
+    "classifier_model": ("classifier", ()),
+    "embedding_model": ("embeddings", ("api",)),
+    "llm_client": ("llm_client", ()),
+}
+
+
+def _loader(name: str, module_name: str):
+    def load():
+        return getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    return load
+
+
+def _load_weights(model):
+    model._load_model()
+
+
+for _name, (_module, _roles) in _MODELS.items():
+    service_registry.register(
+        _name,
+        _loader(_name, _module),
+        roles=_roles,
+        warmup=_load_weights if _name != "llm_client" else None
+    )
+
+
+def __getattr__(name):
+    # LLMProvider importa los SDK de OpenAI/Anthropic: sólo bajo demanda
+    if name == "LLMProvider":
+        return importlib.import_module(f"{__name__}.llm_client").LLMProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-from ml.ner_model import ner_model
-from ml.classifier import classifier_model
-from ml.embeddings import embedding_model
-from ml.llm_client import llm_client, LLMProvider
-
-__all__ = [
-    "ner_model",
-    "classifier_model",
-    "embedding_model",
-    "llm_client",
-    "LLMProvider",
-]
+__all__ = ["LLMProvider"]
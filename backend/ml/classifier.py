@@ -1,7 +1,7 @@
 """
 Wrapper para modelo de clasificación con transformers (BETO/RoBERTa)
 """
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Sequence, Tuple
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 
@@ -9,6 +9,87 @@ from core.logging_config import logger
 from core.config import settings
 
 
+def load_sequence_classifier(model_name: str, device: str, backend: str = "torch") -> Tuple[Any, Any, str]:
+    """
+    Carga tokenizer y modelo de clasificación con el backend de inferencia indicado
+    
+    Backends:
+    - "torch": modelo PyTorch en el dispositivo indicado
+    - "int8": cuantización dinámica int8 de las capas lineales (sólo CPU)
+    - "onnx": ONNX Runtime en CPU (requiere optimum[onnxruntime]; si no está
+      instalado se usa PyTorch)
+    
+    Returns:
+        Tuple: (tokenizer, modelo, dispositivo efectivo)
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            logger.warning("⚠️ optimum[onnxruntime] not installed, using PyTorch for classification")
+        else:
+            model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+            logger.info(f"✅ Classification model {model_name} running on ONNX Runtime")
+            return tokenizer, model, "cpu"
+    
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    
+    if backend == "int8":
+        if device == "cpu":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"✅ Classification model {model_name} quantized to int8")
+        else:
+            logger.warning("⚠️ int8 dynamic quantization is CPU-only, ignored on GPU")
+    
+    model.to(device)
+    return tokenizer, model, device
+
+
+def predict_batch(
+    tokenizer: Any,
+    model: Any,
+    texts: Sequence[str],
+    device: str,
+    max_length: int = 512,
+    batch_size: int = 16
+) -> List[Tuple[int, float]]:
+    """
+    Clase predicha y confianza de cada texto, con inferencia por lotes
+    
+    Los textos se ordenan por número de tokens y cada lote se rellena sólo
+    hasta su texto más largo (padding dinámico). Los resultados se devuelven
+    en el orden original.
+    
+    Returns:
+        List[Tuple[int, float]]: (id de clase, confianza) por texto
+    """
+    if not texts:
+        return []
+    
+    encodings = tokenizer(list(texts), truncation=True, max_length=max_length)
+    order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+    results: List[Tuple[int, float]] = [None] * len(texts)
+    
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {key: [encodings[key][i] for i in indices] for key in encodings.keys()},
+                return_tensors="pt"
+            ).to(device)
+            
+            probabilities = torch.softmax(model(**batch).logits.float(), dim=-1)
+            confidences, classes = probabilities.max(dim=-1)
+            
+            for i, class_id, confidence in zip(indices, classes.tolist(), confidences.tolist()):
+                results[i] = (class_id, confidence)
+    
+    return results
+
+
 class ClassifierModel:
     """Modelo de clasificación de documentos"""
     
@@ -30,10 +111,9 @@ class ClassifierModel:
         try:
             logger.info(f"Loading classification model: {self.model_name} (first use)")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-            self.model.to(self.device)
-            self.model.eval()
+            self.tokenizer, self.model, self.device = load_sequence_classifier(
+                self.model_name, self.device, settings.CLASSIFICATION_BACKEND
+            )
             
             logger.info(f"Classification model loaded successfully on {self.device}")
             
@@ -57,40 +137,7 @@ class ClassifierModel:
         Returns:
             Dict: Resultado con categoría y confianza
         """
-        # LAZY LOADING: Cargar modelo solo cuando se usa
-        if self.model is None and self.pipeline is None:
-            self._load_model()
-        
-        if self.pipeline:
-            result = self.pipeline(text[:2000])[0]
-            return {
-                "category": result["label"],
-                "confidence": result["score"],
-                "method": "pipeline"
-            }
-        
-        # Tokenizar
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=max_length,
-            padding=True
-        ).to(self.device)
-        
-        # Inferencia
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        
-        # Obtener predicción
-        confidence, predicted_class = torch.max(predictions, dim=1)
-        
-        return {
-            "category": self._get_category_name(predicted_class.item()),
-            "confidence": confidence.item(),
-            "method": "transformer"
-        }
+        return self.classify_batch([text], max_length)[0]
     
     def classify_batch(self, texts: List[str], max_length: int = 512) -> List[Dict]:
         """
@@ -103,8 +150,12 @@ class ClassifierModel:
         Returns:
             List[Dict]: Lista de resultados
         """
+        # LAZY LOADING: Cargar modelo solo cuando se usa
+        if self.model is None and self.pipeline is None:
+            self._load_model()
+        
         if self.pipeline:
-            results = self.pipeline(texts)
+            results = self.pipeline([text[:2000] for text in texts], batch_size=settings.CLASSIFICATION_BATCH_SIZE)
             return [
                 {
                     "category": r["label"],
@@ -114,31 +165,23 @@ class ClassifierModel:
                 for r in results
             ]
         
-        # Tokenizar batch
-        inputs = self.tokenizer(
+        predictions = predict_batch(
+            self.tokenizer,
+            self.model,
             texts,
-            return_tensors="pt",
-            truncation=True,
+            self.device,
             max_length=max_length,
-            padding=True
-        ).to(self.device)
-        
-        # Inferencia batch
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            batch_size=settings.CLASSIFICATION_BATCH_SIZE
+        )
         
-        # Procesar resultados
-        results = []
-        for i in range(len(texts)):
-            confidence, predicted_class = torch.max(predictions[i], dim=0)
-            results.append({
-                "category": self._get_category_name(predicted_class.item()),
-                "confidence": confidence.item(),
+        return [
+            {
+                "category": self._get_category_name(class_id),
+                "confidence": confidence,
                 "method": "transformer"
-            })
-        
-        return results
+            }
+            for class_id, confidence in predictions
+        ]
     
     def _get_category_name(self, class_id: int) -> str:
         """Mapea ID de clase a nombre de categoría"""
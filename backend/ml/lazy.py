@@ -0,0 +1,20 @@
+"""
+Proxies perezosos de los modelos ML
+
+Cada proxy crea su modelo en el primer acceso a un atributo. Viven en este
+módulo, y no en el paquete, para no ocupar los nombres de los submódulos
+(``ml.ner_model``, ``ml.llm_client``).
+"""
+from core.service_registry import service_registry
+
+ner_model = service_registry.proxy("ner_model")
+classifier_model = service_registry.proxy("classifier_model")
+embedding_model = service_registry.proxy("embedding_model")
+llm_client = service_registry.proxy("llm_client")
+
+__all__ = [
+    "ner_model",
+    "classifier_model",
+    "embedding_model",
+    "llm_client",
+]
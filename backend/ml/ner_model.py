@@ -2,12 +2,12 @@
 Wrapper para modelo NER con spaCy
 Maneja Named Entity Recognition en español
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict
 import spacy
-from spacy.tokens import Doc
 
 from core.logging_config import logger
 from core.config import settings
+from services.ner_pipeline import pipe_entities
 
 
 class NERModel:
@@ -45,23 +45,36 @@ class NERModel:
         Returns:
             List[Dict]: Lista de entidades con tipo, texto, posición y confianza
         """
+        return self.extract_entities_batch([text])[0]
+    
+    def extract_entities_batch(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Extrae entidades de varios textos en una única pasada de nlp.pipe
+        
+        Los textos se segmentan por frases (sin truncar) y sólo se ejecutan
+        los componentes que necesita el NER.
+        
+        Args:
+            texts: Textos a analizar
+            
+        Returns:
+            List[List[Dict]]: Entidades de cada texto con offsets sobre el original
+        """
         # LAZY LOADING: Cargar modelo solo cuando se usa
         if self.nlp is None:
             self._load_model()
         
-        doc = self.nlp(text[:1000000])  # Limitar a 1M caracteres
-        
-        entities = []
-        for ent in doc.ents:
-            entities.append({
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char,
-                "label_description": spacy.explain(ent.label_)
-            })
-        
-        return entities
+        results = pipe_entities(
+            self.nlp,
+            texts,
+            batch_size=settings.NER_BATCH_SIZE,
+            n_process=settings.NER_N_PROCESS,
+            segment_words=settings.NER_SEGMENT_WORDS
+        )
+        for entities in results:
+            for ent in entities:
+                ent["label_description"] = spacy.explain(ent["label"])
+        return results
     
     def extract_entities_with_context(self, text: str, context_window: int = 50) -> List[Dict]:
         """
@@ -74,22 +87,11 @@ class NERModel:
         Returns:
             List[Dict]: Lista de entidades con contexto
         """
-        doc = self.nlp(text[:1000000])
-        
-        entities = []
-        for ent in doc.ents:
-            start = max(0, ent.start_char - context_window)
-            end = min(len(text), ent.end_char + context_window)
-            context = text[start:end]
-            
-            entities.append({
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char,
-                "context": context,
-                "label_description": spacy.explain(ent.label_)
-            })
+        entities = self.extract_entities(text)
+        for ent in entities:
+            start = max(0, ent["start"] - context_window)
+            end = min(len(text), ent["end"] + context_window)
+            ent["context"] = text[start:end]
         
         return entities
     
@@ -103,11 +105,9 @@ class NERModel:
         Returns:
             Dict[str, int]: Contador de entidades por tipo
         """
-        doc = self.nlp(text[:1000000])
-        
         counts = {}
-        for ent in doc.ents:
-            counts[ent.label_] = counts.get(ent.label_, 0) + 1
+        for ent in self.extract_entities(text):
+            counts[ent["label"]] = counts.get(ent["label"], 0) + 1
         
         return counts
     
@@ -118,6 +118,9 @@ class NERModel:
         Returns:
             Dict: Información del modelo
         """
+        if self.nlp is None:
+            self._load_model()
+        
         return {
             "model_name": self.model_name,
             "language": self.nlp.lang,
@@ -4,7 +4,7 @@ SQLAlchemy ORM models for PostgreSQL
 """
 from sqlalchemy import (
     Column, String, Integer, Float, Boolean, DateTime, Text, 
-    ForeignKey, JSON, BigInteger, Date, ARRAY, Enum as SQLEnum
+    ForeignKey, JSON, BigInteger, Date, ARRAY, Index, Enum as SQLEnum, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
@@ -50,6 +50,8 @@ class User(Base):
     mfa_enabled = Column(Boolean, default=False)
     mfa_secret = Column(String(255))
     is_active = Column(Boolean, default=True)
+    # Se incrementa al cambiar el rol o desactivar: invalida tokens y caché de auth
+    auth_version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_login = Column(DateTime(timezone=True))
@@ -86,6 +88,19 @@ class Document(Base):
     compliance_checks = relationship("ComplianceCheck", back_populates="document", cascade="all, delete-orphan")
     risk_assessments = relationship("RiskAssessment", back_populates="document", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Listado keyset (created_at, id), sin filtro y por cada filtro habitual
+        Index("idx_documents_created_id", "created_at", "id"),
+        Index("idx_documents_status_created_id", "status", "created_at", "id"),
+        Index("idx_documents_classification_created_id", "classification", "created_at", "id"),
+        Index("idx_documents_department_created_id", "department", "created_at", "id"),
+        # Cola de procesamiento: índice pequeño para los documentos sin terminar
+        Index(
+            "idx_documents_in_progress_created_id", "created_at", "id",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')")
+        ),
+    )
+
 
 class DocumentChunk(Base):
     """Document chunks with embeddings for semantic search"""
@@ -176,6 +191,12 @@ class AuditLog(Base):
     
     # Relationships
     user = relationship("User", back_populates="audit_logs")
+    
+    __table_args__ = (
+        # Paginación keyset (timestamp, id) y rangos de fechas de las exportaciones
+        Index("idx_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("idx_audit_logs_timestamp_brin", "timestamp", postgresql_using="brin"),
+    )
 
 
 class ModelRegistry(Base):
@@ -192,11 +192,25 @@ class SearchResult(BaseModel):
     classification: Optional[str] = None
 
 
+class FacetBucket(BaseModel):
+    value: str
+    count: int  # Documentos (no chunks)
+
+
+class SearchFacets(BaseModel):
+    classification: List[FacetBucket] = []
+    department: List[FacetBucket] = []
+    uploaded_by: List[FacetBucket] = []
+    uploaded_at: List[FacetBucket] = []
+    total_documents: int = 0
+
+
 class SearchResponse(BaseModel):
     query: str
     total: int
     results: List[SearchResult]
     took_ms: float
+    facets: Optional[SearchFacets] = None
 
 
 # RAG Models
@@ -335,7 +349,8 @@ class AuditLogQuery(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     limit: int = Field(100, ge=1, le=1000)
-    offset: int = Field(0, ge=0)
+    offset: int = Field(0, ge=0)  # Obsoleto: usar cursor
+    cursor: Optional[str] = None  # Cabecera X-Next-Cursor de la página anterior
 
 
 # Data Subject Request Models
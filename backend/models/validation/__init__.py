@@ -2,10 +2,16 @@
 Modelos de base de datos para validación de terceros.
 """
 
-from .sanctions_models import SanctionsList, ValidationHistory, ValidationResult
+from .sanctions_models import (
+    SanctionsList,
+    ValidationDailyStats,
+    ValidationHistory,
+    ValidationResult,
+)
 
 __all__ = [
     "SanctionsList",
+    "ValidationDailyStats",
     "ValidationHistory",
     "ValidationResult",
 ]
@@ -9,6 +9,7 @@ from sqlalchemy import (
     String,
     Boolean,
     Float,
+    Date,
     DateTime,
     Text,
     JSON,
@@ -88,3 +89,21 @@ class ValidationResult(Base):
 
     def __repr__(self):
         return f"<ValidationResult(entity={self.entity_name}, sanctioned={self.is_sanctioned})>"
+
+
+class ValidationDailyStats(Base):
+    """
+    Contadores diarios de validaciones (rollup del dashboard).
+
+    Una fila por día y fuente; la fuente ``ALL`` acumula todas las
+    validaciones del día. Se actualiza al guardar cada ``ValidationResult``.
+    """
+    __tablename__ = "validation_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    source = Column(String(50), primary_key=True)  # ALL, OFAC, EU_SANCTIONS, WORLD_BANK
+    validations = Column(Integer, nullable=False, default=0)  # Entidades validadas
+    flagged = Column(Integer, nullable=False, default=0)  # Entidades con match
+
+    def __repr__(self):
+        return f"<ValidationDailyStats(day={self.day}, source={self.source}, flagged={self.flagged})>"
@@ -2,7 +2,7 @@
 Prometheus Metrics and Monitoring
 Sistema de métricas y monitoreo avanzado
 """
-from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, REGISTRY
+from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, start_http_server, REGISTRY
 from prometheus_client.exposition import make_asgi_app
 import time
 import functools
@@ -12,6 +12,8 @@ import asyncio
 
 logger = logging.getLogger(__name__)
 
+_metrics_server_port = 0
+
 # ========================================
 # VALIDATION METRICS
 # ========================================
@@ -96,6 +98,53 @@ scheduler_next_run_timestamp = Gauge(
     ['task_name']
 )
 
+# ========================================
+# CONNECTOR SYNC METRICS
+# ========================================
+
+# Counter: Documentos procesados por sincronizaciones de conectores
+connector_documents_synced_total = Counter(
+    'connector_documents_synced_total',
+    'Total documents processed by connector syncs',
+    ['source', 'result']
+)
+
+# Counter: Bytes descargados de sistemas externos
+connector_bytes_downloaded_total = Counter(
+    'connector_bytes_downloaded_total',
+    'Total bytes downloaded by connector syncs',
+    ['source']
+)
+
+# Histogram: Duración de sincronizaciones
+connector_sync_duration_seconds = Histogram(
+    'connector_sync_duration_seconds',
+    'Duration of connector sync runs',
+    ['source', 'status'],
+    buckets=[10.0, 30.0, 60.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0]
+)
+
+# Gauge: Throughput de la última sincronización
+connector_sync_throughput_docs_per_second = Gauge(
+    'connector_sync_throughput_docs_per_second',
+    'Documents per second processed by the last connector sync',
+    ['source']
+)
+
+# Gauge: Timestamp de la última sincronización correcta
+connector_sync_last_success_timestamp = Gauge(
+    'connector_sync_last_success_timestamp',
+    'Timestamp of the last successful connector sync',
+    ['source']
+)
+
+# Gauge: Segundos transcurridos desde la última sincronización correcta
+connector_sync_lag_seconds = Gauge(
+    'connector_sync_lag_seconds',
+    'Seconds since the last successful connector sync',
+    ['source']
+)
+
 # ========================================
 # NOTIFICATION METRICS
 # ========================================
@@ -148,6 +197,46 @@ documents_in_queue = Gauge(
     ['status']
 )
 
+# ========================================
+# KAFKA CONSUMER METRICS
+# ========================================
+
+# Counter: Mensajes procesados por los workers
+kafka_messages_processed_total = Counter(
+    'kafka_messages_processed_total',
+    'Total Kafka messages processed by workers',
+    ['group', 'topic', 'status']  # status: success, retry, dead_letter, error
+)
+
+# Histogram: Duración del procesamiento de un mensaje
+kafka_message_processing_seconds = Histogram(
+    'kafka_message_processing_seconds',
+    'Duration of Kafka message processing',
+    ['group', 'topic'],
+    buckets=[0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0]
+)
+
+# Gauge: Lag del consumer (mensajes pendientes de leer)
+kafka_consumer_lag = Gauge(
+    'kafka_consumer_lag',
+    'Kafka consumer lag in messages',
+    ['group', 'topic', 'partition']
+)
+
+# Gauge: Mensajes en curso
+kafka_consumer_in_flight = Gauge(
+    'kafka_consumer_in_flight',
+    'Kafka messages currently being processed',
+    ['group']
+)
+
+# Gauge: Particiones pausadas por saturación
+kafka_consumer_paused_partitions = Gauge(
+    'kafka_consumer_paused_partitions',
+    'Kafka partitions paused by backpressure',
+    ['group']
+)
+
 # ========================================
 # DATABASE METRICS
 # ========================================
@@ -450,6 +539,22 @@ def get_metrics_app():
     return make_asgi_app()
 
 
+def start_metrics_server(port: int) -> bool:
+    """
+    Expone /metrics en un puerto propio (workers sin servidor HTTP)
+    
+    Returns:
+        bool: True si el servidor se ha iniciado en esta llamada
+    """
+    global _metrics_server_port
+    if not port or _metrics_server_port:
+        return False
+    start_http_server(port)
+    _metrics_server_port = port
+    logger.info(f"Metrics server listening on port {port}")
+    return True
+
+
 def get_metrics_text() -> bytes:
     """
     Obtiene métricas en formato texto Prometheus
@@ -500,6 +605,12 @@ __all__ = [
     'api_failures_total',
     'scheduler_task_executions_total',
     'scheduler_task_duration_seconds',
+    'connector_documents_synced_total',
+    'connector_bytes_downloaded_total',
+    'connector_sync_duration_seconds',
+    'connector_sync_throughput_docs_per_second',
+    'connector_sync_last_success_timestamp',
+    'connector_sync_lag_seconds',
     'notifications_sent_total',
     'notification_send_duration_seconds',
     'documents_processed_total',
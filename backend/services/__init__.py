@@ -1,43 +1,36 @@
 """
 Servicios de Backend - FinancIA 2030
 
-Importing the real ML/AI services now that dependencies are fixed
+Los singletons se registran en el registro de servicios: importar
+``services`` no carga modelos ni abre conexiones; cada servicio se crea en
+su primer uso o en el warmup del rol (ver ``core.service_registry``).
+
+Los proxies perezosos están en ``services.lazy``
+(``from services.lazy import search_service``). ``services.<nombre>`` es
+siempre el submódulo, sea cual sea el orden de importación.
 """
+import importlib
+
+from core.service_registry import service_registry
+
+# Servicio -> roles que lo usan (el módulo se llama igual que el singleton)
+_SERVICES = {
+    "ingest_service": ("api", "ingest-worker", "process-worker"),
+    "transform_service": ("process-worker",),
+    "extract_service": ("api", "process-worker"),  # api: embeddings de consultas
+    "classification_service": ("process-worker",),
+    "search_service": ("api", "index-worker"),
+    "rag_service": ("api",),
+    "risk_service": ("process-worker",),
+    "compliance_service": ("process-worker",),
+}
+
+
+def _loader(name: str):
+    def load():
+        return getattr(importlib.import_module(f"{__name__}.{name}"), name)
+    return load
+
 
-try:
-    from services.ingest_service import ingest_service
-    from services.transform_service import transform_service
-    from services.extract_service import extract_service
-    from services.classification_service import classification_service
-    from services.search_service import search_service
-    from services.rag_service import rag_service
-    from services.risk_service import risk_service
-    from services.compliance_service import compliance_service
-    print("✅ All ML/AI services loaded successfully!")
-except ImportError as e:
-    print(f"⚠️ Some services failed to load: {e}")
-    # Fallback to lightweight services
-    class LightweightService:
-        """Lightweight service placeholder"""
-        def __init__(self, name):
-            self.name = name
-
-    ingest_service = LightweightService("ingest")
-    transform_service = LightweightService("transform")
-    extract_service = LightweightService("extract")
-    classification_service = LightweightService("classification")
-    search_service = LightweightService("search")
-    rag_service = LightweightService("rag")
-    risk_service = LightweightService("risk")
-    compliance_service = LightweightService("compliance")
-
-__all__ = [
-    "ingest_service",
-    "transform_service",
-    "extract_service",
-    "classification_service",
-    "search_service",
-    "rag_service",
-    "risk_service",
-    "compliance_service",
-]
+for _name, _roles in _SERVICES.items():
+    service_registry.register(_name, _loader(_name), roles=_roles)
@@ -0,0 +1,247 @@
+"""
+Servicio de Auditoría
+Consulta y exportación de audit_logs para auditores y SIEM
+
+- Consultas con paginación keyset sobre (timestamp, id): cada página parte
+  del último registro de la anterior (cursor opaco), sin OFFSET
+- Exportaciones en streaming: cursor de servidor (``AsyncSession.stream``
+  con ``yield_per``) serializado por lotes a JSON Lines o CSV; la memoria no
+  depende del número de filas exportadas
+- Con ``AUDIT_LOGS_PARTITIONING=monthly`` un job diario crea las particiones
+  mensuales de los próximos meses (``ensure_audit_log_partitions``), para
+  que las filas nuevas no acaben en ``audit_logs_default``
+"""
+import base64
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import async_session_maker
+from core.logging_config import logger
+from models.database_models import AuditLog
+
+# Formato de exportación -> media type
+EXPORT_FORMATS = {
+    "json": "application/x-ndjson",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+AUDIT_COLUMNS = (
+    "id", "timestamp", "user_id", "action", "resource_type",
+    "resource_id", "ip_address", "user_agent", "result", "metadata",
+)
+
+_SELECT_COLUMNS = (
+    AuditLog.id, AuditLog.timestamp, AuditLog.user_id, AuditLog.action,
+    AuditLog.resource_type, AuditLog.resource_id, AuditLog.ip_address,
+    AuditLog.user_agent, AuditLog.result, AuditLog.metadata_json,
+)
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    """Cursor opaco de la posición (timestamp, id)"""
+    raw = f"{timestamp.isoformat()}|{log_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Posición (timestamp, id) de un cursor; ValueError si no es válido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, log_id = base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid audit cursor: {cursor!r}") from e
+
+
+def row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Fila de audit_logs (columnas de ``AUDIT_COLUMNS``) a tipos JSON"""
+    record = dict(zip(AUDIT_COLUMNS, row))
+    for key in ("user_id", "resource_id"):
+        if record[key] is not None:
+            record[key] = str(record[key])
+    if record["timestamp"] is not None:
+        record["timestamp"] = record["timestamp"].isoformat()
+    return record
+
+
+def serialize_jsonl(rows: Sequence[Sequence[Any]]) -> str:
+    """Lote de filas en JSON Lines"""
+    return "".join(
+        json.dumps(row_to_dict(row), ensure_ascii=False, default=str) + "\n" for row in rows
+    )
+
+
+def serialize_csv(rows: Sequence[Sequence[Any]], header: bool = False) -> str:
+    """Lote de filas en CSV (metadata como JSON)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(AUDIT_COLUMNS)
+    for row in rows:
+        record = row_to_dict(row)
+        if record["metadata"] is not None:
+            record["metadata"] = json.dumps(record["metadata"], ensure_ascii=False, default=str)
+        writer.writerow(record[column] for column in AUDIT_COLUMNS)
+    return buffer.getvalue()
+
+
+class AuditService:
+    """Consultas y exportaciones de logs de auditoría (append-only)"""
+
+    def __init__(self, batch_size: int = 2000):
+        self.batch_size = batch_size
+
+    def _filters(
+        self,
+        user_id: Optional[UUID] = None,
+        action: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List:
+        filters = []
+        if user_id is not None:
+            filters.append(AuditLog.user_id == user_id)
+        if action:
+            filters.append(AuditLog.action == action)
+        if resource_type:
+            filters.append(AuditLog.resource_type == resource_type)
+        if start_date is not None:
+            filters.append(AuditLog.timestamp >= start_date)
+        if end_date is not None:
+            filters.append(AuditLog.timestamp < end_date)
+        return filters
+
+    async def query(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filters: Any
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Página de logs, de más reciente a más antiguo.
+
+        Args:
+            db: Sesión de base de datos
+            limit: Tamaño de página
+            cursor: Cursor devuelto por la página anterior
+            **filters: user_id, action, resource_type, start_date, end_date
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: Registros y cursor de la
+            siguiente página (None si no hay más)
+        """
+        conditions = self._filters(**filters)
+        if cursor:
+            timestamp, log_id = decode_cursor(cursor)
+            # Comparación de filas: Postgres la resuelve con idx_audit_logs_timestamp_id
+            conditions.append(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(timestamp, log_id))
+
+        stmt = (
+            select(*_SELECT_COLUMNS)
+            .where(*conditions)
+            .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+            .limit(limit + 1)
+        )
+        rows = (await db.execute(stmt)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        return [row_to_dict(row) for row in rows], next_cursor
+
+    async def stream_export(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        format: str = "jsonl",
+        **filters: Any
+    ) -> AsyncIterator[str]:
+        """
+        Exportar logs de un rango de fechas en orden cronológico.
+
+        Abre su propia sesión: el generador se consume al enviar la respuesta,
+        después de cerrarse la sesión de la petición.
+
+        Yields:
+            str: Trozos de JSON Lines o CSV de hasta ``batch_size`` filas
+        """
+        serialize = serialize_csv if format == "csv" else serialize_jsonl
+        stmt = (
+            select(*_SELECT_COLUMNS)
+            .where(*self._filters(start_date=start_date, end_date=end_date, **filters))
+            .order_by(AuditLog.timestamp, AuditLog.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+
+        exported = 0
+        if format == "csv":
+            yield serialize_csv([], header=True)
+        async with async_session_maker() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield serialize(rows)
+        logger.info(
+            f"📤 Audit export {start_date.isoformat()} → {end_date.isoformat()}: "
+            f"{exported} rows ({format})"
+        )
+
+    async def ensure_partitions(self, months_ahead: int = 12):
+        """
+        Crear las particiones mensuales de audit_logs que falten desde el mes
+        actual hasta ``months_ahead`` meses (idempotente)
+        """
+        async with async_session_maker() as session:
+            await session.execute(
+                text("SELECT ensure_audit_log_partitions(CURRENT_DATE, :months_ahead)"),
+                {"months_ahead": months_ahead}
+            )
+            await session.commit()
+        logger.info(f"🗂️ Audit log partitions ensured ({months_ahead} months ahead)")
+
+
+# Instancia singleton del servicio
+audit_service = AuditService(batch_size=settings.AUDIT_EXPORT_BATCH_SIZE)
+
+_partition_scheduler = None
+
+
+def start_partition_scheduler():
+    """Programa ``ensure_partitions`` al arrancar y cada día a la 01:00"""
+    global _partition_scheduler
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    _partition_scheduler = AsyncIOScheduler()
+    _partition_scheduler.add_job(
+        audit_service.ensure_partitions,
+        trigger=CronTrigger(hour=1, minute=0),
+        args=[settings.AUDIT_PARTITION_MONTHS_AHEAD],
+        id="ensure_audit_log_partitions",
+        name="Crear particiones de audit_logs",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    _partition_scheduler.start()
+
+
+def stop_partition_scheduler():
+    """Detiene el job de particiones"""
+    global _partition_scheduler
+    if _partition_scheduler is not None:
+        _partition_scheduler.shutdown(wait=False)
+        _partition_scheduler = None
@@ -6,11 +6,13 @@ from typing import Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from transformers import pipeline
 import torch
 
 from core.logging_config import logger
 from core.config import settings
+from core.micro_batcher import MicroBatcher
+from ml.classifier import load_sequence_classifier, predict_batch
 from models.database_models import Document, DocumentClassification, DocumentStatus
 from services.ontology_service import ontology_service
 from services.taxonomy_service import taxonomy_service
@@ -22,15 +24,24 @@ class ClassificationService:
     def __init__(self):
         # Cargar modelo de clasificación
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(settings.CLASSIFICATION_MODEL)
-            self.model = AutoModelForSequenceClassification.from_pretrained(settings.CLASSIFICATION_MODEL)
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.model.to(self.device)
+            self.tokenizer, self.model, self.device = load_sequence_classifier(
+                settings.CLASSIFICATION_MODEL,
+                "cuda" if torch.cuda.is_available() else "cpu",
+                settings.CLASSIFICATION_BACKEND
+            )
             logger.info(f"Loaded classification model: {settings.CLASSIFICATION_MODEL} on {self.device}")
         except Exception as e:
             logger.warning(f"Could not load custom model, using default: {e}")
             self.classifier = pipeline("text-classification", model="dccuchile/bert-base-spanish-wwm-uncased")
         
+        # Inferencia por lotes: los documentos en cola comparten un forward pass
+        self.ml_batcher = MicroBatcher(
+            self._classify_batch,
+            max_batch_size=settings.CLASSIFICATION_BATCH_SIZE,
+            max_wait_ms=settings.CLASSIFICATION_BATCH_WAIT_MS,
+            name="classification"
+        )
+        
         # Mapeo de categorías (usando las disponibles en el enum)
         self.category_mapping = {
             "CONTRATO": DocumentClassification.CONTRATO_PRESTAMO_PERSONAL,
@@ -158,10 +169,7 @@ class ClassificationService:
             
             # ========== FASE 2: ML TRANSFORMERS (CONDICIONAL) ==========
             if use_ml:
-                if hasattr(self, 'model'):
-                    ml_result = await self._classify_with_model(text_sample)
-                else:
-                    ml_result = await self._classify_with_pipeline(text_sample)
+                ml_result = await self._classify_with_ml(text_sample)
                 
                 # Si la confianza ML es baja, aplicar reglas
                 if ml_result["confidence"] < 0.6:
@@ -325,67 +333,64 @@ class ClassificationService:
                 "error": str(e)
             }
     
-    async def _classify_with_model(self, text: str) -> Dict:
-        """Clasifica usando modelo transformer"""
+    async def _classify_with_ml(self, text: str) -> Dict:
+        """Clasifica con el modelo ML, agrupando con otros documentos en cola"""
         try:
-            # Tokenizar
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self.device)
-            
-            # Inferencia
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-            # Obtener predicción más probable
-            confidence, predicted_class = torch.max(predictions, dim=1)
-            
-            # Mapear a categoría
-            class_labels = list(self.category_mapping.keys())
-            predicted_label = class_labels[predicted_class.item()] if predicted_class.item() < len(class_labels) else "UNCLASSIFIED"
-            category = self.category_mapping.get(predicted_label, DocumentClassification.UNCLASSIFIED)
-            
-            return {
-                "category": category,
-                "confidence": confidence.item(),
-                "method": "transformer_model"
-            }
-            
+            return await self.ml_batcher.submit(text)
         except Exception as e:
-            logger.error(f"Model classification failed: {e}", exc_info=True)
+            logger.error(f"ML classification failed: {e}", exc_info=True)
             return {
                 "category": DocumentClassification.UNCLASSIFIED,
                 "confidence": 0.0,
-                "method": "model_error"
+                "method": "model_error" if hasattr(self, 'model') else "pipeline_error"
             }
     
-    async def _classify_with_pipeline(self, text: str) -> Dict:
+    def _classify_batch(self, texts: List[str]) -> List[Dict]:
+        """Clasifica un lote de textos (modelo transformer o pipeline de respaldo)"""
+        if hasattr(self, 'model'):
+            return self._classify_with_model(texts)
+        return self._classify_with_pipeline(texts)
+    
+    def _classify_with_model(self, texts: List[str]) -> List[Dict]:
+        """Clasifica usando modelo transformer (un forward pass por lote)"""
+        predictions = predict_batch(
+            self.tokenizer,
+            self.model,
+            texts,
+            self.device,
+            max_length=settings.CLASSIFICATION_MAX_LENGTH,
+            batch_size=settings.CLASSIFICATION_BATCH_SIZE
+        )
+        
+        # Mapear a categoría
+        class_labels = list(self.category_mapping.keys())
+        results = []
+        for class_id, confidence in predictions:
+            predicted_label = class_labels[class_id] if class_id < len(class_labels) else "UNCLASSIFIED"
+            results.append({
+                "category": self.category_mapping.get(predicted_label, DocumentClassification.UNCLASSIFIED),
+                "confidence": confidence,
+                "method": "transformer_model"
+            })
+        return results
+    
+    def _classify_with_pipeline(self, texts: List[str]) -> List[Dict]:
         """Clasifica usando pipeline de Hugging Face"""
-        try:
-            result = self.classifier(text[:512])
-            
+        outputs = self.classifier(
+            [text[:512] for text in texts],
+            batch_size=settings.CLASSIFICATION_BATCH_SIZE
+        )
+        
+        results = []
+        for output in outputs:
             # Mapear resultado a categoría
-            label = result[0]["label"].upper()
-            category = self.category_mapping.get(label, DocumentClassification.UNCLASSIFIED)
-            
-            return {
-                "category": category,
-                "confidence": result[0]["score"],
+            label = output["label"].upper()
+            results.append({
+                "category": self.category_mapping.get(label, DocumentClassification.UNCLASSIFIED),
+                "confidence": output["score"],
                 "method": "huggingface_pipeline"
-            }
-            
-        except Exception as e:
-            logger.error(f"Pipeline classification failed: {e}", exc_info=True)
-            return {
-                "category": DocumentClassification.UNCLASSIFIED,
-                "confidence": 0.0,
-                "method": "pipeline_error"
-            }
+            })
+        return results
     
     def _classify_with_rules(self, text: str) -> Dict:
         """Clasifica usando reglas basadas en palabras clave"""
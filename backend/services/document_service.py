@@ -0,0 +1,227 @@
+"""
+Servicio de Documentos
+Listado de documentos compartido por la API REST y GraphQL
+
+- Paginación keyset sobre (created_at, id): cada página parte del último
+  documento de la anterior (cursor opaco), sin OFFSET; una página profunda
+  cuesta lo mismo que la primera
+- Filtros de estado, clasificación y departamento servidos por los índices
+  compuestos ``idx_documents_<filtro>_created_id`` (ver migración 012)
+- Total estimado con las estadísticas del planificador (``EXPLAIN``) en
+  lugar de ``count(*)``
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from core.database import async_session_maker
+from models.database_models import Document, DocumentClassification, DocumentStatus
+
+MAX_PAGE_SIZE = 100
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` de una consulta, con sus parámetros ligados"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def encode_cursor(created_at: datetime, document_id: UUID) -> str:
+    """Cursor opaco de la posición (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{document_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Posición (created_at, id) de un cursor; ValueError si no es válido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, document_id = base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(created_at), UUID(document_id)
+    except Exception as e:
+        raise ValueError(f"Invalid document cursor: {cursor!r}") from e
+
+
+def document_cursor(document: Document) -> str:
+    return encode_cursor(document.created_at, document.id)
+
+
+class DocumentService:
+    """Consultas de listado sobre la tabla documents"""
+
+    def _filters(
+        self,
+        status: Optional[str] = None,
+        classification: Optional[str] = None,
+        department: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+        mime_type: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_confidence: Optional[float] = None,
+        title_contains: Optional[str] = None
+    ) -> List:
+        filters = []
+        # Valores de los enums (o sus miembros); ValueError si no existen
+        if status:
+            filters.append(Document.status == DocumentStatus(status))
+        if classification:
+            filters.append(Document.classification == DocumentClassification(classification))
+        if department:
+            filters.append(Document.department == department)
+        if owner_id is not None:
+            filters.append(Document.owner_id == owner_id)
+        if mime_type:
+            filters.append(Document.mime_type == mime_type)
+        if created_after is not None:
+            filters.append(Document.created_at >= created_after)
+        if created_before is not None:
+            filters.append(Document.created_at < created_before)
+        if min_confidence is not None:
+            filters.append(Document.classification_confidence >= min_confidence)
+        if title_contains:
+            filters.append(Document.title.ilike(f"%{title_contains}%"))
+        return filters
+
+    def page_query(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        **filters: Any
+    ):
+        """SELECT de una página (``limit`` + 1 filas para saber si hay más)"""
+        conditions = self._filters(**filters)
+        if cursor:
+            created_at, document_id = decode_cursor(cursor)
+            # Comparación de filas: Postgres la resuelve con los índices (…, created_at, id)
+            position = tuple_(Document.created_at, Document.id)
+            bound = tuple_(created_at, document_id)
+            conditions.append(position < bound if descending else position > bound)
+
+        order = (
+            (Document.created_at.desc(), Document.id.desc()) if descending
+            else (Document.created_at, Document.id)
+        )
+        return select(Document).where(*conditions).order_by(*order).limit(limit + 1)
+
+    async def estimate_count(self, db: AsyncSession, **filters: Any) -> int:
+        """Filas estimadas por el planificador para los filtros (sin recorrer la tabla)"""
+        stmt = select(Document.id).where(*self._filters(**filters))
+        plan = (await db.execute(_Explain(stmt))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(int(plan[0]["Plan"]["Plan Rows"]), 0)
+
+    async def list_page(
+        self,
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        with_total: bool = True,
+        **filters: Any
+    ) -> Dict[str, Any]:
+        """
+        Página de documentos, por defecto de más reciente a más antiguo.
+
+        Args:
+            db: Sesión de base de datos
+            limit: Tamaño de página (máximo ``MAX_PAGE_SIZE``)
+            cursor: Cursor devuelto por la página anterior
+            descending: Orden de created_at
+            with_total: Incluir el total estimado
+            **filters: status, classification, department, owner_id,
+                mime_type, created_after, created_before, min_confidence,
+                title_contains
+
+        Returns:
+            Dict: ``items`` (Document), ``next_cursor`` (None si no hay
+            más) y ``estimated_total`` (None si ``with_total`` es False)
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        stmt = self.page_query(limit=limit, cursor=cursor, descending=descending, **filters)
+        documents = list((await db.execute(stmt)).scalars().all())
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = document_cursor(documents[-1])
+
+        return {
+            "items": documents,
+            "next_cursor": next_cursor,
+            "estimated_total": await self.estimate_count(db, **filters) if with_total else None,
+        }
+
+    # ------------------------------------------------------------------
+    # GraphQL: abren su propia sesión (el contexto no tiene una)
+    # ------------------------------------------------------------------
+
+    async def get_by_id(self, document_id: str) -> Optional[Document]:
+        try:
+            document_id = UUID(str(document_id))
+        except ValueError:
+            return None
+        async with async_session_maker() as session:
+            return await session.get(Document, document_id)
+
+    async def list_paginated(
+        self,
+        first: int = 20,
+        after: Optional[str] = None,
+        **filters: Any
+    ) -> Dict[str, Any]:
+        """Página en forma de conexión Relay (edges / page_info / total_count)"""
+        async with async_session_maker() as session:
+            page = await self.list_page(session, limit=first, cursor=after, **filters)
+
+        edges = [{"cursor": document_cursor(doc), "node": doc} for doc in page["items"]]
+        return {
+            "edges": edges,
+            "page_info": {
+                "has_next_page": page["next_cursor"] is not None,
+                "has_previous_page": after is not None,
+                "start_cursor": edges[0]["cursor"] if edges else None,
+                "end_cursor": edges[-1]["cursor"] if edges else None,
+            },
+            "total_count": page["estimated_total"],
+        }
+
+    async def list_documents(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        order_by: Optional[str] = "uploaded_at",
+        order_desc: bool = True,
+        **filters: Any
+    ) -> List[Document]:
+        """Primera página sin cursor; las siguientes, con ``list_paginated``"""
+        if offset:
+            raise ValueError("offset pagination is not supported; use documentsPaginated")
+        if order_by not in (None, "uploaded_at", "created_at"):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        async with async_session_maker() as session:
+            page = await self.list_page(
+                session, limit=limit, descending=order_desc, with_total=False, **filters
+            )
+        return page["items"]
+
+
+# Instancia singleton del servicio
+document_service = DocumentService()
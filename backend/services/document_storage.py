@@ -0,0 +1,110 @@
+"""
+Acceso en streaming a objetos de MinIO
+Lectura por trozos sin cargar el objeto entero en memoria
+
+- ``iter_object``: iterador asíncrono de trozos de un objeto (o de un rango
+  de bytes); cada lectura bloqueante del cliente de MinIO va a un hilo
+- ``parse_range``: cabecera HTTP ``Range`` de un solo rango (visores de PDF)
+- ``spool_to_file``: vuelca un iterador de trozos a un fichero temporal para
+  los parsers que necesitan acceso aleatorio (PDF, DOCX, XLSX)
+"""
+import asyncio
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from core.config import settings
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """El rango pedido queda fuera del objeto (HTTP 416)"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Rango de bytes [inicio, fin] (inclusivo) de una cabecera ``Range``.
+
+    Sólo se atiende un rango: sin cabecera, con varios rangos o con una
+    sintaxis desconocida se devuelve None y se sirve el objeto completo.
+
+    Raises:
+        RangeNotSatisfiable: Si el rango no se solapa con el objeto
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip().replace(" ", ""))
+    if match is None or (not match.group(1) and not match.group(2)):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Sufijo: los últimos N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(f"bytes=-{suffix} of {size}")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(f"bytes={first}-{last} of {size}")
+    return start, min(end, size - 1)
+
+
+async def iter_object(
+    client: Any,
+    bucket_name: str,
+    object_name: str,
+    offset: int = 0,
+    length: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Trozos de un objeto de MinIO desde ``offset`` (``length`` bytes o hasta el final).
+
+    La conexión se libera al agotar el iterador o al cerrarlo (cliente que
+    corta la descarga).
+    """
+    chunk_size = chunk_size or settings.STORAGE_STREAM_CHUNK_BYTES
+    response = await asyncio.to_thread(
+        client.get_object,
+        bucket_name=bucket_name,
+        object_name=object_name,
+        offset=offset,
+        length=length or 0
+    )
+    try:
+        chunks = response.stream(chunk_size)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        response.close()
+        response.release_conn()
+
+
+@asynccontextmanager
+async def spool_to_file(chunks: AsyncIterator[bytes], suffix: str = "") -> AsyncIterator[str]:
+    """
+    Ruta de un fichero temporal con el contenido de ``chunks``.
+
+    El fichero se borra al salir del contexto. La memoria usada es la de un
+    trozo, no la del objeto.
+    """
+    handle = tempfile.NamedTemporaryFile(prefix="financia-", suffix=suffix, delete=False)
+    try:
+        with handle:
+            async for chunk in chunks:
+                handle.write(chunk)
+        yield handle.name
+    finally:
+        try:
+            os.unlink(handle.name)
+        except FileNotFoundError:
+            pass
@@ -3,8 +3,9 @@ Embedding Service v2.0
 Integra GPU Embedding Service con fallback al método actual
 """
 import logging
-from typing import List
+from typing import List, Optional
 from .gpu_embedding_client import get_gpu_client
+from .embedding_store import EmbeddingStore, normalize_rows
 
 logger = logging.getLogger(__name__)
 
@@ -15,17 +16,25 @@ class EmbeddingServiceV2:
     
     Estrategia:
     1. Intenta usar GPU service si está habilitado
-    2. Si falla o no está disponible, usa método actual
+    2. Si falla o no está disponible, usa método actual (sin esperar si el
+       circuit breaker del cliente está abierto)
+    
+    Con ``store`` se consulta antes el embedding store y sólo se calculan
+    los textos que no estaban. El store guarda los vectores sin normalizar
+    (es el mismo que usan ExtractService y astra-vector-db) y se normalizan
+    al leer si se piden así.
     3. Log de qué método se usó para métricas
     """
     
-    def __init__(self, fallback_service):
+    def __init__(self, fallback_service, store: Optional[EmbeddingStore] = None):
         """
         Args:
             fallback_service: Tu servicio de embeddings actual
+            store: Embedding store del modelo (ver get_embedding_store)
         """
         self.gpu_client = get_gpu_client()
         self.fallback_service = fallback_service
+        self.store = store
         self.stats = {
             "gpu_calls": 0,
             "fallback_calls": 0,
@@ -43,8 +52,20 @@ class EmbeddingServiceV2:
         Returns:
             List of embeddings (always returns, never fails)
         """
-        # Try GPU service first
-        if self.gpu_client.enabled:
+        if self.store is not None:
+            embeddings = await self.store.aencode(
+                texts, lambda missing: self._generate(missing, False)
+            )
+            return (normalize_rows(embeddings) if normalize else embeddings).tolist()
+        return await self._generate(texts, normalize)
+    
+    async def _generate(
+        self,
+        texts: List[str],
+        normalize: bool
+    ) -> List[List[float]]:
+        # Try GPU service first (circuito abierto -> fallback inmediato)
+        if self.gpu_client.enabled and not self.gpu_client.circuit_open:
             try:
                 embeddings = await self.gpu_client.generate_embeddings(
                     texts=texts,
@@ -76,12 +97,26 @@ class EmbeddingServiceV2:
         """
         Generate embeddings in batches
         """
+        if self.store is not None:
+            embeddings = await self.store.aencode(
+                texts, lambda missing: self._batch(missing, batch_size, normalize=False)
+            )
+            return normalize_rows(embeddings).tolist()
+        return await self._batch(texts, batch_size)
+    
+    async def _batch(
+        self,
+        texts: List[str],
+        batch_size: int,
+        normalize: bool = True
+    ) -> List[List[float]]:
         # Try GPU batch service
-        if self.gpu_client.enabled:
+        if self.gpu_client.enabled and not self.gpu_client.circuit_open:
             try:
                 embeddings = await self.gpu_client.batch_embeddings(
                     texts=texts,
-                    batch_size=batch_size
+                    batch_size=batch_size,
+                    normalize=normalize
                 )
                 
                 if embeddings is not None:
@@ -95,6 +130,9 @@ class EmbeddingServiceV2:
         
         # Fallback
         self.stats["fallback_calls"] += 1
+        if not normalize:
+            # Vectores crudos para el store
+            return await self.fallback_service.generate_embeddings(texts, False)
         return await self.fallback_service.batch_embeddings(texts, batch_size)
     
     def get_stats(self) -> dict:
@@ -106,7 +144,10 @@ class EmbeddingServiceV2:
             **self.stats,
             "total_calls": total,
             "gpu_percentage": round(gpu_percentage, 2),
-            "gpu_enabled": self.gpu_client.enabled
+            "gpu_enabled": self.gpu_client.enabled,
+            "gpu_circuit": self.gpu_client.breaker.state,
+            "store_hits": self.store.stats["hits"] if self.store else 0,
+            "store_misses": self.store.stats["misses"] if self.store else 0
         }
 
 
@@ -115,14 +156,16 @@ class EmbeddingServiceV2:
 # En tu backend/main.py o donde inicialices servicios:
 
 from services.embedding_service_v2 import EmbeddingServiceV2
+from services.embedding_store import get_embedding_store
 from services.your_current_embedding_service import YourCurrentEmbeddingService
 
 # Tu servicio actual
 current_embedding_service = YourCurrentEmbeddingService()
 
-# Nuevo servicio con GPU + fallback
+# Nuevo servicio con GPU + fallback (+ embedding store opcional)
 embedding_service = EmbeddingServiceV2(
-    fallback_service=current_embedding_service
+    fallback_service=current_embedding_service,
+    store=get_embedding_store(settings.EMBEDDING_MODEL, settings.EMBEDDING_MODEL_VERSION)
 )
 
 # Usar igual que antes
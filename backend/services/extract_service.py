@@ -3,19 +3,27 @@ Servicio de Extracción de Información
 Maneja NER, generación de embeddings y extracción de metadata
 """
 import re
+import time
+import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 import spacy
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
 from core.logging_config import logger
 from core.config import settings
+from core.bulk_insert import bulk_insert
+from core.micro_batcher import MicroBatcher
+from monitoring.metrics import document_processing_duration_seconds
 from models.database_models import Document, DocumentChunk, Entity, DocumentStatus
+from services.embedding_store import get_embedding_store
+from services.text_chunker import chunk_texts, tokenizer_counter
+from services.ner_pipeline import pipe_entities
 
 
 class ExtractService:
@@ -58,13 +66,30 @@ class ExtractService:
                     except:
                         raise RuntimeError("Could not load or download any spaCy model")
         
+        # NER en lote: los documentos en cola comparten una pasada de nlp.pipe
+        self.ner_batcher = MicroBatcher(
+            self.extract_entities_batch,
+            max_batch_size=settings.NER_MAX_BATCH_DOCS,
+            max_wait_ms=settings.NER_BATCH_WAIT_MS,
+            name="ner"
+        )
+        
         # Cargar modelo de embeddings
         self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
         logger.info(f"Loaded embedding model: {settings.EMBEDDING_MODEL}")
         
+        # Embeddings ya calculados por contenido (reprocesos y duplicados no re-embeben)
+        self.embedding_store = get_embedding_store(
+            settings.EMBEDDING_MODEL, settings.EMBEDDING_MODEL_VERSION
+        )
+        
         # Configuración de chunking
         self.chunk_size = settings.CHUNK_SIZE
         self.chunk_overlap = settings.CHUNK_OVERLAP
+        self.token_counter = (
+            tokenizer_counter(self.embedding_model.tokenizer)
+            if settings.CHUNK_USE_MODEL_TOKENIZER else None
+        )
     
     async def extract_information(
         self,
@@ -89,34 +114,38 @@ class ExtractService:
             logger.info(f"Created {len(chunks)} chunks for document {document.id}")
             
             # 2. Generar embeddings para cada chunk
+            start = time.perf_counter()
             chunk_embeddings = self._generate_embeddings(chunks)
+            document_processing_duration_seconds.labels(stage="embedding").observe(
+                time.perf_counter() - start
+            )
             
-            # 3. Guardar chunks en BD
-            chunk_objects = []
-            for i, (chunk_text, embedding) in enumerate(zip(chunks, chunk_embeddings)):
-                chunk = DocumentChunk(
-                    document_id=document.id,
-                    chunk_index=i,
-                    content=chunk_text,
-                    embedding=embedding.tolist(),
-                    token_count=len(chunk_text.split())
-                )
-                chunk_objects.append(chunk)
-                db.add(chunk)
-            
-            # 4. Extraer entidades (NER)
-            entities = await self._extract_entities(document.id, text, db)
+            # 3. Extraer entidades (NER)
+            start = time.perf_counter()
+            entities = await self._extract_entities(document.id, text)
+            document_processing_duration_seconds.labels(stage="ner").observe(
+                time.perf_counter() - start
+            )
             logger.info(f"Extracted {len(entities)} entities from document {document.id}")
             
-            # 5. Extraer metadata adicional
+            # 4. Extraer metadata adicional
             metadata = self._extract_metadata(text)
             
+            # 5. Persistir chunks (COPY binario) y entidades (INSERT por lotes)
+            start = time.perf_counter()
+            await self._persist_chunks(document.id, chunks, chunk_embeddings, db)
+            if entities:
+                await db.execute(insert(Entity), entities)
+            
             # 6. Actualizar metadata del documento
             document.metadata_.update(metadata)
             document.status = DocumentStatus.PROCESSED
             document.processed_at = datetime.utcnow()
             
             await db.commit()
+            document_processing_duration_seconds.labels(stage="persist").observe(
+                time.perf_counter() - start
+            )
             
             return {
                 "chunk_count": len(chunks),
@@ -139,7 +168,8 @@ class ExtractService:
     
     def _create_chunks(self, text: str) -> List[str]:
         """
-        Divide el texto en chunks con solapamiento
+        Divide el texto en chunks con solapamiento, respetando frases y
+        párrafos (motor común con astra-vector-db)
         
         Args:
             text: Texto a dividir
@@ -147,99 +177,134 @@ class ExtractService:
         Returns:
             List[str]: Lista de chunks
         """
-        # Limpiar texto
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Tokenizar por palabras
-        words = text.split()
-        
-        chunks = []
-        start = 0
+        return chunk_texts(text, self.chunk_size, self.chunk_overlap, self.token_counter)
+    
+    async def _persist_chunks(
+        self,
+        document_id: UUID,
+        chunks: List[str],
+        embeddings: np.ndarray,
+        db: AsyncSession
+    ) -> int:
+        """
+        Guarda los chunks con COPY binario; los embeddings se codifican
+        directamente desde la matriz NumPy (sin ``tolist`` ni objetos ORM)
         
-        while start < len(words):
-            end = start + self.chunk_size
-            chunk_words = words[start:end]
-            chunks.append(' '.join(chunk_words))
+        Args:
+            document_id: ID del documento
+            chunks: Textos de los chunks
+            embeddings: Matriz (n_chunks, dim) de embeddings
+            db: Sesión de base de datos
             
-            # Avanzar con solapamiento
-            start += self.chunk_size - self.chunk_overlap
-        
-        return chunks
+        Returns:
+            int: Número de chunks guardados
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        rows = [
+            (uuid.uuid4(), document_id, i, chunk_text, vectors[i])
+            for i, chunk_text in enumerate(chunks)
+        ]
+        return await bulk_insert(
+            db,
+            DocumentChunk,
+            ["id", "document_id", "chunk_index", "text", "embedding"],
+            rows
+        )
     
     def _generate_embeddings(self, chunks: List[str]) -> List[np.ndarray]:
         """
         Genera embeddings para una lista de chunks
         
+        Sólo se codifican los chunks que no están en el embedding store.
+        
         Args:
             chunks: Lista de textos
             
         Returns:
             List[np.ndarray]: Lista de vectores de embeddings
         """
-        try:
-            embeddings = self.embedding_model.encode(
-                chunks,
+        def encode(texts: List[str]) -> np.ndarray:
+            return self.embedding_model.encode(
+                texts,
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
                 show_progress_bar=False,
                 convert_to_numpy=True
             )
-            return embeddings
+        
+        try:
+            if self.embedding_store is not None:
+                return self.embedding_store.encode(chunks, encode)
+            return encode(chunks)
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}", exc_info=True)
             # Devolver embeddings cero en caso de error
             return [np.zeros(settings.EMBEDDING_DIMENSION) for _ in chunks]
     
+    def extract_entities_batch(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Extrae entidades de varios textos en una única pasada de nlp.pipe
+        
+        Args:
+            texts: Textos de los documentos
+            
+        Returns:
+            List[List[Dict]]: Entidades (text, label, start, end) por documento
+        """
+        return pipe_entities(
+            self.nlp,
+            texts,
+            batch_size=settings.NER_BATCH_SIZE,
+            n_process=settings.NER_N_PROCESS,
+            segment_words=settings.NER_SEGMENT_WORDS
+        )
+    
     async def _extract_entities(
         self,
         document_id: UUID,
-        text: str,
-        db: AsyncSession
-    ) -> List[Entity]:
+        text: str
+    ) -> List[Dict]:
         """
         Extrae entidades nombradas del texto
         
+        El texto se agrupa con los de otros documentos en cola (ner_batcher)
+        y se procesa completo, sin truncar.
+        
         Args:
             document_id: ID del documento
             text: Texto del que extraer entidades
-            db: Sesión de base de datos
             
         Returns:
-            List[Entity]: Lista de entidades extraídas
+            List[Dict]: Filas de la tabla entities (una por entidad distinta)
         """
         entities = []
         
         try:
-            # Procesar con spaCy
-            doc = self.nlp(text[:1000000])  # Limitar a 1M caracteres por performance
+            spans = await self.ner_batcher.submit(text)
             
             # Diccionario para contar ocurrencias
             entity_counts = {}
             
-            for ent in doc.ents:
-                key = (ent.text, ent.label_)
+            for span in spans:
+                key = (span["text"], span["label"])
                 if key not in entity_counts:
                     entity_counts[key] = {
-                        "text": ent.text,
-                        "label": ent.label_,
                         "count": 0,
-                        "positions": []
+                        "start": span["start"],
+                        "end": span["end"]
                     }
                 entity_counts[key]["count"] += 1
-                entity_counts[key]["positions"].append(ent.start_char)
-            
-            # Crear objetos Entity
-            for (text, label), data in entity_counts.items():
-                entity = Entity(
-                    document_id=document_id,
-                    entity_type=label,
-                    entity_value=text,
-                    confidence=data["count"] / len(doc.ents) if len(doc.ents) > 0 else 1.0,
-                    metadata_={
-                        "count": data["count"],
-                        "positions": data["positions"][:10]  # Limitar a 10 posiciones
-                    }
-                )
-                entities.append(entity)
-                db.add(entity)
+            
+            # Filas para un único INSERT multi-fila (primera aparición como posición)
+            for (entity_text, label), data in entity_counts.items():
+                entities.append({
+                    "id": uuid.uuid4(),
+                    "document_id": document_id,
+                    "entity_type": label,
+                    "entity_value": entity_text,
+                    "start_pos": data["start"],
+                    "end_pos": data["end"],
+                    "confidence": data["count"] / len(spans),
+                })
             
             return entities
             
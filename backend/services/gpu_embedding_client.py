@@ -1,8 +1,15 @@
 """
 GPU Embedding Service Client
 Cliente para integrar el GPU Embedding Service con el backend actual
+
+- Un único httpx.AsyncClient por proceso (pool de conexiones con keep-alive)
+- Circuit breaker: tras varios fallos seguidos se deja de llamar al servicio
+  (fallback inmediato) y un probe en segundo plano detecta cuándo vuelve
+- Las entradas grandes se dividen en sub-batches que se envían en paralelo
 """
 import os
+import time
+import asyncio
 import logging
 from typing import List, Optional
 import httpx
@@ -13,37 +20,135 @@ logger = logging.getLogger(__name__)
 USE_GPU_EMBEDDINGS = os.getenv("USE_GPU_EMBEDDINGS", "false").lower() == "true"
 GPU_EMBEDDING_URL = os.getenv("GPU_EMBEDDING_URL", "http://localhost:8001")
 GPU_TIMEOUT = int(os.getenv("GPU_EMBEDDING_TIMEOUT", "30"))
+GPU_MAX_BATCH_SIZE = int(os.getenv("GPU_EMBEDDING_MAX_BATCH_SIZE", "256"))
+GPU_MAX_CONCURRENCY = int(os.getenv("GPU_EMBEDDING_MAX_CONCURRENCY", "4"))
+GPU_FAILURE_THRESHOLD = int(os.getenv("GPU_EMBEDDING_FAILURE_THRESHOLD", "3"))
+GPU_RECOVERY_SECONDS = float(os.getenv("GPU_EMBEDDING_RECOVERY_SECONDS", "10"))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con probe en segundo plano.
+
+    Estados:
+    - closed: las llamadas pasan normalmente
+    - open: tras ``failure_threshold`` fallos consecutivos; las llamadas se
+      rechazan sin tocar la red hasta que el probe confirma la recuperación
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int, recovery_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow_request(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info("✅ GPU embedding circuit closed")
+        self.state = self.CLOSED
+        self.opened_at = None
+
+    def record_failure(self, probe) -> None:
+        """
+        Registrar un fallo; al alcanzar el umbral abre el circuito y lanza
+        ``probe`` (corrutina que devuelve True si el servicio responde).
+        """
+        self.consecutive_failures += 1
+        if self.state == self.OPEN or self.consecutive_failures < self.failure_threshold:
+            return
+
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(
+            f"⚠️ GPU embedding circuit open after {self.consecutive_failures} failures, "
+            f"probing every {self.recovery_seconds}s"
+        )
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop(probe))
+
+    async def _probe_loop(self, probe):
+        while self.state == self.OPEN:
+            await asyncio.sleep(self.recovery_seconds)
+            try:
+                if await probe():
+                    self.record_success()
+            except Exception as e:
+                logger.debug(f"GPU embedding probe failed: {e}")
+
+    def cancel_probe(self):
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
 
 
 class GPUEmbeddingClient:
     """Cliente para el GPU Embedding Service"""
-    
-    def __init__(self):
-        self.base_url = GPU_EMBEDDING_URL
-        self.timeout = GPU_TIMEOUT
-        self.enabled = USE_GPU_EMBEDDINGS
-        
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        max_batch_size: int = GPU_MAX_BATCH_SIZE,
+        max_concurrency: int = GPU_MAX_CONCURRENCY,
+        failure_threshold: int = GPU_FAILURE_THRESHOLD,
+        recovery_seconds: float = GPU_RECOVERY_SECONDS
+    ):
+        self.base_url = base_url or GPU_EMBEDDING_URL
+        self.timeout = timeout or GPU_TIMEOUT
+        self.enabled = USE_GPU_EMBEDDINGS if enabled is None else enabled
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, recovery_seconds)
+        self._client: Optional[httpx.AsyncClient] = None
+
         if self.enabled:
             logger.info(f"✅ GPU Embedding Client enabled: {self.base_url}")
         else:
             logger.info("ℹ️ GPU Embedding Client disabled (using fallback)")
-    
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido (se crea en el primer uso)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency * 2,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+
+    @property
+    def circuit_open(self) -> bool:
+        return not self.breaker.allow_request()
+
     async def is_available(self) -> bool:
         """Check if GPU service is available"""
-        if not self.enabled:
+        if not self.enabled or self.circuit_open:
             return False
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/health",
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            return await self._health()
         except Exception as e:
             logger.warning(f"GPU service not available: {e}")
             return False
-    
+
+    async def _health(self) -> bool:
+        response = await self.client.get("/health", timeout=5.0)
+        return response.status_code == 200
+
     async def generate_embeddings(
         self,
         texts: List[str],
@@ -51,68 +156,81 @@ class GPUEmbeddingClient:
     ) -> Optional[List[List[float]]]:
         """
         Generate embeddings using GPU service
-        
+
+        Las listas mayores que ``max_batch_size`` se envían como sub-batches
+        concurrentes (como máximo ``max_concurrency`` en vuelo).
+
         Returns:
             List of embeddings or None if service unavailable
         """
-        if not self.enabled:
-            return None
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/embeddings/generate",
-                    json={
-                        "texts": texts,
-                        "normalize": normalize
-                    },
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ GPU embeddings generated: {len(texts)} texts")
-                    return data["embeddings"]
-                else:
-                    logger.error(f"GPU service error: {response.status_code}")
-                    return None
-        
-        except Exception as e:
-            logger.error(f"Error calling GPU service: {e}")
-            return None
-    
+        return await self._embed(texts, self.max_batch_size, normalize)
+
     async def batch_embeddings(
         self,
         texts: List[str],
-        batch_size: int = 32
+        batch_size: int = 32,
+        normalize: bool = True
     ) -> Optional[List[List[float]]]:
         """
         Generate embeddings in batches (for large datasets)
         """
+        return await self._embed(texts, min(batch_size, self.max_batch_size), normalize)
+
+    async def _embed(
+        self,
+        texts: List[str],
+        batch_size: int,
+        normalize: bool
+    ) -> Optional[List[List[float]]]:
         if not self.enabled:
             return None
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/embeddings/batch",
-                    json={
-                        "texts": texts,
-                        "batch_size": batch_size
-                    },
-                    timeout=self.timeout * 2  # More time for batches
+        if not texts:
+            return []
+        if self.circuit_open:
+            # Fallback inmediato: no esperar al timeout de un servicio caído
+            return None
+
+        batch_size = max(1, batch_size)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def post(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.client.post(
+                    "/api/v1/embeddings/generate",
+                    json={"texts": batch, "normalize": normalize}
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ GPU batch embeddings: {len(texts)} texts")
-                    return data["embeddings"]
-                else:
-                    return None
-        
+                if 400 <= response.status_code < 500:
+                    # Petición inválida: el servicio está sano, no cuenta como fallo
+                    raise ValueError(f"GPU service rejected request: {response.status_code}")
+                if response.status_code != 200:
+                    raise RuntimeError(f"GPU service error: {response.status_code}")
+                return response.json()["embeddings"]
+
+        tasks = [asyncio.create_task(post(batch)) for batch in batches]
+        try:
+            results = await asyncio.gather(*tasks)
+        except ValueError as e:
+            logger.error(f"Error calling GPU service: {e}")
+            return None
         except Exception as e:
-            logger.error(f"Error in batch embeddings: {e}")
+            logger.error(f"Error calling GPU service: {e}")
+            self.breaker.record_failure(self._health)
             return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self.breaker.record_success()
+        logger.info(f"✅ GPU embeddings generated: {len(texts)} texts ({len(batches)} batches)")
+        return [embedding for batch in results for embedding in batch]
+
+    async def aclose(self):
+        """Cerrar el pool de conexiones y el probe del circuit breaker"""
+        self.breaker.cancel_probe()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 # Singleton instance
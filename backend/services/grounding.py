@@ -0,0 +1,117 @@
+"""
+Verificación de fundamentación (anti-alucinación)
+Mide qué parte de cada oración de la respuesta aparece en el contexto
+
+- Texto normalizado (minúsculas, sin tildes ni signos) partido en shingles
+  de caracteres; los shingles de cada chunk se calculan una vez y se
+  reutilizan entre consultas
+- Puntuación de una oración: fracción de sus shingles presentes en el chunk
+  que mejor la cubre (contención), para todas las oraciones y chunks a la
+  vez con numpy
+- Confianza: media de las oraciones, penalizada si la respuesta no cita
+  ningún [DOC-X]
+
+Coste lineal en el tamaño de respuesta y contexto, frente al
+``SequenceMatcher`` por oración y línea (cuadrático en la longitud)
+"""
+import re
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from services.rag_cache import normalize_question
+from services.rag_stream import CITATION_LABEL
+
+# 8 caracteres: abarcan límites de palabra, así que coincidencias sueltas de vocabulario no cuentan
+SHINGLE_SIZE = 8
+MIN_SENTENCE_CHARS = 10
+# Confianza si no hay oraciones que verificar
+NEUTRAL_CONFIDENCE = 0.5
+# Factor si la respuesta no cita ninguna fuente
+UNCITED_PENALTY = 0.7
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_CHUNK_SEPARATOR = re.compile(r"\n\s*\n")
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def split_sentences(answer: str) -> List[str]:
+    """Oraciones de la respuesta sin etiquetas de citación (se ignoran las muy cortas)"""
+    sentences = (
+        normalize_question(CITATION_LABEL.sub(" ", sentence))
+        for sentence in _SENTENCE_END.split(answer)
+    )
+    return [sentence for sentence in sentences if len(sentence) >= MIN_SENTENCE_CHARS]
+
+
+def split_chunks(context: str) -> List[str]:
+    """Chunks del contexto RAG (separados por línea en blanco)"""
+    return [chunk for chunk in _CHUNK_SEPARATOR.split(context) if chunk.strip()]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hashes únicos de los shingles de caracteres del texto normalizado"""
+    if len(text) < size:
+        return np.asarray([hash(text)], dtype=np.int64) if text else _EMPTY
+    return np.unique(np.fromiter(
+        (hash(text[i:i + size]) for i in range(len(text) - size + 1)),
+        dtype=np.int64,
+        count=len(text) - size + 1
+    ))
+
+
+@lru_cache(maxsize=4096)
+def chunk_shingles(chunk: str) -> np.ndarray:
+    """Shingles de un chunk del contexto (cacheados: los chunks se repiten entre consultas)"""
+    return shingles(normalize_question(CITATION_LABEL.sub(" ", chunk)))
+
+
+def sentence_support(sentences: List[str], chunks: List[str]) -> np.ndarray:
+    """
+    Contención de cada oración en su mejor chunk.
+
+    Returns:
+        np.ndarray: Por oración, fracción (0-1) de sus shingles presentes en
+        el chunk que más comparte con ella
+    """
+    if not sentences:
+        return np.zeros(0)
+    if not chunks:
+        return np.zeros(len(sentences))
+
+    # Pares (shingle, chunk) ordenados por shingle
+    chunk_arrays = [chunk_shingles(chunk) for chunk in chunks]
+    context_hashes = np.concatenate(chunk_arrays)
+    context_chunk = np.repeat(np.arange(len(chunks)), [len(a) for a in chunk_arrays])
+    order = np.argsort(context_hashes, kind="stable")
+    context_hashes, context_chunk = context_hashes[order], context_chunk[order]
+
+    # Pares (shingle, oración)
+    sentence_arrays = [shingles(sentence) for sentence in sentences]
+    sizes = np.asarray([len(a) for a in sentence_arrays])
+    answer_hashes = np.concatenate(sentence_arrays)
+    answer_sentence = np.repeat(np.arange(len(sentences)), sizes)
+
+    # Unión por shingle: cada par de la respuesta con todos los chunks que lo contienen
+    left = np.searchsorted(context_hashes, answer_hashes, side="left")
+    matches = np.searchsorted(context_hashes, answer_hashes, side="right") - left
+    total = int(matches.sum())
+    overlap = np.zeros((len(sentences), len(chunks)))
+    if total:
+        starts = np.repeat(left - (np.cumsum(matches) - matches), matches)
+        chunk_ids = context_chunk[starts + np.arange(total)]
+        np.add.at(overlap, (np.repeat(answer_sentence, matches), chunk_ids), 1)
+
+    return overlap.max(axis=1) / np.maximum(sizes, 1)
+
+
+def grounding_confidence(answer: str, context: str) -> float:
+    """Confianza (0-1) de que la respuesta esté fundamentada en el contexto"""
+    support = sentence_support(split_sentences(answer), split_chunks(context))
+    confidence = float(support.mean()) if support.size else NEUTRAL_CONFIDENCE
+
+    if not CITATION_LABEL.search(answer):
+        confidence *= UNCITED_PENALTY
+
+    return min(1.0, max(0.0, confidence))
@@ -2,10 +2,12 @@
 Servicio de Ingesta de Documentos
 Maneja la carga inicial de documentos, validación y almacenamiento en MinIO
 """
+import asyncio
 import hashlib
 import mimetypes
 from datetime import datetime
-from typing import BinaryIO, Dict, Optional
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Optional
 from uuid import UUID
 
 from minio import Minio
@@ -17,6 +19,7 @@ from core.config import settings
 from core.logging_config import logger, audit_logger
 from models.database_models import Document, DocumentStatus, DocumentClassification
 from models.schemas import DocumentCreate
+from services.document_storage import iter_object, spool_to_file
 
 
 class IngestService:
@@ -55,7 +58,7 @@ class IngestService:
         Ingesta un documento completo
         
         Args:
-            file: Archivo binario
+            file: Archivo binario con seek (se lee por trozos)
             filename: Nombre del archivo
             user_id: ID del usuario que sube el documento
             db: Sesión de base de datos
@@ -65,9 +68,10 @@ class IngestService:
             Document: Documento creado en la base de datos
         """
         try:
-            # Leer contenido del archivo
-            content = file.read()
-            file_size = len(content)
+            # Tamaño sin leer el archivo completo en memoria
+            file.seek(0, 2)
+            file_size = file.tell()
+            file.seek(0)
             
             # Validar tamaño
             max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
@@ -84,8 +88,12 @@ class IngestService:
             if mime_type not in allowed_types:
                 raise ValueError(f"File type {mime_type} not allowed")
             
-            # Calcular hash del archivo
-            file_hash = hashlib.sha256(content).hexdigest()
+            # Calcular hash del archivo por trozos
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: file.read(settings.STORAGE_STREAM_CHUNK_BYTES), b""):
+                digest.update(chunk)
+            file_hash = digest.hexdigest()
+            file.seek(0)
             
             # Verificar duplicados
             existing_doc = await self._check_duplicate(db, file_hash)
@@ -96,12 +104,11 @@ class IngestService:
             # Generar ruta en MinIO
             object_name = f"{user_id}/{datetime.utcnow().strftime('%Y/%m/%d')}/{file_hash}_{filename}"
             
-            # Subir a MinIO
-            from io import BytesIO
+            # Subir a MinIO (el cliente lee el archivo por partes)
             self.minio_client.put_object(
                 bucket_name=self.bucket_name,
                 object_name=object_name,
-                data=BytesIO(content),
+                data=file,
                 length=file_size,
                 content_type=mime_type
             )
@@ -157,6 +164,9 @@ class IngestService:
         """
         Obtiene el contenido binario de un documento desde MinIO
         
+        Carga el objeto entero en memoria: para ficheros grandes usar
+        ``iter_document_content`` o ``spool_document``.
+        
         Args:
             document: Documento del que obtener contenido
             
@@ -176,6 +186,101 @@ class IngestService:
             logger.error(f"Error retrieving document from MinIO: {e}")
             raise
     
+    async def stat_document(self, document: Document):
+        """
+        Metadatos del objeto en MinIO (size, etag, content_type) sin descargarlo
+        
+        Raises:
+            S3Error: Si el objeto no existe
+        """
+        return await asyncio.to_thread(
+            self.minio_client.stat_object,
+            bucket_name=self.bucket_name,
+            object_name=document.storage_path
+        )
+    
+    def iter_document_content(
+        self,
+        document: Document,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Contenido de un documento por trozos (o de un rango de bytes)
+        
+        Args:
+            document: Documento del que obtener contenido
+            offset: Primer byte
+            length: Número de bytes (None: hasta el final)
+            
+        Returns:
+            AsyncIterator[bytes]: Trozos de ``STORAGE_STREAM_CHUNK_BYTES``
+        """
+        return iter_object(
+            self.minio_client,
+            self.bucket_name,
+            document.storage_path,
+            offset=offset,
+            length=length
+        )
+    
+    def spool_document(self, document: Document):
+        """
+        Contexto asíncrono con la ruta de una copia temporal del documento
+        
+        Para los workers: el contenido pasa a disco por trozos y al pool de
+        CPU sólo viaja la ruta.
+        """
+        suffix = Path(document.storage_path or "").suffix
+        return spool_to_file(self.iter_document_content(document), suffix=suffix)
+    
+    async def store_extracted_text(self, document: Document, text: str) -> str:
+        """
+        Guarda en MinIO el texto extraído de un documento, para reanudar el
+        pipeline sin repetir la transformación (OCR)
+        
+        Args:
+            document: Documento de origen
+            text: Texto extraído
+            
+        Returns:
+            str: Ruta del objeto en MinIO
+        """
+        from io import BytesIO
+        data = text.encode("utf-8")
+        object_name = self._extracted_text_path(document)
+        self.minio_client.put_object(
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            data=BytesIO(data),
+            length=len(data),
+            content_type="text/plain; charset=utf-8"
+        )
+        return object_name
+    
+    async def get_extracted_text(self, object_name: str) -> str:
+        """
+        Obtiene de MinIO un texto extraído guardado con ``store_extracted_text``
+        
+        Args:
+            object_name: Ruta del objeto en MinIO
+            
+        Returns:
+            str: Texto extraído
+        """
+        response = self.minio_client.get_object(
+            bucket_name=self.bucket_name,
+            object_name=object_name
+        )
+        try:
+            return response.read().decode("utf-8")
+        finally:
+            response.close()
+            response.release_conn()
+    
+    def _extracted_text_path(self, document: Document) -> str:
+        return f"derived/{document.id}/text.txt"
+    
     async def delete_document(self, document: Document, db: AsyncSession) -> bool:
         """
         Elimina un documento de MinIO y marca como eliminado en BD
@@ -193,6 +298,11 @@ class IngestService:
                 bucket_name=self.bucket_name,
                 object_name=document.storage_path
             )
+            # Texto extraído guardado por el pipeline (si existe)
+            self.minio_client.remove_object(
+                bucket_name=self.bucket_name,
+                object_name=self._extracted_text_path(document)
+            )
             
             # Marcar como eliminado en BD (soft delete)
             document.status = DocumentStatus.ARCHIVED
@@ -215,13 +325,20 @@ class IngestService:
             logger.error(f"Error deleting document: {e}", exc_info=True)
             return False
     
-    def get_presigned_url(self, document: Document, expires: int = 3600) -> str:
+    def get_presigned_url(
+        self,
+        document: Document,
+        expires: int = 3600,
+        response_headers: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         Genera URL prefirmada para descarga directa
         
         Args:
             document: Documento para el que generar URL
             expires: Tiempo de expiración en segundos (default: 1 hora)
+            response_headers: Cabeceras que MinIO pondrá en la respuesta
+                (``response-content-disposition``, ``response-content-type``)
             
         Returns:
             str: URL prefirmada
@@ -230,8 +347,9 @@ class IngestService:
             from datetime import timedelta
             url = self.minio_client.presigned_get_object(
                 bucket_name=self.bucket_name,
-                object_name=document.file_path,
-                expires=timedelta(seconds=expires)
+                object_name=document.storage_path,
+                expires=timedelta(seconds=expires),
+                response_headers=response_headers
             )
             return url
         except S3Error as e:
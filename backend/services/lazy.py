@@ -0,0 +1,28 @@
+"""
+Proxies perezosos de los servicios del backend
+
+Cada proxy crea su servicio (e importa su módulo) en el primer acceso a un
+atributo. Viven en este módulo, y no en el paquete, para no ocupar los
+nombres de los submódulos ``services.<nombre>``.
+"""
+from core.service_registry import service_registry
+
+ingest_service = service_registry.proxy("ingest_service")
+transform_service = service_registry.proxy("transform_service")
+extract_service = service_registry.proxy("extract_service")
+classification_service = service_registry.proxy("classification_service")
+search_service = service_registry.proxy("search_service")
+rag_service = service_registry.proxy("rag_service")
+risk_service = service_registry.proxy("risk_service")
+compliance_service = service_registry.proxy("compliance_service")
+
+__all__ = [
+    "ingest_service",
+    "transform_service",
+    "extract_service",
+    "classification_service",
+    "search_service",
+    "rag_service",
+    "risk_service",
+    "compliance_service",
+]
@@ -0,0 +1,92 @@
+"""
+NER Pipeline
+Extracción de entidades en lote con ``nlp.pipe``
+
+- Cada documento se divide en segmentos con el motor de chunking común
+  (límites de frase, sin solapamiento), así no hay límite de longitud ni
+  truncado de documentos largos
+- Los segmentos de varios documentos pasan juntos por ``nlp.pipe`` con
+  ``batch_size`` y ``n_process`` configurables
+- Sólo se ejecutan los componentes que necesita el NER
+- Los offsets de cada segmento se trasladan al texto original del documento
+"""
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from services.text_chunker import iter_chunks
+
+# Componentes que producen entidades
+NER_COMPONENTS = ("ner", "entity_ruler", "span_ruler")
+
+
+def ner_disabled_components(nlp: Any) -> List[str]:
+    """
+    Componentes del pipeline que el NER no necesita.
+
+    Se mantienen los componentes de entidades y los tok2vec/transformer
+    compartidos de los que escucha alguno de ellos.
+    """
+    entity_pipes = [name for name in nlp.pipe_names if name in NER_COMPONENTS]
+    keep = set(entity_pipes)
+    for name, component in nlp.pipeline:
+        listeners = getattr(component, "listening_components", None) or []
+        if any(listener in entity_pipes for listener in listeners):
+            keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+
+def iter_segments(text: str, segment_words: int) -> Iterator[Tuple[int, str]]:
+    """(offset, texto original) de los segmentos de un documento"""
+    for chunk in iter_chunks(text, segment_words):
+        yield chunk.start, text[chunk.start:chunk.end]
+
+
+def pipe_entities(
+    nlp: Any,
+    texts: Sequence[str],
+    batch_size: int = 64,
+    n_process: int = 1,
+    segment_words: int = 1000
+) -> List[List[Dict]]:
+    """
+    Entidades de varios documentos en una única pasada de ``nlp.pipe``.
+
+    Args:
+        nlp: Pipeline de spaCy
+        texts: Textos de los documentos
+        batch_size: Segmentos por lote de ``nlp.pipe``
+        n_process: Procesos de ``nlp.pipe``
+        segment_words: Tamaño máximo de segmento en palabras
+
+    Returns:
+        List[List[Dict]]: Por documento, entidades ``{text, label, start, end}``
+        ordenadas por posición en el texto original
+    """
+    results: List[List[Dict]] = [[] for _ in texts]
+
+    def segments():
+        for doc_index, text in enumerate(texts):
+            for offset, segment in iter_segments(text, segment_words):
+                yield segment, (doc_index, offset)
+
+    docs = nlp.pipe(
+        segments(),
+        as_tuples=True,
+        batch_size=batch_size,
+        n_process=n_process,
+        disable=ner_disabled_components(nlp)
+    )
+    for doc, (doc_index, offset) in docs:
+        results[doc_index].extend(
+            {
+                "text": ent.text,
+                "label": ent.label_,
+                "start": offset + ent.start_char,
+                "end": offset + ent.end_char,
+            }
+            for ent in doc.ents
+        )
+
+    # Orden por posición en el documento original
+    for entities in results:
+        entities.sort(key=lambda ent: (ent["start"], ent["end"]))
+    return results
@@ -3,7 +3,9 @@ Ontology Service
 Servicio para trabajar con la ontología OWL/SKOS usando RDFLib
 Sprint 2 + 3: Ontología completa con SPARQL y razonamiento
 """
+import hashlib
 import logging
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
@@ -12,6 +14,8 @@ from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL
 from rdflib.plugins.sparql import prepareQuery
 from rdflib.namespace import SKOS, XSD
 
+from core.sparql_executor import SPARQLTimeoutError
+
 
 logger = logging.getLogger(__name__)
 
@@ -39,15 +43,23 @@ class OntologyService:
             ontology_file = current_dir / "ontology" / "tefinancia.ttl"
         self.ontology_file = Path(ontology_file)
         self.graph = Graph()
+        # Versión del contenido cargado (clave de la caché de consultas SPARQL)
+        self.version = "empty"
         
         # Namespaces
         self.TF = Namespace("http://tefinancia.es/ontology#")
         self.graph.bind("tf", self.TF)
         self.graph.bind("skos", SKOS)
+        self.namespaces = {
+            "tf": self.TF, "rdf": RDF, "rdfs": RDFS, "owl": OWL, "skos": SKOS, "xsd": XSD
+        }
         
         # Cargar ontología
         self._load_ontology()
         
+        # Consultas internas parseadas una sola vez
+        self._queries = self._prepare_queries()
+        
         logger.info(f"Ontología cargada: {len(self.graph)} triples")
     
     def _load_ontology(self):
@@ -58,12 +70,86 @@ class OntologyService:
             return
         
         try:
-            self.graph.parse(self.ontology_file, format="turtle")
+            data = self.ontology_file.read_bytes()
+            self.graph.parse(data=data, format="turtle")
+            self.version = hashlib.sha256(data).hexdigest()[:16]
             logger.info(f"✅ Ontología cargada: {len(self.graph)} triples")
         except Exception as e:
             logger.error(f"Error loading ontology: {e}")
             raise
     
+    def reload(self):
+        """Recarga la ontología desde disco (cambia ``version`` si cambió el archivo)"""
+        graph, self.graph = self.graph, Graph()
+        for prefix, namespace in graph.namespaces():
+            self.graph.bind(prefix, namespace)
+        self._load_ontology()
+    
+    def _prepare_queries(self) -> Dict:
+        """
+        Consultas internas con ``prepareQuery``: el parseo y el álgebra se
+        calculan una vez y se reutilizan con ``initBindings``.
+        """
+        queries = {
+            # Subclases transitivas de ?root
+            "subclasses": """
+                SELECT ?subclass ?label WHERE {
+                    ?subclass rdfs:subClassOf* ?root .
+                    OPTIONAL { ?subclass rdfs:label ?label FILTER(lang(?label) = "es") }
+                    FILTER(?subclass != ?root)
+                }
+            """,
+            "leaf_classes": """
+                SELECT DISTINCT ?class WHERE {
+                    ?class a owl:Class .
+                    ?class rdfs:subClassOf* tf:Documento .
+                    FILTER NOT EXISTS {
+                        ?subclass rdfs:subClassOf ?class .
+                        FILTER(?subclass != ?class)
+                    }
+                    FILTER(STRSTARTS(STR(?class), STR(tf:)))
+                }
+            """,
+            # Restricciones de cardinalidad mínima de ?cls
+            "min_cardinality": """
+                SELECT ?property ?minCard WHERE {
+                    ?cls rdfs:subClassOf ?restriction .
+                    ?restriction a owl:Restriction .
+                    ?restriction owl:onProperty ?property .
+                    ?restriction owl:minCardinality ?minCard .
+                    FILTER(?minCard >= 1)
+                }
+            """,
+            "exact_cardinality": """
+                SELECT ?property ?card WHERE {
+                    ?cls rdfs:subClassOf ?restriction .
+                    ?restriction a owl:Restriction .
+                    ?restriction owl:onProperty ?property .
+                    ?restriction owl:cardinality ?card .
+                }
+            """,
+            "related_documents": """
+                SELECT ?relatedClass ?relation ?label WHERE {
+                    ?cls rdfs:subClassOf ?restriction .
+                    ?restriction owl:onProperty ?relation .
+                    ?restriction owl:someValuesFrom ?relatedClass .
+                    OPTIONAL { ?relatedClass rdfs:label ?label FILTER(lang(?label) = "es") }
+                    FILTER(STRSTARTS(STR(?relatedClass), STR(tf:)))
+                }
+            """,
+            # Nº de recursos tf: de tipo ?type
+            "count_by_type": """
+                SELECT (COUNT(DISTINCT ?resource) AS ?count) WHERE {
+                    ?resource a ?type .
+                    FILTER(STRSTARTS(STR(?resource), STR(tf:)))
+                }
+            """,
+        }
+        return {
+            name: prepareQuery(query, initNs=self.namespaces)
+            for name, query in queries.items()
+        }
+    
     def get_class_uri(self, class_name: str) -> URIRef:
         """
         Convierte un nombre de clase a URI
@@ -168,18 +254,9 @@ class OntologyService:
                     })
         else:
             # Todas las subclases (transitivo)
-            query = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX tf: <http://tefinancia.es/ontology#>
-            
-            SELECT ?subclass ?label WHERE {{
-                ?subclass rdfs:subClassOf* <{class_uri}> .
-                OPTIONAL {{ ?subclass rdfs:label ?label FILTER(lang(?label) = "es") }}
-                FILTER(?subclass != <{class_uri}>)
-            }}
-            """
-            
-            results = self.graph.query(query)
+            results = self.graph.query(
+                self._queries["subclasses"], initBindings={"root": URIRef(class_uri)}
+            )
             for row in results:
                 subclasses.append({
                     "uri": str(row.subclass),
@@ -249,24 +326,8 @@ class OntologyService:
     
     def _get_leaf_classes(self) -> List[URIRef]:
         """Obtiene todas las clases hoja (sin subclases)"""
-        query = """
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX tf: <http://tefinancia.es/ontology#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        
-        SELECT DISTINCT ?class WHERE {
-            ?class a owl:Class .
-            ?class rdfs:subClassOf* tf:Documento .
-            FILTER NOT EXISTS {
-                ?subclass rdfs:subClassOf ?class .
-                FILTER(?subclass != ?class)
-            }
-            FILTER(STRSTARTS(STR(?class), STR(tf:)))
-        }
-        """
-        
-        results = self.graph.query(query)
-        return [row.class_ for row in results]
+        results = self.graph.query(self._queries["leaf_classes"])
+        return [row["class"] for row in results]
     
     def _get_keywords(self, class_uri: URIRef) -> List[str]:
         """Obtiene las keywords de una clase"""
@@ -290,21 +351,10 @@ class OntologyService:
         """
         required_fields = []
         
-        # Buscar restricciones de cardinalidad mínima
-        query = f"""
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
+        bindings = {"cls": URIRef(class_uri)}
         
-        SELECT ?property ?minCard WHERE {{
-            <{class_uri}> rdfs:subClassOf ?restriction .
-            ?restriction a owl:Restriction .
-            ?restriction owl:onProperty ?property .
-            ?restriction owl:minCardinality ?minCard .
-            FILTER(?minCard >= 1)
-        }}
-        """
-        
-        results = self.graph.query(query)
+        # Buscar restricciones de cardinalidad mínima
+        results = self.graph.query(self._queries["min_cardinality"], initBindings=bindings)
         for row in results:
             prop_name = str(row.property).split("#")[-1]
             required_fields.append({
@@ -315,19 +365,7 @@ class OntologyService:
             })
         
         # También buscar propiedades con cardinalidad exacta
-        query_exact = f"""
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        
-        SELECT ?property ?card WHERE {{
-            <{class_uri}> rdfs:subClassOf ?restriction .
-            ?restriction a owl:Restriction .
-            ?restriction owl:onProperty ?property .
-            ?restriction owl:cardinality ?card .
-        }}
-        """
-        
-        results = self.graph.query(query_exact)
+        results = self.graph.query(self._queries["exact_cardinality"], initBindings=bindings)
         for row in results:
             prop_name = str(row.property).split("#")[-1]
             required_fields.append({
@@ -443,29 +481,50 @@ class OntologyService:
         
         return base_risk
     
-    def query_sparql(self, sparql_query: str) -> List[Dict]:
+    def query_sparql(self, sparql_query: str, deadline: Optional[float] = None) -> List[Dict]:
         """
         Ejecuta una consulta SPARQL sobre la ontología
         
         Args:
             sparql_query: Consulta SPARQL
+            deadline: Instante (``time.monotonic``) a partir del cual se
+                abandona la consulta con ``SPARQLTimeoutError``
         
         Returns:
             Resultados como lista de diccionarios
         """
+        return self._run_sparql(sparql_query, deadline)[1]
+    
+    def execute_sparql(self, sparql_query: str, deadline: Optional[float] = None) -> Dict:
+        """
+        Ejecuta una consulta SPARQL y devuelve columnas y filas
+        
+        Returns:
+            {"columns": [...], "rows": [...]}
+        """
+        columns, rows = self._run_sparql(sparql_query, deadline)
+        return {"columns": columns, "rows": rows}
+    
+    def _run_sparql(self, sparql_query: str, deadline: Optional[float]) -> Tuple[List[str], List[Dict]]:
         try:
-            results = self.graph.query(sparql_query)
+            results = self.graph.query(sparql_query, initNs=self.namespaces)
+            columns = [str(var) for var in results.vars or []]
             
+            # Los resultados se evalúan al iterar: se comprueba el plazo por fila
             output = []
             for row in results:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise SPARQLTimeoutError("SPARQL query deadline exceeded")
                 row_dict = {}
-                for var in results.vars:
-                    value = getattr(row, str(var))
+                for var in columns:
+                    value = row[var]
                     if value:
-                        row_dict[str(var)] = str(value)
+                        row_dict[var] = str(value)
                 output.append(row_dict)
             
-            return output
+            return columns, output
+        except SPARQLTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"SPARQL query error: {e}")
             raise
@@ -480,21 +539,10 @@ class OntologyService:
         Returns:
             Lista de documentos relacionados
         """
-        query = f"""
-        PREFIX tf: <http://tefinancia.es/ontology#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT ?relatedClass ?relation ?label WHERE {{
-            <{class_uri}> rdfs:subClassOf ?restriction .
-            ?restriction owl:onProperty ?relation .
-            ?restriction owl:someValuesFrom ?relatedClass .
-            OPTIONAL {{ ?relatedClass rdfs:label ?label FILTER(lang(?label) = "es") }}
-            FILTER(STRSTARTS(STR(?relatedClass), STR(tf:)))
-        }}
-        """
-        
         try:
-            results = self.graph.query(query)
+            results = self.graph.query(
+                self._queries["related_documents"], initBindings={"cls": URIRef(class_uri)}
+            )
             related = []
             
             for row in results:
@@ -576,42 +624,14 @@ class OntologyService:
         Returns:
             Estadísticas (número de clases, propiedades, etc.)
         """
-        # Contar clases
-        query_classes = """
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX tf: <http://tefinancia.es/ontology#>
-        
-        SELECT (COUNT(DISTINCT ?class) AS ?count) WHERE {
-            ?class a owl:Class .
-            FILTER(STRSTARTS(STR(?class), STR(tf:)))
-        }
-        """
-        
-        # Contar object properties
-        query_obj_props = """
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX tf: <http://tefinancia.es/ontology#>
-        
-        SELECT (COUNT(DISTINCT ?prop) AS ?count) WHERE {
-            ?prop a owl:ObjectProperty .
-            FILTER(STRSTARTS(STR(?prop), STR(tf:)))
-        }
-        """
-        
-        # Contar datatype properties
-        query_data_props = """
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX tf: <http://tefinancia.es/ontology#>
-        
-        SELECT (COUNT(DISTINCT ?prop) AS ?count) WHERE {
-            ?prop a owl:DatatypeProperty .
-            FILTER(STRSTARTS(STR(?prop), STR(tf:)))
-        }
-        """
+        def count(rdf_type: URIRef) -> int:
+            results = self.graph.query(self._queries["count_by_type"], initBindings={"type": rdf_type})
+            return int(list(results)[0][0])
         
-        num_classes = list(self.graph.query(query_classes))[0][0]
-        num_obj_props = list(self.graph.query(query_obj_props))[0][0]
-        num_data_props = list(self.graph.query(query_data_props))[0][0]
+        # Contar clases y propiedades
+        num_classes = count(OWL.Class)
+        num_obj_props = count(OWL.ObjectProperty)
+        num_data_props = count(OWL.DatatypeProperty)
         
         return {
             "total_triples": len(self.graph),
@@ -0,0 +1,202 @@
+"""
+Caché de respuestas RAG
+Evita repetir la llamada al LLM y la verificación para preguntas repetidas
+
+- Clave: pregunta normalizada, huella de los chunks recuperados (documento y
+  digest del contenido), modelo y versión del prompt. Si el corpus cambia,
+  la recuperación devuelve otros chunks y la clave deja de coincidir
+- Búsqueda semántica opcional: una pregunta casi idéntica (similitud coseno
+  de embeddings) con la misma huella de recuperación reutiliza la respuesta
+- Cada entrada guarda la versión (``updated_at``) de los documentos citados;
+  quien la lee comprueba que siguen iguales y, si no, invalida el documento
+"""
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Signos que no cambian la pregunta ("¿...?" / "...")
+_PUNCTUATION = re.compile(r"[¿?¡!.,;:\"'()]+")
+
+
+def normalize_question(question: str) -> str:
+    """Pregunta en minúsculas, sin tildes, signos ni espacios repetidos"""
+    text = unicodedata.normalize("NFKD", question.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"\s+", " ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def retrieval_fingerprint(chunks: Iterable[Tuple[Any, str]]) -> str:
+    """
+    Huella del contexto recuperado: pares (document_id, contenido del chunk).
+
+    Respeta el orden: las etiquetas [DOC-X] de la respuesta en caché se
+    refieren a la posición de cada chunk en el contexto.
+    """
+    digests = [
+        f"{document_id}:{hashlib.sha1(content.encode('utf-8')).hexdigest()}"
+        for document_id, content in chunks
+    ]
+    return hashlib.sha256("|".join(digests).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    """Respuesta generada y verificada, con las versiones de sus documentos"""
+    answer: str
+    citations: List[Any]
+    confidence: float
+    document_versions: Dict[str, Optional[str]]
+    question_embedding: Optional[np.ndarray] = None
+    expires_at: float = 0.0
+    hits: int = field(default=0)
+
+
+class RAGAnswerCache:
+    """
+    Caché LRU con TTL de respuestas RAG.
+
+    Args:
+        ttl: Vida de cada entrada (segundos)
+        max_size: Entradas máximas (0 desactiva la caché)
+        similarity_threshold: Similitud coseno mínima para reutilizar la
+            respuesta de otra pregunta (None: sólo coincidencia exacta)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_size: int = 1000,
+        similarity_threshold: Optional[float] = None
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[Tuple, CachedAnswer]" = OrderedDict()
+        # (huella, modelo, prompt) -> claves: candidatas de la búsqueda semántica
+        self._by_context: Dict[Tuple, Set[Tuple]] = {}
+        # documento -> claves que lo citan
+        self._by_document: Dict[str, Set[Tuple]] = {}
+        self._stats = {"hit": 0, "semantic_hit": 0, "miss": 0, "invalidated": 0}
+
+    @property
+    def semantic(self) -> bool:
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def key(question: str, fingerprint: str, model: str, prompt_version: str) -> Tuple:
+        return (normalize_question(question), fingerprint, model, prompt_version)
+
+    def get(self, key: Tuple, question_embedding: Optional[Sequence[float]] = None) -> Optional[CachedAnswer]:
+        """Entrada de la pregunta o, con embedding, de una pregunta casi idéntica"""
+        entry = self._live(key)
+        if entry is not None:
+            self._stats["hit"] += 1
+        elif self.semantic and question_embedding is not None:
+            entry = self._nearest(key, np.asarray(question_embedding, dtype=np.float32))
+            if entry is not None:
+                self._stats["semantic_hit"] += 1
+
+        if entry is None:
+            self._stats["miss"] += 1
+            return None
+        entry.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: Tuple,
+        answer: str,
+        citations: List[Any],
+        confidence: float,
+        document_versions: Dict[str, Optional[str]],
+        question_embedding: Optional[Sequence[float]] = None
+    ) -> Optional[CachedAnswer]:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return None
+        self._remove(key)
+
+        entry = CachedAnswer(
+            answer=answer,
+            citations=list(citations),
+            confidence=confidence,
+            document_versions=dict(document_versions),
+            question_embedding=(
+                _unit(np.asarray(question_embedding, dtype=np.float32))
+                if question_embedding is not None else None
+            ),
+            expires_at=time.monotonic() + self.ttl
+        )
+        self._entries[key] = entry
+        self._by_context.setdefault(key[1:], set()).add(key)
+        for document_id in entry.document_versions:
+            self._by_document.setdefault(document_id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def invalidate_document(self, document_id: Any) -> int:
+        """Elimina las respuestas que citan el documento (reprocesado o borrado)"""
+        keys = self._by_document.pop(str(document_id), set())
+        for key in list(keys):
+            self._remove(key)
+        self._stats["invalidated"] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_context.clear()
+        self._by_document.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "size": len(self._entries)}
+
+    def _live(self, key: Tuple) -> Optional[CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, key: Tuple, embedding: np.ndarray) -> Optional[CachedAnswer]:
+        query = _unit(embedding)
+        best, best_score = None, self.similarity_threshold
+        for candidate in list(self._by_context.get(key[1:], ())):
+            entry = self._live(candidate)
+            if entry is None or entry.question_embedding is None:
+                continue
+            score = float(np.dot(query, entry.question_embedding))
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        context = self._by_context.get(key[1:])
+        if context is not None:
+            context.discard(key)
+            if not context:
+                del self._by_context[key[1:]]
+        for document_id in entry.document_versions:
+            keys = self._by_document.get(document_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_document[document_id]
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
@@ -3,11 +3,14 @@ Servicio RAG (Retrieval-Augmented Generation)
 Combina búsqueda de contexto con generación de LLM, incluyendo anti-alucinación y citaciones
 Integrado con Arize Phoenix para observabilidad completa de LLM
 """
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID, uuid4
 from datetime import datetime
+import asyncio
+import hashlib
 import time
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.prompts import PromptTemplate
@@ -17,8 +20,16 @@ import anthropic
 from core.logging_config import logger, audit_logger
 from core.config import settings
 from core.phoenix_config import get_phoenix, log_llm_call
+from models.database_models import Document
 from models.schemas import RAGQuery, RAGResponse, Citation
-from services.search_service import search_service
+from services.lazy import extract_service, search_service
+from services.grounding import grounding_confidence
+from services.rag_cache import CachedAnswer, RAGAnswerCache, retrieval_fingerprint
+from services.rag_stream import CITATION_LABEL, CitationTracker
+
+GENERATION_ERROR = "Error al generar respuesta"
+NO_DOCUMENTS = "No encontré documentos relevantes para responder tu pregunta."
+_MISSING = object()
 
 
 class RAGService:
@@ -66,6 +77,20 @@ Pregunta del usuario: {question}
 
 Responde basándote ÚNICAMENTE en el contexto proporcionado. Cita las fuentes usando [DOC-X]."""
         
+        # Cambia si cambian las plantillas: las respuestas en caché dejan de valer
+        self.prompt_version = hashlib.sha256(
+            (self.system_prompt + self.query_prompt_template).encode("utf-8")
+        ).hexdigest()[:12]
+        
+        # Caché de respuestas (pregunta + contexto recuperado + modelo + prompt)
+        self.answer_cache = RAGAnswerCache(
+            ttl=settings.RAG_ANSWER_CACHE_TTL_SECONDS,
+            max_size=settings.RAG_ANSWER_CACHE_SIZE,
+            similarity_threshold=(
+                settings.RAG_ANSWER_CACHE_SIMILARITY if settings.RAG_ANSWER_CACHE_SEMANTIC else None
+            )
+        )
+        
         # Configuración de conversaciones
         self.conversations = {}  # En producción usar Redis
         self.max_conversation_length = 10
@@ -87,91 +112,309 @@ Responde basándote ÚNICAMENTE en el contexto proporcionado. Cita las fuentes u
         Returns:
             RAGResponse: Respuesta con citaciones
         """
+        start_time = time.perf_counter()
+        conversation_id = str(query.conversation_id or uuid4())
         try:
-            conversation_id = query.conversation_id or str(uuid4())
-            
             # 1. Recuperar contexto relevante mediante búsqueda híbrida
-            search_results = await search_service.hybrid_search(
-                query=query.question,
-                db=db,
-                limit=query.top_k,
-                filters=query.filters,
-                user_id=user_id
-            )
+            search_results = await self._retrieve(query, db, user_id)
             
             if not search_results.results:
-                return RAGResponse(
-                    answer="No encontré documentos relevantes para responder tu pregunta.",
-                    citations=[],
-                    conversation_id=conversation_id,
-                    confidence=0.0
-                )
+                return self._response(query, NO_DOCUMENTS, [], 0.0, conversation_id, start_time)
             
             # 2. Preparar contexto con numeración para citaciones
-            context_parts = []
-            citations_map = {}
-            
-            for idx, result in enumerate(search_results.results, start=1):
-                doc_label = f"DOC-{idx}"
-                context_parts.append(f"[{doc_label}] {result.chunk_content}")
-                
-                citations_map[doc_label] = Citation(
-                    document_id=result.document_id,
-                    filename=result.filename,
-                    chunk_content=result.chunk_content,
-                    relevance_score=result.score,
-                    doc_label=doc_label
-                )
-            
-            context = "\n\n".join(context_parts)
+            context, citations_map = self._build_context(search_results)
             
             # 3. Obtener historial de conversación
             conversation_history = self._get_conversation_history(conversation_id)
             
-            # 4. Generar respuesta con LLM
-            answer, used_citations = await self._generate_answer(
-                question=query.question,
-                context=context,
-                conversation_history=conversation_history,
-                citations_map=citations_map
+            # 4. Respuesta en caché: sólo sin historial (los turnos previos cambian la respuesta)
+            cache_key, question_embedding, cached = await self._lookup_cache(
+                db, query.question, search_results, conversation_history
             )
             
-            # 5. Verificar anti-alucinación
-            confidence = await self._verify_answer(answer, context)
+            if cached is not None:
+                answer, used_citations, confidence = cached.answer, cached.citations, cached.confidence
+            else:
+                # 5. Generar respuesta con LLM
+                answer, used_citations = await self._generate_answer(
+                    question=query.question,
+                    context=context,
+                    conversation_history=conversation_history,
+                    citations_map=citations_map
+                )
+                
+                # 6. Verificar anti-alucinación
+                confidence = await self._verify_answer(answer, context)
+                
+                if answer != GENERATION_ERROR:
+                    await self._store_answer(
+                        db, cache_key, search_results, answer, used_citations, confidence, question_embedding
+                    )
             
-            # 6. Actualizar conversación
+            # 7. Actualizar conversación
             self._update_conversation(conversation_id, query.question, answer)
             
-            # 7. Log de auditoría
-            audit_logger.info(
-                "RAG query processed",
-                extra={
-                    "action": "rag_query",
-                    "user_id": str(user_id),
+            # 8. Log de auditoría
+            self._audit_query(
+                user_id, conversation_id, query.question, search_results,
+                used_citations, confidence, cached=cached is not None
+            )
+            
+            return self._response(query, answer, used_citations, confidence, conversation_id, start_time)
+            
+        except Exception as e:
+            logger.error(f"Error processing RAG query: {e}", exc_info=True)
+            return self._response(
+                query, f"Error al procesar la consulta: {str(e)}", [], 0.0, conversation_id, start_time
+            )
+    
+    def _response(
+        self,
+        query: RAGQuery,
+        answer: str,
+        citations: List[Citation],
+        confidence: float,
+        conversation_id: str,
+        start_time: float
+    ) -> RAGResponse:
+        return RAGResponse(
+            question=query.question,
+            answer=answer,
+            citations=citations,
+            confidence=confidence,
+            conversation_id=conversation_id,
+            processing_time_ms=(time.perf_counter() - start_time) * 1000,
+            model_version=self.model
+        )
+    
+    async def stream_query(
+        self,
+        query: RAGQuery,
+        db: AsyncSession,
+        user_id: Optional[UUID]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Procesa una consulta RAG reenviando la respuesta a medida que se genera
+        
+        Produce eventos ``(tipo, datos)``:
+        - ``start``: conversación y número de documentos recuperados
+        - ``token``: fragmento de texto de la respuesta
+        - ``citation``: documento citado, en cuanto su etiqueta [DOC-X] aparece completa
+        - ``done``: confianza de la verificación anti-alucinación (al final)
+        - ``error``: la consulta no se pudo completar
+        
+        Args:
+            query: Consulta del usuario
+            db: Sesión de base de datos
+            user_id: ID del usuario
+        """
+        conversation_id = str(query.conversation_id or uuid4())
+        try:
+            search_results = await self._retrieve(query, db, user_id)
+            yield "start", {
+                "conversation_id": conversation_id,
+                "documents_count": len(search_results.results)
+            }
+            
+            if not search_results.results:
+                yield "token", {"text": NO_DOCUMENTS}
+                yield "done", {
                     "conversation_id": conversation_id,
-                    "question": query.question,
-                    "documents_retrieved": len(search_results.results),
-                    "citations_used": len(used_citations),
-                    "confidence": confidence
+                    "confidence": 0.0,
+                    "citations_used": 0,
+                    "cached": False
                 }
+                return
+            
+            context, citations_map = self._build_context(search_results)
+            conversation_history = self._get_conversation_history(conversation_id)
+            cache_key, question_embedding, cached = await self._lookup_cache(
+                db, query.question, search_results, conversation_history
             )
             
-            return RAGResponse(
-                answer=answer,
-                citations=used_citations,
-                conversation_id=conversation_id,
-                confidence=confidence,
-                documents_count=len(search_results.results)
+            if cached is not None:
+                # Respuesta ya verificada: se envía de una vez
+                answer, used_citations, confidence = cached.answer, cached.citations, cached.confidence
+                yield "token", {"text": answer}
+                # Misma huella de recuperación: las etiquetas apuntan a los mismos documentos
+                for label, citation in self._labelled_citations(answer, citations_map):
+                    yield "citation", self._citation_event(label, citation)
+            else:
+                start_time = time.time()
+                first_token_ms = None
+                usage: Dict[str, int] = {}
+                tracker = CitationTracker()
+                parts: List[str] = []
+                
+                async for text in self._stream_completion(
+                    query.question, context, conversation_history, usage
+                ):
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                    parts.append(text)
+                    yield "token", {"text": text}
+                    for label in tracker.feed(text):
+                        if label in citations_map:
+                            yield "citation", self._citation_event(label, citations_map[label])
+                
+                answer = "".join(parts)
+                used_citations = self._used_citations(answer, citations_map)
+                latency_ms = (time.time() - start_time) * 1000
+                tokens_used = usage.get("tokens_used", 0)
+                self._log_rag_query(query.question, answer, used_citations, tokens_used, latency_ms)
+                logger.info(
+                    f"⚡ RAG answer streamed: first token {first_token_ms or 0:.0f}ms, "
+                    f"total {latency_ms:.0f}ms, {len(used_citations)} citations"
+                )
+                
+                # Verificación anti-alucinación sobre la respuesta completa
+                confidence = await self._verify_answer(answer, context)
+                await self._store_answer(
+                    db, cache_key, search_results, answer, used_citations, confidence, question_embedding
+                )
+            
+            self._update_conversation(conversation_id, query.question, answer)
+            self._audit_query(
+                user_id, conversation_id, query.question, search_results,
+                used_citations, confidence, cached=cached is not None, streamed=True
             )
             
+            yield "done", {
+                "conversation_id": conversation_id,
+                "confidence": confidence,
+                "citations_used": len(used_citations),
+                "cached": cached is not None
+            }
+            
         except Exception as e:
-            logger.error(f"Error processing RAG query: {e}", exc_info=True)
-            return RAGResponse(
-                answer=f"Error al procesar la consulta: {str(e)}",
-                citations=[],
-                conversation_id=conversation_id if 'conversation_id' in locals() else str(uuid4()),
-                confidence=0.0
+            logger.error(f"Error streaming RAG query: {e}", exc_info=True)
+            yield "error", {
+                "conversation_id": conversation_id,
+                "detail": f"Error al procesar la consulta: {str(e)}"
+            }
+    
+    async def _retrieve(self, query: RAGQuery, db: AsyncSession, user_id: Optional[UUID]):
+        """Contexto relevante mediante búsqueda híbrida"""
+        return await search_service.hybrid_search(
+            query=query.question,
+            db=db,
+            limit=query.top_k,
+            filters=getattr(query, "filters", None),
+            user_id=user_id
+        )
+    
+    def _build_context(self, search_results) -> Tuple[str, Dict[str, Citation]]:
+        """Contexto numerado ([DOC-X]) y citación de cada etiqueta"""
+        context_parts = []
+        citations_map = {}
+        
+        for idx, result in enumerate(search_results.results, start=1):
+            doc_label = f"DOC-{idx}"
+            context_parts.append(f"[{doc_label}] {result.snippet}")
+            
+            citations_map[doc_label] = Citation(
+                document_id=result.document_id,
+                document_title=result.title,
+                page_num=result.page_num,
+                text_snippet=result.snippet,
+                score=result.score
             )
+        
+        return "\n\n".join(context_parts), citations_map
+    
+    def _build_messages(
+        self,
+        question: str,
+        context: str,
+        conversation_history: List[Dict]
+    ) -> Tuple[str, List[Dict[str, str]]]:
+        """Prompt de la pregunta y mensajes para el LLM (con historial)"""
+        prompt = self.query_prompt_template.format(
+            context=context,
+            question=question
+        )
+        
+        messages = [{"role": "system", "content": self.system_prompt}]
+        
+        for entry in conversation_history[-6:]:  # Últimos 3 turnos
+            messages.append({"role": "user", "content": entry["question"]})
+            messages.append({"role": "assistant", "content": entry["answer"]})
+        
+        messages.append({"role": "user", "content": prompt})
+        return prompt, messages
+    
+    async def _lookup_cache(
+        self,
+        db: AsyncSession,
+        question: str,
+        search_results,
+        conversation_history: List[Dict]
+    ) -> Tuple[Optional[tuple], Optional[List[float]], Optional[CachedAnswer]]:
+        """Clave, embedding de la pregunta y respuesta en caché (sólo sin historial)"""
+        if conversation_history:
+            return None, None, None
+        
+        cache_key = self.answer_cache.key(
+            question,
+            retrieval_fingerprint(
+                (result.document_id, result.snippet) for result in search_results.results
+            ),
+            self.model,
+            self.prompt_version
+        )
+        question_embedding = await self._question_embedding(question)
+        cached = await self._cached_answer(db, cache_key, question_embedding)
+        return cache_key, question_embedding, cached
+    
+    async def _store_answer(
+        self,
+        db: AsyncSession,
+        cache_key: Optional[tuple],
+        search_results,
+        answer: str,
+        used_citations: List[Citation],
+        confidence: float,
+        question_embedding: Optional[List[float]]
+    ):
+        """Guarda la respuesta verificada en caché"""
+        if cache_key is None:
+            return
+        self.answer_cache.put(
+            cache_key,
+            answer,
+            used_citations,
+            confidence,
+            await self._document_versions(
+                db, (result.document_id for result in search_results.results)
+            ),
+            question_embedding
+        )
+    
+    def _audit_query(
+        self,
+        user_id: Optional[UUID],
+        conversation_id: str,
+        question: str,
+        search_results,
+        used_citations: List[Citation],
+        confidence: float,
+        cached: bool,
+        streamed: bool = False
+    ):
+        audit_logger.info(
+            "RAG query processed",
+            extra={
+                "action": "rag_query",
+                "user_id": str(user_id),
+                "conversation_id": conversation_id,
+                "question": question,
+                "documents_retrieved": len(search_results.results),
+                "citations_used": len(used_citations),
+                "confidence": confidence,
+                "cached": cached,
+                "streamed": streamed
+            }
+        )
     
     async def _generate_answer(
         self,
@@ -185,20 +428,8 @@ Responde basándote ÚNICAMENTE en el contexto proporcionado. Cita las fuentes u
             # Iniciar tracking de tiempo
             start_time = time.time()
             
-            # Construir prompt
-            prompt = self.query_prompt_template.format(
-                context=context,
-                question=question
-            )
-            
-            # Agregar historial si existe
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            for entry in conversation_history[-6:]:  # Últimos 3 turnos
-                messages.append({"role": "user", "content": entry["question"]})
-                messages.append({"role": "assistant", "content": entry["answer"]})
-            
-            messages.append({"role": "user", "content": prompt})
+            # Construir prompt (con historial si existe)
+            prompt, messages = self._build_messages(question, context, conversation_history)
             
             # Generar respuesta según proveedor
             answer = ""
@@ -239,43 +470,16 @@ Responde basándote ÚNICAMENTE en el contexto proporcionado. Cita las fuentes u
                 
             else:
                 # Modelo local
-                full_prompt = "\n\n".join([m["content"] for m in messages])
-                response = self.client(full_prompt, max_length=settings.LLM_MAX_TOKENS)
-                answer = response[0]["generated_text"]
-                tokens_used = len(answer.split())  # Aproximación
-                
-                # Log manual a Phoenix para modelo local
-                log_llm_call(
-                    prompt=prompt,
-                    response=answer,
-                    model=self.model,
-                    provider="local",
-                    tokens_used=tokens_used
-                )
+                answer, tokens_used = await self._generate_local(prompt, messages)
             
             # Calcular latencia
             latency_ms = (time.time() - start_time) * 1000
             
             # Extraer citaciones usadas
-            import re
-            citation_pattern = r'\[DOC-\d+\]'
-            used_labels = re.findall(citation_pattern, answer)
-            used_citations = [citations_map[label] for label in used_labels if label in citations_map]
+            used_citations = self._used_citations(answer, citations_map)
             
             # Log completo RAG query a Phoenix
-            phoenix = get_phoenix()
-            phoenix.log_rag_query(
-                query=question,
-                response=answer,
-                chunks_used=[{
-                    "document_id": str(c.document_id),
-                    "filename": c.filename,
-                    "score": c.relevance_score
-                } for c in used_citations],
-                model=self.model,
-                tokens_used=tokens_used,
-                latency_ms=latency_ms
-            )
+            self._log_rag_query(question, answer, used_citations, tokens_used, latency_ms)
             
             # Log para métricas internas
             logger.info(
@@ -286,44 +490,185 @@ Responde basándote ÚNICAMENTE en el contexto proporcionado. Cita las fuentes u
             
         except Exception as e:
             logger.error(f"Error generating answer: {e}", exc_info=True)
-            return "Error al generar respuesta", []
+            return GENERATION_ERROR, []
+    
+    async def _stream_completion(
+        self,
+        question: str,
+        context: str,
+        conversation_history: List[Dict],
+        usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """
+        Fragmentos de la respuesta del LLM según llegan
+        
+        ``usage["tokens_used"]`` se rellena al terminar si el proveedor lo informa.
+        El modelo local no admite streaming: su respuesta llega en un solo fragmento.
+        """
+        prompt, messages = self._build_messages(question, context, conversation_history)
+        
+        if settings.LLM_PROVIDER == "openai":
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=settings.LLM_TEMPERATURE,
+                max_tokens=settings.LLM_MAX_TOKENS,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage["tokens_used"] = chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Cliente desconectado: cortar la generación en OpenAI
+                await stream.close()
+            
+        elif settings.LLM_PROVIDER == "anthropic":
+            parts = []
+            async with self.client.messages.stream(
+                model=self.model,
+                system=self.system_prompt,
+                messages=messages[1:],  # Excluir system message
+                temperature=settings.LLM_TEMPERATURE,
+                max_tokens=settings.LLM_MAX_TOKENS
+            ) as stream:
+                async for text in stream.text_stream:
+                    parts.append(text)
+                    yield text
+                message = await stream.get_final_message()
+            
+            usage["tokens_used"] = message.usage.input_tokens + message.usage.output_tokens
+            log_llm_call(
+                prompt=prompt,
+                response="".join(parts),
+                model=self.model,
+                provider="anthropic",
+                tokens_used=usage["tokens_used"]
+            )
+            
+        else:
+            answer, usage["tokens_used"] = await self._generate_local(prompt, messages)
+            yield answer
+    
+    async def _generate_local(self, prompt: str, messages: List[Dict[str, str]]) -> Tuple[str, int]:
+        """Respuesta del modelo local (fuera del event loop)"""
+        full_prompt = "\n\n".join([m["content"] for m in messages])
+        response = await asyncio.to_thread(self.client, full_prompt, max_length=settings.LLM_MAX_TOKENS)
+        answer = response[0]["generated_text"]
+        tokens_used = len(answer.split())  # Aproximación
+        
+        # Log manual a Phoenix para modelo local
+        log_llm_call(
+            prompt=prompt,
+            response=answer,
+            model=self.model,
+            provider="local",
+            tokens_used=tokens_used
+        )
+        return answer, tokens_used
+    
+    @staticmethod
+    def _labelled_citations(answer: str, citations_map: Dict[str, Citation]) -> List[Tuple[str, Citation]]:
+        """Etiquetas [DOC-X] de la respuesta con su citación, sin repetir"""
+        labels = dict.fromkeys(CITATION_LABEL.findall(answer))
+        return [(label, citations_map[label]) for label in labels if label in citations_map]
+    
+    @classmethod
+    def _used_citations(cls, answer: str, citations_map: Dict[str, Citation]) -> List[Citation]:
+        """Citaciones de las etiquetas [DOC-X] de la respuesta, sin repetir"""
+        return [citation for _, citation in cls._labelled_citations(answer, citations_map)]
+    
+    @staticmethod
+    def _citation_event(label: Optional[str], citation: Citation) -> Dict[str, Any]:
+        return {"label": label, **citation.model_dump(mode="json")}
+    
+    def _log_rag_query(
+        self,
+        question: str,
+        answer: str,
+        used_citations: List[Citation],
+        tokens_used: int,
+        latency_ms: float
+    ):
+        """Log completo RAG query a Phoenix"""
+        phoenix = get_phoenix()
+        phoenix.log_rag_query(
+            query=question,
+            response=answer,
+            chunks_used=[{
+                "document_id": str(c.document_id),
+                "document_title": c.document_title,
+                "page_num": c.page_num,
+                "score": c.score
+            } for c in used_citations],
+            model=self.model,
+            tokens_used=tokens_used,
+            latency_ms=latency_ms
+        )
+    
+    async def _cached_answer(
+        self,
+        db: AsyncSession,
+        key: tuple,
+        question_embedding: Optional[List[float]]
+    ) -> Optional[CachedAnswer]:
+        """Respuesta en caché si los documentos de su contexto no han cambiado"""
+        entry = self.answer_cache.get(key, question_embedding)
+        if entry is None:
+            return None
+        
+        current = await self._document_versions(db, entry.document_versions)
+        stale = [
+            document_id for document_id, version in entry.document_versions.items()
+            if current.get(document_id, _MISSING) != version
+        ]
+        if stale:
+            # Documento reprocesado (o borrado) en otro proceso: invalidar sus respuestas
+            for document_id in stale:
+                self.answer_cache.invalidate_document(document_id)
+            logger.info(f"♻️ RAG cache entry dropped: {len(stale)} document(s) changed")
+            return None
+        return entry
+    
+    async def _document_versions(self, db: AsyncSession, document_ids: Iterable) -> Dict[str, Optional[str]]:
+        """Versión (updated_at) de cada documento existente, en una sola consulta"""
+        ids = {UUID(str(document_id)) for document_id in document_ids}
+        if not ids:
+            return {}
+        result = await db.execute(
+            select(Document.id, Document.updated_at).where(Document.id.in_(ids))
+        )
+        return {
+            str(row.id): row.updated_at.isoformat() if row.updated_at else None
+            for row in result.all()
+        }
+    
+    async def _question_embedding(self, question: str) -> Optional[List[float]]:
+        """Embedding de la pregunta para la búsqueda semántica en caché (si está activa)"""
+        if not self.answer_cache.semantic:
+            return None
+        try:
+            embeddings = await asyncio.to_thread(extract_service._generate_embeddings, [question])
+            return embeddings[0]
+        except Exception as e:
+            logger.warning(f"Could not embed question for RAG cache lookup: {e}")
+            return None
     
     async def _verify_answer(self, answer: str, context: str) -> float:
         """
         Verifica que la respuesta esté fundamentada en el contexto (anti-alucinación)
         
+        Contención de shingles de cada oración en el chunk que mejor la cubre
+        (ver services.grounding): milisegundos incluso con top_k alto.
+        
         Returns:
             float: Nivel de confianza (0-1)
         """
         try:
-            # Estrategia 1: Verificar que las oraciones clave estén en el contexto
-            from difflib import SequenceMatcher
-            
-            answer_sentences = answer.split('.')
-            context_lower = context.lower()
-            
-            matching_scores = []
-            for sentence in answer_sentences:
-                sentence_clean = sentence.strip().lower()
-                if len(sentence_clean) < 10:  # Ignorar oraciones muy cortas
-                    continue
-                
-                # Buscar similitud con fragmentos del contexto
-                max_similarity = 0
-                for context_chunk in context_lower.split('\n'):
-                    similarity = SequenceMatcher(None, sentence_clean, context_chunk).ratio()
-                    max_similarity = max(max_similarity, similarity)
-                
-                matching_scores.append(max_similarity)
-            
-            # Confianza basada en promedio de similitud
-            confidence = sum(matching_scores) / len(matching_scores) if matching_scores else 0.5
-            
-            # Penalizar si no hay citaciones
-            if '[DOC-' not in answer:
-                confidence *= 0.7
-            
-            return min(1.0, max(0.0, confidence))
+            return grounding_confidence(answer, context)
             
         except Exception as e:
             logger.error(f"Error verifying answer: {e}")
@@ -0,0 +1,59 @@
+"""
+Streaming de respuestas RAG
+Utilidades para reenviar los tokens del LLM a medida que llegan
+
+- ``CitationTracker``: detecta etiquetas ``[DOC-X]`` completas en el texto
+  recibido por trozos, aunque una etiqueta llegue partida entre tokens
+- ``sse_event``: serializa un evento como Server-Sent Events
+  (``event: token|citation|done|error``)
+"""
+import json
+import re
+from typing import Any, Dict, List, Set
+
+# Etiqueta de citación: el grupo es la clave de ``citations_map`` ("DOC-3")
+CITATION_LABEL = re.compile(r"\[(DOC-\d+)\]")
+# Final del texto que todavía puede convertirse en una etiqueta ("[", "[DO", "[DOC-1")
+_PARTIAL_LABEL = re.compile(r"\[(?:D(?:O(?:C(?:-\d*)?)?)?)?$")
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Evita que proxies (nginx) acumulen la respuesta antes de reenviarla
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class CitationTracker:
+    """
+    Detector incremental de citaciones.
+
+    ``feed`` recibe cada trozo de texto y devuelve las etiquetas que se han
+    completado con él, una sola vez por etiqueta y en orden de aparición.
+    Sólo conserva el posible inicio de etiqueta del final del texto, así que
+    el coste no crece con la longitud de la respuesta.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._seen: Set[str] = set()
+        self.labels: List[str] = []
+
+    def feed(self, text: str) -> List[str]:
+        buffer = self._pending + text
+        new_labels = []
+        last_end = 0
+        for match in CITATION_LABEL.finditer(buffer):
+            label = match.group(1)
+            last_end = match.end()
+            if label not in self._seen:
+                self._seen.add(label)
+                self.labels.append(label)
+                new_labels.append(label)
+
+        partial = _PARTIAL_LABEL.search(buffer, last_end)
+        self._pending = partial.group(0) if partial else ""
+        return new_labels
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Evento SSE con los datos en JSON (una sola línea ``data:``)"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -12,6 +12,7 @@ from sqlalchemy import select
 
 from core.logging_config import logger, audit_logger
 from core.config import settings
+from core.cpu_pool import run_cpu_bound
 from models.database_models import Document, RiskAssessment, Entity
 from models.schemas import RiskScore, RiskDimension
 
@@ -164,13 +165,16 @@ class RiskService:
             RiskAssessment: Evaluación completa de riesgos
         """
         try:
-            # Evaluar cada dimensión
-            legal_score, legal_evidence = self._assess_legal_risk(text)
-            financial_score, financial_evidence = self._assess_financial_risk(text)
-            operational_score, operational_evidence = self._assess_operational_risk(text)
-            esg_score, esg_evidence = self._assess_esg_risk(text)
-            privacy_score, privacy_evidence = self._assess_privacy_risk(text, db, document.id)
-            cyber_score, cyber_evidence = self._assess_cybersecurity_risk(text)
+            # Evaluar cada dimensión (patrones en el pool de CPU)
+            text_scores = await run_cpu_bound(score_risk_text, text)
+            legal_score, legal_evidence = text_scores["legal"]
+            financial_score, financial_evidence = text_scores["financial"]
+            operational_score, operational_evidence = text_scores["operational"]
+            esg_score, esg_evidence = text_scores["esg"]
+            privacy_score, privacy_evidence = await self._assess_privacy_risk(
+                text_scores["privacy"], db, document.id
+            )
+            cyber_score, cyber_evidence = text_scores["cybersecurity"]
             
             # Calcular score global ponderado
             overall_score = (
@@ -317,8 +321,19 @@ class RiskService:
         
         return min(1.0, score), evidence
     
-    async def _assess_privacy_risk(self, text: str, db: AsyncSession, document_id: UUID) -> tuple[float, List[str]]:
-        """Evalúa riesgo de privacidad (GDPR)"""
+    def _score_text(self, text: str) -> Dict[str, tuple[float, List[str]]]:
+        """Puntuación por patrones de cada dimensión (sólo depende del texto)"""
+        return {
+            "legal": self._assess_legal_risk(text),
+            "financial": self._assess_financial_risk(text),
+            "operational": self._assess_operational_risk(text),
+            "esg": self._assess_esg_risk(text),
+            "privacy": self._assess_privacy_patterns(text),
+            "cybersecurity": self._assess_cybersecurity_risk(text),
+        }
+    
+    def _assess_privacy_patterns(self, text: str) -> tuple[float, List[str]]:
+        """Evalúa patrones de riesgo de privacidad (GDPR)"""
         score = 0.0
         evidence = []
         text_lower = text.lower()
@@ -331,6 +346,18 @@ class RiskService:
                     score += 0.3
                     evidence.append(f"{category}: {', '.join(set(matches[:3]))}")
         
+        return score, evidence
+    
+    async def _assess_privacy_risk(
+        self,
+        pattern_result: tuple[float, List[str]],
+        db: AsyncSession,
+        document_id: UUID
+    ) -> tuple[float, List[str]]:
+        """Evalúa riesgo de privacidad (GDPR): patrones y personas identificadas"""
+        score, evidence = pattern_result
+        evidence = list(evidence)
+        
         # Verificar entidades de tipo PER (personas)
         result = await db.execute(
             select(Entity).where(
@@ -454,3 +481,8 @@ class RiskService:
 
 # Instancia singleton del servicio
 risk_service = RiskService()
+
+
+def score_risk_text(text: str) -> Dict[str, tuple[float, List[str]]]:
+    """Puntuación por patrones, para ejecutarla en el pool de CPU"""
+    return risk_service._score_text(text)
@@ -0,0 +1,178 @@
+"""
+Facetas de búsqueda
+Agregaciones de OpenSearch para los filtros de la UI
+
+- Clasificación, departamento y autor (``terms``) e histograma de fechas de
+  subida, calculados en la misma petición que la búsqueda BM25
+- El índice es por chunk: cada cubo cuenta documentos distintos
+  (``cardinality`` de ``document_id``), no chunks
+- ``filter_path`` recorta la respuesta a lo que se usa
+- ``index_source``: campos de cada chunk indexado, rellenados desde las
+  columnas de ``Document`` (las facetas y los filtros leen estos nombres)
+- ``FacetCache``: caché con TTL para la consulta vacía y las consultas
+  populares (se admiten a partir de ``min_hits`` peticiones)
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+TERM_FACETS = ("classification", "department", "uploaded_by")
+DATE_FACET = "uploaded_at"
+DATE_INTERVALS = ("day", "week", "month", "quarter", "year")
+
+# Respuesta recortada: sólo claves y número de documentos de cada cubo
+FACETS_FILTER_PATH = (
+    "aggregations.*.buckets.key,"
+    "aggregations.*.buckets.key_as_string,"
+    "aggregations.*.buckets.documents.value,"
+    "aggregations.total_documents.value"
+)
+HITS_FILTER_PATH = (
+    "hits.hits._id,"
+    "hits.hits._score,"
+    "hits.hits._source.document_id,"
+    "hits.hits._source.content,"
+    "hits.hits.highlight"
+)
+
+_DOCUMENT_COUNT = {"documents": {"cardinality": {"field": "document_id"}}}
+
+
+def build_facet_aggs(size: int = 20, interval: str = "month") -> Dict[str, Any]:
+    """Agregaciones de todas las facetas"""
+    if interval not in DATE_INTERVALS:
+        raise ValueError(f"Unsupported facet interval: {interval}")
+
+    aggs: Dict[str, Any] = {
+        field: {"terms": {"field": field, "size": size}, "aggs": _DOCUMENT_COUNT}
+        for field in TERM_FACETS
+    }
+    aggs[DATE_FACET] = {
+        "date_histogram": {
+            "field": DATE_FACET,
+            "calendar_interval": interval,
+            "min_doc_count": 1
+        },
+        "aggs": _DOCUMENT_COUNT
+    }
+    aggs["total_documents"] = {"cardinality": {"field": "document_id"}}
+    return aggs
+
+
+def parse_facets(aggregations: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Facetas de la sección ``aggregations`` de la respuesta.
+
+    Returns:
+        Dict: Por faceta, lista de ``{"value", "count"}`` ordenada por número
+        de documentos (fechas en orden cronológico), y ``total_documents``
+    """
+    aggregations = aggregations or {}
+    facets: Dict[str, Any] = {}
+
+    for field in TERM_FACETS + (DATE_FACET,):
+        buckets = aggregations.get(field, {}).get("buckets", [])
+        values = [
+            {
+                "value": str(bucket.get("key_as_string", bucket.get("key"))),
+                "count": int(bucket.get("documents", {}).get("value", 0)),
+            }
+            for bucket in buckets
+        ]
+        if field != DATE_FACET:
+            values.sort(key=lambda item: item["count"], reverse=True)
+        facets[field] = values
+
+    facets["total_documents"] = int(aggregations.get("total_documents", {}).get("value", 0))
+    return facets
+
+
+def index_source(document: Any, chunk: Any) -> Dict[str, Any]:
+    """Documento de OpenSearch de un chunk con los nombres de campo del mapping"""
+    return {
+        "document_id": str(document.id),
+        "chunk_id": str(chunk.id),
+        "content": chunk.text,
+        "filename": document.title,
+        "classification": document.classification.value if document.classification else None,
+        "department": document.department,
+        "uploaded_by": str(document.owner_id) if document.owner_id else None,
+        "uploaded_at": document.created_at.isoformat() if document.created_at else None,
+        "metadata": document.metadata_json
+    }
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Consulta en minúsculas y con los espacios colapsados (clave de caché)"""
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class FacetCache:
+    """
+    Caché LRU con TTL de facetas.
+
+    La consulta vacía (facetas iniciales de la UI) se guarda siempre; el resto
+    cuando se ha pedido al menos ``min_hits`` veces dentro de la ventana de
+    popularidad, para que las consultas únicas no desplacen a las frecuentes.
+
+    Args:
+        ttl: Vida de cada entrada (segundos)
+        max_size: Entradas máximas (0 desactiva la caché)
+        min_hits: Peticiones necesarias para guardar una consulta no vacía
+    """
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 512, min_hits: int = 2):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.min_hits = min_hits
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._seen: "OrderedDict[Tuple, int]" = OrderedDict()
+        self._stats = {"hit": 0, "miss": 0, "stored": 0}
+
+    @staticmethod
+    def key(
+        query: Optional[str],
+        filters: Optional[Dict[str, Any]] = None,
+        user_id: Optional[Hashable] = None,
+        interval: str = "month"
+    ) -> Tuple:
+        filter_items = tuple(sorted(
+            (name, str(value)) for name, value in (filters or {}).items() if value is not None
+        ))
+        return (normalize_query(query), filter_items, str(user_id) if user_id else None, interval)
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        self._seen[key] = self._seen.get(key, 0) + 1
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size * 4:
+            self._seen.popitem(last=False)
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self._stats["miss"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hit"] += 1
+        return entry[1]
+
+    def put(self, key: Tuple, facets: Dict) -> bool:
+        """Guarda las facetas si la consulta es vacía o popular"""
+        if self.max_size <= 0 or self.ttl <= 0:
+            return False
+        if key[0] and self._seen.get(key, 0) < self.min_hits:
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl, facets)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._stats["stored"] += 1
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._seen.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "size": len(self._entries)}
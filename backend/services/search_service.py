@@ -3,7 +3,9 @@ Servicio de Búsqueda Híbrida
 Combina búsqueda léxica (BM25 en OpenSearch) y semántica (vectores en pgvector)
 usando Reciprocal Rank Fusion (RRF)
 """
-from typing import Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from opensearchpy import OpenSearch, RequestsHttpConnection
@@ -14,8 +16,16 @@ import numpy as np
 from core.logging_config import logger
 from core.config import settings
 from models.database_models import Document, DocumentChunk
-from models.schemas import SearchResult, SearchResponse
-from services.extract_service import extract_service
+from models.schemas import SearchFacets, SearchResult, SearchResponse
+from services.lazy import extract_service
+from services.search_facets import (
+    FACETS_FILTER_PATH,
+    HITS_FILTER_PATH,
+    FacetCache,
+    build_facet_aggs,
+    index_source,
+    parse_facets,
+)
 
 
 class SearchService:
@@ -38,6 +48,14 @@ class SearchService:
         self.bm25_weight = 0.4
         self.semantic_weight = 0.6
         self.k_rrf = 60  # Constante para RRF
+        
+        # Facetas: valores por faceta y caché de consultas vacías/populares
+        self.facet_size = settings.SEARCH_FACET_SIZE
+        self.facet_cache = FacetCache(
+            ttl=settings.SEARCH_FACET_CACHE_TTL_SECONDS,
+            max_size=settings.SEARCH_FACET_CACHE_SIZE,
+            min_hits=settings.SEARCH_FACET_CACHE_MIN_HITS
+        )
     
     def _ensure_index_exists(self):
         """Crea el índice de OpenSearch si no existe"""
@@ -72,6 +90,7 @@ class SearchService:
                             },
                             "filename": {"type": "text"},
                             "classification": {"type": "keyword"},
+                            "department": {"type": "keyword"},
                             "uploaded_by": {"type": "keyword"},
                             "uploaded_at": {"type": "date"},
                             "metadata": {"type": "object", "enabled": False}
@@ -81,6 +100,12 @@ class SearchService:
                 
                 self.opensearch_client.indices.create(index=self.index_name, body=mapping)
                 logger.info(f"Created OpenSearch index: {self.index_name}")
+            else:
+                # Índices creados antes de la faceta de departamento
+                self.opensearch_client.indices.put_mapping(
+                    index=self.index_name,
+                    body={"properties": {"department": {"type": "keyword"}}}
+                )
         except Exception as e:
             logger.error(f"Error creating OpenSearch index: {e}")
             raise
@@ -95,16 +120,7 @@ class SearchService:
         """
         try:
             for chunk in chunks:
-                doc_body = {
-                    "document_id": str(document.id),
-                    "chunk_id": str(chunk.id),
-                    "content": chunk.content,
-                    "filename": document.filename,
-                    "classification": document.classification.value,
-                    "uploaded_by": str(document.uploaded_by),
-                    "uploaded_at": document.uploaded_at.isoformat(),
-                    "metadata": document.metadata_
-                }
+                doc_body = index_source(document, chunk)
                 
                 self.opensearch_client.index(
                     index=self.index_name,
@@ -124,7 +140,9 @@ class SearchService:
         db: AsyncSession,
         limit: int = 10,
         filters: Optional[Dict] = None,
-        user_id: Optional[UUID] = None
+        user_id: Optional[UUID] = None,
+        facets: bool = False,
+        facet_interval: str = "month"
     ) -> SearchResponse:
         """
         Realiza búsqueda híbrida combinando BM25 y búsqueda semántica
@@ -135,13 +153,24 @@ class SearchService:
             limit: Número de resultados
             filters: Filtros adicionales (clasificación, fechas, etc.)
             user_id: ID del usuario para control de acceso
+            facets: Incluir facetas (agregaciones en la petición BM25)
+            facet_interval: Intervalo del histograma de fechas
             
         Returns:
             SearchResponse: Resultados de búsqueda
         """
+        started = time.perf_counter()
         try:
-            # 1. Búsqueda léxica (BM25)
-            lexical_results = await self._lexical_search(query, limit * 2, filters, user_id)
+            # 1. Búsqueda léxica (BM25), con las facetas si no están en caché
+            facet_key = self.facet_cache.key(query, filters, user_id, facet_interval) if facets else None
+            facet_values = self.facet_cache.get(facet_key) if facets else None
+            lexical_results, aggregated = await self._lexical_search(
+                query, limit * 2, filters, user_id,
+                facet_interval=facet_interval if facets and facet_values is None else None
+            )
+            if aggregated is not None:
+                facet_values = aggregated
+                self.facet_cache.put(facet_key, aggregated)
             
             # 2. Búsqueda semántica (vectores)
             semantic_results = await self._semantic_search(query, db, limit * 2, filters, user_id)
@@ -162,40 +191,120 @@ class SearchService:
                 query=query,
                 total=len(enriched_results),
                 results=enriched_results,
+                took_ms=(time.perf_counter() - started) * 1000,
+                facets=SearchFacets(**facet_values) if facet_values else None,
                 search_type="hybrid"
             )
             
         except Exception as e:
             logger.error(f"Error in hybrid search: {e}", exc_info=True)
-            return SearchResponse(query=query, total=0, results=[], search_type="error")
+            return SearchResponse(
+                query=query,
+                total=0,
+                results=[],
+                took_ms=(time.perf_counter() - started) * 1000,
+                search_type="error"
+            )
+    
+    async def get_facets(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        user_id: Optional[UUID] = None,
+        interval: str = "month"
+    ) -> SearchFacets:
+        """
+        Facetas de una consulta (o de todo el índice si está vacía) sin hits
+        
+        Args:
+            query: Consulta de búsqueda (opcional)
+            filters: Filtros aplicados (clasificación, departamento, fechas...)
+            user_id: ID del usuario para control de acceso
+            interval: Intervalo del histograma de fechas
+            
+        Returns:
+            SearchFacets: Valores y número de documentos por faceta
+        """
+        key = self.facet_cache.key(query, filters, user_id, interval)
+        cached = self.facet_cache.get(key)
+        if cached is not None:
+            return SearchFacets(**cached)
+        
+        search_body = {
+            "size": 0,
+            "track_total_hits": False,
+            "query": self._query_clause(query, filters, user_id),
+            "aggs": build_facet_aggs(size=self.facet_size, interval=interval)
+        }
+        response = await asyncio.to_thread(
+            self.opensearch_client.search,
+            index=self.index_name,
+            body=search_body,
+            filter_path=FACETS_FILTER_PATH
+        )
+        facets = parse_facets(response.get("aggregations"))
+        self.facet_cache.put(key, facets)
+        return SearchFacets(**facets)
+    
+    def _query_clause(
+        self,
+        query: Optional[str],
+        filters: Optional[Dict],
+        user_id: Optional[UUID]
+    ) -> Dict[str, Any]:
+        """Consulta bool: BM25 sobre contenido y nombre (o todo) más filtros"""
+        must = [
+            {
+                "multi_match": {
+                    "query": query,
+                    "fields": ["content^2", "filename"],
+                    "type": "best_fields",
+                    "operator": "or"
+                }
+            }
+        ] if query and query.strip() else [{"match_all": {}}]
+        return {"bool": {"must": must, "filter": self._build_filters(filters, user_id)}}
+    
+    def _build_filters(self, filters: Optional[Dict], user_id: Optional[UUID]) -> List[Dict]:
+        """Filtros de OpenSearch (no puntúan y se cachean a nivel de segmento)"""
+        clauses = []
+        filters = filters or {}
+        for field in ("classification", "department", "uploaded_by"):
+            if filters.get(field):
+                clauses.append({"term": {field: str(filters[field])}})
+        if filters.get("date_from"):
+            clauses.append({"range": {"uploaded_at": {"gte": filters["date_from"]}}})
+        if filters.get("date_to"):
+            clauses.append({"range": {"uploaded_at": {"lte": filters["date_to"]}}})
+        
+        # Control de acceso (si se especifica usuario)
+        if user_id:
+            clauses.append({"term": {"uploaded_by": str(user_id)}})
+        return clauses
     
     async def _lexical_search(
         self,
         query: str,
         limit: int,
         filters: Optional[Dict],
-        user_id: Optional[UUID]
-    ) -> List[Dict]:
-        """Búsqueda léxica con BM25 en OpenSearch"""
+        user_id: Optional[UUID],
+        facet_interval: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Búsqueda léxica con BM25 en OpenSearch
+        
+        Con ``facet_interval`` las facetas se calculan en la misma petición.
+        
+        Returns:
+            Tuple[List[Dict], Optional[Dict]]: Hits y facetas (None si no se
+            pidieron o la búsqueda falló)
+        """
         try:
             # Construir query de OpenSearch
             search_body = {
                 "size": limit,
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "multi_match": {
-                                    "query": query,
-                                    "fields": ["content^2", "filename"],
-                                    "type": "best_fields",
-                                    "operator": "or"
-                                }
-                            }
-                        ],
-                        "filter": []
-                    }
-                },
+                "_source": ["document_id", "content"],
+                "query": self._query_clause(query, filters, user_id),
                 "highlight": {
                     "fields": {
                         "content": {
@@ -205,36 +314,21 @@ class SearchService:
                     }
                 }
             }
-            
-            # Aplicar filtros
-            if filters:
-                if "classification" in filters:
-                    search_body["query"]["bool"]["filter"].append(
-                        {"term": {"classification": filters["classification"]}}
-                    )
-                if "date_from" in filters:
-                    search_body["query"]["bool"]["filter"].append(
-                        {"range": {"uploaded_at": {"gte": filters["date_from"]}}}
-                    )
-                if "date_to" in filters:
-                    search_body["query"]["bool"]["filter"].append(
-                        {"range": {"uploaded_at": {"lte": filters["date_to"]}}}
-                    )
-            
-            # Control de acceso (si se especifica usuario)
-            if user_id:
-                search_body["query"]["bool"]["filter"].append(
-                    {"term": {"uploaded_by": str(user_id)}}
-                )
-            
-            # Ejecutar búsqueda
-            response = self.opensearch_client.search(
+            filter_path = HITS_FILTER_PATH
+            if facet_interval:
+                search_body["aggs"] = build_facet_aggs(size=self.facet_size, interval=facet_interval)
+                filter_path = f"{HITS_FILTER_PATH},{FACETS_FILTER_PATH}"
+            
+            # Ejecutar búsqueda (cliente síncrono: fuera del event loop)
+            response = await asyncio.to_thread(
+                self.opensearch_client.search,
                 index=self.index_name,
-                body=search_body
+                body=search_body,
+                filter_path=filter_path
             )
             
             results = []
-            for hit in response["hits"]["hits"]:
+            for hit in response.get("hits", {}).get("hits", []):
                 results.append({
                     "chunk_id": hit["_id"],
                     "document_id": hit["_source"]["document_id"],
@@ -244,11 +338,12 @@ class SearchService:
                     "source": "lexical"
                 })
             
-            return results
+            facets = parse_facets(response.get("aggregations")) if facet_interval else None
+            return results, facets
             
         except Exception as e:
             logger.error(f"Lexical search failed: {e}", exc_info=True)
-            return []
+            return [], None
     
     async def _semantic_search(
         self,
@@ -268,14 +363,14 @@ class SearchService:
             SELECT 
                 dc.id as chunk_id,
                 dc.document_id,
-                dc.content,
+                dc.text as content,
                 dc.embedding <-> :query_embedding as distance,
                 1 - (dc.embedding <-> :query_embedding) as similarity,
-                d.filename,
+                d.title as filename,
                 d.classification
             FROM document_chunks dc
             JOIN documents d ON dc.document_id = d.id
-            WHERE d.deleted_at IS NULL
+            WHERE d.status != 'ARCHIVED'
             """
             
             # Aplicar filtros
@@ -286,14 +381,14 @@ class SearchService:
                     query_sql += " AND d.classification = :classification"
                     params["classification"] = filters["classification"]
                 if "date_from" in filters:
-                    query_sql += " AND d.uploaded_at >= :date_from"
+                    query_sql += " AND d.created_at >= :date_from"
                     params["date_from"] = filters["date_from"]
                 if "date_to" in filters:
-                    query_sql += " AND d.uploaded_at <= :date_to"
+                    query_sql += " AND d.created_at <= :date_to"
                     params["date_to"] = filters["date_to"]
             
             if user_id:
-                query_sql += " AND d.uploaded_by = :user_id"
+                query_sql += " AND d.owner_id = :user_id"
                 params["user_id"] = str(user_id)
             
             query_sql += " ORDER BY distance LIMIT :limit"
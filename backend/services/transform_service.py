@@ -2,13 +2,16 @@
 Servicio de Transformación de Documentos
 Maneja OCR, conversión de formatos y normalización de contenido
 """
+import asyncio
 import os
 import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from io import BytesIO
+from types import SimpleNamespace
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Union
 
 import pytesseract
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_bytes, convert_from_path
 from PIL import Image
 # import textract  # Commented out - package has dependency issues
 from docx import Document as DocxDocument
@@ -17,6 +20,17 @@ import openpyxl
 
 from core.logging_config import logger
 from models.database_models import Document, DocumentStatus
+from services.document_storage import spool_to_file
+
+# Contenido de un documento: bytes en memoria o ruta de un fichero local
+Content = Union[bytes, str]
+
+
+def _open_content(content: Content) -> BinaryIO:
+    """Fichero binario sobre el contenido, esté en memoria o en disco"""
+    if isinstance(content, (bytes, bytearray)):
+        return BytesIO(content)
+    return open(content, "rb")
 
 
 class TransformService:
@@ -28,13 +42,14 @@ class TransformService:
         # Idiomas soportados: español, inglés, francés, portugués, catalán, euskera, gallego
         self.tesseract_languages = 'spa+eng+fra+por+cat+eus+glg'
     
-    async def transform_document(self, document: Document, content: bytes) -> Dict:
+    async def transform_document(self, document: Document, content: Content) -> Dict:
         """
         Transforma un documento a texto plano
         
         Args:
             document: Documento a transformar
-            content: Contenido binario del documento
+            content: Contenido binario del documento o ruta de un fichero
+                con él (los parsers leen del disco sin cargarlo entero)
             
         Returns:
             Dict: Resultado con texto extraído y metadata
@@ -57,7 +72,7 @@ class TransformService:
                 result = await self._extract_from_text(content, mime_type)
             else:
                 # Intentar con textract como último recurso
-                result = await self._extract_with_textract(content, document.filename)
+                result = await self._extract_with_textract(content, document.title)
             
             logger.info(f"Document transformed: {document.id}, extracted {len(result['text'])} characters")
             return result
@@ -71,7 +86,18 @@ class TransformService:
                 "error": str(e)
             }
     
-    async def _extract_from_pdf(self, content: bytes) -> Dict:
+    async def transform_stream(self, document: Document, chunks: AsyncIterator[bytes]) -> Dict:
+        """
+        Transforma un documento leído por trozos (``iter_document_content``)
+        
+        El contenido se vuelca a un fichero temporal en lugar de a memoria.
+        """
+        # La ruta en MinIO conserva el nombre original ({hash}_{nombre})
+        suffix = Path(document.storage_path or document.title or "").suffix
+        async with spool_to_file(chunks, suffix=suffix) as path:
+            return await self.transform_document(document, path)
+    
+    async def _extract_from_pdf(self, content: Content) -> Dict:
         """Extrae texto de PDF con OCR si es necesario"""
         text_parts = []
         page_count = 0
@@ -80,9 +106,8 @@ class TransformService:
         try:
             # Primero intentar extracción directa de texto
             import pdfplumber
-            from io import BytesIO
             
-            with pdfplumber.open(BytesIO(content)) as pdf:
+            with _open_content(content) as source, pdfplumber.open(source) as pdf:
                 page_count = len(pdf.pages)
                 
                 for page in pdf.pages:
@@ -118,11 +143,14 @@ class TransformService:
                 "method": "OCR only"
             }
     
-    async def _apply_ocr_to_pdf(self, content: bytes) -> str:
+    async def _apply_ocr_to_pdf(self, content: Content) -> str:
         """Aplica OCR a un PDF convirtiéndolo a imágenes"""
         try:
             # Convertir PDF a imágenes
-            images = convert_from_bytes(content, dpi=300)
+            if isinstance(content, (bytes, bytearray)):
+                images = convert_from_bytes(content, dpi=300)
+            else:
+                images = convert_from_path(content, dpi=300)
             
             text_parts = []
             for i, image in enumerate(images):
@@ -140,18 +168,18 @@ class TransformService:
             logger.error(f"OCR failed: {e}", exc_info=True)
             return ""
     
-    async def _extract_from_image(self, content: bytes) -> Dict:
+    async def _extract_from_image(self, content: Content) -> Dict:
         """Extrae texto de imagen usando OCR"""
         try:
-            from io import BytesIO
-            image = Image.open(BytesIO(content))
-            
-            # Aplicar OCR
-            text = pytesseract.image_to_string(
-                image,
-                lang=self.tesseract_languages,
-                config=self.tesseract_config
-            )
+            with _open_content(content) as source:
+                image = Image.open(source)
+                
+                # Aplicar OCR
+                text = pytesseract.image_to_string(
+                    image,
+                    lang=self.tesseract_languages,
+                    config=self.tesseract_config
+                )
             
             return {
                 "text": text,
@@ -165,11 +193,11 @@ class TransformService:
             logger.error(f"Image OCR failed: {e}", exc_info=True)
             return {"text": "", "page_count": 1, "has_images": True, "error": str(e)}
     
-    async def _extract_from_docx(self, content: bytes) -> Dict:
+    async def _extract_from_docx(self, content: Content) -> Dict:
         """Extrae texto de DOCX"""
         try:
-            from io import BytesIO
-            doc = DocxDocument(BytesIO(content))
+            with _open_content(content) as source:
+                doc = DocxDocument(source)
             
             text_parts = []
             for paragraph in doc.paragraphs:
@@ -196,11 +224,11 @@ class TransformService:
             logger.error(f"DOCX extraction failed: {e}", exc_info=True)
             return {"text": "", "page_count": 0, "has_images": False, "error": str(e)}
     
-    async def _extract_from_pptx(self, content: bytes) -> Dict:
+    async def _extract_from_pptx(self, content: Content) -> Dict:
         """Extrae texto de PPTX"""
         try:
-            from io import BytesIO
-            prs = Presentation(BytesIO(content))
+            with _open_content(content) as source:
+                prs = Presentation(source)
             
             text_parts = []
             for slide in prs.slides:
@@ -220,11 +248,15 @@ class TransformService:
             logger.error(f"PPTX extraction failed: {e}", exc_info=True)
             return {"text": "", "page_count": 0, "has_images": False, "error": str(e)}
     
-    async def _extract_from_xlsx(self, content: bytes) -> Dict:
+    async def _extract_from_xlsx(self, content: Content) -> Dict:
         """Extrae texto de XLSX"""
         try:
-            from io import BytesIO
-            wb = openpyxl.load_workbook(BytesIO(content), data_only=True)
+            # read_only: openpyxl lee las hojas de forma incremental
+            wb = openpyxl.load_workbook(
+                content if isinstance(content, str) else BytesIO(content),
+                read_only=True,
+                data_only=True
+            )
             
             text_parts = []
             for sheet_name in wb.sheetnames:
@@ -235,22 +267,28 @@ class TransformService:
                     row_text = '\t'.join([str(cell) if cell is not None else '' for cell in row])
                     if row_text.strip():
                         text_parts.append(row_text)
+            sheet_names = wb.sheetnames
+            wb.close()
             
             return {
                 "text": '\n'.join(text_parts),
-                "page_count": len(wb.sheetnames),
+                "page_count": len(sheet_names),
                 "has_images": False,
                 "method": "openpyxl",
-                "sheet_count": len(wb.sheetnames)
+                "sheet_count": len(sheet_names)
             }
             
         except Exception as e:
             logger.error(f"XLSX extraction failed: {e}", exc_info=True)
             return {"text": "", "page_count": 0, "has_images": False, "error": str(e)}
     
-    async def _extract_from_text(self, content: bytes, mime_type: str) -> Dict:
+    async def _extract_from_text(self, content: Content, mime_type: str) -> Dict:
         """Extrae texto de archivos de texto plano"""
         try:
+            if not isinstance(content, (bytes, bytearray)):
+                with open(content, "rb") as source:
+                    content = source.read()
+            
             # Intentar decodificar con diferentes encodings
             encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
             text = None
@@ -277,7 +315,7 @@ class TransformService:
             logger.error(f"Text extraction failed: {e}", exc_info=True)
             return {"text": "", "page_count": 1, "has_images": False, "error": str(e)}
     
-    async def _extract_with_textract(self, content: bytes, filename: str) -> Dict:
+    async def _extract_with_textract(self, content: Content, filename: str) -> Dict:
         """Extrae texto usando textract como último recurso"""
         # Textract disabled due to dependency issues
         logger.warning(f"Textract extraction not available for {filename}")
@@ -314,3 +352,15 @@ class TransformService:
 
 # Instancia singleton del servicio
 transform_service = TransformService()
+
+
+def transform_content(document_id: str, title: str, mime_type: str, content: Content) -> Dict:
+    """
+    Transformación síncrona para ejecutarla en el pool de CPU.
+
+    Recibe sólo datos serializables en lugar del ``Document`` de SQLAlchemy.
+    Con una ruta (``ingest_service.spool_document``) el contenido no viaja
+    al proceso del pool.
+    """
+    document = SimpleNamespace(id=document_id, title=title, mime_type=mime_type)
+    return asyncio.run(transform_service.transform_document(document, content))
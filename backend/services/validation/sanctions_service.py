@@ -20,6 +20,7 @@ from backend.models.validation.sanctions_models import (
     ValidationResult,
 )
 from config.validation_apis import SANCTIONS_CONFIG
+from .validation_stats import record_validation
 
 
 logger = logging.getLogger(__name__)
@@ -104,7 +105,8 @@ class SanctionsService:
                 all_matches.extend(result["matches"])
                 max_confidence = max(max_confidence, result.get("confidence", 0))
 
-        # Guardar en historial
+        # Guardar en historial y sumar al rollup diario del dashboard
+        checked_at = datetime.utcnow()
         validation_result = ValidationResult(
             entity_name=entity_name,
             entity_type=entity_type,
@@ -112,9 +114,13 @@ class SanctionsService:
             confidence=max_confidence,
             matches_count=len(all_matches),
             sources_checked=sources_checked,
-            checked_at=datetime.utcnow(),
+            match_details=all_matches,
+            checked_at=checked_at,
         )
         self.db.add(validation_result)
+        await record_validation(
+            self.db, checked_at, len(all_matches) > 0, sources_checked, all_matches
+        )
         await self.db.commit()
 
         return {
@@ -122,7 +128,7 @@ class SanctionsService:
             "confidence": max_confidence,
             "matches": all_matches,
             "sources_checked": sources_checked,
-            "checked_at": datetime.utcnow().isoformat(),
+            "checked_at": checked_at.isoformat(),
             "validation_id": validation_result.id,
         }
 
@@ -0,0 +1,196 @@
+"""
+Estadísticas de validación por periodos de tiempo.
+
+Capa de agregación del dashboard de validación:
+- ``validation_daily_stats`` guarda contadores diarios (totales y por fuente)
+  que se actualizan de forma incremental con un upsert al guardar cada
+  ``ValidationResult``
+- Las series temporales salen de un único ``GROUP BY date_trunc`` con
+  conteos condicionales sobre el rollup; los tramos sin datos se rellenan
+  con ceros en Python
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.models.validation.sanctions_models import (
+    ValidationDailyStats,
+    ValidationHistory,
+)
+
+
+ALL_SOURCES = "ALL"
+
+PERIOD_DAYS = {"7d": 7, "30d": 30, "90d": 90}
+
+# Granularidad de date_trunc -> paso entre tramos
+BUCKETS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def period_days(period: str) -> int:
+    """Días de un periodo del dashboard (30 por defecto)"""
+    return PERIOD_DAYS.get(period, 30)
+
+
+def period_start(period: str, today: Optional[date] = None) -> date:
+    """Primer día del periodo: los ``N`` días naturales que terminan hoy"""
+    today = today or datetime.utcnow().date()
+    return today - timedelta(days=period_days(period) - 1)
+
+
+def bucket_start(day: date, bucket: str = "day") -> date:
+    """Inicio del tramo que contiene ``day`` (semanas ISO, como ``date_trunc``)"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def compliance_rate(validations: int, flagged: int) -> float:
+    """Porcentaje de validaciones sin match"""
+    return 100 - ((flagged / validations * 100) if validations > 0 else 0)
+
+
+def matched_sources(matches: Iterable[Dict]) -> List[str]:
+    """Fuentes con algún match para la entidad"""
+    return sorted({m["source"] for m in matches or () if m.get("source")})
+
+
+def daily_stats_upsert(
+    checked_at: datetime,
+    is_sanctioned: bool,
+    sources_checked: Iterable[str],
+    matches: Iterable[Dict] = (),
+):
+    """
+    Upsert que suma una validación a los contadores de su día.
+
+    Incrementa la fila ``ALL`` y la de cada fuente consultada; ``flagged``
+    sólo en las fuentes con match.
+    """
+    day = checked_at.date()
+    flagged_sources = set(matched_sources(matches))
+    rows = [{"day": day, "source": ALL_SOURCES, "validations": 1, "flagged": int(is_sanctioned)}]
+    rows.extend(
+        {"day": day, "source": source, "validations": 1, "flagged": int(source in flagged_sources)}
+        for source in dict.fromkeys(sources_checked or ())
+    )
+
+    stmt = insert(ValidationDailyStats).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ValidationDailyStats.day, ValidationDailyStats.source],
+        set_={
+            "validations": ValidationDailyStats.validations + stmt.excluded.validations,
+            "flagged": ValidationDailyStats.flagged + stmt.excluded.flagged,
+        },
+    )
+
+
+async def record_validation(
+    db,
+    checked_at: datetime,
+    is_sanctioned: bool,
+    sources_checked: Iterable[str],
+    matches: Iterable[Dict] = (),
+):
+    """Sumar una validación al rollup diario (en la transacción de ``db``)"""
+    await db.execute(daily_stats_upsert(checked_at, is_sanctioned, sources_checked, matches))
+
+
+def bucket_counts_query(start_day: date, bucket: str = "day", end_day: Optional[date] = None):
+    """Validaciones y flagged por tramo desde ``start_day`` (un solo GROUP BY)"""
+    bucket_col = cast(func.date_trunc(bucket, ValidationDailyStats.day), Date).label("bucket")
+    query = select(
+        bucket_col,
+        func.sum(ValidationDailyStats.validations).label("validations"),
+        func.sum(ValidationDailyStats.flagged).label("flagged"),
+    ).where(
+        ValidationDailyStats.source == ALL_SOURCES,
+        ValidationDailyStats.day >= start_day,
+    )
+    if end_day is not None:
+        query = query.where(ValidationDailyStats.day <= end_day)
+    return query.group_by(bucket_col).order_by(bucket_col)
+
+
+async def bucket_counts(db, start_day: date, bucket: str = "day") -> Dict[date, Tuple[int, int]]:
+    """Contadores por tramo: ``{inicio_tramo: (validations, flagged)}``"""
+    result = await db.execute(bucket_counts_query(start_day, bucket))
+    return {row.bucket: (int(row.validations or 0), int(row.flagged or 0)) for row in result}
+
+
+def fill_buckets(
+    counts: Dict[date, Tuple[int, int]],
+    start_day: date,
+    end_day: date,
+    bucket: str = "day",
+) -> List[Dict]:
+    """Serie continua de tramos entre dos días, con ceros donde no hay datos"""
+    step = BUCKETS[bucket]
+    current = bucket_start(start_day, bucket)
+    series = []
+    while current <= end_day:
+        validations, flagged = counts.get(current, (0, 0))
+        series.append({
+            "date": current.strftime("%Y-%m-%d"),
+            "validations": validations,
+            "flagged": flagged,
+            "compliance_rate": compliance_rate(validations, flagged),
+        })
+        current += step
+    return series
+
+
+async def period_totals(db, start_day: date, days: int) -> Dict[str, int]:
+    """
+    Totales del periodo y del periodo anterior en una sola consulta.
+
+    Conteos condicionales sobre el rollup (``SUM ... FILTER``) y documentos
+    validados desde ``start_day`` como subconsulta escalar.
+    """
+    previous_start = start_day - timedelta(days=days)
+    current = ValidationDailyStats.day >= start_day
+    previous = ValidationDailyStats.day < start_day
+
+    documents = select(func.count(ValidationHistory.id)).where(
+        ValidationHistory.validated_at >= datetime.combine(start_day, datetime.min.time())
+    ).scalar_subquery()
+
+    query = select(
+        func.sum(ValidationDailyStats.validations).filter(current).label("validations"),
+        func.sum(ValidationDailyStats.flagged).filter(current).label("flagged"),
+        func.sum(ValidationDailyStats.validations).filter(previous).label("prev_validations"),
+        func.sum(ValidationDailyStats.flagged).filter(previous).label("prev_flagged"),
+        documents.label("documents"),
+    ).where(
+        ValidationDailyStats.source == ALL_SOURCES,
+        ValidationDailyStats.day >= previous_start,
+    )
+    row = (await db.execute(query)).one()
+    return {key: int(value or 0) for key, value in row._mapping.items()}
+
+
+async def source_counts(db, start_day: date) -> List[Dict]:
+    """Entidades con match por fuente desde ``start_day``, de más a menos"""
+    flagged = func.sum(ValidationDailyStats.flagged).label("flagged")
+    result = await db.execute(
+        select(ValidationDailyStats.source, flagged)
+        .where(
+            ValidationDailyStats.source != ALL_SOURCES,
+            ValidationDailyStats.day >= start_day,
+        )
+        .group_by(ValidationDailyStats.source)
+        .order_by(flagged.desc())
+    )
+    rows = [(row.source, int(row.flagged or 0)) for row in result]
+    total = sum(count for _, count in rows)
+    return [
+        {
+            "source": source,
+            "count": count,
+            "percentage": round(count / total * 100, 1) if total > 0 else 0,
+        }
+        for source, count in rows
+    ]
@@ -1,20 +1,29 @@
 """
 Worker de Indexación
 Indexa documentos procesados en OpenSearch y actualiza vectores en PostgreSQL
+
+Los fallos de indexación se reintentan con backoff en
+``document.to_index.retry.N`` (sólo se repite la indexación, no el OCR ni los
+embeddings) y terminan en ``document.to_index.dlq``.
 """
 import asyncio
 import json
+from datetime import datetime
 from typing import Dict
 from uuid import UUID
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
 from core.database import async_session_maker
+from core.kafka_consumer import KafkaConsumerRuntime
 from core.logging_config import logger, audit_logger
+from core.retry_topics import RetryPolicy, retry_attempt
+from core.service_registry import service_registry
 from models.database_models import Document, DocumentChunk, DocumentStatus
-from services.search_service import search_service
+from services.lazy import search_service
+from monitoring.metrics import start_metrics_server
 from sqlalchemy import select
 
 
@@ -23,6 +32,8 @@ class IndexWorker:
     
     def __init__(self):
         self.consumer = None
+        self.producer = None
+        self.runtime = None
         self.topic_index = "document.to_index"
         self.running = False
     
@@ -30,23 +41,46 @@ class IndexWorker:
         """Inicia el worker"""
         logger.info("Starting Index Worker...")
         
-        # Inicializar consumer
+        # Precargar los servicios del rol antes de unirse al grupo de Kafka
+        warmup = await service_registry.warmup(role="index-worker")
+        logger.info(f"Index Worker services: {warmup}")
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+        
+        # Producer para reenviar los fallos a reintento/DLQ
+        self.producer = AIOKafkaProducer(
+            bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
+            value_serializer=lambda v: json.dumps(v).encode('utf-8')
+        )
+        
+        # Inicializar consumer (commits manuales desde el runtime)
+        retry = RetryPolicy.from_settings(self.topic_index)
         self.consumer = AIOKafkaConsumer(
-            self.topic_index,
             bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
             group_id="index-worker-group",
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
             auto_offset_reset='earliest',
-            enable_auto_commit=True
+            enable_auto_commit=False
+        )
+        self.runtime = KafkaConsumerRuntime(
+            self.consumer,
+            retry.topics,
+            self._handle_message,
+            group="index-worker-group",
+            max_in_flight=settings.INDEX_WORKER_CONCURRENCY,
+            fetch_timeout_ms=settings.WORKER_FETCH_TIMEOUT_MS,
+            commit_interval_ms=settings.WORKER_COMMIT_INTERVAL_MS,
+            retry=retry,
+            producer=self.producer
         )
         
-        await self.consumer.start()
+        await self.producer.start()
+        await self.runtime.start()
         
         self.running = True
-        logger.info("Index Worker started successfully")
+        logger.info(f"Index Worker started successfully (concurrency: {self.runtime.max_in_flight})")
         
         try:
-            await self._consume_messages()
+            await self.runtime.run()
         finally:
             await self.stop()
     
@@ -55,29 +89,33 @@ class IndexWorker:
         logger.info("Stopping Index Worker...")
         self.running = False
         
-        if self.consumer:
-            await self.consumer.stop()
+        # Terminar los mensajes en curso y confirmar sus offsets
+        if self.runtime:
+            await self.runtime.stop()
+        if self.producer:
+            await self.producer.stop()
         
         logger.info("Index Worker stopped")
     
-    async def _consume_messages(self):
-        """Consume mensajes del topic"""
-        async for message in self.consumer:
-            try:
-                event = message.value
-                logger.info(f"Processing index event: {event}")
-                
-                await self._index_document(event)
-                
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+    async def _handle_message(self, message):
+        """Procesa un mensaje del topic (o de sus topics de reintento)"""
+        event = message.value
+        attempt = retry_attempt(message)
+        logger.info(f"Processing index event: {event}" + (f" (retry {attempt})" if attempt else ""))
+        
+        await self._index_document(event, attempt)
     
-    async def _index_document(self, event: Dict):
+    async def _index_document(self, event: Dict, attempt: int = 0):
         """
         Indexa un documento en OpenSearch
         
+        Los errores se propagan para que el runtime reenvíe el mensaje a
+        reintento o DLQ; el documento sigue COMPLETED con ``indexation_error``
+        en ``metadata_json``.
+        
         Args:
             event: Evento con document_id
+            attempt: Intento actual (0 = mensaje original)
         """
         document_id = UUID(event["document_id"])
         
@@ -93,9 +131,9 @@ class IndexWorker:
                     logger.error(f"Document {document_id} not found")
                     return
                 
-                # Verificar que el documento esté procesado
-                if document.status != DocumentStatus.PROCESSED:
-                    logger.warning(f"Document {document_id} is not in PROCESSED state: {document.status}")
+                # Verificar que el documento esté procesado (ProcessWorker lo deja COMPLETED)
+                if document.status != DocumentStatus.COMPLETED:
+                    logger.warning(f"Document {document_id} is not in COMPLETED state: {document.status}")
                     return
                 
                 logger.info(f"Starting indexation for document {document_id}")
@@ -120,10 +158,14 @@ class IndexWorker:
                     f"{len(chunks)} chunks indexed in OpenSearch"
                 )
                 
-                # Actualizar estado del documento
-                document.status = DocumentStatus.INDEXED
-                document.metadata_["indexed_at"] = asyncio.get_event_loop().time()
-                document.metadata_["indexed_chunks"] = len(chunks)
+                # Registrar la indexación (el estado sigue COMPLETED)
+                metadata = {
+                    key: value for key, value in (document.metadata_json or {}).items()
+                    if key != "indexation_error"
+                }
+                metadata["indexed_at"] = datetime.utcnow().isoformat()
+                metadata["indexed_chunks"] = len(chunks)
+                document.metadata_json = metadata
                 await db.commit()
                 
                 # Log de auditoría
@@ -132,9 +174,9 @@ class IndexWorker:
                     extra={
                         "action": "document_indexed",
                         "document_id": str(document_id),
-                        "filename": document.filename,
+                        "title": document.title,
                         "chunk_count": len(chunks),
-                        "classification": document.classification.value
+                        "classification": document.classification.value if document.classification else None
                     }
                 )
                 
@@ -143,11 +185,15 @@ class IndexWorker:
             except Exception as e:
                 logger.error(f"Error indexing document {document_id}: {e}", exc_info=True)
                 
-                # Actualizar metadata con error (pero mantener PROCESSED)
+                # Actualizar metadata con error (pero mantener COMPLETED)
                 if 'document' in locals() and document:
-                    document.metadata_["indexation_error"] = {
-                        "error": str(e),
-                        "error_type": type(e).__name__
+                    document.metadata_json = {
+                        **(document.metadata_json or {}),
+                        "indexation_error": {
+                            "error": str(e),
+                            "error_type": type(e).__name__,
+                            "attempt": attempt
+                        }
                     }
                     await db.commit()
                     
@@ -156,9 +202,11 @@ class IndexWorker:
                         extra={
                             "action": "document_indexation_failed",
                             "document_id": str(document_id),
-                            "error": str(e)
+                            "error": str(e),
+                            "attempt": attempt
                         }
                     )
+                raise
 
 
 async def main():
@@ -12,9 +12,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
 from core.database import async_session_maker
+from core.kafka_consumer import KafkaConsumerRuntime
 from core.logging_config import logger, audit_logger
+from core.service_registry import service_registry
 from models.database_models import Document, DocumentStatus
-from services.ingest_service import ingest_service
+from services.lazy import ingest_service
+from monitoring.metrics import start_metrics_server
 from sqlalchemy import select
 
 
@@ -23,6 +26,7 @@ class IngestWorker:
     
     def __init__(self):
         self.consumer = None
+        self.runtime = None
         self.producer = None
         self.topic_ingest = "document.ingested"
         self.topic_transform = "document.to_transform"
@@ -32,14 +36,27 @@ class IngestWorker:
         """Inicia el worker"""
         logger.info("Starting Ingest Worker...")
         
-        # Inicializar consumer
+        # Precargar los servicios del rol antes de unirse al grupo de Kafka
+        warmup = await service_registry.warmup(role="ingest-worker")
+        logger.info(f"Ingest Worker services: {warmup}")
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+        
+        # Inicializar consumer (commits manuales desde el runtime)
         self.consumer = AIOKafkaConsumer(
-            self.topic_ingest,
             bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
             group_id="ingest-worker-group",
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
             auto_offset_reset='earliest',
-            enable_auto_commit=True
+            enable_auto_commit=False
+        )
+        self.runtime = KafkaConsumerRuntime(
+            self.consumer,
+            [self.topic_ingest],
+            self._handle_message,
+            group="ingest-worker-group",
+            max_in_flight=settings.INGEST_WORKER_CONCURRENCY,
+            fetch_timeout_ms=settings.WORKER_FETCH_TIMEOUT_MS,
+            commit_interval_ms=settings.WORKER_COMMIT_INTERVAL_MS
         )
         
         # Inicializar producer
@@ -48,14 +65,14 @@ class IngestWorker:
             value_serializer=lambda v: json.dumps(v).encode('utf-8')
         )
         
-        await self.consumer.start()
+        await self.runtime.start()
         await self.producer.start()
         
         self.running = True
-        logger.info("Ingest Worker started successfully")
+        logger.info(f"Ingest Worker started successfully (concurrency: {self.runtime.max_in_flight})")
         
         try:
-            await self._consume_messages()
+            await self.runtime.run()
         finally:
             await self.stop()
     
@@ -64,24 +81,20 @@ class IngestWorker:
         logger.info("Stopping Ingest Worker...")
         self.running = False
         
-        if self.consumer:
-            await self.consumer.stop()
+        # Terminar los mensajes en curso y confirmar sus offsets
+        if self.runtime:
+            await self.runtime.stop()
         if self.producer:
             await self.producer.stop()
         
         logger.info("Ingest Worker stopped")
     
-    async def _consume_messages(self):
-        """Consume mensajes del topic"""
-        async for message in self.consumer:
-            try:
-                event = message.value
-                logger.info(f"Processing ingest event: {event}")
-                
-                await self._process_ingest_event(event)
-                
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+    async def _handle_message(self, message):
+        """Procesa un mensaje del topic"""
+        event = message.value
+        logger.info(f"Processing ingest event: {event}")
+        
+        await self._process_ingest_event(event)
     
     async def _process_ingest_event(self, event: Dict):
         """
@@ -109,8 +122,8 @@ class IngestWorker:
                     logger.warning(f"Document {document_id} is not in PENDING state: {document.status}")
                     return
                 
-                # Obtener contenido del documento desde MinIO
-                content = await ingest_service.get_document_content(document)
+                # Comprobar que el objeto está en MinIO (sin descargarlo)
+                await ingest_service.stat_document(document)
                 
                 # Actualizar estado a PROCESSING
                 document.status = DocumentStatus.PROCESSING
@@ -1,27 +1,47 @@
 """
 Worker de Procesamiento
 Procesa documentos: transformación, extracción, clasificación, evaluación de riesgos
+
+- Hasta ``PROCESS_WORKER_CONCURRENCY`` documentos en curso por pod
+  (``core.kafka_consumer``: backpressure y commits manuales)
+- Clasificación (+ cumplimiento) y riesgos se ejecutan en paralelo, cada
+  etapa con su propia sesión de base de datos
+- Las etapas CPU-bound van al pool de procesos (``core.cpu_pool``)
+- Los fallos se reintentan con backoff (``document.to_transform.retry.N``) y
+  terminan en ``document.to_transform.dlq``; cada reintento continúa desde
+  la primera etapa pendiente
 """
 import asyncio
 import json
-from typing import Dict
+from typing import Dict, Optional
 from uuid import UUID
 
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from core.cpu_pool import configure_cpu_pool, run_cpu_bound, shutdown_cpu_pool
 from core.database import async_session_maker
+from core.kafka_consumer import KafkaConsumerRuntime
 from core.logging_config import logger, audit_logger
-from models.database_models import Document, DocumentStatus, DocumentChunk
-from services.ingest_service import ingest_service
-from services.transform_service import transform_service
-from services.extract_service import extract_service
-from services.classification_service import classification_service
-from services.risk_service import risk_service
-from services.compliance_service import compliance_service
-from middleware.validation_middleware import validation_middleware
-from sqlalchemy import select
+from core.retry_topics import NonRetryableError, RetryPolicy, retry_attempt
+from core.service_registry import service_registry
+from models.database_models import Document, DocumentStatus, DocumentChunk, Entity
+from services.lazy import (
+    ingest_service,
+    extract_service,
+    classification_service,
+    risk_service,
+    compliance_service,
+)
+from monitoring.metrics import start_metrics_server
+from sqlalchemy import delete, select
+
+
+def _validation_middleware():
+    """Middleware de validación (importación diferida: clientes de sanciones, registros y ESG)"""
+    from middleware.validation_middleware import validation_middleware
+    return validation_middleware
 
 
 class ProcessWorker:
@@ -30,6 +50,7 @@ class ProcessWorker:
     def __init__(self):
         self.consumer = None
         self.producer = None
+        self.runtime = None
         self.topic_transform = "document.to_transform"
         self.topic_index = "document.to_index"
         self.running = False
@@ -38,30 +59,48 @@ class ProcessWorker:
         """Inicia el worker"""
         logger.info("Starting Process Worker...")
         
-        # Inicializar consumer
+        # Precargar los servicios del rol antes de unirse al grupo de Kafka
+        warmup = await service_registry.warmup(role="process-worker")
+        logger.info(f"Process Worker services: {warmup}")
+        
+        configure_cpu_pool(settings.PROCESS_WORKER_CPU_PROCESSES)
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+        
+        # Inicializar producer (también reenvía los fallos a reintento/DLQ)
+        self.producer = AIOKafkaProducer(
+            bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
+            value_serializer=lambda v: json.dumps(v).encode('utf-8')
+        )
+        
+        # Inicializar consumer (commits manuales desde el runtime)
+        retry = RetryPolicy.from_settings(self.topic_transform)
         self.consumer = AIOKafkaConsumer(
-            self.topic_transform,
             bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
             group_id="process-worker-group",
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
             auto_offset_reset='earliest',
-            enable_auto_commit=True
+            enable_auto_commit=False
         )
-        
-        # Inicializar producer
-        self.producer = AIOKafkaProducer(
-            bootstrap_servers=f"{settings.KAFKA_BOOTSTRAP_SERVERS}",
-            value_serializer=lambda v: json.dumps(v).encode('utf-8')
+        self.runtime = KafkaConsumerRuntime(
+            self.consumer,
+            retry.topics,
+            self._handle_message,
+            group="process-worker-group",
+            max_in_flight=settings.PROCESS_WORKER_CONCURRENCY,
+            fetch_timeout_ms=settings.WORKER_FETCH_TIMEOUT_MS,
+            commit_interval_ms=settings.WORKER_COMMIT_INTERVAL_MS,
+            retry=retry,
+            producer=self.producer
         )
         
-        await self.consumer.start()
         await self.producer.start()
+        await self.runtime.start()
         
         self.running = True
-        logger.info("Process Worker started successfully")
+        logger.info(f"Process Worker started successfully (concurrency: {self.runtime.max_in_flight})")
         
         try:
-            await self._consume_messages()
+            await self.runtime.run()
         finally:
             await self.stop()
     
@@ -70,39 +109,43 @@ class ProcessWorker:
         logger.info("Stopping Process Worker...")
         self.running = False
         
-        if self.consumer:
-            await self.consumer.stop()
+        # Terminar los documentos en curso y confirmar sus offsets
+        if self.runtime:
+            await self.runtime.stop()
         if self.producer:
             await self.producer.stop()
+        shutdown_cpu_pool()
         
         logger.info("Process Worker stopped")
     
-    async def _consume_messages(self):
-        """Consume mensajes del topic"""
-        async for message in self.consumer:
-            try:
-                event = message.value
-                logger.info(f"Processing transform event: {event}")
-                
-                await self._process_document(event)
-                
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+    async def _handle_message(self, message):
+        """Procesa un mensaje del topic (o de sus topics de reintento)"""
+        event = message.value
+        attempt = retry_attempt(message)
+        logger.info(f"Processing transform event: {event}" + (f" (retry {attempt})" if attempt else ""))
+        
+        await self._process_document(event, attempt)
     
-    async def _process_document(self, event: Dict):
+    async def _process_document(self, event: Dict, attempt: int = 0):
         """
         Procesa completamente un documento
         
         Pipeline:
         1. Transformación (OCR, extracción de texto)
         2. Extracción (NER, embeddings, chunking)
-        3. Clasificación
-        4. Evaluación de riesgos
-        5. Verificación de cumplimiento
-        6. Envío a indexación
+        3. Validación
+        4-6. En paralelo: clasificación → cumplimiento (la retención depende
+             de la categoría) y evaluación de riesgos
+        7. Envío a indexación
+        
+        Cada etapa terminada se registra en ``metadata_json["pipeline_stages"]``;
+        un reintento continúa desde la primera etapa pendiente (el texto
+        extraído se recupera de MinIO en lugar de repetir el OCR). Los errores
+        se propagan para que el runtime reenvíe el mensaje a reintento o DLQ.
         
         Args:
             event: Evento con document_id
+            attempt: Intento actual (0 = mensaje original)
         """
         document_id = UUID(event["document_id"])
         
@@ -118,59 +161,101 @@ class ProcessWorker:
                     logger.error(f"Document {document_id} not found")
                     return
                 
-                logger.info(f"Starting processing pipeline for document {document_id}")
+                stages = dict((document.metadata_json or {}).get("pipeline_stages") or {})
+                if stages:
+                    logger.info(f"Resuming pipeline for document {document_id}: completed stages {sorted(stages)}")
+                    document.status = DocumentStatus.PROCESSING
+                else:
+                    logger.info(f"Starting processing pipeline for document {document_id}")
                 
                 # 1. TRANSFORMACIÓN: Extraer texto del documento
-                logger.info(f"Step 1/5: Transforming document {document_id}")
-                content = await ingest_service.get_document_content(document)
-                transform_result = await transform_service.transform_document(document, content)
-                
-                extracted_text = transform_result.get("text", "")
-                if not extracted_text:
-                    raise ValueError("No text extracted from document")
-                
-                logger.info(
-                    f"Transformation completed: {len(extracted_text)} chars, "
-                    f"{transform_result.get('page_count', 0)} pages"
-                )
-                
-                # Guardar metadata de transformación
-                document.metadata_["transformation"] = {
-                    "method": transform_result.get("method"),
-                    "page_count": transform_result.get("page_count"),
-                    "has_images": transform_result.get("has_images"),
-                    "char_count": len(extracted_text)
-                }
-                await db.commit()
+                extracted_text = await self._load_extracted_text(stages.get("transform"))
+                if extracted_text is None:
+                    logger.info(f"Step 1/6: Transforming document {document_id}")
+                    # Importación diferida: OCR y parsers de ofimática sólo al procesar
+                    from services.transform_service import transform_content
+                    # Copia temporal en disco: al pool de CPU sólo viaja la ruta
+                    async with ingest_service.spool_document(document) as content_path:
+                        transform_result = await run_cpu_bound(
+                            transform_content,
+                            str(document.id),
+                            document.title,
+                            document.mime_type,
+                            content_path
+                        )
+                    
+                    extracted_text = transform_result.get("text", "")
+                    if not extracted_text:
+                        raise NonRetryableError(
+                            f"No text extracted from document: {transform_result.get('error', 'empty text')}"
+                        )
+                    
+                    logger.info(
+                        f"Transformation completed: {len(extracted_text)} chars, "
+                        f"{transform_result.get('page_count', 0)} pages"
+                    )
+                    
+                    # Guardar metadata de transformación y el texto para reanudar
+                    transformation = {
+                        "method": transform_result.get("method"),
+                        "page_count": transform_result.get("page_count"),
+                        "has_images": transform_result.get("has_images"),
+                        "char_count": len(extracted_text)
+                    }
+                    self._update_metadata(document, transformation=transformation)
+                    try:
+                        text_object = await ingest_service.store_extracted_text(document, extracted_text)
+                    except Exception as e:
+                        logger.warning(f"Could not store extracted text for document {document_id}: {e}")
+                        text_object = None
+                    self._checkpoint(document, "transform", {**transformation, "text_object": text_object})
+                    await db.commit()
+                else:
+                    logger.info(f"Step 1/6: Reusing extracted text for document {document_id}")
                 
                 # 2. EXTRACCIÓN: NER, embeddings, chunking
-                logger.info(f"Step 2/5: Extracting information from document {document_id}")
-                extract_result = await extract_service.extract_information(
-                    document=document,
-                    text=extracted_text,
-                    db=db
-                )
-                
-                logger.info(
-                    f"Extraction completed: {extract_result['chunk_count']} chunks, "
-                    f"{extract_result['entity_count']} entities"
-                )
+                if "extract" not in stages:
+                    logger.info(f"Step 2/6: Extracting information from document {document_id}")
+                    if attempt:
+                        # Un intento previo pudo guardar chunks sin llegar al checkpoint
+                        await db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+                        await db.execute(delete(Entity).where(Entity.document_id == document_id))
+                    
+                    extract_result = await extract_service.extract_information(
+                        document=document,
+                        text=extracted_text,
+                        db=db
+                    )
+                    if extract_result["status"] != "success":
+                        raise RuntimeError(f"Extraction failed: {extract_result.get('error')}")
+                    
+                    logger.info(
+                        f"Extraction completed: {extract_result['chunk_count']} chunks, "
+                        f"{extract_result['entity_count']} entities"
+                    )
+                    self._checkpoint(document, "extract", {
+                        "chunk_count": extract_result["chunk_count"],
+                        "entity_count": extract_result["entity_count"]
+                    })
+                    await db.commit()
+                extract_stage = document.metadata_json["pipeline_stages"]["extract"]
                 
                 # 3. VALIDACIÓN AUTOMÁTICA: Terceros, sanciones, registros
                 logger.info(f"Step 3/6: Validating entities for document {document_id}")
                 validation_result = None
-                if await validation_middleware.should_validate(document):
+                validation_middleware = _validation_middleware()
+                if document.metadata_json.get("validation_completed"):
+                    validation_result = document.metadata_json.get("validation")
+                    logger.info(f"Validation already completed for document {document_id}")
+                elif await validation_middleware.should_validate(document):
                     # Obtener entidades extraídas
                     entities_result = await db.execute(
-                        select(DocumentChunk).where(DocumentChunk.document_id == document_id)
+                        select(Entity).where(Entity.document_id == document_id)
                     )
-                    chunks = entities_result.scalars().all()
-                    
-                    # Extraer entidades de los chunks
-                    all_entities = []
-                    for chunk in chunks:
-                        if chunk.metadata_ and "entities" in chunk.metadata_:
-                            all_entities.extend(chunk.metadata_["entities"])
+                    all_entities = [
+                        {"text": entity.entity_value, "type": entity.entity_type}
+                        for entity in entities_result.scalars().all()
+                    ]
                     
                     # Ejecutar validación
                     validation_result = await validation_middleware.validate_document(
@@ -181,8 +266,7 @@ class ProcessWorker:
                     )
                     
                     # Guardar resultado de validación
-                    document.metadata_["validation"] = validation_result
-                    document.metadata_["validation_completed"] = True
+                    self._update_metadata(document, validation=validation_result, validation_completed=True)
                     await db.commit()
                     
                     logger.info(
@@ -191,61 +275,49 @@ class ProcessWorker:
                 else:
                     logger.info(f"Skipping validation for document {document_id}")
                 
-                # 4. CLASIFICACIÓN: Determinar categoría del documento
-                logger.info(f"Step 4/6: Classifying document {document_id}")
-                classification_result = await classification_service.classify_document(
-                    document=document,
-                    text=extracted_text,
-                    db=db
-                )
-                
-                logger.info(
-                    f"Classification completed: {classification_result['category'].value} "
-                    f"(confidence: {classification_result['confidence']:.2f})"
-                )
-                
-                # 5. EVALUACIÓN DE RIESGOS: Análisis multidimensional
-                logger.info(f"Step 5/6: Assessing risks for document {document_id}")
-                risk_assessment = await risk_service.assess_risk(
-                    document=document,
-                    text=extracted_text,
-                    db=db
-                )
-                
-                logger.info(
-                    f"Risk assessment completed: {risk_assessment.risk_level} "
-                    f"(score: {risk_assessment.overall_risk_score:.2f})"
+                # 4-6. CLASIFICACIÓN, CUMPLIMIENTO Y RIESGOS: sólo dependen del texto
+                # y las entidades ya guardadas, se ejecutan en paralelo
+                logger.info(f"Steps 4-6/6: Classifying, checking compliance and assessing risks for document {document_id}")
+                completed: Dict[str, Dict] = {}
+                results = await asyncio.gather(
+                    self._classify_and_check_compliance(document_id, extracted_text, stages, completed),
+                    self._assess_risk(document_id, extracted_text, stages, completed),
+                    return_exceptions=True
                 )
                 
-                # 6. VERIFICACIÓN DE CUMPLIMIENTO: GDPR, etc.
-                logger.info(f"Step 6/6: Checking compliance for document {document_id}")
-                compliance_result = await compliance_service.run_compliance_checks(
-                    document=document,
-                    db=db
-                )
+                # Las etapas han actualizado el documento en sus sesiones
+                await db.refresh(document)
+                for stage, output in completed.items():
+                    self._checkpoint(document, stage, output)
+                errors = [r for r in results if isinstance(r, BaseException)]
+                if errors:
+                    await db.commit()
+                    raise errors[0]
                 
-                logger.info(
-                    f"Compliance check completed: {'COMPLIANT' if compliance_result.is_compliant else 'NON-COMPLIANT'} "
-                    f"(score: {compliance_result.compliance_score:.2f})"
-                )
+                stages = document.metadata_json["pipeline_stages"]
+                risk_stage = stages["risk"]
+                compliance_stage = stages["compliance"]
                 
                 # Actualizar estado final
-                document.status = DocumentStatus.PROCESSED
+                document.status = DocumentStatus.COMPLETED
+                document.metadata_json = {
+                    key: value for key, value in document.metadata_json.items()
+                    if key != "processing_error"
+                }
                 await db.commit()
-                await db.refresh(document)
                 
                 # Enviar evento de indexación
                 index_event = {
                     "document_id": str(document_id),
-                    "chunk_count": extract_result['chunk_count'],
+                    "chunk_count": extract_stage['chunk_count'],
                     "classification": document.classification.value,
-                    "risk_level": risk_assessment.risk_level,
-                    "is_compliant": compliance_result.is_compliant,
+                    "risk_level": risk_stage["risk_level"],
+                    "is_compliant": compliance_stage["is_compliant"],
                     "validation_completed": validation_result is not None,
                     "entities_flagged": len(validation_result.get("flagged_entities", [])) if validation_result else 0
                 }
                 
-                await self.producer.send(self.topic_index, value=index_event)
+                await self.producer.send_and_wait(self.topic_index, value=index_event)
                 
                 logger.info(f"✅ Document {document_id} processed successfully - sent to indexing")
                 
@@ -255,28 +327,30 @@ class ProcessWorker:
                     extra={
                         "action": "document_processed",
                         "document_id": str(document_id),
-                        "filename": document.filename,
+                        "title": document.title,
                         "classification": document.classification.value,
-                        "chunk_count": extract_result['chunk_count'],
-                        "entity_count": extract_result['entity_count'],
-                        "risk_level": risk_assessment.risk_level,
-                        "risk_score": risk_assessment.overall_risk_score,
-                        "is_compliant": compliance_result.is_compliant,
+                        "chunk_count": extract_stage['chunk_count'],
+                        "entity_count": extract_stage['entity_count'],
+                        "risk_level": risk_stage["risk_level"],
+                        "risk_score": risk_stage["overall_risk_score"],
+                        "is_compliant": compliance_stage["is_compliant"],
                         "validation_completed": validation_result is not None,
-                        "entities_flagged": len(validation_result.get("flagged_entities", [])) if validation_result else 0
+                        "entities_flagged": len(validation_result.get("flagged_entities", [])) if validation_result else 0,
+                        "attempt": attempt
                     }
                 )
                 
             except Exception as e:
                 logger.error(f"Error processing document {document_id}: {e}", exc_info=True)
                 
-                # Marcar documento como fallido
+                # Marcar documento como fallido (los checkpoints se conservan)
                 if 'document' in locals() and document:
                     document.status = DocumentStatus.FAILED
-                    document.metadata_["processing_error"] = {
+                    self._update_metadata(document, processing_error={
                         "error": str(e),
-                        "error_type": type(e).__name__
-                    }
+                        "error_type": type(e).__name__,
+                        "attempt": attempt
+                    })
                     await db.commit()
                     
                     audit_logger.error(
@@ -284,9 +358,91 @@ class ProcessWorker:
                         extra={
                             "action": "document_processing_failed",
                             "document_id": str(document_id),
-                            "error": str(e)
+                            "error": str(e),
+                            "attempt": attempt
                         }
                     )
+                raise
+    
+    async def _load_extracted_text(self, transform_stage: Optional[Dict]) -> Optional[str]:
+        """Texto extraído en un intento anterior (None si hay que transformar)"""
+        if not transform_stage or not transform_stage.get("text_object"):
+            return None
+        try:
+            return await ingest_service.get_extracted_text(transform_stage["text_object"])
+        except Exception as e:
+            logger.warning(f"Could not load extracted text {transform_stage['text_object']}: {e}")
+            return None
+    
+    def _checkpoint(self, document: Document, stage: str, output: Dict):
+        """Registrar una etapa terminada"""
+        stages = {**((document.metadata_json or {}).get("pipeline_stages") or {}), stage: output}
+        self._update_metadata(document, pipeline_stages=stages)
+    
+    def _update_metadata(self, document: Document, **values):
+        """Actualizar ``metadata_json`` (se reasigna el dict para que SQLAlchemy registre el cambio)"""
+        document.metadata_json = {**(document.metadata_json or {}), **values}
+    
+    async def _classify_and_check_compliance(self, document_id: UUID, text: str, stages: Dict, completed: Dict):
+        """Clasificación y, con la categoría asignada, verificación de cumplimiento"""
+        async with async_session_maker() as db:
+            document = await db.get(Document, document_id)
+            
+            if "classification" not in stages:
+                classification_result = await classification_service.classify_document(
+                    document=document,
+                    text=text,
+                    db=db
+                )
+                if classification_result.get("method") == "error":
+                    raise RuntimeError(f"Classification failed: {classification_result.get('error')}")
+                
+                logger.info(
+                    f"Classification completed: {classification_result['category'].value} "
+                    f"(confidence: {classification_result['confidence']:.2f})"
+                )
+                completed["classification"] = {
+                    "category": classification_result["category"].value,
+                    "confidence": classification_result["confidence"]
+                }
+            
+            if "compliance" not in stages:
+                compliance_result = await compliance_service.run_compliance_checks(
+                    document=document,
+                    db=db
+                )
+                
+                logger.info(
+                    f"Compliance check completed: {'COMPLIANT' if compliance_result.is_compliant else 'NON-COMPLIANT'} "
+                    f"(score: {compliance_result.compliance_score:.2f})"
+                )
+                completed["compliance"] = {
+                    "is_compliant": compliance_result.is_compliant,
+                    "compliance_score": compliance_result.compliance_score
+                }
+    
+    async def _assess_risk(self, document_id: UUID, text: str, stages: Dict, completed: Dict):
+        """Evaluación de riesgos en su propia sesión"""
+        if "risk" in stages:
+            return
+        
+        async with async_session_maker() as db:
+            document = await db.get(Document, document_id)
+            
+            risk_assessment = await risk_service.assess_risk(
+                document=document,
+                text=text,
+                db=db
+            )
+            
+            logger.info(
+                f"Risk assessment completed: {risk_assessment.risk_level} "
+                f"(score: {risk_assessment.overall_risk_score:.2f})"
+            )
+            completed["risk"] = {
+                "risk_level": risk_assessment.risk_level,
+                "overall_risk_score": risk_assessment.overall_risk_score
+            }
 
 
 async def main():
@@ -37,6 +37,7 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
+from core.sparql_executor import sparql_executor
 from services.ontology_service import ontology_service
 from services.taxonomy_service import taxonomy_service
 
@@ -289,7 +290,8 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent | Ima
             if "LIMIT" not in query.upper():
                 query = f"{query}\nLIMIT {limit}"
             
-            results = ontology_service.execute_sparql(query)
+            # Pool acotado con plazo y caché: no bloquea el bucle del servidor
+            results = await sparql_executor.execute(ontology_service, query)
             
             return [TextContent(
                 type="text",
@@ -0,0 +1,130 @@
+"""
+Benchmark de la verificación anti-alucinación
+
+Compara, sobre un contexto RAG sintético, el método anterior
+(``SequenceMatcher`` por oración y línea del contexto) con el verificador
+de shingles de ``services.grounding``: tiempo por verificación y confianza
+obtenida para una respuesta fundamentada y otra inventada.
+
+Uso:
+    python scripts/grounding_benchmark.py
+    python scripts/grounding_benchmark.py --top-k 20 --chunk-chars 2000
+    python scripts/grounding_benchmark.py --budget-ms 20
+
+Sale con código 1 si el verificador supera su presupuesto o no distingue la
+respuesta fundamentada de la inventada.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.grounding import chunk_shingles, grounding_confidence  # noqa: E402
+
+WORDS = (
+    "contrato proveedor importe factura cláusula penalización vencimiento pago "
+    "empresa servicio plazo garantía riesgo auditoría cumplimiento informe "
+    "balance activo pasivo cliente entrega seguro póliza renovación anual "
+    "mensual firmado acuerdo condiciones entidad financiera préstamo interés"
+).split()
+
+
+def legacy_confidence(answer: str, context: str) -> float:
+    """Método anterior de RAGService._verify_answer"""
+    answer_sentences = answer.split('.')
+    context_lower = context.lower()
+
+    matching_scores = []
+    for sentence in answer_sentences:
+        sentence_clean = sentence.strip().lower()
+        if len(sentence_clean) < 10:
+            continue
+        max_similarity = 0
+        for context_chunk in context_lower.split('\n'):
+            similarity = SequenceMatcher(None, sentence_clean, context_chunk).ratio()
+            max_similarity = max(max_similarity, similarity)
+        matching_scores.append(max_similarity)
+
+    confidence = sum(matching_scores) / len(matching_scores) if matching_scores else 0.5
+    if '[DOC-' not in answer:
+        confidence *= 0.7
+    return min(1.0, max(0.0, confidence))
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def build_case(rng: random.Random, top_k: int, chunk_chars: int, answer_sentences: int):
+    """Contexto como lo construye RAGService, respuesta fundamentada y respuesta inventada"""
+    chunks = []
+    for _ in range(top_k):
+        lines, length = [], 0
+        while length < chunk_chars:
+            lines.append(sentence(rng, rng.randint(8, 16)))
+            length += len(lines[-1])
+        chunks.append("\n".join(lines))
+    context = "\n\n".join(f"[DOC-{idx}] {chunk}" for idx, chunk in enumerate(chunks, start=1))
+
+    grounded = []
+    for _ in range(answer_sentences):
+        idx = rng.randrange(top_k)
+        quoted = rng.choice(chunks[idx].split("\n")).rstrip(".")
+        grounded.append(f"{quoted} [DOC-{idx + 1}].")
+    invented = [sentence(rng, rng.randint(8, 16)) for _ in range(answer_sentences)]
+    return context, " ".join(grounded), " ".join(invented)
+
+
+def timed(func, answer: str, context: str, repeat: int):
+    """Mediana de ``repeat`` ejecuciones (ms) y resultado"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(answer, context)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la verificación anti-alucinación")
+    parser.add_argument("--top-k", type=int, default=10, help="Chunks en el contexto")
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="Caracteres por chunk")
+    parser.add_argument("--sentences", type=int, default=12, help="Oraciones de la respuesta")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por método")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Presupuesto del verificador (ms)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    context, grounded, invented = build_case(
+        random.Random(args.seed), args.top_k, args.chunk_chars, args.sentences
+    )
+    print(
+        f"Contexto: {args.top_k} chunks, {len(context)} caracteres; "
+        f"respuesta: {args.sentences} oraciones"
+    )
+
+    chunk_shingles.cache_clear()
+    cold_ms, _ = timed(grounding_confidence, grounded, context, 1)
+    legacy_ms, legacy_grounded = timed(legacy_confidence, grounded, context, args.repeat)
+    fast_ms, fast_grounded = timed(grounding_confidence, grounded, context, args.repeat)
+    legacy_invented = legacy_confidence(invented, context)
+    fast_invented = grounding_confidence(invented, context)
+
+    print(f"{'método':12s} {'ms':>10s} {'fundamentada':>13s} {'inventada':>10s}")
+    print(f"{'legacy':12s} {legacy_ms:10.2f} {legacy_grounded:13.3f} {legacy_invented:10.3f}")
+    print(f"{'shingles':12s} {fast_ms:10.2f} {fast_grounded:13.3f} {fast_invented:10.3f}")
+    print(f"shingles sin caché de chunks: {cold_ms:.2f} ms; aceleración x{legacy_ms / max(fast_ms, 1e-6):.0f}")
+
+    ok = cold_ms <= args.budget_ms and fast_grounded > fast_invented
+    print(f"{'✅' if ok else '❌'} presupuesto {args.budget_ms:.0f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
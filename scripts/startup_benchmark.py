@@ -0,0 +1,135 @@
+"""
+Benchmark de arranque del backend
+
+Mide, en un intérprete limpio por rol, el tiempo de importación del punto de
+entrada (``main`` para la API, el módulo de cada worker) y comprueba que no
+se importan librerías de modelos pesadas: los servicios se crean en su primer
+uso o en el warmup del rol. Con ``--warmup`` mide también el warmup.
+
+Uso:
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --role api --budget api=2.5
+    python scripts/startup_benchmark.py --warmup
+
+Sale con código 1 si algún rol supera su presupuesto o importa módulos pesados.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Rol -> módulo de entrada
+ENTRYPOINTS = {
+    "api": "main",
+    "ingest-worker": "workers.ingest_worker",
+    "process-worker": "workers.process_worker",
+    "index-worker": "workers.index_worker",
+}
+
+# Presupuesto de importación por rol (segundos)
+DEFAULT_BUDGETS = {
+    "api": 3.0,
+    "ingest-worker": 3.0,
+    "process-worker": 3.0,
+    "index-worker": 3.0,
+}
+
+# Librerías que sólo deben cargarse al crear los servicios
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "spacy",
+    "opensearchpy",
+    "openai",
+    "anthropic",
+    "langchain",
+)
+
+_PROBE = """
+import json, sys, time, asyncio
+start = time.perf_counter()
+import importlib
+importlib.import_module({module!r})
+import_seconds = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+result = {{"import_seconds": import_seconds, "heavy_modules": heavy}}
+if {warmup!r}:
+    from core.service_registry import service_registry
+    start = time.perf_counter()
+    result["warmup"] = asyncio.run(service_registry.warmup(role={role!r}))
+    result["warmup_seconds"] = time.perf_counter() - start
+    result["services"] = service_registry.status()
+print("RESULT " + json.dumps(result))
+"""
+
+
+def run_role(role: str, warmup: bool) -> dict:
+    """Importar el punto de entrada del rol en un proceso nuevo"""
+    code = _PROBE.format(module=ENTRYPOINTS[role], heavy=HEAVY_MODULES, warmup=warmup, role=role)
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "SERVICE_ROLE": role,
+            # Algunos módulos importan vía ``backend.``: raíz del repo también en el path
+            "PYTHONPATH": os.pathsep.join([str(BACKEND_DIR), str(BACKEND_DIR.parent)]),
+        },
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    return {"error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["no output"]}
+
+
+def parse_budgets(values) -> dict:
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        role, _, seconds = value.partition("=")
+        if role not in ENTRYPOINTS or not seconds:
+            raise SystemExit(f"Invalid budget {value!r}: expected <role>=<seconds>")
+        budgets[role] = float(seconds)
+    return budgets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque por rol")
+    parser.add_argument("--role", choices=sorted(ENTRYPOINTS), action="append", help="Rol a medir (repetible)")
+    parser.add_argument("--budget", action="append", help="Presupuesto <role>=<segundos>")
+    parser.add_argument("--warmup", action="store_true", help="Medir también el warmup del rol")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    failed = False
+
+    for role in args.role or list(ENTRYPOINTS):
+        result = run_role(role, args.warmup)
+        if "error" in result:
+            print(f"❌ {role:15s} import failed: {result['error'][0]}")
+            failed = True
+            continue
+
+        seconds = result["import_seconds"]
+        ok = seconds <= budgets[role] and not result["heavy_modules"]
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {role:15s} import {seconds:6.2f}s (budget {budgets[role]:.1f}s)")
+        if result["heavy_modules"]:
+            print(f"   heavy modules imported: {', '.join(result['heavy_modules'])}")
+        if args.warmup:
+            print(f"   warmup {result['warmup_seconds']:.2f}s")
+            for name, status in result["warmup"].items():
+                load = result["services"][name]["load_seconds"]
+                print(f"     {name:24s} {status}" + (f" ({load:.2f}s)" if load is not None else ""))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ import logging
 from typing import List, Tuple
 import re
 
+from text_chunker import TextChunk, iter_chunks
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,7 +73,7 @@ class DocumentProcessor:
     def chunk_text(
         self,
         text: str,
-        chunk_size: int = 500,
+        chunk_size: int = 512,
         chunk_overlap: int = 50
     ) -> List[str]:
         """
@@ -79,63 +81,30 @@ class DocumentProcessor:
         
         Args:
             text: Input text
-            chunk_size: Size of each chunk in characters
-            chunk_overlap: Overlap between chunks
+            chunk_size: Size of each chunk in word tokens
+            chunk_overlap: Overlap between chunks in word tokens
         
         Returns:
             List of text chunks
         """
-        # Clean text
-        text = self._clean_text(text)
-        
-        # Split into sentences (better than character split)
-        sentences = self._split_into_sentences(text)
-        
-        chunks = []
-        current_chunk = []
-        current_size = 0
-        
-        for sentence in sentences:
-            sentence_size = len(sentence)
-            
-            # If adding this sentence exceeds chunk_size, save current chunk
-            if current_size + sentence_size > chunk_size and current_chunk:
-                chunk_text = " ".join(current_chunk)
-                chunks.append(chunk_text)
-                
-                # Keep last sentences for overlap
-                overlap_sentences = []
-                overlap_size = 0
-                for s in reversed(current_chunk):
-                    if overlap_size + len(s) <= chunk_overlap:
-                        overlap_sentences.insert(0, s)
-                        overlap_size += len(s)
-                    else:
-                        break
-                
-                current_chunk = overlap_sentences
-                current_size = overlap_size
-            
-            current_chunk.append(sentence)
-            current_size += sentence_size
-        
-        # Add last chunk
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        return [chunk.text for chunk in self.chunk_with_offsets(text, chunk_size, chunk_overlap)]
+    
+    def chunk_with_offsets(
+        self,
+        text: str,
+        chunk_size: int = 512,
+        chunk_overlap: int = 50
+    ) -> List[TextChunk]:
+        """
+        Split text into chunks with character offsets in the original text
         
+        Uses the shared chunking engine (same output as the backend
+        ExtractService for the same parameters).
+        """
+        chunks = list(iter_chunks(text, chunk_size, chunk_overlap))
         logger.info(f"✅ Created {len(chunks)} chunks from text")
         return chunks
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,;:!?¿¡\-áéíóúñÁÉÍÓÚÑ]', '', text)
-        
-        return text.strip()
-    
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
         # Simple sentence splitter (can be improved with spaCy/NLTK)
@@ -4,15 +4,22 @@ Integrates with GPU Embedding Service and provides fallback options
 """
 import os
 import logging
-from typing import List, Optional
-import httpx
+from typing import Awaitable, Callable, List, Optional
 import numpy as np
 
+from gpu_embedding_client import GPUEmbeddingClient
+from embedding_store import get_embedding_store, get_store_stats, normalize_rows
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 GPU_EMBEDDING_URL = os.getenv("GPU_EMBEDDING_URL", "http://localhost:8001")
 USE_GPU_SERVICE = os.getenv("USE_GPU_EMBEDDINGS", "true").lower() == "true"
+# Igual que EMBEDDING_MODEL_VERSION del backend: el store es común
+EMBEDDING_MODEL_VERSION = os.getenv("EMBEDDING_MODEL_VERSION", "1")
+# Modelo servido por el GPU service, el mismo que EMBEDDING_MODEL del backend:
+# sus vectores se guardan en el store que también usa el backend
+GPU_EMBEDDING_MODEL = os.getenv("GPU_EMBEDDING_MODEL", "paraphrase-multilingual-mpnet-base-v2")
 
 
 class EmbeddingService:
@@ -29,6 +36,8 @@ class EmbeddingService:
     def __init__(self):
         self.gpu_url = GPU_EMBEDDING_URL
         self.use_gpu = USE_GPU_SERVICE
+        # Cliente compartido: pool keep-alive + circuit breaker + sub-batches
+        self.gpu_client = GPUEmbeddingClient(base_url=self.gpu_url, enabled=self.use_gpu)
         
         # Stats
         self.stats = {
@@ -47,6 +56,13 @@ class EmbeddingService:
         """
         Generate embeddings using best available method
         
+        Los textos ya embebidos se leen del embedding store y no se
+        recalculan. El store se elige por el modelo que produce los vectores:
+        el del GPU service (GPU_EMBEDDING_MODEL) es el mismo modelo del
+        backend, así que reutiliza lo que ya embebieron ExtractService y
+        EmbeddingServiceV2; los del proveedor pedido (ada, cohere...) tienen
+        dimensiones distintas y van a su propio store.
+        
         Args:
             texts: List of texts to embed
             model: Model name
@@ -54,18 +70,54 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        # Try GPU service first if enabled
-        if self.use_gpu and "ada" in model.lower():
-            try:
-                embeddings = await self._gpu_embeddings(texts)
-                if embeddings:
-                    self.stats["gpu_calls"] += 1
-                    return embeddings
-            except Exception as e:
-                logger.warning(f"GPU service failed: {e}, using fallback")
-                self.stats["errors"] += 1
+        # Try GPU service first if enabled (se omite con el circuito abierto)
+        if self.use_gpu and "ada" in model.lower() and not self.gpu_client.circuit_open:
+            # El store guarda los vectores sin normalizar (como el backend);
+            # el GPU service devolvía vectores unitarios, se normalizan al leer
+            embeddings = await self._cached(texts, GPU_EMBEDDING_MODEL, self._gpu_or_none, normalize=True)
+            if embeddings is not None:
+                return embeddings
         
-        # Fallback to specific provider
+        return await self._cached(texts, model, lambda missing: self._provider_embeddings(missing, model))
+    
+    async def _cached(
+        self,
+        texts: List[str],
+        model: str,
+        encoder: Callable[[List[str]], Awaitable[Optional[List[List[float]]]]],
+        normalize: bool = False
+    ) -> Optional[List[List[float]]]:
+        """Consultar el store de ``model`` y generar sólo los textos que faltan"""
+        store = get_embedding_store(model, EMBEDDING_MODEL_VERSION)
+        if store is None:
+            embeddings = await encoder(texts)
+            if embeddings is None:
+                return None
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        else:
+            embeddings = await store.aencode(texts, encoder)
+            if embeddings is None:
+                return None
+        return (normalize_rows(embeddings) if normalize else embeddings).tolist()
+    
+    async def _gpu_or_none(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Embeddings del GPU service, o None para pasar al proveedor"""
+        try:
+            embeddings = await self._gpu_embeddings(texts)
+            if embeddings:
+                self.stats["gpu_calls"] += 1
+                return embeddings
+        except Exception as e:
+            logger.warning(f"GPU service failed: {e}, using fallback")
+            self.stats["errors"] += 1
+        return None
+    
+    async def _provider_embeddings(
+        self,
+        texts: List[str],
+        model: str
+    ) -> List[List[float]]:
+        """Generate embeddings with the provider of the requested model"""
         if "ada" in model.lower() or "openai" in model.lower():
             return await self._openai_embeddings(texts, model)
         elif "cohere" in model.lower():
@@ -74,25 +126,12 @@ class EmbeddingService:
             return await self._local_embeddings(texts, model)
     
     async def _gpu_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
-        """Call GPU embedding service"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.gpu_url}/api/v1/embeddings/generate",
-                    json={"texts": texts, "normalize": True},
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ GPU embeddings: {len(texts)} texts")
-                    return data["embeddings"]
-                
-                return None
-        
-        except Exception as e:
-            logger.error(f"GPU service error: {e}")
-            return None
+        """Call GPU embedding service (vectores sin normalizar, como en el store)"""
+        return await self.gpu_client.generate_embeddings(texts, normalize=False)
+    
+    async def close(self):
+        """Cerrar el pool de conexiones al GPU service"""
+        await self.gpu_client.aclose()
     
     async def _openai_embeddings(
         self,
@@ -177,6 +216,7 @@ class EmbeddingService:
     
     def get_stats(self) -> dict:
         """Get usage statistics"""
+        store_stats = get_store_stats()
         total = sum([
             self.stats["gpu_calls"],
             self.stats["openai_calls"],
@@ -187,7 +227,10 @@ class EmbeddingService:
         return {
             **self.stats,
             "total_calls": total,
-            "gpu_percentage": (self.stats["gpu_calls"] / total * 100) if total > 0 else 0
+            "gpu_percentage": (self.stats["gpu_calls"] / total * 100) if total > 0 else 0,
+            "gpu_circuit": self.gpu_client.breaker.state,
+            "store_hits": store_stats["hits"],
+            "store_misses": store_stats["misses"]
         }
 
 
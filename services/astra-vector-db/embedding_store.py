@@ -0,0 +1,290 @@
+"""
+Embedding Store
+Almacén de embeddings direccionado por contenido para no re-embeber chunks
+
+Clave: (sha256 del texto normalizado, modelo, versión del modelo). Cada par
+modelo/versión tiene su propio directorio con:
+- ``vectors.f32``: vectores float32 en filas de tamaño fijo, sólo append,
+  leídos con ``np.memmap`` (páginas compartidas entre procesos)
+- ``index.db``: índice SQLite clave -> fila
+
+El directorio puede vivir en un volumen compartido entre servicios
+(``EMBEDDING_STORE_PATH``) para que un texto embebido por el backend no se
+vuelva a embeber en otro servicio con el mismo modelo. Para que el store sea
+común:
+- el modelo se identifica por su nombre canónico (sin el prefijo
+  ``sentence-transformers/``), igual en el backend y en astra-vector-db
+- se guardan los vectores tal como los devuelve el modelo, sin normalizar;
+  quien necesite vectores unitarios los normaliza al leer (``normalize_rows``)
+
+Este fichero es idéntico en ``backend/services`` y en
+``services/astra-vector-db``.
+"""
+import os
+import re
+import fcntl
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+EMBEDDING_STORE_ENABLED = os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() == "true"
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "data/embedding_store")
+
+
+def normalize_text(text: str) -> str:
+    """Normalización usada para la clave: Unicode NFC y espacios colapsados"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def canonical_model_name(model_name: str) -> str:
+    """Nombre del modelo en el store: sin el prefijo de organización de sentence-transformers"""
+    prefix = "sentence-transformers/"
+    return model_name[len(prefix):] if model_name.startswith(prefix) else model_name
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Vectores unitarios (norma L2) de una matriz de embeddings"""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingStore:
+    """
+    Caché persistente de embeddings para un modelo y versión concretos.
+
+    Uso típico: ``store.encode(texts, model.encode)`` devuelve la matriz de
+    embeddings llamando al encoder sólo con los textos que no estaban.
+    """
+
+    def __init__(self, base_path: str, model_name: str, model_version: str = "1"):
+        self.model_name = canonical_model_name(model_name)
+        self.model_version = model_version
+        self.path = Path(base_path) / _safe_name(self.model_name) / _safe_name(model_version)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._vectors_path = self.path / "vectors.f32"
+        self._lock_path = self.path / ".lock"
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path / "index.db", check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, row INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """
+        )
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+        self.dimension: Optional[int] = int(row[0]) if row else None
+        self._mmap: Optional[np.memmap] = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    # ------------------------------------------------------------------
+    # Lectura / escritura
+    # ------------------------------------------------------------------
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Embeddings almacenados (o None) para cada texto"""
+        keys = [content_key(text) for text in texts]
+        rows = self._lookup(keys)
+        if rows and self.dimension is None:
+            # Otro proceso creó el store después de abrirlo este
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+            self.dimension = int(row[0]) if row else None
+        if not rows or self.dimension is None:
+            return [None] * len(texts)
+
+        vectors = self._vectors(max(rows.values()) + 1)
+        return [np.array(vectors[rows[key]]) if key in rows else None for key in keys]
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """Guardar embeddings (los textos ya presentes se ignoran)"""
+        if not texts:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got shape {matrix.shape}")
+
+        keys = [content_key(text) for text in texts]
+
+        with self._lock, open(self._lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._ensure_dimension(matrix.shape[1])
+
+                # Otro proceso pudo guardar alguno mientras esperábamos el lock
+                existing = self._lookup(keys)
+                new: Dict[str, int] = {}
+                for i, key in enumerate(keys):
+                    if key not in existing and key not in new:
+                        new[key] = i
+                if not new:
+                    return
+
+                row_bytes = self.dimension * 4
+                with open(self._vectors_path, "ab") as f:
+                    size = f.tell()
+                    if size % row_bytes:
+                        # Fila incompleta de una escritura interrumpida: alinear
+                        f.write(b"\0" * (row_bytes - size % row_bytes))
+                    first_row = f.tell() // row_bytes
+                    f.write(matrix[list(new.values())].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, row) VALUES (?, ?)",
+                    [(key, first_row + offset) for offset, key in enumerate(new)]
+                )
+                self._conn.execute("COMMIT")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        encoder: Callable[[List[str]], Sequence[Sequence[float]]]
+    ) -> np.ndarray:
+        """
+        Embeddings de ``texts``; ``encoder`` sólo recibe los textos no
+        almacenados (sin duplicados) y sus resultados se guardan.
+        """
+        cached, missing = self._split(texts)
+        if missing:
+            self.put_many(missing, encoder(missing))
+        return self._assemble(texts, cached, missing)
+
+    async def aencode(
+        self,
+        texts: Sequence[str],
+        encoder: Callable[[List[str]], Awaitable[Optional[Sequence[Sequence[float]]]]]
+    ) -> Optional[np.ndarray]:
+        """Versión asíncrona de ``encode``; devuelve None si el encoder falla (None)"""
+        cached, missing = self._split(texts)
+        if missing:
+            embeddings = await encoder(missing)
+            if embeddings is None:
+                return None
+            self.put_many(missing, embeddings)
+        return self._assemble(texts, cached, missing)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._mmap = None
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _split(self, texts: Sequence[str]) -> Tuple[List[Optional[np.ndarray]], List[str]]:
+        cached = self.get_many(texts)
+        missing: List[str] = []
+        seen = set()
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                key = content_key(text)
+                if key not in seen:
+                    seen.add(key)
+                    missing.append(text)
+        self.stats["hits"] += len(texts) - sum(1 for v in cached if v is None)
+        self.stats["misses"] += len(missing)
+        return cached, missing
+
+    def _assemble(
+        self,
+        texts: Sequence[str],
+        cached: List[Optional[np.ndarray]],
+        missing: List[str]
+    ) -> np.ndarray:
+        if missing:
+            fresh = dict(zip([content_key(t) for t in missing], self.get_many(missing)))
+            cached = [v if v is not None else fresh[content_key(t)] for t, v in zip(texts, cached)]
+        if not cached:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.vstack(cached)
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        unique = list(dict.fromkeys(keys))
+        # Límite de variables de SQLite
+        for i in range(0, len(unique), 500):
+            batch = unique[i:i + 500]
+            with self._lock:
+                result = self._conn.execute(
+                    f"SELECT key, row FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+            rows.update(result)
+        return rows
+
+    def _vectors(self, min_rows: int) -> np.memmap:
+        """Vista memory-mapped de los vectores; se reabre si el fichero creció"""
+        with self._lock:
+            if self._mmap is None or self._mmap.shape[0] < min_rows:
+                rows = os.path.getsize(self._vectors_path) // (self.dimension * 4)
+                self._mmap = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimension)
+                )
+            return self._mmap
+
+    def _ensure_dimension(self, dimension: int):
+        if self.dimension is None:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+            if row:
+                self.dimension = int(row[0])
+            else:
+                self._conn.execute("INSERT INTO meta (name, value) VALUES ('dimension', ?)", (str(dimension),))
+                self.dimension = dimension
+        if dimension != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {dimension} does not match store dimension {self.dimension} "
+                f"for {self.model_name}@{self.model_version}"
+            )
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+
+
+# Un store por (modelo, versión) y proceso
+_stores: Dict[Tuple[str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name: str, model_version: str = "1") -> Optional[EmbeddingStore]:
+    """Store compartido para el modelo, o None si está deshabilitado"""
+    if not EMBEDDING_STORE_ENABLED:
+        return None
+    model_name = canonical_model_name(model_name)
+    with _stores_lock:
+        store = _stores.get((model_name, model_version))
+        if store is None:
+            store = EmbeddingStore(EMBEDDING_STORE_PATH, model_name, model_version)
+            _stores[(model_name, model_version)] = store
+            logger.info(f"✅ Embedding store ready: {store.path}")
+        return store
+
+
+def get_store_stats() -> Dict[str, int]:
+    """Aciertos/fallos acumulados de todos los stores del proceso"""
+    with _stores_lock:
+        stores = list(_stores.values())
+    return {
+        "hits": sum(store.stats["hits"] for store in stores),
+        "misses": sum(store.stats["misses"] for store in stores),
+    }
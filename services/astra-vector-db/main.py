@@ -99,6 +99,8 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("🛑 Shutting down Astra DB Vector Search Service...")
+    if embedding_service:
+        await embedding_service.close()
 
 
 # Create FastAPI app
@@ -204,14 +206,17 @@ async def ingest_document(request: DocumentIngest):
         with ingest_duration.time():
             # Generate chunks if requested
             if request.generate_chunks:
-                chunks = document_processor.chunk_text(
+                text_chunks = document_processor.chunk_with_offsets(
                     request.content,
                     request.chunk_size,
                     request.chunk_overlap
                 )
-                logger.info(f"Created {len(chunks)} chunks")
+                chunks = [chunk.text for chunk in text_chunks]
+                # Offsets de carácter en el documento original (resaltado)
+                offsets = [(chunk.start, chunk.end) for chunk in text_chunks]
             else:
                 chunks = [request.content]
+                offsets = [(0, len(request.content))]
             
             # Generate embeddings
             embeddings = await embedding_service.generate_embeddings(
@@ -221,11 +226,13 @@ async def ingest_document(request: DocumentIngest):
             
             # Store first chunk (or full document if no chunking)
             doc_id = str(uuid.uuid4())
+            first_metadata = request.metadata.dict()
+            first_metadata["start_offset"], first_metadata["end_offset"] = offsets[0]
             await astra_client.insert_document(
                 document_id=doc_id,
                 vector=embeddings[0],
                 content=chunks[0],
-                metadata=request.metadata.dict()
+                metadata=first_metadata
             )
             
             # Store additional chunks if any
@@ -235,6 +242,7 @@ async def ingest_document(request: DocumentIngest):
                     chunk_metadata = request.metadata.dict()
                     chunk_metadata["parent_id"] = doc_id
                     chunk_metadata["chunk_index"] = i
+                    chunk_metadata["start_offset"], chunk_metadata["end_offset"] = offsets[i]
                     
                     await astra_client.insert_document(
                         document_id=chunk_id,
@@ -1,9 +1,10 @@
 """
 Data Models for Astra DB Vector Search Service
 """
+import os
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from enum import Enum
 
 
@@ -45,8 +46,16 @@ class DocumentIngest(BaseModel):
     metadata: DocumentMetadata
     embedding_model: EmbeddingModel = EmbeddingModel.OPENAI_ADA
     generate_chunks: bool = Field(default=True, description="Split into chunks")
-    chunk_size: int = Field(default=500, ge=100, le=2000)
-    chunk_overlap: int = Field(default=50, ge=0, le=500)
+    # Tamaños en tokens (palabras), mismos valores por defecto que el backend
+    chunk_size: int = Field(default=int(os.getenv("CHUNK_SIZE", "512")), ge=100, le=2000)
+    chunk_overlap: int = Field(default=int(os.getenv("CHUNK_OVERLAP", "50")), ge=0, le=500)
+
+    @model_validator(mode="after")
+    def check_chunk_overlap(self) -> "DocumentIngest":
+        """El solapamiento debe ser menor que el chunk (422 en lugar de 500)"""
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        return self
 
 
 class VectorSearchRequest(BaseModel):
@@ -0,0 +1,201 @@
+"""
+Text Chunker
+Motor de chunking común para el backend y los servicios de vectores
+
+- Recorre el texto por offsets (``re.finditer``) sin materializar la lista de
+  palabras ni normalizar el texto completo: la memoria adicional depende del
+  tamaño del chunk, no del documento
+- Respeta límites de frase y de párrafo; sólo una frase más larga que el
+  chunk se divide por palabras
+- Cada chunk lleva sus offsets de carácter en el texto original (resaltado)
+- El tamaño se mide en tokens: palabras por defecto o el tokenizer del
+  modelo de embeddings si se indica
+
+Con los mismos parámetros el resultado es idéntico en todos los servicios.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+
+# Fin de párrafo (línea en blanco) o fin de frase seguido de espacio
+_BOUNDARY = re.compile(r"\n[^\S\n]*\n\s*|(?<=[.!?…])\s+")
+_WORD = re.compile(r"\S+")
+_WHITESPACE = re.compile(r"\s+")
+
+TokenCounter = Callable[[str], int]
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """Chunk de texto con su posición en el documento original"""
+    index: int
+    text: str
+    start: int
+    end: int
+    token_count: int
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def tokenizer_counter(tokenizer: Any) -> TokenCounter:
+    """Contador de tokens a partir de un tokenizer de HuggingFace"""
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def iter_chunks(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    token_counter: Optional[TokenCounter] = None
+) -> Iterator[TextChunk]:
+    """
+    Generar los chunks de ``text``.
+
+    Los chunks agrupan frases completas hasta ``chunk_size`` tokens; se cierra
+    también un chunk al acabar un párrafo si ya está medio lleno. Las últimas
+    frases de cada chunk (hasta ``chunk_overlap`` tokens) se repiten al
+    principio del siguiente.
+
+    Args:
+        text: Texto del documento
+        chunk_size: Tamaño máximo del chunk en tokens
+        chunk_overlap: Solapamiento en tokens entre chunks consecutivos
+        token_counter: Función de conteo de tokens (por defecto palabras)
+
+    Yields:
+        TextChunk: Chunks en orden
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError("chunk_overlap must be >= 0 and smaller than chunk_size")
+
+    counter = token_counter or count_words
+    window: Deque[Tuple[int, int, int]] = deque()  # (start, end, tokens)
+    window_tokens = 0
+    has_new = False  # La ventana tiene frases aún no emitidas
+    index = 0
+
+    def emit() -> TextChunk:
+        nonlocal index
+        chunk = _make_chunk(text, index, window[0][0], window[-1][1], window_tokens)
+        index += 1
+        return chunk
+
+    def keep_overlap(next_tokens: int = 0):
+        nonlocal window_tokens
+        while window and (
+            window_tokens > chunk_overlap or window_tokens + next_tokens > chunk_size
+        ):
+            window_tokens -= window.popleft()[2]
+
+    for start, end, paragraph_end in _iter_sentences(text):
+        tokens = counter(text[start:end])
+
+        if tokens > chunk_size:
+            # Frase más larga que un chunk: cerrar el actual y trocearla por palabras
+            if has_new:
+                yield emit()
+            window.clear()
+            window_tokens = 0
+            has_new = False
+            for chunk in _split_long_sentence(text, start, end, chunk_size, chunk_overlap, counter, index):
+                index += 1
+                yield chunk
+            continue
+
+        if window_tokens + tokens > chunk_size:
+            # Cerrar el chunk si tiene frases nuevas y recortar el solapamiento
+            # (también tras un fin de párrafo) para que la frase quepa
+            if has_new:
+                yield emit()
+                has_new = False
+            keep_overlap(tokens)
+
+        window.append((start, end, tokens))
+        window_tokens += tokens
+        has_new = True
+
+        if paragraph_end and window_tokens * 2 >= chunk_size:
+            yield emit()
+            has_new = False
+            keep_overlap()
+
+    if has_new:
+        yield emit()
+
+
+def chunk_texts(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    token_counter: Optional[TokenCounter] = None
+) -> List[str]:
+    """Textos de los chunks (ver ``iter_chunks``)"""
+    return [chunk.text for chunk in iter_chunks(text, chunk_size, chunk_overlap, token_counter)]
+
+
+def _iter_sentences(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """Spans (start, end, fin_de_párrafo) de las frases no vacías"""
+    position = 0
+    for match in _BOUNDARY.finditer(text):
+        span = _strip_span(text, position, match.start())
+        if span:
+            yield span[0], span[1], match.group().count("\n") >= 2
+        position = match.end()
+
+    span = _strip_span(text, position, len(text))
+    if span:
+        yield span[0], span[1], True
+
+
+def _strip_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _split_long_sentence(
+    text: str,
+    start: int,
+    end: int,
+    chunk_size: int,
+    chunk_overlap: int,
+    counter: TokenCounter,
+    first_index: int
+) -> Iterator[TextChunk]:
+    """Ventanas de palabras con solapamiento dentro de una frase"""
+    words: Deque[Tuple[int, int, int]] = deque()
+    tokens = 0
+    new_words = 0
+    index = first_index
+
+    for match in _WORD.finditer(text, start, end):
+        word_tokens = counter(match.group())
+        if new_words and tokens + word_tokens > chunk_size:
+            yield _make_chunk(text, index, words[0][0], words[-1][1], tokens)
+            index += 1
+            new_words = 0
+            while words and (tokens > chunk_overlap or tokens + word_tokens > chunk_size):
+                tokens -= words.popleft()[2]
+        words.append((match.start(), match.end(), word_tokens))
+        tokens += word_tokens
+        new_words += 1
+
+    if new_words:
+        yield _make_chunk(text, index, words[0][0], words[-1][1], tokens)
+
+
+def _make_chunk(text: str, index: int, start: int, end: int, tokens: int) -> TextChunk:
+    return TextChunk(
+        index=index,
+        text=_WHITESPACE.sub(" ", text[start:end]),
+        start=start,
+        end=end,
+        token_count=tokens
+    )
@@ -8,13 +8,14 @@ import logging
 from typing import List, Dict, Optional
 from contextlib import asynccontextmanager
 
-import httpx
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 from fastapi.responses import Response
 
+from gpu_embedding_client import GPUEmbeddingClient
+
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +31,9 @@ GPU_EMBEDDING_URL = os.getenv("GPU_EMBEDDING_URL", "http://gpu-embedding-service
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
+# Cliente GPU compartido: pool keep-alive, circuit breaker y sub-batches concurrentes
+gpu_client = GPUEmbeddingClient(base_url=GPU_EMBEDDING_URL, timeout=30.0, enabled=True)
+
 
 # Pydantic Models
 class Document(BaseModel):
@@ -73,14 +77,9 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting RAG Enhanced Service...")
     
     # Check GPU embedding service
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{GPU_EMBEDDING_URL}/health", timeout=5.0)
-            if response.status_code == 200:
-                logger.info("✅ GPU Embedding Service connected")
-            else:
-                logger.warning("⚠️ GPU Embedding Service not responding")
-    except:
+    if await gpu_client.is_available():
+        logger.info("✅ GPU Embedding Service connected")
+    else:
         logger.warning("⚠️ GPU Embedding Service not available")
     
     # Check API keys
@@ -99,6 +98,7 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("🛑 Shutting down RAG Enhanced Service...")
+    await gpu_client.aclose()
 
 
 # Create FastAPI app
@@ -121,21 +121,12 @@ app.add_middleware(
 
 async def get_embeddings(texts: List[str]) -> List[List[float]]:
     """Get embeddings from GPU service"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{GPU_EMBEDDING_URL}/api/v1/embeddings/generate",
-                json={"texts": texts, "normalize": True},
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data["embeddings"]
-            else:
-                raise Exception(f"GPU service error: {response.status_code}")
-    except Exception as e:
-        logger.error(f"Error getting embeddings: {e}")
-        raise
+    embeddings = await gpu_client.generate_embeddings(texts, normalize=True)
+    if embeddings is None:
+        if gpu_client.circuit_open:
+            raise Exception("GPU embedding service unavailable (circuit open)")
+        raise Exception("GPU embedding service error")
+    return embeddings
 
 
 def calculate_similarity(emb1: List[float], emb2: List[float]) -> float:
@@ -222,13 +213,7 @@ async def call_anthropic(prompt: str, model: str, temperature: float) -> tuple:
 async def health_check():
     """Health check endpoint"""
     # Check GPU embedding service
-    gpu_available = False
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{GPU_EMBEDDING_URL}/health", timeout=5.0)
-            gpu_available = response.status_code == 200
-    except:
-        pass
+    gpu_available = await gpu_client.is_available()
     
     return HealthResponse(
         status="healthy",
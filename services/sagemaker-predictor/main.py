@@ -9,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
+import asyncio
 from datetime import datetime
 import os
 import numpy as np
@@ -27,6 +28,8 @@ import xgboost as xgb
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 from starlette.responses import Response
 
+from model_store import ModelArtifactStore
+
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,6 +45,20 @@ prediction_requests = Counter('prediction_requests_total', 'Total prediction req
 prediction_latency = Histogram('prediction_latency_seconds', 'Prediction latency', ['model'])
 shap_computation_time = Histogram('shap_computation_seconds', 'SHAP computation time')
 model_confidence = Gauge('model_confidence_score', 'Model confidence score')
+model_load_duration = Histogram(
+    'model_load_seconds',
+    'Time to make a model available (mmap load or training)',
+    ['model', 'source']
+)
+
+# Artefactos de modelo (compartidos entre workers vía mmap)
+model_store = ModelArtifactStore(
+    MODEL_PATH,
+    on_load=lambda name, source, seconds: model_load_duration.labels(model=name, source=source).observe(seconds)
+)
+
+# Columnas de entrada de los modelos
+FEATURE_COLUMNS = ['amount', 'duration', 'age', 'employment_duration', 'num_dependents']
 
 # FastAPI app
 app = FastAPI(
@@ -136,33 +153,49 @@ class PredictiveMLModel:
         self.explainer = None
         self.feature_names = []
         self.is_trained = False
-        
-        # Intentar cargar modelo pre-entrenado
-        self._load_model()
+        self._load_lock = asyncio.Lock()
+    
+    @property
+    def artifact_name(self) -> str:
+        return f"{self.model_type}_model"
     
     def _load_model(self):
-        """Cargar modelo pre-entrenado si existe"""
-        model_file = Path(MODEL_PATH) / f"{self.model_type}_model.pkl"
+        """
+        Cargar modelo desde el artifact store (bajo demanda).
         
-        if model_file.exists():
-            try:
-                self.model = joblib.load(model_file)
-                self.is_trained = True
-                logger.info(f"✅ Modelo {self.model_type} cargado desde {model_file}")
-                
-                # Inicializar explainer SHAP
-                if self.model_type == "lightgbm":
-                    self.explainer = shap.TreeExplainer(self.model)
-                elif self.model_type == "xgboost":
-                    self.explainer = shap.TreeExplainer(self.model)
-                
-                logger.info("✅ SHAP explainer inicializado")
-            except Exception as e:
-                logger.warning(f"⚠️ No se pudo cargar modelo: {e}")
-                self._create_dummy_model()
-        else:
-            logger.info(f"ℹ️ No existe modelo pre-entrenado, usando modelo dummy")
-            self._create_dummy_model()
+        Si no existe artefacto, se entrena el modelo dummy una sola vez y se
+        publica en MODEL_PATH para el resto de workers y reinicios.
+        """
+        if self.is_trained:
+            return
+        
+        self.model = model_store.get_or_create(self.artifact_name, self._create_dummy_model)
+        self.feature_names = list(getattr(self.model, "feature_names_in_", FEATURE_COLUMNS))
+        
+        # Inicializar explainer SHAP
+        try:
+            self.explainer = shap.TreeExplainer(self.model)
+            logger.info("✅ SHAP explainer inicializado")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo inicializar SHAP explainer: {e}")
+            self.explainer = None
+        
+        # Al final: quien vea is_trained ya tiene modelo y explainer
+        self.is_trained = True
+    
+    async def ensure_loaded(self):
+        """
+        Cargar (o entrenar) el modelo sin bloquear el event loop.
+        
+        La carga se ejecuta en un hilo con asyncio.to_thread; el lock hace que
+        las peticiones concurrentes de un arranque en frío esperen a esa misma
+        carga en lugar de ocupar otro hilo cada una.
+        """
+        if self.is_trained:
+            return
+        async with self._load_lock:
+            if not self.is_trained:
+                await asyncio.to_thread(self._load_model)
     
     def _create_dummy_model(self):
         """Crear modelo dummy para demostración"""
@@ -186,14 +219,14 @@ class PredictiveMLModel:
         
         # Entrenar modelo
         if self.model_type == "lightgbm":
-            self.model = lgb.LGBMClassifier(
+            model = lgb.LGBMClassifier(
                 n_estimators=100,
                 max_depth=5,
                 learning_rate=0.1,
                 random_state=42
             )
         elif self.model_type == "xgboost":
-            self.model = xgb.XGBClassifier(
+            model = xgb.XGBClassifier(
                 n_estimators=100,
                 max_depth=5,
                 learning_rate=0.1,
@@ -201,18 +234,10 @@ class PredictiveMLModel:
                 base_score=0.5  # Fix for SHAP compatibility
             )
         
-        self.model.fit(X, y)
-        self.feature_names = list(X.columns)
-        self.is_trained = True
-        
-        # Inicializar explainer
-        try:
-            self.explainer = shap.TreeExplainer(self.model)
-        except Exception as e:
-            logger.warning(f"⚠️ No se pudo inicializar SHAP explainer: {e}")
-            self.explainer = None
+        model.fit(X, y)
         
         logger.info(f"✅ Modelo dummy {self.model_type} entrenado con {n_samples} muestras")
+        return model
     
     def _features_to_dataframe(self, features: DocumentFeatures) -> pd.DataFrame:
         """Convertir features a DataFrame para predicción"""
@@ -239,6 +264,7 @@ class PredictiveMLModel:
         """
         start_time = datetime.now()
         
+        self._load_model()
         if not self.is_trained:
             raise ValueError("Modelo no está entrenado")
         
@@ -314,6 +340,15 @@ class PredictiveMLModel:
 lightgbm_model = PredictiveMLModel(model_type="lightgbm")
 xgboost_model = PredictiveMLModel(model_type="xgboost")
 
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+
+@app.on_event("startup")
+async def preload_models():
+    """Dejar los modelos listos antes de aceptar tráfico si PRELOAD_MODELS=true"""
+    if PRELOAD_MODELS:
+        await lightgbm_model.ensure_loaded()
+        await xgboost_model.ensure_loaded()
+
 def get_model(model_type: str) -> PredictiveMLModel:
     """Obtener modelo según tipo"""
     if model_type == "lightgbm":
@@ -361,6 +396,9 @@ async def health_check():
         "models_loaded": {
             "lightgbm": lightgbm_model.is_trained,
             "xgboost": xgboost_model.is_trained
+        },
+        "model_load_times_ms": {
+            name: round(seconds * 1000, 2) for name, seconds in model_store.load_times().items()
         }
     }
 
@@ -378,6 +416,7 @@ async def predict(request: PredictionRequest):
     try:
         with prediction_latency.labels(model=request.model_type).time():
             model = get_model(request.model_type)
+            await model.ensure_loaded()
             
             result = model.predict(request.features, explain=request.explain)
             
@@ -410,6 +449,7 @@ async def batch_predict(request: BatchPredictionRequest):
         start_time = datetime.now()
         
         model = get_model(request.model_type)
+        await model.ensure_loaded()
         results = model.batch_predict(request.features_list, explain=request.explain)
         
         # Convertir a PredictionResult
@@ -446,6 +486,7 @@ async def explain_prediction(request: PredictionRequest):
     """
     try:
         model = get_model(request.model_type)
+        await model.ensure_loaded()
         result = model.predict(request.features, explain=True)
         
         return {
@@ -508,8 +549,7 @@ if __name__ == "__main__":
     import uvicorn
     
     logger.info(f"🚀 Starting SageMaker Predictive ML Service on port {SERVICE_PORT}")
-    logger.info(f"📊 LightGBM Model: {'✅ Loaded' if lightgbm_model.is_trained else '❌ Not loaded'}")
-    logger.info(f"📊 XGBoost Model: {'✅ Loaded' if xgboost_model.is_trained else '❌ Not loaded'}")
+    logger.info(f"📦 Model artifacts: {MODEL_PATH} ({'preload' if PRELOAD_MODELS else 'lazy load'})")
     logger.info(f"🔍 SHAP Explainability: Enabled")
     
     uvicorn.run(
@@ -5,6 +5,7 @@ Puerto: 8011
 """
 
 import os
+import asyncio
 import logging
 import pickle
 import numpy as np
@@ -26,6 +27,8 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.calibration import CalibratedClassifierCV
 import joblib
 
+from model_store import ModelArtifactStore
+
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,9 +43,34 @@ for collector in list(REGISTRY._collector_to_names.keys()):
 prediction_requests = Counter('sklearn_prediction_requests_total', 'Total prediction requests')
 prediction_duration = Histogram('sklearn_prediction_duration_seconds', 'Time to predict')
 model_loads = Counter('sklearn_model_loads_total', 'Model load operations', ['model_type'])
+model_load_duration = Histogram(
+    'sklearn_model_load_seconds',
+    'Time to make a model available (mmap load or training)',
+    ['model_type', 'source']
+)
 risk_scores = Histogram('sklearn_risk_scores', 'Distribution of risk scores')
 default_predictions = Counter('sklearn_default_predictions_total', 'Default predictions', ['prediction'])
 fraud_detections = Counter('sklearn_fraud_detections_total', 'Fraud detections')
+batch_sizes = Histogram(
+    'sklearn_batch_prediction_size',
+    'Customers scored per batch request',
+    buckets=(1, 10, 100, 1000, 10000, 100000)
+)
+
+# Límite de clientes por petición batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 50000))
+
+# Artefactos de modelo (compartidos entre workers vía mmap)
+MODEL_PATH = os.getenv("MODEL_PATH", "./models")
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+
+
+def _record_model_load(name: str, source: str, seconds: float):
+    model_loads.labels(model_type=name).inc()
+    model_load_duration.labels(model_type=name, source=source).observe(seconds)
+
+
+model_store = ModelArtifactStore(MODEL_PATH, on_load=_record_model_load)
 
 
 @asynccontextmanager
@@ -50,13 +78,12 @@ async def lifespan(app: FastAPI):
     """Lifecycle manager"""
     logger.info("🚀 Starting Scikit-Learn Credit Risk ML Service...")
     
-    # Initialize models
-    global credit_risk_model, fraud_detector, scaler
-    credit_risk_model = _create_credit_risk_model()
-    fraud_detector = _create_fraud_detector()
-    scaler = StandardScaler()
-    
-    logger.info("✅ Models initialized")
+    # Los modelos se cargan bajo demanda desde el artifact store;
+    # PRELOAD_MODELS=true los deja listos antes de aceptar tráfico
+    if PRELOAD_MODELS:
+        await get_credit_risk_model()
+        await get_fraud_detector()
+        logger.info("✅ Models initialized")
     yield
     logger.info("👋 Shutting down Scikit-Learn Credit Risk ML Service")
 
@@ -156,6 +183,12 @@ class PredictionRequest(BaseModel):
     explain: bool = Field(True, description="Incluir explicación")
 
 
+class BatchPredictionRequest(BaseModel):
+    requests: List[PredictionRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="Clientes a evaluar"
+    )
+
+
 class FeatureImportance(BaseModel):
     feature_name: str
     importance: float
@@ -202,6 +235,14 @@ class PredictionResponse(BaseModel):
     processing_time_ms: float
 
 
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    total: int
+    suspicious_count: int
+    model_version: str
+    processing_time_ms: float
+
+
 # ============================================
 # MODEL CREATION
 # ============================================
@@ -210,8 +251,8 @@ def _create_credit_risk_model():
     """Crea modelo de riesgo crediticio (dummy para desarrollo)"""
     logger.info("📊 Creating credit risk model...")
     
-    # En producción, cargar modelo entrenado
-    # model = joblib.load('models/credit_risk_model.pkl')
+    # Sólo se ejecuta si no hay artefacto en MODEL_PATH; en producción
+    # publicar ahí el modelo entrenado (ver training.py)
     
     # Para desarrollo: modelo dummy
     model = GradientBoostingClassifier(
@@ -222,7 +263,7 @@ def _create_credit_risk_model():
     )
     
     # Entrenar con datos dummy
-    X_dummy = np.random.randn(1000, 20)
+    X_dummy = np.random.randn(1000, len(FeatureEngineer.get_feature_names()))
     y_dummy = np.random.randint(0, 2, 1000)
     model.fit(X_dummy, y_dummy)
     
@@ -230,8 +271,7 @@ def _create_credit_risk_model():
     calibrated_model = CalibratedClassifierCV(model, cv=3, method='sigmoid')
     calibrated_model.fit(X_dummy, y_dummy)
     
-    model_loads.labels(model_type='credit_risk').inc()
-    logger.info("✅ Credit risk model loaded")
+    logger.info("✅ Credit risk model trained")
     
     return calibrated_model
 
@@ -248,15 +288,34 @@ def _create_fraud_detector():
     )
     
     # Entrenar con datos dummy
-    X_dummy = np.random.randn(1000, 20)
+    X_dummy = np.random.randn(1000, len(FeatureEngineer.get_feature_names()))
     detector.fit(X_dummy)
     
-    model_loads.labels(model_type='fraud_detector').inc()
-    logger.info("✅ Fraud detector loaded")
+    logger.info("✅ Fraud detector trained")
     
     return detector
 
 
+async def _get_model(name: str, factory):
+    """
+    Modelo del artifact store. La primera carga (o el entrenamiento si no hay
+    artefacto) se ejecuta en un hilo para no bloquear el event loop.
+    """
+    if model_store.is_loaded(name):
+        return model_store.get_or_create(name, factory)
+    return await asyncio.to_thread(model_store.get_or_create, name, factory)
+
+
+async def get_credit_risk_model() -> CalibratedClassifierCV:
+    """Modelo de riesgo (carga perezosa desde el artifact store)"""
+    return await _get_model("credit_risk", _create_credit_risk_model)
+
+
+async def get_fraud_detector() -> IsolationForest:
+    """Detector de fraude (carga perezosa desde el artifact store)"""
+    return await _get_model("fraud_detector", _create_fraud_detector)
+
+
 # ============================================
 # FEATURE ENGINEERING
 # ============================================
@@ -270,65 +329,93 @@ class FeatureEngineer:
         unstructured: Optional[UnstructuredFeatures]
     ) -> np.ndarray:
         """Crea vector de features combinadas"""
+        return FeatureEngineer.create_feature_matrix([structured], [unstructured])
+    
+    @staticmethod
+    def create_feature_matrix(
+        structured: List[StructuredFeatures],
+        unstructured: List[Optional[UnstructuredFeatures]]
+    ) -> np.ndarray:
+        """
+        Crea la matriz de features (n_clientes x 22) de forma vectorizada.
         
-        features = []
+        Las transformaciones se aplican por columna sobre todo el lote,
+        de modo que un único predict_proba puede puntuar la cartera completa.
+        """
+        n = len(structured)
         
         # === FEATURES ESTRUCTURADAS ===
+        raw = np.array([
+            (
+                s.age, s.income, s.employment_years,
+                s.credit_history_months, s.num_previous_loans, s.num_defaults,
+                s.external_credit_score or 0,
+                s.loan_amount, s.loan_duration_months,
+                s.customer_tenure_months, s.num_products, s.avg_balance
+            )
+            for s in structured
+        ], dtype=np.float64).reshape(n, 12)
+        (age, income, employment_years, credit_history, num_loans, num_defaults,
+         external_score, loan_amount, loan_duration, tenure, num_products,
+         avg_balance) = raw.T
+        
+        features = np.empty((n, 22), dtype=np.float64)
         
         # Demográficas normalizadas
-        features.append(structured.age / 100.0)
-        features.append(np.log1p(structured.income) / 15.0)  # Log-transform
-        features.append(structured.employment_years / 40.0)
+        features[:, 0] = age / 100.0
+        features[:, 1] = np.log1p(income) / 15.0  # Log-transform
+        features[:, 2] = employment_years / 40.0
         
         # Historial crediticio
-        features.append(structured.credit_history_months / 120.0)
-        features.append(structured.num_previous_loans / 20.0)
-        features.append(structured.num_defaults / 5.0)
+        features[:, 3] = credit_history / 120.0
+        features[:, 4] = num_loans / 20.0
+        features[:, 5] = num_defaults / 5.0
         
-        # Score externo normalizado
-        if structured.external_credit_score:
-            features.append((structured.external_credit_score - 300) / 550.0)
-        else:
-            features.append(0.5)  # Valor medio si no disponible
+        # Score externo normalizado (valor medio si no disponible)
+        features[:, 6] = np.where(external_score > 0, (external_score - 300) / 550.0, 0.5)
         
         # Operación actual
-        features.append(np.log1p(structured.loan_amount) / 15.0)
-        features.append(structured.loan_duration_months / 360.0)
+        features[:, 7] = np.log1p(loan_amount) / 15.0
+        features[:, 8] = loan_duration / 360.0
         
         # Ratios importantes
-        debt_to_income = structured.loan_amount / max(structured.income, 1)
-        features.append(min(debt_to_income, 2.0) / 2.0)  # Cap at 2.0
+        safe_income = np.maximum(income, 1)
+        debt_to_income = loan_amount / safe_income
+        features[:, 9] = np.minimum(debt_to_income, 2.0) / 2.0  # Cap at 2.0
         
-        monthly_payment = structured.loan_amount / max(structured.loan_duration_months, 1)
-        payment_to_income = (monthly_payment * 12) / max(structured.income, 1)
-        features.append(min(payment_to_income, 1.0))  # Cap at 1.0
+        monthly_payment = loan_amount / np.maximum(loan_duration, 1)
+        payment_to_income = (monthly_payment * 12) / safe_income
+        features[:, 10] = np.minimum(payment_to_income, 1.0)  # Cap at 1.0
         
         # Relación con entidad
-        features.append(structured.customer_tenure_months / 120.0)
-        features.append(structured.num_products / 10.0)
-        features.append(np.log1p(structured.avg_balance) / 15.0)
+        features[:, 11] = tenure / 120.0
+        features[:, 12] = num_products / 10.0
+        features[:, 13] = np.log1p(avg_balance) / 15.0
         
         # === FEATURES NO ESTRUCTURADAS ===
+        has_docs = np.fromiter((u is not None for u in unstructured), dtype=bool, count=n)
+        docs = np.array([
+            (
+                u.doc_sentiment_score, u.risk_clauses_count, u.inconsistencies_detected,
+                u.payment_delay_mentions, u.legal_issues_mentions, u.restructuring_mentions,
+                u.document_completeness, u.document_quality_score
+            ) if u is not None else (0.0,) * 8
+            for u in unstructured
+        ], dtype=np.float64).reshape(n, 8)
         
-        if unstructured:
-            # Sentimiento
-            features.append((unstructured.doc_sentiment_score + 1) / 2.0)  # Normalize to [0,1]
-            
-            # Indicadores de riesgo documental
-            features.append(unstructured.risk_clauses_count / 10.0)
-            features.append(unstructured.inconsistencies_detected / 5.0)
-            features.append(unstructured.payment_delay_mentions / 5.0)
-            features.append(unstructured.legal_issues_mentions / 3.0)
-            features.append(unstructured.restructuring_mentions / 3.0)
-            
-            # Calidad documental
-            features.append(unstructured.document_completeness)
-            features.append(unstructured.document_quality_score)
-        else:
-            # Valores por defecto si no hay docs
-            features.extend([0.5] * 8)
+        # Sentimiento normalizado a [0,1]
+        features[:, 14] = (docs[:, 0] + 1) / 2.0
+        
+        # Indicadores de riesgo documental
+        features[:, 15:20] = docs[:, 1:6] / np.array([10.0, 5.0, 5.0, 3.0, 3.0])
         
-        return np.array(features).reshape(1, -1)
+        # Calidad documental
+        features[:, 20:22] = docs[:, 6:8]
+        
+        # Valores por defecto si no hay docs
+        features[~has_docs, 14:22] = 0.5
+        
+        return features
     
     @staticmethod
     def get_feature_names() -> List[str]:
@@ -382,6 +469,28 @@ class RiskAssessor:
         
         return (round(lower, 4), round(upper, 4))
     
+    @staticmethod
+    def assess_risk_batch(probabilities: np.ndarray) -> Tuple[List[RiskLevel], List[DecisionType]]:
+        """Versión vectorizada de assess_risk para un lote de probabilidades"""
+        levels = (RiskLevel.VERY_LOW, RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.VERY_HIGH)
+        decisions = (
+            DecisionType.APPROVED, DecisionType.APPROVED, DecisionType.APPROVED_WITH_CONDITIONS,
+            DecisionType.MANUAL_REVIEW, DecisionType.REJECTED
+        )
+        buckets = np.digitize(probabilities, [0.10, 0.20, 0.35, 0.50])
+        return [levels[b] for b in buckets], [decisions[b] for b in buckets]
+    
+    @staticmethod
+    def calculate_confidence_intervals(
+        probabilities: np.ndarray,
+        n_samples: int = 1000
+    ) -> np.ndarray:
+        """Calcula intervalos de confianza 95% para un lote (n x 2)"""
+        margin = 1.96 * np.sqrt(probabilities * (1 - probabilities) / n_samples)
+        lower = np.maximum(0.0, probabilities - margin)
+        upper = np.minimum(1.0, probabilities + margin)
+        return np.round(np.column_stack([lower, upper]), 4)
+    
     @staticmethod
     def create_explanation(
         features: np.ndarray,
@@ -447,6 +556,70 @@ class RiskAssessor:
             risk_level=risk_level,
             confidence=round(confidence, 3)
         )
+    
+    @staticmethod
+    def create_explanations(
+        features: np.ndarray,
+        feature_names: List[str],
+        risk_levels: List[RiskLevel]
+    ) -> List[RiskExplanation]:
+        """
+        Crea explicaciones para un lote de predicciones.
+        
+        Las reglas y el ranking de importancias se evalúan sobre la matriz
+        completa; sólo el ensamblado de los textos se hace por fila.
+        """
+        risk_rules = (
+            features[:, 5] > 0.2,   # num_defaults
+            features[:, 9] > 0.5,   # debt_to_income
+            features[:, 15] > 0.3,  # risk_clauses
+            features[:, 17] > 0.2,  # payment_delays
+        )
+        protective_rules = (
+            (features[:, 6] > 0.7, "✅ Excelente score crediticio externo"),
+            (features[:, 11] > 0.5, "✅ Cliente de larga antigüedad"),
+            (features[:, 14] > 0.6, "✅ Sentimiento positivo en documentos"),
+            (features[:, 20] > 0.8, "✅ Documentación completa y de calidad"),
+        )
+        
+        # Top features por importancia (simplificado, igual que create_explanation)
+        head = features[:, :10]
+        importances = np.round(np.abs(head - 0.5), 3)
+        ranking = np.argsort(-importances, axis=1, kind="stable")[:, :5]
+        confidences = np.round(0.7 + features[:, 20] * 0.3, 3)
+        
+        explanations = []
+        for row, values in enumerate(features):
+            risk_factors = []
+            if risk_rules[0][row]:
+                risk_factors.append(f"⚠️ Historial de {int(values[5] * 5)} impagos previos")
+            if risk_rules[1][row]:
+                risk_factors.append(f"⚠️ Ratio deuda/ingresos alto ({values[9]:.1%})")
+            if risk_rules[2][row]:
+                risk_factors.append(f"⚠️ {int(values[15] * 10)} cláusulas de riesgo en documentos")
+            if risk_rules[3][row]:
+                risk_factors.append("⚠️ Menciones de retrasos de pago en documentos")
+            
+            protective_factors = [text for mask, text in protective_rules if mask[row]]
+            
+            top_features = [
+                FeatureImportance(
+                    feature_name=feature_names[i],
+                    importance=float(importances[row, i]),
+                    impact="positive" if head[row, i] < 0.5 else "negative"
+                )
+                for i in ranking[row]
+            ]
+            
+            explanations.append(RiskExplanation(
+                main_risk_factors=risk_factors if risk_factors else ["Sin factores de riesgo significativos"],
+                protective_factors=protective_factors if protective_factors else ["Perfil estándar"],
+                top_features=top_features,
+                risk_level=risk_levels[row],
+                confidence=float(confidences[row])
+            ))
+        
+        return explanations
 
 
 class FraudAnalyzer:
@@ -504,12 +677,70 @@ class FraudAnalyzer:
             suspicious_patterns=suspicious_patterns if suspicious_patterns else ["Sin patrones sospechosos detectados"],
             confidence=round(confidence, 3)
         )
-
-
-# Global instances
-credit_risk_model = None
-fraud_detector = None
-scaler = None
+    
+    @staticmethod
+    def analyze_fraud_batch(
+        features: np.ndarray,
+        detector: IsolationForest,
+        structured: List[StructuredFeatures],
+        unstructured: List[Optional[UnstructuredFeatures]]
+    ) -> List[FraudAnalysis]:
+        """
+        Analiza posible fraude para un lote de clientes.
+        
+        Ejecuta score_samples una sola vez y deriva la predicción a partir
+        del offset del detector (equivalente a detector.predict).
+        """
+        n = len(structured)
+        anomaly_scores = detector.score_samples(features)
+        is_suspicious = (anomaly_scores - detector.offset_) < 0
+        normalized_scores = 1 / (1 + np.exp(anomaly_scores))
+        
+        loan_amount, income, tenure = np.array([
+            (s.loan_amount, s.income, s.customer_tenure_months) for s in structured
+        ], dtype=np.float64).reshape(n, 3).T
+        inconsistencies, restructuring, completeness = np.array([
+            (u.inconsistencies_detected, u.restructuring_mentions, u.document_completeness)
+            if u is not None else (0, 0, 1.0)
+            for u in unstructured
+        ], dtype=np.float64).reshape(n, 3).T
+        
+        pattern_masks = (
+            loan_amount > income * 3,
+            (tenure < 6) & (loan_amount > 50000),
+            inconsistencies > 2,
+            restructuring > 1,
+            completeness < 0.5,
+        )
+        num_patterns = np.sum(pattern_masks, axis=0)
+        confidences = np.round(np.minimum(0.95, normalized_scores + 0.1 * num_patterns), 3)
+        
+        suspicious_count = int(is_suspicious.sum())
+        if suspicious_count:
+            fraud_detections.inc(suspicious_count)
+        
+        analyses = []
+        for row in range(n):
+            suspicious_patterns = []
+            if pattern_masks[0][row]:
+                suspicious_patterns.append("Monto solicitado muy alto respecto a ingresos")
+            if pattern_masks[1][row]:
+                suspicious_patterns.append("Cliente nuevo solicitando monto elevado")
+            if pattern_masks[2][row]:
+                suspicious_patterns.append(f"{int(inconsistencies[row])} inconsistencias en documentos")
+            if pattern_masks[3][row]:
+                suspicious_patterns.append("Múltiples reestructuraciones mencionadas")
+            if pattern_masks[4][row]:
+                suspicious_patterns.append("Documentación significativamente incompleta")
+            
+            analyses.append(FraudAnalysis(
+                is_suspicious=bool(is_suspicious[row]),
+                anomaly_score=round(float(normalized_scores[row]), 4),
+                suspicious_patterns=suspicious_patterns if suspicious_patterns else ["Sin patrones sospechosos detectados"],
+                confidence=float(confidences[row])
+            ))
+        
+        return analyses
 
 
 # ============================================
@@ -524,8 +755,11 @@ async def health_check():
         "service": "sklearn-credit-risk",
         "version": "1.0.0",
         "models_loaded": {
-            "credit_risk": credit_risk_model is not None,
-            "fraud_detector": fraud_detector is not None
+            "credit_risk": model_store.is_loaded("credit_risk"),
+            "fraud_detector": model_store.is_loaded("fraud_detector")
+        },
+        "model_load_times_ms": {
+            name: round(seconds * 1000, 2) for name, seconds in model_store.load_times().items()
         },
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -555,7 +789,7 @@ async def predict_risk(request: PredictionRequest):
             feature_names = FeatureEngineer.get_feature_names()
             
             # 2. Predicción de riesgo
-            probability = credit_risk_model.predict_proba(features)[0][1]
+            probability = (await get_credit_risk_model()).predict_proba(features)[0][1]
             calibrated_prob = probability  # Ya está calibrado
             
             # 3. Score de riesgo (0-100)
@@ -585,7 +819,7 @@ async def predict_risk(request: PredictionRequest):
             if request.check_fraud:
                 fraud_analysis = FraudAnalyzer.analyze_fraud(
                     features,
-                    fraud_detector,
+                    await get_fraud_detector(),
                     request.structured_features,
                     request.unstructured_features
                 )
@@ -616,6 +850,110 @@ async def predict_risk(request: PredictionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_risk_batch(request: BatchPredictionRequest):
+    """
+    Predice riesgo de impago para un lote de clientes (stress tests de cartera).
+    
+    Construye una única matriz de features y ejecuta un solo predict_proba
+    del modelo de riesgo y un solo score_samples del detector de fraude.
+    """
+    items = request.requests
+    n = len(items)
+    prediction_requests.inc(n)
+    batch_sizes.observe(n)
+    start_time = datetime.utcnow()
+    
+    try:
+        with prediction_duration.time():
+            structured = [item.structured_features for item in items]
+            unstructured = [item.unstructured_features for item in items]
+            
+            # 1. Feature engineering (matriz n x 22)
+            features = FeatureEngineer.create_feature_matrix(structured, unstructured)
+            feature_names = FeatureEngineer.get_feature_names()
+            
+            # 2. Predicción de riesgo (ya calibrada)
+            probabilities = (await get_credit_risk_model()).predict_proba(features)[:, 1]
+            risk_score_values = np.round(probabilities * 100, 2)
+            for score in risk_score_values:
+                risk_scores.observe(score)
+            
+            defaults = int((probabilities > 0.5).sum())
+            if defaults:
+                default_predictions.labels(prediction="1").inc(defaults)
+            if n - defaults:
+                default_predictions.labels(prediction="0").inc(n - defaults)
+            
+            # 3. Nivel de riesgo, decisión e intervalos de confianza
+            risk_levels, decisions = RiskAssessor.assess_risk_batch(probabilities)
+            conf_intervals = RiskAssessor.calculate_confidence_intervals(probabilities)
+            
+            # 4. Explicaciones (sólo para las filas que las piden)
+            explanations: List[Optional[RiskExplanation]] = [None] * n
+            explain_rows = np.flatnonzero([item.explain for item in items])
+            if explain_rows.size:
+                batch_explanations = RiskAssessor.create_explanations(
+                    features[explain_rows],
+                    feature_names,
+                    [risk_levels[i] for i in explain_rows]
+                )
+                for row, explanation in zip(explain_rows, batch_explanations):
+                    explanations[row] = explanation
+            
+            # 5. Análisis de fraude (sólo para las filas que lo piden)
+            fraud_analyses: List[Optional[FraudAnalysis]] = [None] * n
+            fraud_rows = np.flatnonzero([item.check_fraud for item in items])
+            if fraud_rows.size:
+                batch_fraud = FraudAnalyzer.analyze_fraud_batch(
+                    features[fraud_rows],
+                    await get_fraud_detector(),
+                    [structured[i] for i in fraud_rows],
+                    [unstructured[i] for i in fraud_rows]
+                )
+                for row, analysis in zip(fraud_rows, batch_fraud):
+                    fraud_analyses[row] = analysis
+            
+            timestamp = datetime.utcnow().isoformat()
+            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            per_item_time = round(processing_time / n, 2)
+            
+            predictions = [
+                PredictionResponse(
+                    customer_id=item.customer_id,
+                    default_probability=round(float(probabilities[i]), 4),
+                    risk_score=float(risk_score_values[i]),
+                    risk_level=risk_levels[i],
+                    decision=decisions[i],
+                    fraud_analysis=fraud_analyses[i],
+                    explanation=explanations[i],
+                    calibrated_probability=round(float(probabilities[i]), 4),
+                    confidence_interval=(float(conf_intervals[i, 0]), float(conf_intervals[i, 1])),
+                    model_version="1.0.0",
+                    prediction_timestamp=timestamp,
+                    processing_time_ms=per_item_time
+                )
+                for i, item in enumerate(items)
+            ]
+            
+            suspicious_count = sum(
+                1 for analysis in fraud_analyses if analysis is not None and analysis.is_suspicious
+            )
+            
+            logger.info(f"✅ Batch prediction for {n} customers in {processing_time:.2f}ms")
+            return BatchPredictionResponse(
+                predictions=predictions,
+                total=n,
+                suspicious_count=suspicious_count,
+                model_version="1.0.0",
+                processing_time_ms=round(processing_time, 2)
+            )
+            
+    except Exception as e:
+        logger.error(f"❌ Error in batch prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/model-info")
 async def get_model_info():
     """Información del modelo"""
@@ -637,6 +975,7 @@ async def get_model_info():
             "default_probability_prediction",
             "risk_scoring",
             "fraud_detection",
+            "batch_prediction",
             "feature_importance",
             "calibrated_probabilities",
             "confidence_intervals"
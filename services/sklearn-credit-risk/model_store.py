@@ -0,0 +1,131 @@
+"""
+Model Artifact Store
+Persistencia de modelos entrenados con joblib y carga memory-mapped compartida entre workers
+"""
+
+import os
+import time
+import fcntl
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+class ModelArtifactStore:
+    """
+    Almacén de artefactos de modelo en disco.
+
+    - Los modelos se guardan sin compresión para que joblib pueda abrir sus
+      arrays NumPy con ``mmap_mode="r"``: las páginas son de sólo lectura y el
+      page cache del sistema las comparte entre todos los workers de uvicorn.
+    - La carga es perezosa y se cachea por proceso.
+    - Si el artefacto no existe, un único proceso lo entrena (file lock) y el
+      resto espera y lo carga desde disco en lugar de entrenar otra copia.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        on_load: Optional[Callable[[str, str, float], None]] = None
+    ):
+        """
+        Args:
+            base_path: Directorio de artefactos
+            on_load: Callback (name, source, seconds) para métricas de carga;
+                source es "mmap" o "trained"
+        """
+        self.base_path = Path(base_path)
+        self.on_load = on_load
+        self._models: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def artifact_path(self, name: str) -> Path:
+        return self.base_path / f"{name}.pkl"
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def load_times(self) -> Dict[str, float]:
+        """Tiempos de carga (segundos) de los modelos de este proceso"""
+        return dict(self._load_times)
+
+    def save(self, name: str, model: Any) -> Path:
+        """Guarda un modelo de forma atómica (escritura a temporal + rename)"""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        path = self.artifact_path(name)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_path, prefix=f".{name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            # compress=0: requisito para poder hacer mmap de los arrays
+            joblib.dump(model, tmp_path, compress=0)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        logger.info(f"💾 Model artifact saved: {path}")
+        return path
+
+    def get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Devuelve el modelo ``name``, cargándolo desde disco o entrenándolo con
+        ``factory`` (y guardándolo) la primera vez que se necesita.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            start = time.perf_counter()
+            path = self.artifact_path(name)
+            source = "mmap"
+
+            if path.exists():
+                model = self._load(path)
+            else:
+                self.base_path.mkdir(parents=True, exist_ok=True)
+                with open(self.base_path / f".{name}.lock", "w") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        # Otro worker pudo entrenarlo mientras esperábamos el lock
+                        if path.exists():
+                            model = self._load(path)
+                        else:
+                            source = "trained"
+                            self.save(name, factory())
+                            # Recargar con mmap para compartir páginas con el resto de workers
+                            model = self._load(path)
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+            elapsed = time.perf_counter() - start
+            self._models[name] = model
+            self._load_times[name] = elapsed
+
+            if self.on_load:
+                self.on_load(name, source, elapsed)
+
+            logger.info(f"✅ Model '{name}' ready ({source}) in {elapsed * 1000:.1f}ms")
+            return model
+
+    def invalidate(self, name: str) -> None:
+        """Descarta la copia en memoria (p. ej. tras publicar un nuevo artefacto)"""
+        with self._lock:
+            self._models.pop(name, None)
+            self._load_times.pop(name, None)
+
+    @staticmethod
+    def _load(path: Path) -> Any:
+        return joblib.load(path, mmap_mode="r")
@@ -7,10 +7,12 @@ import os
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 import joblib
 
+from model_store import ModelArtifactStore
+
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, IsolationForest
 from sklearn.linear_model import LogisticRegression
@@ -317,6 +319,11 @@ class ModelTrainer:
         }
         joblib.dump(metadata, metadata_path)
         
+        # Publicar como versión activa (sin compresión, cargable con mmap por main.py)
+        store = ModelArtifactStore(self.model_dir)
+        store.save("credit_risk", credit_risk_model)
+        store.save("fraud_detector", fraud_detector)
+        
         logger.info(f"✅ Models saved:")
         logger.info(f"   - Credit Risk: {model_path}")
         logger.info(f"   - Fraud Detector: {fraud_path}")
@@ -49,7 +49,7 @@ def sap_config():
 
 @pytest.fixture
 def mock_sap_session():
-    """Mock de requests.Session para SAP"""
+    """Mock de httpx.AsyncClient para SAP"""
     session = Mock()
     
     # Mock response exitoso para auth
@@ -114,10 +114,16 @@ def mock_sap_session():
         }
     }
     
-    # Mock para descargar contenido
-    content_response = Mock()
+    # Mock para descargar contenido (streaming)
+    async def aiter_bytes(chunk_size=None):
+        yield b"PDF content "
+        yield b"here"
+    
+    content_response = MagicMock()
     content_response.status_code = 200
-    content_response.content = b"PDF content here"
+    content_response.aiter_bytes = aiter_bytes
+    content_response.__aenter__ = AsyncMock(return_value=content_response)
+    content_response.__aexit__ = AsyncMock(return_value=False)
     
     # Mock para upload
     upload_response = Mock()
@@ -135,8 +141,6 @@ def mock_sap_session():
     def side_effect_get(url, *args, **kwargs):
         if "Repositories" in url:
             return repos_response
-        elif "Documents(" in url and "$value" in url:
-            return content_response
         elif "Documents(" in url:
             return doc_response
         elif "Documents" in url:
@@ -144,9 +148,10 @@ def mock_sap_session():
         else:
             return auth_response
     
-    session.get.side_effect = side_effect_get
-    session.post.return_value = upload_response
-    session.put.return_value = Mock(status_code=204)
+    session.get = AsyncMock(side_effect=side_effect_get)
+    session.stream = Mock(return_value=content_response)
+    session.post = AsyncMock(return_value=upload_response)
+    session.put = AsyncMock(return_value=Mock(status_code=204))
     
     return session
 
@@ -165,7 +170,7 @@ class TestSAPDMSConnector:
         assert connector._authenticated == False
         assert len(connector.SAP_TO_FINANCIA_MAPPING) > 0
     
-    @patch('backend.connectors.sap_dms_connector.requests.Session')
+    @patch('backend.connectors.sap_dms_connector.httpx.AsyncClient')
     async def test_authenticate_success(self, mock_session_class, sap_config, mock_sap_session):
         """Test: Autenticación básica exitosa"""
         mock_session_class.return_value = mock_sap_session
@@ -180,13 +185,13 @@ class TestSAPDMSConnector:
         # Verificar que se configuró auth básica
         mock_sap_session.get.assert_called()
     
-    @patch('backend.connectors.sap_dms_connector.requests.Session')
+    @patch('backend.connectors.sap_dms_connector.httpx.AsyncClient')
     async def test_authenticate_invalid_credentials(self, mock_session_class, sap_config):
         """Test: Autenticación con credenciales inválidas"""
         mock_session = Mock()
         mock_response = Mock()
         mock_response.status_code = 401
-        mock_session.get.return_value = mock_response
+        mock_session.get = AsyncMock(return_value=mock_response)
         mock_session_class.return_value = mock_session
         
         connector = SAPDMSConnector(sap_config)
@@ -378,6 +383,123 @@ class TestSAPDMSConnector:
         with pytest.raises(Exception, match="Not authenticated"):
             await connector.search_documents("FI_DOCUMENTS")
     
+    async def test_iter_documents_follows_next_link(self, sap_config):
+        """Test: Paginación del servidor con __next"""
+        connector = SAPDMSConnector(sap_config)
+        page1 = Mock()
+        page1.json.return_value = {"d": {
+            "results": [{"DOKNR": "DOC001", "DOKAR": "INVOICE"}],
+            "__next": "https://sap-test.company.com/next-page"
+        }}
+        page2 = Mock()
+        page2.json.return_value = {"d": {"results": [{"DOKNR": "DOC002", "DOKAR": "INVOICE"}]}}
+        connector.session = Mock()
+        connector.session.get = AsyncMock(side_effect=[page1, page2])
+        
+        docs = [doc async for doc in connector.iter_documents("FI_DOCUMENTS")]
+        
+        assert [doc.metadata["sap_document_number"] for doc in docs] == ["DOC001", "DOC002"]
+        assert connector.session.get.call_args_list[1].args[0] == "https://sap-test.company.com/next-page"
+    
+    async def test_iter_documents_skip_paging(self, sap_config):
+        """Test: Paginación con $skip cuando no hay __next"""
+        sap_config.batch_size = 2
+        connector = SAPDMSConnector(sap_config)
+        full_page = Mock()
+        full_page.json.return_value = {"d": {"results": [{"DOKNR": "A"}, {"DOKNR": "B"}]}}
+        last_page = Mock()
+        last_page.json.return_value = {"d": {"results": [{"DOKNR": "C"}]}}
+        connector.session = Mock()
+        connector.session.get = AsyncMock(side_effect=[full_page, last_page])
+        
+        docs = [doc async for doc in connector.iter_documents("FI_DOCUMENTS")]
+        
+        assert len(docs) == 3
+        first_params = connector.session.get.call_args_list[0].kwargs["params"]
+        second_params = connector.session.get.call_args_list[1].kwargs["params"]
+        assert first_params["$top"] == 2
+        assert "$skip" not in first_params
+        assert second_params["$skip"] == 2
+    
+    async def test_iter_documents_next_link_then_skip(self, sap_config):
+        """Test: Las filas leídas vía __next cuentan para el $skip siguiente"""
+        sap_config.batch_size = 2
+        connector = SAPDMSConnector(sap_config)
+        first_page = Mock()
+        first_page.json.return_value = {"d": {
+            "results": [{"DOKNR": "A"}, {"DOKNR": "B"}],
+            "__next": "https://sap-test.company.com/next-page"
+        }}
+        next_page = Mock()
+        next_page.json.return_value = {"d": {"results": [{"DOKNR": "C"}, {"DOKNR": "D"}]}}
+        last_page = Mock()
+        last_page.json.return_value = {"d": {"results": []}}
+        connector.session = Mock()
+        connector.session.get = AsyncMock(side_effect=[first_page, next_page, last_page])
+        
+        docs = [doc async for doc in connector.iter_documents("FI_DOCUMENTS")]
+        
+        assert len(docs) == 4
+        assert connector.session.get.call_args_list[2].kwargs["params"]["$skip"] == 4
+    
+    async def test_sync_resumes_from_checkpoint(self, sap_config, tmp_path):
+        """Test: Una sync interrumpida se reanuda desde el checkpoint con $skip"""
+        sap_config.batch_size = 2
+        sap_config.state_path = str(tmp_path / "state.db")
+        connector = SAPDMSConnector(sap_config)
+        async def iter_content(doc_id):
+            yield doc_id.encode()
+        connector.iter_document_content = iter_content
+        ingested = {}
+        
+        spooled = []
+        
+        async def ingest(doc, path, metadata):
+            spooled.append(path)
+            with open(path, "rb") as f:
+                ingested[doc.id] = f.read()
+        full_page = Mock()
+        full_page.json.return_value = {"d": {"results": [{"DOKNR": "A"}, {"DOKNR": "B"}]}}
+        last_page = Mock()
+        last_page.json.return_value = {"d": {"results": [{"DOKNR": "C"}]}}
+        connector.session = Mock()
+        connector.session.get = AsyncMock(side_effect=[full_page, Exception("connection reset")])
+        
+        stats = await connector.sync_to_financia("FI_DOCUMENTS", ingest=ingest)
+        
+        assert stats["error"] == "connection reset"
+        checkpoint = connector.state_store.get_checkpoint(sap_config.name, "FI_DOCUMENTS")
+        assert checkpoint["status"] == "running"
+        assert checkpoint["position"] == 2
+        
+        connector.session.get = AsyncMock(side_effect=[last_page])
+        stats = await connector.sync_to_financia("FI_DOCUMENTS", ingest=ingest)
+        
+        assert stats["resumed_from"] == 2
+        assert stats["synced"] == 1
+        assert connector.session.get.call_args.kwargs["params"]["$skip"] == 2
+        assert len(ingested) == 3
+        assert all(content == doc_id.encode() for doc_id, content in ingested.items())
+        assert not any(os.path.exists(path) for path in spooled)
+        checkpoint = connector.state_store.get_checkpoint(sap_config.name, "FI_DOCUMENTS")
+        assert checkpoint["status"] == "completed"
+        assert checkpoint["position"] == 3
+    
+    async def test_download_document_to_file(self, sap_config, mock_sap_session, tmp_path):
+        """Test: Descarga en streaming a fichero"""
+        connector = SAPDMSConnector(sap_config)
+        connector.session = mock_sap_session
+        destination = str(tmp_path / "doc.pdf")
+        
+        path = await connector.download_document_to_file(
+            "FI_DOCUMENTS|INVOICE|DOC001|01|000", destination
+        )
+        
+        assert path == destination
+        with open(path, "rb") as f:
+            assert f.read() == b"PDF content here"
+        assert "$value" in mock_sap_session.stream.call_args.args[1]
+    
     async def test_oauth2_not_implemented(self, sap_config):
         """Test: OAuth2 aún no implementado"""
         sap_config.auth_type = "oauth2"
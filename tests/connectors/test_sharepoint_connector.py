@@ -11,8 +11,9 @@ from datetime import datetime
 import sys
 import os
 
-# Add backend to path
+# Add repo root and backend to path (la ingesta por defecto importa ``core`` y ``models`` como el backend)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
 
 from backend.connectors.sharepoint_connector import (
     SharePointConnector,
@@ -21,6 +22,22 @@ from backend.connectors.sharepoint_connector import (
 )
 
 
+def mock_download_session(*chunks):
+    """Cliente HTTP simulado que descarga ``chunks`` en streaming"""
+    async def aiter_bytes(chunk_size=None):
+        for chunk in chunks:
+            yield chunk
+    
+    response = MagicMock()
+    response.aiter_bytes = aiter_bytes
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=False)
+    
+    session = Mock()
+    session.stream = Mock(return_value=response)
+    return session
+
+
 @pytest.fixture
 def sharepoint_config():
     """Configuración de prueba para SharePoint"""
@@ -83,6 +100,7 @@ def mock_graph_client():
     mock_item.last_modified_by = Mock(user=Mock(display_name="Test User"))
     mock_item.web_url = "https://test.sharepoint.com/test.pdf"
     mock_item.e_tag = "test-etag"
+    mock_item.additional_data = {"@microsoft.graph.downloadUrl": "https://download.test/test-item-123"}
     
     items_response = Mock()
     items_response.value = [mock_item]
@@ -96,14 +114,6 @@ def mock_graph_client():
         return_value=mock_item
     )
     
-    # Mock content download
-    mock_content_stream = AsyncMock()
-    mock_content_stream.read = AsyncMock(return_value=b"Test PDF content")
-    
-    client.sites.by_site_id().drives.by_drive_id().items.by_drive_item_id().content.get = AsyncMock(
-        return_value=mock_content_stream
-    )
-    
     return client
 
 
@@ -273,13 +283,32 @@ class TestSharePointConnector:
         """Test: Descargar documento"""
         connector = SharePointConnector(sharepoint_config)
         connector.client = mock_graph_client
+        connector.download_session = mock_download_session(b"Test PDF ", b"content")
         connector._authenticated = True
         
         document_id = "test-site-123|test-drive-123|test-item-123"
         content = await connector.download_document(document_id)
         
         assert content == b"Test PDF content"
-        assert len(content) > 0
+        connector.download_session.stream.assert_called_once_with(
+            "GET", "https://download.test/test-item-123"
+        )
+    
+    async def test_download_document_to_file(self, sharepoint_config, mock_graph_client, tmp_path):
+        """Test: Descarga en streaming a fichero por trozos, sin content.get()"""
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        connector.client = mock_graph_client
+        connector.download_session = mock_download_session(b"Test PDF ", b"content")
+        destination = str(tmp_path / "doc.pdf")
+        
+        path = await connector.download_document_to_file(
+            "test-site-123|test-drive-123|test-item-123", destination
+        )
+        
+        with open(path, "rb") as f:
+            assert f.read() == b"Test PDF content"
+        assert connector.download_session.stream.call_args.args == ("GET", "https://download.test/test-item-123")
     
     async def test_map_metadata(self, sharepoint_config):
         """Test: Mapeo de metadata"""
@@ -311,6 +340,174 @@ class TestSharePointConnector:
             await connector.list_repositories()
 
 
+def _make_item(item_id, name, e_tag, parent_path="/drives/test-drive-123/root:"):
+    item = Mock()
+    item.id = item_id
+    item.name = name
+    item.size = 10
+    item.file = Mock(mime_type="application/pdf")
+    item.deleted = None
+    item.created_date_time = datetime.now()
+    item.last_modified_date_time = datetime.now()
+    item.created_by = None
+    item.last_modified_by = None
+    item.web_url = f"https://test.sharepoint.com/{name}"
+    item.e_tag = e_tag
+    item.parent_reference = Mock(path=parent_path)
+    item.additional_data = {"@microsoft.graph.downloadUrl": f"https://download.test/{item_id}"}
+    return item
+
+
+@pytest.fixture
+def delta_graph_client():
+    """Mock de Graph con delta query paginada (2 páginas + deltaLink)"""
+    client = Mock()
+    client.sites.by_site_id = Mock(return_value=Mock())
+    client.sites.by_site_id().get = AsyncMock(return_value=Mock(display_name="Corporate"))
+    
+    drive = Mock()
+    drive.id = "test-drive-123"
+    drive.name = "Shared Documents"
+    client.sites.by_site_id().drives.get = AsyncMock(return_value=Mock(value=[drive]))
+    
+    deleted = _make_item("gone", "old.pdf", "e0")
+    deleted.deleted = Mock()
+    
+    page1 = Mock(value=[_make_item("a", "a.pdf", "e1")], odata_next_link="https://graph/next", odata_delta_link=None)
+    page2 = Mock(
+        value=[_make_item("b", "b.pdf", "e2", "/drives/test-drive-123/root:/Contratos"), deleted],
+        odata_next_link=None,
+        odata_delta_link="https://graph/delta?token=1"
+    )
+    
+    delta = client.drives.by_drive_id().items.by_drive_item_id().delta
+    delta.get = AsyncMock(return_value=page1)
+    delta.with_url = Mock(return_value=Mock(get=AsyncMock(return_value=page2)))
+    
+    client.sites.by_site_id().drives.by_drive_id().items.by_drive_item_id().get = AsyncMock(
+        return_value=_make_item("a", "a.pdf", "e1")
+    )
+    return client
+
+
+@pytest.mark.asyncio
+class TestSharePointDeltaSync:
+    """Tests de sincronización incremental con delta queries"""
+    
+    async def test_iter_changes_follows_paging(self, sharepoint_config, delta_graph_client, tmp_path):
+        """Test: Delta recorre todas las páginas y deja el deltaLink pendiente"""
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        connector.client = delta_graph_client
+        
+        docs = [doc async for doc in connector.iter_changes("test-site-123")]
+        
+        assert [doc.name for doc in docs] == ["a.pdf", "b.pdf"]
+        assert docs[0].id == "test-site-123|test-drive-123|a"
+        assert docs[1].path == "Shared Documents/Contratos/b.pdf"
+        assert connector._pending_delta_tokens == {
+            "test-site-123|test-drive-123": "https://graph/delta?token=1"
+        }
+    
+    async def test_sync_skips_unchanged_and_resumes_from_delta(
+        self, sharepoint_config, delta_graph_client, tmp_path
+    ):
+        """Test: Segunda sync reanuda desde el deltaLink y omite eTags sin cambios"""
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        connector.client = delta_graph_client
+        connector.download_session = mock_download_session(b"content")
+        ingest = AsyncMock()
+        delete = AsyncMock(return_value=1)
+        
+        stats = await connector.sync_to_financia("test-site-123", ingest=ingest, delete=delete)
+        
+        assert stats["synced"] == 2
+        assert stats["deleted"] == 1
+        assert stats["errors"] == 0
+        assert ingest.await_count == 2
+        delete.assert_awaited_once_with("test-site-123|test-drive-123|gone")
+        assert connector.state_store.get_delta_token(
+            "Test SharePoint", "test-site-123|test-drive-123"
+        ) == "https://graph/delta?token=1"
+        
+        ingest.reset_mock()
+        stats = await connector.sync_to_financia("test-site-123", ingest=ingest, delete=delete)
+        
+        delta = delta_graph_client.drives.by_drive_id().items.by_drive_item_id().delta
+        delta.with_url.assert_any_call("https://graph/delta?token=1")
+        assert stats["total_documents"] == 1
+        assert stats["skipped"] == 1
+        assert ingest.await_count == 0
+    
+    async def test_failed_sync_keeps_previous_delta_token(
+        self, sharepoint_config, delta_graph_client, tmp_path
+    ):
+        """Test: Si falla la ingesta no se avanza el deltaLink"""
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        connector.client = delta_graph_client
+        connector.download_session = mock_download_session(b"content")
+        
+        stats = await connector.sync_to_financia(
+            "test-site-123",
+            ingest=AsyncMock(side_effect=RuntimeError("MinIO down")),
+            delete=AsyncMock(return_value=1)
+        )
+        
+        assert stats["errors"] == 2
+        assert connector.state_store.get_delta_token(
+            "Test SharePoint", "test-site-123|test-drive-123"
+        ) is None
+    
+    async def test_new_version_archives_previous_documents(self, sharepoint_config, tmp_path):
+        """Test: Reingerir un elemento modificado archiva las versiones anteriores del mismo source_id"""
+        from uuid import uuid4
+        import services.lazy as lazy_services
+        
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        new_version = Mock(id=uuid4())
+        previous = Mock(id=uuid4())
+        ingest_service = Mock(
+            ingest_document=AsyncMock(return_value=new_version),
+            delete_document=AsyncMock(return_value=True)
+        )
+        db = Mock(execute=AsyncMock(return_value=Mock(
+            scalars=Mock(return_value=Mock(all=Mock(return_value=[previous])))
+        )))
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=db)
+        session.__aexit__ = AsyncMock(return_value=False)
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"content v2")
+        
+        with patch("core.database.AsyncSessionLocal", Mock(return_value=session)), \
+                patch.object(lazy_services, "ingest_service", ingest_service), \
+                patch.object(connector, "_service_account_id", return_value=uuid4()):
+            document = await connector._ingest_document(
+                _make_item("a", "a.pdf", "e2"), str(path),
+                {"source": "sharepoint", "source_id": "test-site-123|test-drive-123|a"}
+            )
+        
+        assert document is new_version
+        ingest_service.delete_document.assert_awaited_once_with(previous, db)
+        query = str(db.execute.await_args.args[0])
+        assert "documents.id !=" in query
+        assert "documents.status !=" in query
+    
+    async def test_default_ingest_requires_service_account(self, sharepoint_config, tmp_path):
+        """Test: Sin cuenta de servicio la sync no empieza (no se ingiere con propietario nulo)"""
+        sharepoint_config.state_path = str(tmp_path / "state.db")
+        connector = SharePointConnector(sharepoint_config)
+        
+        with patch.object(connector, "_service_account_id", side_effect=ValueError("no service account")):
+            with pytest.raises(ValueError):
+                await connector.sync_to_financia("test-site-123")
+        
+        assert connector.state_store.get_checkpoint("Test SharePoint", "test-site-123") is None
+
+
 @pytest.mark.asyncio
 class TestSharePointConnectorIntegration:
     """Tests de integración (requieren credenciales reales)"""
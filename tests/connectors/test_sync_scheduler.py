@@ -0,0 +1,148 @@
+"""
+Tests for Connector Sync Scheduler
+
+Verifican la carga de connectors.yaml, el registro de jobs por fuente y los
+reintentos de syncs interrumpidas.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+# Add repo root and backend to path (el scheduler importa ``monitoring`` y ``core`` como el backend)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from backend.connectors.sync_scheduler import ConnectorSyncScheduler
+from backend.connectors.sap_dms_connector import SAPDMSConnector
+
+
+CONFIG = """
+sharepoint:
+  enabled: true
+  name: "Corporate SharePoint"
+  type: "sharepoint"
+  tenant_id: "${TEST_SP_TENANT}"
+  client_id: "client"
+  client_secret: "secret"
+  sites:
+    - name: "Corporate Documents"
+      site_id: "site-1"
+      libraries: ["Shared Documents"]
+  sync_schedule: "0 */6 * * *"
+
+sap_dms:
+  enabled: true
+  name: "SAP Document Management"
+  type: "sap_dms"
+  url: "https://sap-test.company.com"
+  username: "user"
+  password: "password"
+  repositories:
+    - id: "FI_DOCUMENTS"
+      sync_filters:
+        status: ["active"]
+    - id: "HR_DOCUMENTS"
+  sync_schedule: "0 2 * * *"
+  retry_attempts: 2
+
+alfresco:
+  enabled: false
+  name: "Alfresco ECM"
+  type: "alfresco"
+
+exchange:
+  enabled: true
+  name: "Microsoft Exchange"
+  type: "exchange"
+
+global:
+  enabled: true
+  max_concurrent_syncs: 2
+  default_retry_attempts: 3
+  default_retry_delay_seconds: 0
+  default_retry_backoff_multiplier: 2.0
+"""
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    """Scheduler con una configuración de prueba"""
+    monkeypatch.setenv("TEST_SP_TENANT", "tenant-from-env")
+    config_path = tmp_path / "connectors.yaml"
+    config_path.write_text(CONFIG)
+    scheduler = ConnectorSyncScheduler(str(config_path))
+    scheduler.load_config()
+    for source in scheduler.sources.values():
+        source["state_path"] = str(tmp_path / "state.db")
+    return scheduler
+
+
+class TestConnectorSyncScheduler:
+    """Tests del scheduler de conectores"""
+
+    def test_load_config(self, scheduler):
+        """Test: Sólo fuentes habilitadas con conector implementado"""
+        assert set(scheduler.sources) == {"sharepoint", "sap_dms"}
+        assert scheduler.sources["sharepoint"]["tenant_id"] == "tenant-from-env"
+        assert scheduler.sources["sharepoint"]["retry_attempts"] == 3
+        assert scheduler.sources["sap_dms"]["retry_attempts"] == 2
+
+    def test_repositories(self, scheduler):
+        """Test: Repositorios y filtros por tipo de fuente"""
+        assert scheduler.repositories("sharepoint") == [("site-1", None)]
+        assert scheduler.repositories("sap_dms") == [
+            ("FI_DOCUMENTS", {"status": ["active"]}),
+            ("HR_DOCUMENTS", None),
+        ]
+
+    def test_create_connector(self, scheduler):
+        """Test: Instanciación del conector desde la configuración"""
+        connector = scheduler.create_connector("sap_dms")
+
+        assert isinstance(connector, SAPDMSConnector)
+        assert connector.config.url == "https://sap-test.company.com"
+
+    @pytest.mark.asyncio
+    async def test_start_registers_jobs(self, scheduler):
+        """Test: Un job cron por fuente"""
+        scheduler.start()
+        try:
+            job_ids = {job.id for job in scheduler.scheduler.get_jobs()}
+            assert job_ids == {"connector_sync_sharepoint", "connector_sync_sap_dms"}
+        finally:
+            scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_run_source_retries_interrupted_sync(self, scheduler):
+        """Test: Una sync interrumpida se reintenta y se acumulan estadísticas"""
+        sync = AsyncMock(side_effect=[
+            {"total_documents": 5, "synced": 5, "errors": 0, "error": "timeout"},
+            {"total_documents": 3, "synced": 3, "errors": 0, "resumed_from": 5},
+            {"total_documents": 2, "synced": 1, "skipped": 1, "errors": 0},
+        ])
+
+        with patch.object(SAPDMSConnector, "authenticate", AsyncMock(return_value=True)), \
+             patch.object(SAPDMSConnector, "sync_to_financia", sync):
+            results = await scheduler.run_source("sap_dms")
+
+        assert sync.await_count == 3
+        assert results["FI_DOCUMENTS"]["synced"] == 8
+        assert results["FI_DOCUMENTS"]["attempts"] == 2
+        assert "error" not in results["FI_DOCUMENTS"]
+        assert results["HR_DOCUMENTS"]["skipped"] == 1
+        assert "sap_dms" in scheduler._last_success
+
+    @pytest.mark.asyncio
+    async def test_run_source_gives_up_after_retry_attempts(self, scheduler):
+        """Test: Tras agotar reintentos la fuente queda como fallida"""
+        sync = AsyncMock(return_value={"synced": 0, "errors": 0, "error": "timeout"})
+
+        with patch.object(SAPDMSConnector, "authenticate", AsyncMock(return_value=True)), \
+             patch.object(SAPDMSConnector, "sync_to_financia", sync):
+            results = await scheduler.run_source("sap_dms")
+
+        assert results["FI_DOCUMENTS"]["error"] == "timeout"
+        assert results["FI_DOCUMENTS"]["attempts"] == 2
+        assert "sap_dms" not in scheduler._last_success
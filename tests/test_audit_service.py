@@ -0,0 +1,221 @@
+"""
+Tests for Audit Service
+
+Verifican la paginación keyset de audit_logs, la exportación en streaming
+por lotes a JSON Lines y CSV y la creación de particiones mensuales.
+"""
+
+import csv
+import io
+import json
+import sys
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import services.audit_service as audit_module
+from services.audit_service import (
+    AuditService,
+    decode_cursor,
+    encode_cursor,
+    serialize_csv,
+    serialize_jsonl,
+)
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+def make_row(log_id: int, day: int = 1):
+    return (
+        log_id,
+        datetime(2025, 1, day, 12, 0, tzinfo=timezone.utc),
+        USER_ID,
+        "document.view",
+        "document",
+        None,
+        "10.0.0.1",
+        "pytest",
+        "success",
+        {"document_id": "abc", "nota": "ñ"},
+    )
+
+
+class FakeStreamResult:
+    """Resultado de ``session.stream`` que cuenta los lotes entregados"""
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.delivered = 0
+
+    async def partitions(self):
+        for batch in self.batches:
+            self.delivered += 1
+            yield batch
+
+
+class FakeSession:
+    def __init__(self, result):
+        self.result = result
+        self.statement = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement):
+        self.statement = statement
+        return self.result
+
+
+class TestCursor:
+    """Tests del cursor keyset"""
+
+    def test_roundtrip(self):
+        """Test: El cursor conserva timestamp (con zona) e id"""
+        timestamp = datetime(2025, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+        assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+    def test_invalid_cursor(self):
+        """Test: Un cursor corrupto da ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestSerialization:
+    """Tests de los formatos de exportación"""
+
+    def test_jsonl_one_object_per_line(self):
+        """Test: Una línea JSON por registro"""
+        lines = serialize_jsonl([make_row(1), make_row(2)]).splitlines()
+        records = [json.loads(line) for line in lines]
+
+        assert [r["id"] for r in records] == [1, 2]
+        assert records[0]["user_id"] == str(USER_ID)
+        assert records[0]["timestamp"] == "2025-01-01T12:00:00+00:00"
+        assert records[0]["metadata"]["nota"] == "ñ"
+
+    def test_csv_header_and_json_metadata(self):
+        """Test: Cabecera sólo en el primer trozo y metadata como JSON"""
+        content = serialize_csv([], header=True) + serialize_csv([make_row(7)])
+        rows = list(csv.reader(io.StringIO(content)))
+
+        assert rows[0][0] == "id" and rows[0][-1] == "metadata"
+        assert len(rows) == 2
+        assert json.loads(rows[1][-1]) == {"document_id": "abc", "nota": "ñ"}
+
+
+class TestAuditQuery:
+    """Tests de la consulta paginada"""
+
+    @pytest.mark.asyncio
+    async def test_keyset_page_and_next_cursor(self):
+        """Test: Se pide limit+1 filas y el cursor apunta a la última devuelta"""
+        statements = []
+
+        class Result:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def all(self):
+                return self.rows
+
+        class Session:
+            async def execute(self, statement):
+                statements.append(statement)
+                rows = [make_row(i, day=10 - i) for i in (1, 2, 3)]
+                return Result([_NamedRow(row) for row in rows])
+
+        cursor = encode_cursor(datetime(2025, 1, 10, tzinfo=timezone.utc), 99)
+        records, next_cursor = await AuditService().query(Session(), limit=2, cursor=cursor, action="document.view")
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+
+        assert [r["id"] for r in records] == [1, 2]
+        assert decode_cursor(next_cursor)[1] == 2
+        assert "(audit_logs.timestamp, audit_logs.id) < (" in sql
+        assert "ORDER BY audit_logs.timestamp DESC, audit_logs.id DESC" in sql
+        assert "OFFSET" not in sql
+        assert statements[0]._limit == 3
+
+
+class _NamedRow(tuple):
+    """Fila con acceso por nombre (como ``sqlalchemy.engine.Row``)"""
+
+    @property
+    def id(self):
+        return self[0]
+
+    @property
+    def timestamp(self):
+        return self[1]
+
+
+class TestAuditExport:
+    """Tests de la exportación en streaming"""
+
+    @pytest.mark.asyncio
+    async def test_export_streams_batches_lazily(self, monkeypatch):
+        """Test: Cada lote del cursor de servidor se envía según se lee"""
+        result = FakeStreamResult([[make_row(1), make_row(2)], [make_row(3)]])
+        session = FakeSession(result)
+        monkeypatch.setattr(audit_module, "async_session_maker", lambda: session)
+
+        export = AuditService(batch_size=2).stream_export(
+            datetime(2024, 1, 1), datetime(2026, 1, 1), format="jsonl"
+        )
+        first = await export.__anext__()
+
+        assert result.delivered == 1
+        assert [json.loads(line)["id"] for line in first.splitlines()] == [1, 2]
+
+        rest = [chunk async for chunk in export]
+        assert [json.loads(line)["id"] for line in rest[0].splitlines()] == [3]
+        assert session.statement.get_execution_options()["yield_per"] == 2
+
+    @pytest.mark.asyncio
+    async def test_csv_export_starts_with_header(self, monkeypatch):
+        """Test: La exportación CSV empieza con la cabecera"""
+        session = FakeSession(FakeStreamResult([[make_row(1)]]))
+        monkeypatch.setattr(audit_module, "async_session_maker", lambda: session)
+
+        chunks = [
+            chunk async for chunk in AuditService().stream_export(
+                datetime(2024, 1, 1), datetime(2026, 1, 1), format="csv"
+            )
+        ]
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+
+        assert rows[0][:2] == ["id", "timestamp"]
+        assert rows[1][0] == "1"
+
+
+class TestAuditPartitions:
+    """Tests del mantenimiento de particiones mensuales"""
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_from_current_month(self, monkeypatch):
+        """Test: Llama a ensure_audit_log_partitions desde el mes actual"""
+        calls = []
+
+        class Session(FakeSession):
+            async def execute(self, statement, params=None):
+                calls.append((str(statement), params))
+
+            async def commit(self):
+                calls.append("commit")
+
+        monkeypatch.setattr(audit_module, "async_session_maker", lambda: Session(None))
+
+        await AuditService().ensure_partitions(months_ahead=6)
+
+        assert calls == [
+            ("SELECT ensure_audit_log_partitions(CURRENT_DATE, :months_ahead)", {"months_ahead": 6}),
+            "commit",
+        ]
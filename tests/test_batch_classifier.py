@@ -0,0 +1,102 @@
+"""
+Tests for Batched Classification
+
+Verifican la inferencia por lotes del clasificador con un modelo BERT
+diminuto creado en local: orden original, padding dinámico por longitud y
+backends de CPU.
+"""
+
+import sys
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from ml.classifier import load_sequence_classifier, predict_batch
+
+WORDS = ["contrato", "préstamo", "factura", "seguro", "informe", "banco", "cliente", "pago"]
+TEXTS = [
+    "contrato préstamo banco cliente pago contrato préstamo banco",
+    "factura",
+    "seguro informe cliente pago banco",
+    "pago banco",
+    "informe informe informe informe informe informe informe informe informe",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """Modelo y tokenizer diminutos guardados en disco"""
+    path = tmp_path_factory.mktemp("tiny-bert")
+    vocab = path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS), encoding="utf-8")
+
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab), do_lower_case=True)
+    torch.manual_seed(0)
+    model = transformers.BertForSequenceClassification(transformers.BertConfig(
+        vocab_size=len(WORDS) + 5, hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, num_labels=4
+    ))
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return str(path)
+
+
+class RecordingModel(torch.nn.Module):
+    """Envuelve el modelo y registra el tamaño de cada lote"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.shapes = []
+
+    def forward(self, **inputs):
+        self.shapes.append(tuple(inputs["input_ids"].shape))
+        return self.model(**inputs)
+
+
+class TestBatchClassifier:
+    """Tests de la clasificación por lotes"""
+
+    def test_batch_matches_single_predictions(self, model_dir):
+        """Test: El lote devuelve lo mismo que clasificar uno a uno, en orden"""
+        tokenizer, model, device = load_sequence_classifier(model_dir, "cpu")
+
+        batched = predict_batch(tokenizer, model, TEXTS, device, batch_size=8)
+        single = [predict_batch(tokenizer, model, [text], device)[0] for text in TEXTS]
+
+        assert [c for c, _ in batched] == [c for c, _ in single]
+        for (_, a), (_, b) in zip(batched, single):
+            assert a == pytest.approx(b, abs=1e-5)
+
+    def test_dynamic_padding_sorted_by_length(self, model_dir):
+        """Test: Cada lote se rellena sólo hasta su texto más largo"""
+        tokenizer, model, device = load_sequence_classifier(model_dir, "cpu")
+        recording = RecordingModel(model)
+
+        predict_batch(tokenizer, recording, TEXTS, device, batch_size=2)
+
+        assert [shape[0] for shape in recording.shapes] == [2, 2, 1]
+        lengths = [shape[1] for shape in recording.shapes]
+        assert lengths == sorted(lengths)
+        assert lengths[0] == 4  # [CLS] pago banco [SEP] / [CLS] factura [SEP] [PAD]
+
+    def test_int8_backend(self, model_dir):
+        """Test: La cuantización dinámica int8 mantiene las predicciones válidas"""
+        tokenizer, model, device = load_sequence_classifier(model_dir, "cpu", backend="int8")
+
+        results = predict_batch(tokenizer, model, TEXTS, device)
+
+        assert any("quantized" in type(m).__module__ for m in model.modules())
+        assert all(0 <= c < 4 and 0.0 < p <= 1.0 for c, p in results)
+
+    def test_empty_batch(self, model_dir):
+        """Test: Un lote vacío no ejecuta el modelo"""
+        tokenizer, model, device = load_sequence_classifier(model_dir, "cpu")
+
+        assert predict_batch(tokenizer, model, [], device) == []
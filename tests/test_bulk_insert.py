@@ -0,0 +1,86 @@
+"""
+Tests for Bulk Insert
+
+Verifican la codificación COPY binaria (incluido pgvector) usada para
+persistir chunks de forma masiva.
+"""
+
+import struct
+import sys
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from sqlalchemy import Column, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import declarative_base
+from pgvector.sqlalchemy import Vector
+from pgvector.utils import from_db_binary
+
+from core.bulk_insert import encode_copy_rows, _field_encoder
+
+Base = declarative_base()
+
+
+class Chunk(Base):
+    __tablename__ = "chunks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    chunk_index = Column(Integer)
+    text = Column(Text)
+    embedding = Column(Vector(4))
+
+
+def decode_fields(payload: bytes):
+    """Decodificar una fila COPY binaria en la lista de campos (bytes o None)"""
+    (count,) = struct.unpack_from(">h", payload, 0)
+    offset, fields = 2, []
+    for _ in range(count):
+        (length,) = struct.unpack_from(">i", payload, offset)
+        offset += 4
+        if length == -1:
+            fields.append(None)
+        else:
+            fields.append(payload[offset:offset + length])
+            offset += length
+    return fields, offset
+
+
+class TestBulkInsert:
+    """Tests de codificación COPY binaria"""
+
+    def test_encode_row(self):
+        """Test: Cada tipo se codifica en su formato binario de PostgreSQL"""
+        table = Chunk.__table__
+        encoders = [_field_encoder(table.c[name].type) for name in ("id", "chunk_index", "text", "embedding")]
+        chunk_id = uuid.uuid4()
+        vector = np.array([0.5, -1.0, 2.25, 3.0], dtype=np.float32)
+
+        payload = encode_copy_rows(encoders, [(chunk_id, 7, "préstamo", vector)])
+        fields, consumed = decode_fields(payload)
+
+        assert consumed == len(payload)
+        assert uuid.UUID(bytes=fields[0]) == chunk_id
+        assert struct.unpack(">i", fields[1]) == (7,)
+        assert fields[2].decode("utf-8") == "préstamo"
+        np.testing.assert_array_equal(from_db_binary(fields[3]), vector)
+
+    def test_encode_null(self):
+        """Test: None se codifica como NULL (longitud -1)"""
+        encoders = [_field_encoder(Chunk.__table__.c["text"].type)]
+
+        fields, _ = decode_fields(encode_copy_rows(encoders, [(None,)]))
+
+        assert fields == [None]
+
+    def test_unsupported_type(self):
+        """Test: Tipos sin codificador binario se rechazan"""
+        from sqlalchemy import ARRAY
+
+        with pytest.raises(TypeError):
+            _field_encoder(ARRAY(Integer))
@@ -0,0 +1,137 @@
+"""
+Tests for Document Access
+
+Verifican ``can_access_document`` (administrador, propietario o mismo
+departamento), que la descarga rechaza a otros usuarios antes de tocar
+el almacenamiento y que el listado se limita al departamento del usuario.
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import api.v1.documents as documents_module
+from core.auth import can_access_document
+from models.database_models import Document
+from models.schemas import UserResponse
+
+OWNER = uuid.uuid4()
+
+
+def make_user(role: str = "agent", department: str = "riesgos", user_id=None) -> UserResponse:
+    return UserResponse(
+        id=user_id or uuid.uuid4(),
+        email="ana@tefinancia.es",
+        full_name="Ana",
+        role=role,
+        department=department,
+        mfa_enabled=False,
+        is_active=True,
+        created_at=datetime(2026, 1, 1)
+    )
+
+
+@pytest.fixture
+def document():
+    return Document(
+        id=uuid.uuid4(),
+        title="contrato_acme.pdf",
+        owner_id=OWNER,
+        department="riesgos",
+        storage_path="user/2026/contrato_acme.pdf",
+    )
+
+
+class TestCanAccessDocument:
+    """Tests de la regla de acceso a documentos"""
+
+    def test_owner(self, document):
+        assert can_access_document(document, make_user(department="legal", user_id=OWNER))
+
+    def test_same_department(self, document):
+        assert can_access_document(document, make_user(department="riesgos"))
+
+    def test_other_department(self, document):
+        assert not can_access_document(document, make_user(department="legal"))
+
+    def test_admin(self, document):
+        assert can_access_document(document, make_user(role="admin", department="legal"))
+
+    def test_without_department(self, document):
+        """Test: Documento y usuario sin departamento no cuentan como el mismo"""
+        document.department = None
+        assert not can_access_document(document, make_user(department=None))
+
+
+@pytest.mark.asyncio
+class TestDownloadPermissions:
+    """Tests de permisos de la descarga"""
+
+    async def test_other_department_is_forbidden(self, monkeypatch, document):
+        """Test: 403 sin consultar MinIO"""
+        stat_document = AsyncMock()
+        monkeypatch.setattr(documents_module, "ingest_service", SimpleNamespace(stat_document=stat_document))
+        db = SimpleNamespace(get=AsyncMock(return_value=document))
+
+        with pytest.raises(HTTPException) as exc:
+            await documents_module.download_document(
+                document.id, request=None, redirect=None,
+                current_user=make_user(department="legal"), db=db
+            )
+
+        assert exc.value.status_code == 403
+        stat_document.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestListPermissions:
+    """Tests del listado de documentos por departamento"""
+
+    @pytest.fixture
+    def document_service(self, monkeypatch):
+        service = SimpleNamespace(list_page=AsyncMock(return_value={
+            "items": [], "next_cursor": None, "estimated_total": 0
+        }))
+        monkeypatch.setattr(documents_module, "document_service", service)
+        return service
+
+    async def list_documents(self, user, department=None):
+        return await documents_module.list_documents(
+            SimpleNamespace(headers={}), skip=0, limit=50, cursor=None, doc_status=None,
+            classification=None, department=department, current_user=user, db=None
+        )
+
+    async def test_user_sees_own_department(self, document_service):
+        await self.list_documents(make_user(department="riesgos"))
+
+        assert document_service.list_page.await_args.kwargs["department"] == "riesgos"
+
+    async def test_other_department_is_forbidden(self, document_service):
+        with pytest.raises(HTTPException) as exc:
+            await self.list_documents(make_user(department="riesgos"), department="legal")
+
+        assert exc.value.status_code == 403
+        document_service.list_page.assert_not_awaited()
+
+    async def test_user_without_department_sees_own_documents(self, document_service):
+        user = make_user(department=None)
+
+        await self.list_documents(user)
+
+        kwargs = document_service.list_page.await_args.kwargs
+        assert kwargs["owner_id"] == user.id
+        assert kwargs["department"] is None
+
+    async def test_admin_sees_any_department(self, document_service):
+        await self.list_documents(make_user(role="admin", department="riesgos"), department="legal")
+
+        assert document_service.list_page.await_args.kwargs["department"] == "legal"
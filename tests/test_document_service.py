@@ -0,0 +1,172 @@
+"""
+Tests for Document Service
+
+Verifican el listado keyset de documentos: cursor opaco sobre
+(created_at, id), filtros, total estimado con EXPLAIN y la conexión
+Relay que usa GraphQL.
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import services.document_service as document_module
+from models.database_models import Document, DocumentStatus
+from services.document_service import (
+    DocumentService,
+    _Explain,
+    decode_cursor,
+    encode_cursor,
+)
+
+START = datetime(2025, 1, 31, tzinfo=timezone.utc)
+
+
+def make_documents(count: int):
+    return [
+        Document(
+            id=uuid.uuid4(),
+            title=f"doc-{i}",
+            mime_type="application/pdf",
+            file_size_bytes=1024,
+            status=DocumentStatus.COMPLETED,
+            created_at=START - timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    """Sesión que devuelve documentos o un plan de EXPLAIN según la sentencia"""
+
+    def __init__(self, documents, plan_rows: int = 1234):
+        self.documents = documents
+        self.plan_rows = plan_rows
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if isinstance(statement, _Explain):
+            return FakeResult([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": self.plan_rows}}])
+        return FakeResult(self.documents)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestCursor:
+    """Tests del cursor keyset"""
+
+    def test_roundtrip(self):
+        """Test: El cursor conserva created_at e id"""
+        document_id = uuid.uuid4()
+        assert decode_cursor(encode_cursor(START, document_id)) == (START, document_id)
+
+    def test_invalid_cursor(self):
+        """Test: Un cursor corrupto da ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(START, uuid.uuid4())[:-6])
+
+
+class TestPageQuery:
+    """Tests de la consulta de una página"""
+
+    def test_keyset_condition_without_offset(self):
+        """Test: La página siguiente compara (created_at, id) y no usa OFFSET"""
+        cursor = encode_cursor(START, uuid.uuid4())
+        sql = compile_sql(DocumentService().page_query(limit=20, cursor=cursor, department="riesgos"))
+
+        assert "documents.department = " in sql
+        assert "(documents.created_at, documents.id) < (" in sql
+        assert "ORDER BY documents.created_at DESC, documents.id DESC" in sql
+        assert "OFFSET" not in sql
+
+    def test_ascending_order(self):
+        """Test: En orden ascendente la condición se invierte"""
+        cursor = encode_cursor(START, uuid.uuid4())
+        sql = compile_sql(DocumentService().page_query(cursor=cursor, descending=False))
+
+        assert "(documents.created_at, documents.id) > (" in sql
+        assert "ORDER BY documents.created_at, documents.id" in sql
+
+    def test_explain_wraps_filtered_count_query(self):
+        """Test: El total estimado se pide con EXPLAIN de la consulta filtrada"""
+        statement = DocumentService().page_query(status=DocumentStatus.PENDING)
+        sql = compile_sql(_Explain(statement))
+
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "documents.status = " in sql
+
+
+class TestListPage:
+    """Tests del listado paginado"""
+
+    @pytest.mark.asyncio
+    async def test_next_cursor_points_to_last_item(self):
+        """Test: Se pide limit+1 filas y el cursor apunta a la última devuelta"""
+        documents = make_documents(3)
+        db = FakeSession(documents)
+
+        page = await DocumentService().list_page(db, limit=2)
+
+        assert page["items"] == documents[:2]
+        assert decode_cursor(page["next_cursor"]) == (documents[1].created_at, documents[1].id)
+        assert page["estimated_total"] == 1234
+        assert db.statements[0]._limit == 3
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self):
+        """Test: Sin filas de más no hay cursor siguiente"""
+        page = await DocumentService().list_page(FakeSession(make_documents(2)), limit=2, with_total=False)
+
+        assert page["next_cursor"] is None
+        assert page["estimated_total"] is None
+
+    @pytest.mark.asyncio
+    async def test_relay_connection(self, monkeypatch):
+        """Test: list_paginated devuelve edges, page_info y total estimado"""
+        documents = make_documents(4)
+        monkeypatch.setattr(document_module, "async_session_maker", lambda: FakeSession(documents, plan_rows=40))
+
+        after = encode_cursor(START + timedelta(hours=1), uuid.uuid4())
+        result = await DocumentService().list_paginated(first=3, after=after)
+
+        assert [edge["node"] for edge in result["edges"]] == documents[:3]
+        assert result["page_info"]["has_next_page"] is True
+        assert result["page_info"]["has_previous_page"] is True
+        assert result["page_info"]["end_cursor"] == result["edges"][-1]["cursor"]
+        assert result["total_count"] == 40
+
+    @pytest.mark.asyncio
+    async def test_offset_rejected(self):
+        """Test: list_documents no admite OFFSET"""
+        with pytest.raises(ValueError):
+            await DocumentService().list_documents(offset=40)
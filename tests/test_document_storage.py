@@ -0,0 +1,162 @@
+"""
+Tests for Document Storage
+
+Verifican la lectura en streaming de objetos de MinIO: rangos HTTP,
+lectura por trozos con liberación de la conexión y volcado a fichero
+temporal.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.document_storage import (
+    RangeNotSatisfiable,
+    iter_object,
+    parse_range,
+    spool_to_file,
+)
+
+CONTENT = bytes(range(256)) * 40  # 10 KiB
+
+
+class FakeResponse:
+    """Respuesta de ``Minio.get_object`` (urllib3) sobre unos bytes"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.read_calls = 0
+        self.released = False
+
+    def stream(self, amt):
+        for start in range(0, len(self.data), amt):
+            self.read_calls += 1
+            yield self.data[start:start + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeMinio:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+        self.response = None
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        self.requests.append((bucket_name, object_name, offset, length))
+        end = offset + length if length else len(self.data)
+        self.response = FakeResponse(self.data[offset:end])
+        return self.response
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestParseRange:
+    """Tests de la cabecera Range"""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes=-5000", (0, 999)),
+    ])
+    def test_single_range(self, header, expected):
+        """Test: Rangos absolutos, abiertos y de sufijo"""
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", [None, "", "bytes=0-9,20-29", "items=0-9", "bytes=-"])
+    def test_ignored_headers_serve_full_object(self, header):
+        """Test: Sin rango único válido se sirve el objeto completo"""
+        assert parse_range(header, 1000) is None
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=50-10", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        """Test: Un rango fuera del objeto da 416"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 1000)
+
+
+class TestIterObject:
+    """Tests de la lectura por trozos"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_cover_object(self):
+        """Test: Los trozos reconstruyen el objeto y se libera la conexión"""
+        client = FakeMinio(CONTENT)
+
+        chunks = await collect(iter_object(client, "documents", "a.pdf", chunk_size=4096))
+
+        assert b"".join(chunks) == CONTENT
+        assert [len(chunk) for chunk in chunks] == [4096, 4096, 2048]
+        assert client.response.released
+
+    @pytest.mark.asyncio
+    async def test_range_is_requested_from_minio(self):
+        """Test: El rango se pide a MinIO, no se recorta en memoria"""
+        client = FakeMinio(CONTENT)
+
+        chunks = await collect(iter_object(client, "documents", "a.pdf", offset=100, length=50))
+
+        assert client.requests == [("documents", "a.pdf", 100, 50)]
+        assert b"".join(chunks) == CONTENT[100:150]
+
+    @pytest.mark.asyncio
+    async def test_closing_early_releases_connection(self):
+        """Test: Un cliente que corta la descarga no deja la conexión ocupada"""
+        client = FakeMinio(CONTENT)
+        chunks = iter_object(client, "documents", "a.pdf", chunk_size=1024)
+
+        await chunks.__anext__()
+        await chunks.aclose()
+
+        assert client.response.released
+        assert client.response.read_calls == 1
+
+
+class TestSpoolToFile:
+    """Tests del volcado a fichero temporal"""
+
+    @pytest.mark.asyncio
+    async def test_spooled_file_is_removed(self):
+        """Test: El fichero tiene el contenido y se borra al salir"""
+        client = FakeMinio(CONTENT)
+
+        async with spool_to_file(iter_object(client, "documents", "a.pdf", chunk_size=1000), suffix=".pdf") as path:
+            assert path.endswith(".pdf")
+            with open(path, "rb") as handle:
+                assert handle.read() == CONTENT
+
+        assert not os.path.exists(path)
+
+    @pytest.mark.asyncio
+    async def test_transform_stream_keeps_original_extension(self, monkeypatch):
+        """Test: ``transform_stream`` vuelca con la extensión de la ruta en MinIO"""
+        from types import SimpleNamespace
+        from services.transform_service import transform_service
+
+        seen = {}
+
+        async def transform_document(document, path):
+            seen["suffix"] = os.path.splitext(path)[1]
+            return {"text": "ok"}
+
+        monkeypatch.setattr(transform_service, "transform_document", transform_document)
+        document = SimpleNamespace(id="doc-1", title="Contrato Acme", storage_path="u/2026/abc_contrato.docx")
+
+        result = await transform_service.transform_stream(
+            document, iter_object(FakeMinio(CONTENT), "documents", "a.docx", chunk_size=1000)
+        )
+
+        assert result == {"text": "ok"}
+        assert seen["suffix"] == ".docx"
@@ -0,0 +1,134 @@
+"""
+Tests for Embedding Store
+
+Verifican que los textos ya embebidos no vuelven a pasar por el encoder y
+que el store se comparte entre instancias (procesos) del mismo modelo, y
+entre el backend y astra-vector-db (misma copia del módulo, mismo nombre
+de modelo y vectores sin normalizar).
+"""
+
+import sys
+import os
+import filecmp
+import importlib.util
+
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../'))
+
+from backend.services.embedding_store import EmbeddingStore, content_key, normalize_rows
+
+ASTRA_STORE = os.path.join(os.path.dirname(__file__), '../services/astra-vector-db/embedding_store.py')
+
+
+def load_astra_store():
+    """Cargar el embedding_store de astra-vector-db (no es un paquete)"""
+    spec = importlib.util.spec_from_file_location("astra_embedding_store", ASTRA_STORE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CountingEncoder:
+    """Encoder simulado: embedding = [longitud, número de palabras]"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), len(t.split())] for t in texts], dtype=np.float32)
+
+
+class TestEmbeddingStore:
+    """Tests del embedding store"""
+
+    def test_content_key_normalizes_whitespace(self):
+        """Test: Cambios de espaciado no cambian la clave"""
+        assert content_key("Contrato  de\npréstamo ") == content_key("Contrato de\npréstamo")
+        assert content_key("Contrato de préstamo") == content_key(" Contrato\tde  préstamo")
+        assert content_key("a") != content_key("b")
+
+    def test_encode_only_missing_texts(self, tmp_path):
+        """Test: Sólo se codifican los textos nuevos, sin duplicados"""
+        store = EmbeddingStore(str(tmp_path), "test-model")
+        encoder = CountingEncoder()
+
+        first = store.encode(["uno dos", "tres", "uno dos"], encoder)
+        second = store.encode(["tres", "cuatro cinco seis"], encoder)
+
+        assert encoder.calls == [["uno dos", "tres"], ["cuatro cinco seis"]]
+        np.testing.assert_array_equal(first, [[7, 2], [4, 1], [7, 2]])
+        np.testing.assert_array_equal(second, [[4, 1], [17, 3]])
+        assert store.stats == {"hits": 1, "misses": 3}
+
+    def test_reprocess_costs_no_encoding(self, tmp_path):
+        """Test: Otra instancia del mismo modelo reutiliza los embeddings"""
+        chunks = [f"chunk {i}" for i in range(10)]
+        EmbeddingStore(str(tmp_path), "test-model").encode(chunks, CountingEncoder())
+
+        encoder = CountingEncoder()
+        embeddings = EmbeddingStore(str(tmp_path), "test-model").encode(chunks, encoder)
+
+        assert encoder.calls == []
+        assert embeddings.shape == (10, 2)
+
+    def test_model_version_isolated(self, tmp_path):
+        """Test: Otra versión del modelo no reutiliza embeddings"""
+        EmbeddingStore(str(tmp_path), "test-model", "1").encode(["texto"], CountingEncoder())
+
+        encoder = CountingEncoder()
+        EmbeddingStore(str(tmp_path), "test-model", "2").encode(["texto"], encoder)
+
+        assert encoder.calls == [["texto"]]
+
+    def test_dimension_mismatch(self, tmp_path):
+        """Test: No se mezclan dimensiones en un store"""
+        store = EmbeddingStore(str(tmp_path), "test-model")
+        store.put_many(["a"], [[1.0, 2.0]])
+
+        with pytest.raises(ValueError):
+            store.put_many(["b"], [[1.0, 2.0, 3.0]])
+
+    @pytest.mark.asyncio
+    async def test_aencode_failure_stores_nothing(self, tmp_path):
+        """Test: Si el encoder asíncrono falla (None) no se guarda nada"""
+        store = EmbeddingStore(str(tmp_path), "test-model")
+
+        async def failing(texts):
+            return None
+
+        assert await store.aencode(["texto"], failing) is None
+        assert store.get_many(["texto"]) == [None]
+
+
+class TestSharedStore:
+    """Tests del store compartido entre el backend y astra-vector-db"""
+
+    def test_astra_copy_is_identical(self):
+        """Test: Las dos copias del módulo no divergen"""
+        backend_store = os.path.join(os.path.dirname(__file__), '../backend/services/embedding_store.py')
+        assert filecmp.cmp(backend_store, ASTRA_STORE, shallow=False)
+
+    def test_backend_vectors_are_reused_by_astra(self, tmp_path):
+        """Test: Lo que embebe el backend (EMBEDDING_MODEL) lo lee astra (GPU_EMBEDDING_MODEL)"""
+        backend = EmbeddingStore(
+            str(tmp_path), "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+        )
+        backend.encode(["Contrato de préstamo"], CountingEncoder())
+
+        astra = load_astra_store().EmbeddingStore(str(tmp_path), "paraphrase-multilingual-mpnet-base-v2")
+        encoder = CountingEncoder()
+        embeddings = astra.encode(["Contrato de préstamo"], encoder)
+
+        assert astra.path == backend.path
+        assert encoder.calls == []
+        np.testing.assert_array_equal(embeddings, [[20, 3]])
+
+    def test_normalize_rows(self):
+        """Test: Normalización al leer, sin dividir por cero"""
+        rows = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32))
+
+        np.testing.assert_allclose(rows, [[0.6, 0.8], [0.0, 0.0]])
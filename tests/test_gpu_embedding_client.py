@@ -0,0 +1,101 @@
+"""
+Tests for GPU Embedding Client
+
+Verifican el troceo en sub-batches, el circuit breaker y su recuperación
+mediante el probe en segundo plano.
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../'))
+
+from backend.services.gpu_embedding_client import GPUEmbeddingClient, CircuitBreaker
+
+
+def make_client(handler, **kwargs) -> GPUEmbeddingClient:
+    """Cliente con transporte simulado"""
+    client = GPUEmbeddingClient(base_url="http://gpu-test", enabled=True, **kwargs)
+    client._client = httpx.AsyncClient(
+        base_url="http://gpu-test",
+        transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def embed_handler(calls):
+    """Servicio simulado: embedding = [longitud del texto]"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        texts = json.loads(request.content)["texts"]
+        calls.append(texts)
+        return httpx.Response(200, json={"embeddings": [[float(len(t))] for t in texts]})
+    return handler
+
+
+@pytest.mark.asyncio
+class TestGPUEmbeddingClient:
+    """Tests del cliente GPU"""
+
+    async def test_splits_into_sub_batches(self):
+        """Test: Entradas grandes se envían en sub-batches y se conserva el orden"""
+        calls = []
+        client = make_client(embed_handler(calls), max_batch_size=3, max_concurrency=2)
+        texts = ["a" * i for i in range(1, 9)]
+
+        embeddings = await client.generate_embeddings(texts)
+
+        assert embeddings == [[float(i)] for i in range(1, 9)]
+        assert sorted(len(batch) for batch in calls) == [2, 3, 3]
+        await client.aclose()
+
+    async def test_circuit_opens_and_skips_network(self):
+        """Test: Tras fallos consecutivos el cliente no llama al servicio"""
+        calls = []
+
+        def failing(request):
+            calls.append(request.url.path)
+            return httpx.Response(503)
+
+        client = make_client(failing, failure_threshold=2, recovery_seconds=60)
+
+        assert await client.generate_embeddings(["x"]) is None
+        assert await client.generate_embeddings(["x"]) is None
+        assert client.circuit_open
+
+        assert await client.generate_embeddings(["x"]) is None
+        assert await client.is_available() is False
+        assert len(calls) == 2
+        await client.aclose()
+
+    async def test_client_error_does_not_open_circuit(self):
+        """Test: Un 422 no cuenta como fallo del servicio"""
+        client = make_client(lambda request: httpx.Response(422), failure_threshold=1)
+
+        assert await client.generate_embeddings(["x"]) is None
+        assert not client.circuit_open
+        await client.aclose()
+
+    async def test_probe_closes_circuit(self):
+        """Test: El probe en segundo plano cierra el circuito cuando el servicio vuelve"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.01)
+        healthy = asyncio.Event()
+
+        async def probe():
+            healthy.set()
+            return True
+
+        breaker.record_failure(probe)
+        assert not breaker.allow_request()
+
+        await asyncio.wait_for(healthy.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert breaker.allow_request()
+        breaker.cancel_probe()
@@ -0,0 +1,100 @@
+"""
+Tests for Grounding Verifier
+
+Verifican la confianza anti-alucinación basada en shingles: oraciones
+copiadas o parafraseadas del contexto frente a oraciones inventadas,
+chunk que mejor cubre cada oración y penalización sin citaciones.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.grounding import (
+    NEUTRAL_CONFIDENCE,
+    UNCITED_PENALTY,
+    grounding_confidence,
+    sentence_support,
+    split_chunks,
+    split_sentences,
+)
+
+CONTEXT = "\n\n".join([
+    "[DOC-1] El contrato de suministro con Acme vence el 31 de diciembre de 2026.\n"
+    "La renovación es automática salvo preaviso de tres meses.",
+    "[DOC-2] La penalización por retraso en la entrega es del 2% del importe mensual.",
+])
+
+
+class TestSplitting:
+    """Tests de la segmentación"""
+
+    def test_sentences_without_labels(self):
+        """Test: Las etiquetas [DOC-X] no forman parte de la oración y las cortas se ignoran"""
+        sentences = split_sentences("El contrato vence en 2026 [DOC-1]. Sí. ¿Y la penalización? Es del 2% mensual [DOC-2].")
+
+        assert sentences == ["el contrato vence en 2026", "y la penalizacion", "es del 2% mensual"]
+
+    def test_chunks_of_context(self):
+        """Test: Cada bloque [DOC-X] es un chunk aunque tenga saltos de línea"""
+        assert len(split_chunks(CONTEXT)) == 2
+
+
+class TestSentenceSupport:
+    """Tests de la contención por oración"""
+
+    def test_best_chunk_per_sentence(self):
+        """Test: Cada oración se mide contra el chunk que mejor la cubre"""
+        support = sentence_support(
+            ["la penalizacion por retraso en la entrega es del 2% del importe mensual",
+             "el contrato de suministro con acme vence el 31 de diciembre de 2026"],
+            split_chunks(CONTEXT)
+        )
+
+        assert support.tolist() == [1.0, 1.0]
+
+    def test_unrelated_sentence(self):
+        """Test: Una oración inventada apenas comparte shingles"""
+        support = sentence_support(["el consejo aprobo una fusion con globex en marzo"], split_chunks(CONTEXT))
+
+        assert support[0] < 0.2
+
+    def test_empty_context(self):
+        """Test: Sin contexto ninguna oración está fundamentada"""
+        assert sentence_support(["el contrato vence en 2026"], []).tolist() == [0.0]
+
+
+class TestGroundingConfidence:
+    """Tests de la confianza final"""
+
+    def test_grounded_answer_scores_above_invented(self):
+        """Test: Respuesta fundamentada (con paráfrasis) puntúa más que una inventada"""
+        grounded = grounding_confidence(
+            "El contrato de suministro con Acme vence el 31 de diciembre de 2026 [DOC-1]. "
+            "Por retraso en la entrega hay una penalización del 2% del importe mensual [DOC-2].",
+            CONTEXT
+        )
+        invented = grounding_confidence(
+            "El consejo aprobó una fusión con Globex en marzo [DOC-1]. "
+            "El director financiero dimitió tras la auditoría [DOC-2].",
+            CONTEXT
+        )
+
+        assert grounded > 0.8
+        assert invented < 0.3
+
+    def test_uncited_answer_is_penalized(self):
+        """Test: Sin ninguna citación la confianza se multiplica por la penalización"""
+        answer = "El contrato de suministro con Acme vence el 31 de diciembre de 2026"
+
+        assert grounding_confidence(answer, CONTEXT) == pytest.approx(
+            grounding_confidence(answer + " [DOC-1]", CONTEXT) * UNCITED_PENALTY
+        )
+
+    def test_no_sentences_is_neutral(self):
+        """Test: Una respuesta sin oraciones verificables da la confianza neutra"""
+        assert grounding_confidence("Sí [DOC-1].", CONTEXT) == NEUTRAL_CONFIDENCE
@@ -0,0 +1,123 @@
+"""
+Tests for Index Worker
+
+Verifican ``IndexWorker._index_document`` sobre un ``Document`` real: sólo
+se indexan documentos COMPLETED, el resultado queda en ``metadata_json`` y
+un fallo deja ``indexation_error`` y se propaga para que el runtime lo envíe
+a reintento; el reintento limpia el error.
+"""
+
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("aiokafka")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import workers.index_worker as index_worker_module
+from models.database_models import Document, DocumentChunk, DocumentClassification, DocumentStatus
+
+
+class FakeSession:
+    """Sesión asíncrona en memoria: primero el documento y después sus chunks"""
+
+    def __init__(self, document, chunks):
+        self.document = document
+        self.chunks = chunks
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        if statement.column_descriptions[0]["entity"] is Document:
+            return SimpleNamespace(scalar_one_or_none=lambda: self.document)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.chunks))
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def document():
+    return Document(
+        id=uuid.uuid4(),
+        title="contrato_acme.pdf",
+        mime_type="application/pdf",
+        file_size_bytes=1024,
+        checksum_sha256="0" * 64,
+        storage_path="user/2026/contrato_acme.pdf",
+        status=DocumentStatus.COMPLETED,
+        classification=DocumentClassification.CONTRATO_PROVEEDOR,
+        metadata_json={"pipeline_stages": {"transform": {}}},
+    )
+
+
+@pytest.fixture
+def session(monkeypatch, document):
+    chunks = [
+        DocumentChunk(id=uuid.uuid4(), document_id=document.id, chunk_index=i, text=f"chunk {i}")
+        for i in range(3)
+    ]
+    session = FakeSession(document, chunks)
+    monkeypatch.setattr(index_worker_module, "async_session_maker", lambda: session)
+    return session
+
+
+@pytest.fixture
+def search(monkeypatch):
+    search = SimpleNamespace(index_document=AsyncMock())
+    monkeypatch.setattr(index_worker_module, "search_service", search)
+    return search
+
+
+@pytest.mark.asyncio
+class TestIndexWorker:
+    """Tests de indexación de documentos"""
+
+    async def test_index_completed_document(self, document, session, search):
+        """Test: Un documento COMPLETED se indexa y se registra en metadata_json"""
+        await index_worker_module.IndexWorker()._index_document({"document_id": str(document.id)})
+
+        search.index_document.assert_awaited_once_with(document, session.chunks)
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.metadata_json["indexed_chunks"] == 3
+        assert "indexed_at" in document.metadata_json
+        assert "pipeline_stages" in document.metadata_json
+        assert session.commits == 1
+
+    async def test_failure_is_recorded_and_cleared_on_retry(self, document, session, search):
+        """Test: El fallo queda en indexation_error, se propaga y el reintento lo limpia"""
+        search.index_document.side_effect = [RuntimeError("opensearch unavailable"), None]
+        worker = index_worker_module.IndexWorker()
+        event = {"document_id": str(document.id)}
+
+        with pytest.raises(RuntimeError, match="opensearch unavailable"):
+            await worker._index_document(event)
+
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.metadata_json["indexation_error"]["error_type"] == "RuntimeError"
+        assert document.metadata_json["indexation_error"]["attempt"] == 0
+
+        await worker._index_document(event, attempt=1)
+
+        assert search.index_document.await_count == 2
+        assert "indexation_error" not in document.metadata_json
+        assert document.metadata_json["indexed_chunks"] == 3
+
+    async def test_skip_unprocessed_document(self, document, session, search):
+        """Test: Un documento que no está COMPLETED no se indexa"""
+        document.status = DocumentStatus.PROCESSING
+
+        await index_worker_module.IndexWorker()._index_document({"document_id": str(document.id)})
+
+        search.index_document.assert_not_awaited()
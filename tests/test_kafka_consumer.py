@@ -0,0 +1,362 @@
+"""
+Tests for Kafka Consumer Runtime
+
+Verifican el consumo concurrente con backpressure: lotes limitados a los
+huecos libres, pausa/reanudación de particiones, commits manuales tras
+procesar, métricas por topic y reintentos/DLQ. Se usa un consumer en
+memoria con la misma interfaz que ``AIOKafkaConsumer``.
+"""
+
+import asyncio
+import sys
+import os
+import time
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip("aiokafka")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from aiokafka.structs import TopicPartition
+
+from core.kafka_consumer import KafkaConsumerRuntime
+from core.retry_topics import (
+    NonRetryableError,
+    RetryPolicy,
+    retry_attempt,
+    retry_due_at,
+    header,
+    ORIGINAL_TOPIC_HEADER,
+)
+
+Record = namedtuple("Record", ["topic", "partition", "offset", "value", "key", "headers"], defaults=(None, ()))
+TP = TopicPartition("document.to_index", 0)
+
+
+class MemoryConsumer:
+    """Consumer en memoria: una partición con los mensajes indicados"""
+
+    def __init__(self, values, tp=TP, headers=()):
+        self.tp = tp
+        self.records = [Record(tp.topic, tp.partition, i, v, None, headers) for i, v in enumerate(values)]
+        self.position = 0
+        self.max_records_seen = []
+        self.commits = []
+        self.pause_calls = 0
+        self._paused = set()
+        self.listener = None
+        self.stopped = False
+
+    def subscribe(self, topics, listener=None):
+        self.listener = listener
+
+    async def start(self):
+        await self.listener.on_partitions_assigned({self.tp})
+
+    async def stop(self):
+        self.stopped = True
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        self.max_records_seen.append(max_records)
+        if self.tp in self._paused or self.position >= len(self.records):
+            await asyncio.sleep(timeout_ms / 1000)
+            return {}
+        batch = self.records[self.position:self.position + max_records]
+        self.position += len(batch)
+        return {self.tp: batch}
+
+    def seek(self, partition, offset):
+        self.position = offset
+
+    def assignment(self):
+        return {self.tp}
+
+    def pause(self, *partitions):
+        self.pause_calls += 1
+        self._paused.update(partitions)
+
+    def resume(self, *partitions):
+        self._paused.difference_update(partitions)
+
+    def paused(self):
+        return set(self._paused)
+
+    async def commit(self, offsets):
+        self.commits.append(dict(offsets))
+
+    def highwater(self, partition):
+        return len(self.records)
+
+
+async def run_until(runtime, condition, timeout=5.0):
+    task = asyncio.create_task(runtime.run())
+    try:
+        async def wait():
+            while not condition():
+                await asyncio.sleep(0.005)
+        await asyncio.wait_for(wait(), timeout)
+    finally:
+        await runtime.stop()
+        await task
+
+
+class TestKafkaConsumerRuntime:
+    """Tests del runtime de consumo"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test: Nunca hay más de max_in_flight mensajes en curso"""
+        consumer = MemoryConsumer(range(10))
+        active, peak, done = 0, 0, []
+
+        async def handler(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            done.append(message.value)
+
+        runtime = KafkaConsumerRuntime(
+            consumer, [TP.topic], handler, group="test", max_in_flight=3,
+            fetch_timeout_ms=10, commit_interval_ms=0
+        )
+        await runtime.start()
+        await run_until(runtime, lambda: len(done) == 10)
+
+        assert sorted(done) == list(range(10))
+        assert peak == 3
+        assert all(n is None or 1 <= n <= 3 for n in consumer.max_records_seen)
+        assert consumer.commits[-1] == {TP: 10}
+        assert consumer.stopped
+
+    @pytest.mark.asyncio
+    async def test_pauses_when_saturated(self):
+        """Test: Con el worker saturado se pausan las particiones y se reanudan después"""
+        consumer = MemoryConsumer(range(6))
+        release = asyncio.Event()
+        done = []
+
+        async def handler(message):
+            await release.wait()
+            done.append(message.value)
+
+        runtime = KafkaConsumerRuntime(
+            consumer, [TP.topic], handler, group="test", max_in_flight=2,
+            fetch_timeout_ms=10, commit_interval_ms=0
+        )
+        await runtime.start()
+        task = asyncio.create_task(runtime.run())
+        while not runtime.paused:
+            await asyncio.sleep(0.005)
+
+        assert consumer.paused() == {TP}
+        assert runtime.in_flight == 2
+
+        release.set()
+        while len(done) < 6:
+            await asyncio.sleep(0.005)
+        await runtime.stop()
+        await task
+
+        assert not consumer.paused()
+        assert consumer.pause_calls >= 1
+
+    @pytest.mark.asyncio
+    async def test_slow_message_holds_commit(self):
+        """Test: No se confirma más allá de un mensaje que sigue en curso"""
+        consumer = MemoryConsumer(["slow", "fast", "fast"])
+        release = asyncio.Event()
+        done = []
+
+        async def handler(message):
+            if message.value == "slow":
+                await release.wait()
+            done.append(message.offset)
+
+        runtime = KafkaConsumerRuntime(
+            consumer, [TP.topic], handler, group="test", max_in_flight=3,
+            fetch_timeout_ms=10, commit_interval_ms=0
+        )
+        await runtime.start()
+        task = asyncio.create_task(runtime.run())
+        while len(done) < 2:
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+
+        assert all(commit[TP] == 0 for commit in consumer.commits)
+
+        release.set()
+        await runtime.stop()
+        await task
+        assert consumer.commits[-1] == {TP: 3}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_counted_and_committed(self):
+        """Test: Un mensaje con error se cuenta y no bloquea la partición"""
+        consumer = MemoryConsumer([1, 0, 2])
+
+        async def handler(message):
+            1 / message.value
+
+        runtime = KafkaConsumerRuntime(
+            consumer, [TP.topic], handler, group="test", max_in_flight=4,
+            fetch_timeout_ms=10, commit_interval_ms=0
+        )
+        await runtime.start()
+        await run_until(runtime, lambda: runtime.offsets.committed(TP) == 3)
+
+        stats = runtime.stats()
+        assert stats["topics"][TP.topic]["processed"] == 2
+        assert stats["topics"][TP.topic]["failed"] == 1
+        assert stats["topics"][TP.topic]["consumed"] == 3
+        assert stats["lag"] == {f"{TP.topic}[0]": 0}
+
+    @pytest.mark.asyncio
+    async def test_revoke_waits_for_in_flight_messages(self):
+        """Test: En un rebalanceo se terminan y confirman los mensajes de la partición"""
+        consumer = MemoryConsumer(range(2))
+        done = []
+
+        async def handler(message):
+            await asyncio.sleep(0.02)
+            done.append(message.offset)
+
+        runtime = KafkaConsumerRuntime(
+            consumer, [TP.topic], handler, group="test", max_in_flight=2,
+            fetch_timeout_ms=10, commit_interval_ms=60_000
+        )
+        await runtime.start()
+        await runtime._fetch()
+        assert runtime.in_flight == 2
+
+        await consumer.listener.on_partitions_revoked({TP})
+
+        assert sorted(done) == [0, 1]
+        assert consumer.commits == [{TP: 2}]
+        assert runtime.offsets.committable() == {}
+        await runtime.stop()
+
+
+class MemoryProducer:
+    """Producer en memoria: registra los mensajes enviados"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_and_wait(self, topic, value=None, key=None, headers=None):
+        self.sent.append((topic, value, Record(topic, 0, len(self.sent), value, key, headers or [])))
+
+
+class TestRetryTopics:
+    """Tests de reintentos con backoff y dead-letter topic"""
+
+    def test_policy_topics_and_backoff(self):
+        """Test: Topics de reintento con espera exponencial y DLQ al final"""
+        policy = RetryPolicy.exponential("document.to_transform", attempts=3, base_delay=30, factor=4)
+
+        assert policy.delays == (30, 120, 480)
+        assert policy.topics == [
+            "document.to_transform",
+            "document.to_transform.retry.1",
+            "document.to_transform.retry.2",
+            "document.to_transform.retry.3",
+        ]
+        assert policy.next_step(0) == ("document.to_transform.retry.1", 30)
+        assert policy.next_step(2) == ("document.to_transform.retry.3", 480)
+        assert policy.next_step(3) == ("document.to_transform.dlq", None)
+        assert policy.next_step(0, retryable=False) == ("document.to_transform.dlq", None)
+
+    @pytest.mark.asyncio
+    async def test_failure_goes_to_retry_then_dead_letter(self):
+        """Test: Un fallo pasa al siguiente reintento y, agotados, al DLQ con contexto"""
+        policy = RetryPolicy("document.to_index", delays=(0.0, 0.0))
+        producer = MemoryProducer()
+
+        async def handler(message):
+            raise ConnectionError("OpenSearch unavailable")
+
+        # Mensaje original -> retry.1
+        consumer = MemoryConsumer([{"document_id": "d1"}])
+        runtime = KafkaConsumerRuntime(
+            consumer, policy.topics, handler, group="test", max_in_flight=2,
+            fetch_timeout_ms=10, commit_interval_ms=0, retry=policy, producer=producer
+        )
+        await runtime.start()
+        await run_until(runtime, lambda: runtime.offsets.committed(TP) == 1)
+
+        topic, value, forwarded = producer.sent[-1]
+        assert topic == "document.to_index.retry.1"
+        assert value == {"document_id": "d1"}
+        assert retry_attempt(forwarded) == 1
+        assert header(forwarded, ORIGINAL_TOPIC_HEADER) == "document.to_index"
+        assert runtime.stats()["topics"][TP.topic]["retried"] == 1
+
+        # Último reintento -> DLQ
+        retry_tp = TopicPartition("document.to_index.retry.2", 0)
+        consumer = MemoryConsumer([{"document_id": "d1"}], tp=retry_tp, headers=[
+            ("x-retry-attempt", b"2"), ("x-original-topic", b"document.to_index")
+        ])
+        runtime = KafkaConsumerRuntime(
+            consumer, policy.topics, handler, group="test", max_in_flight=2,
+            fetch_timeout_ms=10, commit_interval_ms=0, retry=policy, producer=producer
+        )
+        await runtime.start()
+        await run_until(runtime, lambda: runtime.offsets.committed(retry_tp) == 1)
+
+        topic, value, _ = producer.sent[-1]
+        assert topic == "document.to_index.dlq"
+        assert value["event"] == {"document_id": "d1"}
+        assert value["source_topic"] == "document.to_index"
+        assert value["attempts"] == 3
+        assert value["error_type"] == "ConnectionError"
+        assert runtime.stats()["topics"][retry_tp.topic]["dead_lettered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_error_skips_retries(self):
+        """Test: Un fallo permanente va directamente al DLQ"""
+        policy = RetryPolicy("document.to_transform", delays=(30.0,))
+        producer = MemoryProducer()
+
+        async def handler(message):
+            raise NonRetryableError("No text extracted")
+
+        consumer = MemoryConsumer([{"document_id": "d2"}])
+        runtime = KafkaConsumerRuntime(
+            consumer, policy.topics, handler, group="test",
+            fetch_timeout_ms=10, commit_interval_ms=0, retry=policy, producer=producer
+        )
+        await runtime.start()
+        await run_until(runtime, lambda: runtime.offsets.committed(TP) == 1)
+
+        assert [topic for topic, _, _ in producer.sent] == ["document.to_transform.dlq"]
+        assert producer.sent[0][1]["retryable"] is False
+
+    @pytest.mark.asyncio
+    async def test_retry_waits_until_due(self):
+        """Test: Un reintento no se procesa antes de su hora"""
+        policy = RetryPolicy("document.to_index", delays=(0.2,))
+        retry_tp = TopicPartition("document.to_index.retry.1", 0)
+        due = time.time() + 0.2
+        consumer = MemoryConsumer(["a", "b"], tp=retry_tp, headers=[
+            ("x-retry-attempt", b"1"), ("x-retry-at", f"{due:.3f}".encode())
+        ])
+        processed_at = []
+
+        async def handler(message):
+            processed_at.append(time.time())
+
+        runtime = KafkaConsumerRuntime(
+            consumer, policy.topics, handler, group="test",
+            fetch_timeout_ms=10, commit_interval_ms=0, retry=policy, producer=MemoryProducer()
+        )
+        await runtime.start()
+        assert retry_due_at(consumer.records[0]) == pytest.approx(due, abs=0.01)
+
+        await run_until(runtime, lambda: len(processed_at) == 2)
+
+        assert min(processed_at) >= due - 0.01
+        assert consumer.commits[-1] == {retry_tp: 2}
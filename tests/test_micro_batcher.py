@@ -0,0 +1,59 @@
+"""
+Tests for Micro Batcher
+
+Verifican que las peticiones concurrentes se agrupan en lotes y que cada
+llamador recibe su resultado (o el error del lote).
+"""
+
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from core.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Tests del micro batcher"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_batch(self):
+        """Test: Peticiones concurrentes se procesan en un lote"""
+        batches = []
+
+        def process(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        await batcher.close()
+
+        assert results == [0, 2, 4, 6, 8, 10]
+        assert batches == [[0, 1, 2, 3], [4, 5]]
+        assert batcher.stats == {"batches": 2, "items": 6}
+
+    @pytest.mark.asyncio
+    async def test_batch_error_propagates(self):
+        """Test: El error del lote llega a todos sus llamadores"""
+        def process(items):
+            raise ValueError("model failed")
+
+        batcher = MicroBatcher(process, max_wait_ms=10)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.close()
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch(self):
+        """Test: Un número de resultados distinto se trata como error"""
+        batcher = MicroBatcher(lambda items: [], max_wait_ms=10)
+
+        with pytest.raises(RuntimeError):
+            await batcher.submit("x")
+        await batcher.close()
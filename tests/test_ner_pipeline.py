@@ -0,0 +1,69 @@
+"""
+Tests for NER Pipeline
+
+Verifican la extracción de entidades en lote: segmentación sin truncado,
+offsets sobre el texto original y componentes deshabilitados.
+"""
+
+import sys
+import os
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.ner_pipeline import ner_disabled_components, pipe_entities
+
+
+@pytest.fixture
+def nlp():
+    """Pipeline en blanco con reglas de entidades (sin descargar modelos)"""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "ORG", "pattern": "Banco Central"},
+        {"label": "PER", "pattern": "Ana López"},
+    ])
+    return nlp
+
+
+class TestNERPipeline:
+    """Tests del NER en lote"""
+
+    def test_offsets_across_segments(self, nlp):
+        """Test: Los offsets de cada segmento se trasladan al documento"""
+        text = "Ana López firmó el contrato. " * 50 + "El Banco Central lo aprobó."
+
+        [entities] = pipe_entities(nlp, [text], batch_size=4, segment_words=12)
+
+        assert len(entities) == 51
+        for ent in entities:
+            assert text[ent["start"]:ent["end"]] == ent["text"]
+        assert entities[-1]["label"] == "ORG"
+
+    def test_multiple_documents(self, nlp):
+        """Test: Varios documentos en una pasada conservan su asignación"""
+        texts = ["Sin entidades.", "Informe del Banco Central.", "Ana López y Ana López."]
+
+        results = pipe_entities(nlp, texts, segment_words=10)
+
+        assert results[0] == []
+        assert [e["text"] for e in results[1]] == ["Banco Central"]
+        assert [(e["start"], e["end"]) for e in results[2]] == [(0, 9), (12, 21)]
+
+    def test_long_document_not_truncated(self, nlp):
+        """Test: Documentos mayores que nlp.max_length no se truncan"""
+        nlp.max_length = 1000
+        text = "Texto de relleno sin nombres. " * 100 + "Ana López."
+
+        [entities] = pipe_entities(nlp, [text], segment_words=50)
+
+        assert [e["text"] for e in entities] == ["Ana López"]
+
+    def test_disabled_components(self, nlp):
+        """Test: Sólo se ejecutan los componentes de entidades"""
+        assert ner_disabled_components(nlp) == ["sentencizer"]
@@ -0,0 +1,89 @@
+"""
+Tests for Offset Tracker and CPU Pool
+
+Verifican la confirmación manual de offsets con mensajes que terminan en
+cualquier orden y la ejecución de etapas CPU-bound en el pool de procesos.
+"""
+
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from core.offset_tracker import OffsetTracker
+from core.cpu_pool import configure_cpu_pool, run_cpu_bound, shutdown_cpu_pool
+
+
+class TestOffsetTracker:
+    """Tests del seguimiento de offsets"""
+
+    def test_commits_only_contiguous_prefix(self):
+        """Test: Un mensaje lento bloquea la confirmación de los posteriores"""
+        tracker = OffsetTracker()
+        for offset in (10, 11, 12):
+            tracker.start("p0", offset)
+
+        tracker.done("p0", 11)
+        tracker.done("p0", 12)
+        assert tracker.committable() == {"p0": 10}
+        assert tracker.in_flight == 1
+
+        tracker.done("p0", 10)
+        assert tracker.committable() == {"p0": 13}
+        assert tracker.in_flight == 0
+
+    def test_partitions_are_independent(self):
+        """Test: Cada partición avanza por separado"""
+        tracker = OffsetTracker()
+        tracker.start("p0", 0)
+        tracker.start("p1", 5)
+        tracker.done("p1", 5)
+
+        assert tracker.committable() == {"p0": 0, "p1": 6}
+
+    def test_mark_committed_skips_unchanged_partitions(self):
+        """Test: Sólo se confirman las particiones que han avanzado"""
+        tracker = OffsetTracker()
+        tracker.start("p0", 0)
+        tracker.start("p1", 0)
+        tracker.done("p0", 0)
+        tracker.mark_committed(tracker.committable())
+
+        assert tracker.committable() == {}
+
+        tracker.done("p1", 0)
+        assert tracker.committable() == {"p1": 1}
+
+    def test_forget_revoked_partitions(self):
+        """Test: Las particiones revocadas dejan de confirmarse"""
+        tracker = OffsetTracker()
+        tracker.start("p0", 3)
+        tracker.forget(["p0"])
+        tracker.done("p0", 3)
+
+        assert tracker.committable() == {}
+        assert tracker.in_flight == 0
+
+
+class TestCpuPool:
+    """Tests del pool de procesos"""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_thread_without_pool(self):
+        """Test: Sin pool la función se ejecuta en el proceso actual"""
+        assert await run_cpu_bound(os.getpid) == os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_runs_in_process_pool(self):
+        """Test: Con pool las tareas se reparten en otros procesos"""
+        assert configure_cpu_pool(2) == 2
+        try:
+            pids = await asyncio.gather(*(run_cpu_bound(os.getpid) for _ in range(4)))
+            assert os.getpid() not in pids
+            assert await run_cpu_bound(pow, 2, 10) == 1024
+        finally:
+            shutdown_cpu_pool()
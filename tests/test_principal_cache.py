@@ -0,0 +1,174 @@
+"""
+Tests for Principal Cache
+
+Verifican que get_current_user resuelve el usuario de un token una sola vez
+mientras la entrada es vigente y que un cambio de rol o una desactivación
+invalidan la caché y los tokens emitidos antes.
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from core.auth import (
+    PrincipalCache,
+    _bump_auth_version,
+    create_access_token,
+    get_current_user,
+    principal_cache,
+)
+from models.database_models import User
+
+
+def make_user(role: str = "agent", auth_version: int = 1) -> User:
+    """Usuario 'cargado' de la BD (valores confirmados, sin historial)"""
+    user = User()
+    values = {
+        "id": uuid.uuid4(),
+        "email": "ana@tefinancia.es",
+        "full_name": "Ana",
+        "role": role,
+        "department": "riesgos",
+        "mfa_enabled": False,
+        "is_active": True,
+        "auth_version": auth_version,
+        "created_at": datetime(2025, 1, 1),
+        "last_login": None,
+    }
+    for key, value in values.items():
+        set_committed_value(user, key, value)
+    return user
+
+
+class FakeResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+class FakeSession:
+    """Sesión que cuenta las consultas"""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return FakeResult(self.user)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+class TestGetCurrentUserCache:
+    """Tests de la resolución de usuarios con caché"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_cache(self):
+        """Test: El mismo token sólo consulta la BD una vez"""
+        user = make_user()
+        db = FakeSession(user)
+        token = create_access_token({"sub": user.email, "ver": 1})
+
+        first = await get_current_user(token, db)
+        second = await get_current_user(token, db)
+
+        assert db.queries == 1
+        assert first is second
+        assert principal_cache.stats()["hit"] == 1
+
+    @pytest.mark.asyncio
+    async def test_distinct_tokens_are_cached_separately(self):
+        """Test: Cada token (jti) tiene su propia entrada"""
+        user = make_user()
+        db = FakeSession(user)
+
+        await get_current_user(create_access_token({"sub": user.email}), db)
+        await get_current_user(create_access_token({"sub": user.email}), db)
+
+        assert db.queries == 2
+
+    @pytest.mark.asyncio
+    async def test_role_change_invalidates_cached_principal(self):
+        """Test: Cambiar el rol sube auth_version y descarta la entrada"""
+        user = make_user(role="agent")
+        db = FakeSession(user)
+        token = create_access_token({"sub": user.email})
+        await get_current_user(token, db)
+
+        user.role = "admin"
+        _bump_auth_version(None, None, user)
+        principal = await get_current_user(token, db)
+
+        assert user.auth_version == 2
+        assert db.queries == 2
+        assert principal.role == "admin"
+        assert principal_cache.stats()["invalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_token_issued_before_deactivation_is_rejected(self):
+        """Test: Un token con versión anterior a la del usuario da 401"""
+        user = make_user(auth_version=1)
+        token = create_access_token({"sub": user.email, "ver": 1})
+
+        set_committed_value(user, "is_active", False)
+        set_committed_value(user, "auth_version", 2)
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token, FakeSession(user))
+        assert exc.value.status_code == 401
+
+    def test_unrelated_update_keeps_version(self):
+        """Test: Otros cambios (last_login) no invalidan"""
+        user = make_user()
+        user.last_login = datetime(2025, 2, 1)
+        _bump_auth_version(None, None, user)
+
+        assert user.auth_version == 1
+
+
+class TestPrincipalCache:
+    """Tests de la caché en memoria"""
+
+    def test_entries_expire_with_token(self):
+        """Test: La entrada no sobrevive a la expiración del token"""
+        cache = PrincipalCache(ttl=60)
+        expired = (datetime.utcnow() - timedelta(seconds=1)).timestamp()
+        cache.put(("sub", "jti"), "u1", 1, "principal", token_exp=expired)
+
+        assert cache.get(("sub", "jti")) is None
+        assert cache.stats()["stale"] == 1
+
+    def test_lru_eviction(self):
+        """Test: Se descarta la entrada menos usada al superar el tamaño"""
+        cache = PrincipalCache(ttl=60, max_size=2)
+        cache.put(("a", 1), "u1", 1, "A")
+        cache.put(("b", 1), "u2", 1, "B")
+        cache.get(("a", 1))
+        cache.put(("c", 1), "u3", 1, "C")
+
+        assert cache.get(("b", 1)) is None
+        assert cache.get(("a", 1)) == "A"
+        assert cache.stats()["size"] == 2
+
+    def test_disabled_with_zero_ttl(self):
+        """Test: Con TTL 0 no se guarda nada"""
+        cache = PrincipalCache(ttl=0)
+        cache.put(("a", 1), "u1", 1, "A")
+
+        assert cache.get(("a", 1)) is None
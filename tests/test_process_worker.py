@@ -0,0 +1,149 @@
+"""
+Tests for Process Worker
+
+Verifican los checkpoints del pipeline sobre un ``Document`` real: cada etapa
+terminada queda en ``metadata_json["pipeline_stages"]`` y un reintento tras
+un fallo continúa desde la etapa que falló sin repetir las anteriores.
+"""
+
+import sys
+import os
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("aiokafka")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import workers.process_worker as process_worker_module
+from models.database_models import Document, DocumentClassification, DocumentStatus
+
+TEXT = "Contrato de suministro con Acme. Penalización del 2% por retraso."
+
+
+class FakeSession:
+    """Sesión asíncrona en memoria que siempre devuelve el mismo documento"""
+
+    def __init__(self, document):
+        self.document = document
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one_or_none=lambda: self.document)
+
+    async def get(self, model, document_id):
+        return self.document
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, document):
+        pass
+
+
+@pytest.fixture
+def document():
+    return Document(
+        id=uuid.uuid4(),
+        title="contrato_acme.pdf",
+        mime_type="application/pdf",
+        file_size_bytes=1024,
+        checksum_sha256="0" * 64,
+        storage_path="user/2026/contrato_acme.pdf",
+        status=DocumentStatus.PENDING,
+        metadata_json=None,
+    )
+
+
+@pytest.fixture
+def pipeline(monkeypatch, document):
+    """Servicios del pipeline simulados; el riesgo falla en el primer intento"""
+
+    @asynccontextmanager
+    async def spool_document(doc):
+        yield "/tmp/contrato_acme.pdf"
+
+    async def classify_document(document, text, db):
+        document.classification = DocumentClassification.CONTRATO_PROVEEDOR
+        return {"category": DocumentClassification.CONTRATO_PROVEEDOR, "confidence": 0.9, "method": "ml"}
+
+    services = SimpleNamespace(
+        transform=AsyncMock(return_value={"text": TEXT, "page_count": 1, "method": "direct"}),
+        ingest=SimpleNamespace(
+            spool_document=spool_document,
+            store_extracted_text=AsyncMock(return_value="extracted/contrato_acme.txt"),
+            get_extracted_text=AsyncMock(return_value=TEXT),
+        ),
+        extract=SimpleNamespace(extract_information=AsyncMock(
+            return_value={"status": "success", "chunk_count": 3, "entity_count": 2}
+        )),
+        classification=SimpleNamespace(classify_document=AsyncMock(side_effect=classify_document)),
+        compliance=SimpleNamespace(run_compliance_checks=AsyncMock(
+            return_value=SimpleNamespace(is_compliant=True, compliance_score=0.95)
+        )),
+        risk=SimpleNamespace(assess_risk=AsyncMock(side_effect=[
+            RuntimeError("risk model unavailable"),
+            SimpleNamespace(risk_level="low", overall_risk_score=0.2),
+        ])),
+    )
+
+    monkeypatch.setattr(process_worker_module, "async_session_maker", lambda: FakeSession(document))
+    monkeypatch.setattr(process_worker_module, "run_cpu_bound", services.transform)
+    monkeypatch.setattr(process_worker_module, "ingest_service", services.ingest)
+    monkeypatch.setattr(process_worker_module, "extract_service", services.extract)
+    monkeypatch.setattr(process_worker_module, "classification_service", services.classification)
+    monkeypatch.setattr(process_worker_module, "compliance_service", services.compliance)
+    monkeypatch.setattr(process_worker_module, "risk_service", services.risk)
+    monkeypatch.setattr(
+        process_worker_module, "_validation_middleware",
+        lambda: SimpleNamespace(should_validate=AsyncMock(return_value=False))
+    )
+    return services
+
+
+@pytest.mark.asyncio
+class TestProcessWorkerResume:
+    """Tests de reanudación del pipeline"""
+
+    async def test_retry_resumes_from_failed_stage(self, document, pipeline):
+        """Test: El reintento sólo ejecuta la etapa fallida y las siguientes"""
+        worker = process_worker_module.ProcessWorker()
+        worker.producer = SimpleNamespace(send_and_wait=AsyncMock())
+        event = {"document_id": str(document.id)}
+
+        with pytest.raises(RuntimeError, match="risk model unavailable"):
+            await worker._process_document(event)
+
+        assert document.status == DocumentStatus.FAILED
+        assert set(document.metadata_json["pipeline_stages"]) == {
+            "transform", "extract", "classification", "compliance"
+        }
+        assert document.metadata_json["processing_error"]["error_type"] == "RuntimeError"
+
+        await worker._process_document(event, attempt=1)
+
+        assert pipeline.transform.await_count == 1
+        pipeline.ingest.get_extracted_text.assert_awaited_once_with("extracted/contrato_acme.txt")
+        assert pipeline.extract.extract_information.await_count == 1
+        assert pipeline.classification.classify_document.await_count == 1
+        assert pipeline.compliance.run_compliance_checks.await_count == 1
+        assert pipeline.risk.assess_risk.await_count == 2
+
+        assert document.status == DocumentStatus.COMPLETED
+        assert "processing_error" not in document.metadata_json
+        assert document.metadata_json["pipeline_stages"]["risk"] == {
+            "risk_level": "low", "overall_risk_score": 0.2
+        }
+        index_event = worker.producer.send_and_wait.await_args.kwargs["value"]
+        assert index_event["chunk_count"] == 3
+        assert index_event["classification"] == "contrato_proveedor"
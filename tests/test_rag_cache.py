@@ -0,0 +1,124 @@
+"""
+Tests for RAG Answer Cache
+
+Verifican la caché de respuestas RAG: clave por pregunta normalizada y
+contexto recuperado, búsqueda semántica de preguntas casi idénticas,
+expiración e invalidación por documento.
+"""
+
+import sys
+import os
+import uuid
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import services.rag_cache as rag_cache_module
+from services.rag_cache import (
+    RAGAnswerCache,
+    normalize_question,
+    retrieval_fingerprint,
+)
+
+DOC_A = str(uuid.uuid4())
+DOC_B = str(uuid.uuid4())
+CHUNKS = [(DOC_A, "El contrato vence en 2026."), (DOC_B, "Penalización del 2%.")]
+FINGERPRINT = retrieval_fingerprint(CHUNKS)
+VERSIONS = {DOC_A: "2025-01-01T00:00:00", DOC_B: None}
+
+
+def cache_key(cache, question, fingerprint=FINGERPRINT, model="gpt-4", prompt="p1"):
+    return cache.key(question, fingerprint, model, prompt)
+
+
+class TestKey:
+    """Tests de la clave de caché"""
+
+    def test_question_normalization(self):
+        """Test: Mayúsculas, tildes, signos y espacios no cambian la pregunta"""
+        assert normalize_question("¿Cuándo  vence el Contrato?") == normalize_question("cuando vence el contrato")
+
+    def test_fingerprint_depends_on_content_and_order(self):
+        """Test: La huella depende del contenido recuperado y de su orden (etiquetas [DOC-X])"""
+        assert retrieval_fingerprint(list(CHUNKS)) == FINGERPRINT
+        assert retrieval_fingerprint(reversed(CHUNKS)) != FINGERPRINT
+        changed = [(DOC_A, "El contrato vence en 2027."), CHUNKS[1]]
+        assert retrieval_fingerprint(changed) != FINGERPRINT
+
+    def test_model_and_prompt_are_part_of_key(self):
+        """Test: Otro modelo u otra versión del prompt no comparten respuesta"""
+        cache = RAGAnswerCache()
+        cache.put(cache_key(cache, "¿Cuándo vence?"), "En 2026 [DOC-1]", [], 0.9, VERSIONS)
+
+        assert cache.get(cache_key(cache, "cuando vence")) is not None
+        assert cache.get(cache_key(cache, "cuando vence", model="claude")) is None
+        assert cache.get(cache_key(cache, "cuando vence", prompt="p2")) is None
+
+
+class TestLookup:
+    """Tests de lectura"""
+
+    def test_semantic_match_requires_same_context(self):
+        """Test: Una pregunta parecida reutiliza la respuesta sólo con el mismo contexto"""
+        cache = RAGAnswerCache(similarity_threshold=0.95)
+        cache.put(cache_key(cache, "¿Cuándo vence el contrato?"), "En 2026", [], 0.9, VERSIONS, [1.0, 0.0, 0.1])
+
+        similar = [0.99, 0.0, 0.12]
+        assert cache.get(cache_key(cache, "¿Qué día vence el contrato?"), similar).answer == "En 2026"
+        other_context = retrieval_fingerprint(CHUNKS[:1])
+        assert cache.get(cache_key(cache, "¿Qué día vence el contrato?", other_context), similar) is None
+        assert cache.get(cache_key(cache, "¿Quién firma?"), [0.0, 1.0, 0.0]) is None
+        assert cache.stats()["semantic_hit"] == 1
+
+    def test_semantic_disabled_by_default(self):
+        """Test: Sin umbral sólo vale la coincidencia exacta"""
+        cache = RAGAnswerCache()
+        cache.put(cache_key(cache, "¿Cuándo vence el contrato?"), "En 2026", [], 0.9, VERSIONS, [1.0, 0.0])
+
+        assert cache.get(cache_key(cache, "¿Qué día vence el contrato?"), [1.0, 0.0]) is None
+
+    def test_entries_expire(self, monkeypatch):
+        """Test: Una entrada vencida no se sirve"""
+        now = [1000.0]
+        monkeypatch.setattr(rag_cache_module.time, "monotonic", lambda: now[0])
+        cache = RAGAnswerCache(ttl=60)
+        key = cache_key(cache, "¿Cuándo vence?")
+        cache.put(key, "En 2026", [], 0.9, VERSIONS)
+
+        now[0] += 61
+        assert cache.get(key) is None
+        assert cache.stats()["size"] == 0
+
+
+class TestInvalidation:
+    """Tests de invalidación"""
+
+    def test_invalidate_document_drops_answers_citing_it(self):
+        """Test: Reprocesar un documento elimina las respuestas que lo usan"""
+        cache = RAGAnswerCache()
+        key_a = cache_key(cache, "¿Cuándo vence?")
+        key_other = cache_key(cache, "¿Quién firma?", retrieval_fingerprint([(DOC_B, "x")]))
+        cache.put(key_a, "En 2026", [], 0.9, VERSIONS)
+        cache.put(key_other, "Ana", [], 0.9, {DOC_B: None})
+
+        assert cache.invalidate_document(uuid.UUID(DOC_A)) == 1
+        assert cache.get(key_a) is None
+        assert cache.get(key_other) is not None
+
+    def test_lru_eviction_cleans_indexes(self):
+        """Test: Al superar el tamaño se descarta la menos usada y sus índices"""
+        cache = RAGAnswerCache(max_size=1)
+        first = cache_key(cache, "primera pregunta")
+        cache.put(first, "1", [], 0.9, {DOC_A: None})
+        cache.put(cache_key(cache, "segunda pregunta"), "2", [], 0.9, {DOC_B: None})
+
+        assert cache.get(first) is None
+        assert cache.invalidate_document(DOC_A) == 0
+
+    def test_disabled_with_zero_size(self):
+        """Test: Con tamaño 0 no se guarda nada"""
+        cache = RAGAnswerCache(max_size=0)
+
+        assert cache.put(cache_key(cache, "¿Cuándo vence?"), "En 2026", [], 0.9, VERSIONS) is None
@@ -0,0 +1,228 @@
+"""
+Tests for RAG Service
+
+Verifican ``RAGService.query`` y ``stream_query`` con búsqueda y LLM
+simulados: citaciones construidas con los campos de ``SearchResult``,
+respuesta en caché para la misma pregunta y contexto, invalidación cuando
+cambia ``updated_at`` de un documento citado, y la secuencia de eventos
+token/citation/done del streaming.
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("openai")
+pytest.importorskip("anthropic")
+pytest.importorskip("phoenix")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+import services.rag_service as rag_service_module
+from core.config import settings
+from models.schemas import RAGQuery, SearchResponse, SearchResult
+
+DOC_A = uuid.uuid4()
+DOC_B = uuid.uuid4()
+ANSWER = "El contrato de suministro con Acme vence el 31 de diciembre de 2026 [DOC-1]."
+
+
+class FakeDB:
+    """Sesión que devuelve el ``updated_at`` actual de cada documento"""
+
+    def __init__(self, versions):
+        self.versions = versions
+
+    async def execute(self, statement):
+        rows = [SimpleNamespace(id=document_id, updated_at=updated_at)
+                for document_id, updated_at in self.versions.items()]
+        return SimpleNamespace(all=lambda: rows)
+
+
+def completion(text):
+    """Respuesta de ``chat.completions.create`` sin streaming"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(total_tokens=42)
+    )
+
+
+class FakeStream:
+    """Stream de ``chat.completions.create(stream=True)``: un chunk por token"""
+
+    def __init__(self, tokens):
+        self.chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            for token in tokens
+        ] + [SimpleNamespace(usage=SimpleNamespace(total_tokens=42), choices=[])]
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+@pytest.fixture
+def search_results():
+    return SearchResponse(
+        query="¿Cuándo vence el contrato con Acme?",
+        total=2,
+        took_ms=1.0,
+        results=[
+            SearchResult(
+                document_id=DOC_A,
+                title="Contrato Acme",
+                score=0.92,
+                snippet="El contrato de suministro con Acme vence el 31 de diciembre de 2026.",
+                page_num=3
+            ),
+            SearchResult(
+                document_id=DOC_B,
+                title="Anexo penalizaciones",
+                score=0.71,
+                snippet="La penalización por retraso es del 2% del importe mensual.",
+                page_num=1
+            ),
+        ]
+    )
+
+
+@pytest.fixture
+def rag(monkeypatch, search_results):
+    """RAGService con OpenAI, búsqueda y Phoenix simulados"""
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "RAG_ANSWER_CACHE_SEMANTIC", False)
+    monkeypatch.setattr(
+        rag_service_module, "search_service",
+        SimpleNamespace(hybrid_search=AsyncMock(return_value=search_results))
+    )
+    monkeypatch.setattr(
+        rag_service_module, "get_phoenix", lambda: SimpleNamespace(log_rag_query=lambda **kwargs: None)
+    )
+
+    service = rag_service_module.RAGService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(return_value=completion(ANSWER))
+    )))
+    return service
+
+
+@pytest.fixture
+def db():
+    updated = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return FakeDB({DOC_A: updated, DOC_B: None})
+
+
+@pytest.mark.asyncio
+class TestRAGQuery:
+    """Tests de la consulta RAG y su caché de respuestas"""
+
+    async def test_answer_with_citations(self, rag, db):
+        """Test: La respuesta cita el documento con título, página y fragmento"""
+        response = await rag.query(RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4())
+
+        assert response.answer == ANSWER
+        assert response.question == "¿Cuándo vence el contrato con Acme?"
+        assert response.model_version == settings.OPENAI_MODEL
+        assert [(c.document_id, c.document_title, c.page_num) for c in response.citations] == [
+            (DOC_A, "Contrato Acme", 3)
+        ]
+        assert response.citations[0].text_snippet.startswith("El contrato de suministro")
+        assert response.confidence > 0.8
+
+    async def test_repeated_question_is_served_from_cache(self, rag, db):
+        """Test: La misma pregunta con el mismo contexto no vuelve a llamar al LLM"""
+        first = await rag.query(RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4())
+        second = await rag.query(RAGQuery(question="¿cuándo vence el contrato con ACME"), db, uuid.uuid4())
+
+        assert rag.client.chat.completions.create.await_count == 1
+        assert second.answer == first.answer
+        assert second.citations == first.citations
+        assert second.confidence == first.confidence
+
+    async def test_updated_document_invalidates_cached_answer(self, rag, db):
+        """Test: Si cambia ``updated_at`` de un documento del contexto se regenera la respuesta"""
+        question = RAGQuery(question="¿Cuándo vence el contrato con Acme?")
+        await rag.query(question, db, uuid.uuid4())
+
+        db.versions[DOC_A] = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        await rag.query(question, db, uuid.uuid4())
+        await rag.query(question, db, uuid.uuid4())
+
+        assert rag.client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+class TestRAGStreamQuery:
+    """Tests de la consulta RAG en streaming"""
+
+    TOKENS = ["El contrato de suministro con Acme vence ", "el 31 de diciembre de 2026 [DO", "C-1]."]
+
+    async def test_token_citation_and_done_events(self, rag, db):
+        """Test: Tokens en orden, citación al completarse [DOC-1] y confianza al final"""
+        stream = FakeStream(self.TOKENS)
+        rag.client.chat.completions.create = AsyncMock(return_value=stream)
+
+        events = await collect(rag.stream_query(
+            RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4()
+        ))
+
+        # La citación sale con el token que cierra la etiqueta
+        assert [event for event, _ in events] == ["start", "token", "token", "token", "citation", "done"]
+        assert events[0][1]["documents_count"] == 2
+        assert "".join(data["text"] for event, data in events if event == "token") == ANSWER
+        citation = events[4][1]
+        assert citation["label"] == "DOC-1"
+        assert citation["document_id"] == str(DOC_A)
+        assert citation["document_title"] == "Contrato Acme"
+        assert citation["page_num"] == 3
+        done = events[-1][1]
+        assert done["citations_used"] == 1
+        assert done["cached"] is False
+        assert done["confidence"] > 0.8
+        assert rag.client.chat.completions.create.await_args.kwargs["stream"] is True
+        assert stream.closed
+
+    async def test_cached_answer_is_streamed_with_labels(self, rag, db):
+        """Test: Una respuesta en caché se envía de una vez con la etiqueta de cada citación"""
+        await rag.query(RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4())
+
+        events = await collect(rag.stream_query(
+            RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4()
+        ))
+
+        assert [event for event, _ in events] == ["start", "token", "citation", "done"]
+        assert events[1][1]["text"] == ANSWER
+        assert events[2][1]["label"] == "DOC-1"
+        assert events[-1][1]["cached"] is True
+        assert rag.client.chat.completions.create.await_count == 1
+
+    async def test_no_documents(self, rag, db, search_results):
+        """Test: Sin documentos se responde sin llamar al LLM"""
+        search_results.results = []
+
+        events = await collect(rag.stream_query(
+            RAGQuery(question="¿Cuándo vence el contrato con Acme?"), db, uuid.uuid4()
+        ))
+
+        assert [event for event, _ in events] == ["start", "token", "done"]
+        assert events[-1][1]["confidence"] == 0.0
+        rag.client.chat.completions.create.assert_not_awaited()
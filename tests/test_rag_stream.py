@@ -0,0 +1,79 @@
+"""
+Tests for RAG Streaming
+
+Verifican la detección incremental de citaciones [DOC-X] sobre los tokens
+del LLM (etiquetas partidas entre tokens, repetidas o incompletas) y el
+formato de los eventos SSE.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.rag_stream import CitationTracker, sse_event
+
+
+def feed_all(tracker, tokens):
+    return [tracker.feed(token) for token in tokens]
+
+
+class TestCitationTracker:
+    """Tests del detector de citaciones"""
+
+    def test_label_in_single_token(self):
+        """Test: Una etiqueta completa se detecta con su token"""
+        tracker = CitationTracker()
+
+        assert tracker.feed("El contrato vence en 2026 [DOC-1].") == ["DOC-1"]
+
+    @pytest.mark.parametrize("tokens", [
+        ["vence [", "DOC-1", "]"],
+        ["vence [D", "OC", "-", "1", "]"],
+        ["vence [DOC-1", "] y"],
+    ])
+    def test_label_split_across_tokens(self, tokens):
+        """Test: La etiqueta se emite con el token que la cierra"""
+        tracker = CitationTracker()
+
+        emitted = feed_all(tracker, tokens)
+
+        assert emitted == [[]] * (len(tokens) - 1) + [["DOC-1"]]
+
+    def test_multi_digit_label_not_emitted_early(self):
+        """Test: "[DOC-1" seguido de "2]" es DOC-12, no DOC-1"""
+        tracker = CitationTracker()
+
+        assert feed_all(tracker, ["según [DOC-1", "2] y"]) == [[], ["DOC-12"]]
+
+    def test_repeated_labels_emitted_once(self):
+        """Test: Cada documento se emite una vez, en orden de aparición"""
+        tracker = CitationTracker()
+
+        feed_all(tracker, ["A [DOC-2], B [DOC-1]", " y C [DOC-2][DOC-3]"])
+
+        assert tracker.labels == ["DOC-2", "DOC-1", "DOC-3"]
+
+    def test_brackets_that_are_not_labels(self):
+        """Test: Corchetes ajenos no se confunden ni se acumulan"""
+        tracker = CitationTracker()
+
+        assert feed_all(tracker, ["[nota] [DOC-x] [", "1] ", "[DOC-", "4]"]) == [[], [], [], ["DOC-4"]]
+        assert tracker._pending == ""
+
+
+class TestSSEEvent:
+    """Tests del formato SSE"""
+
+    def test_event_format(self):
+        """Test: Tipo de evento y datos JSON en una línea, terminado en línea en blanco"""
+        message = sse_event("token", {"text": "línea 1\nlínea 2"})
+
+        event_line, data_line, *rest = message.split("\n")
+        assert event_line == "event: token"
+        assert json.loads(data_line[len("data: "):]) == {"text": "línea 1\nlínea 2"}
+        assert message.endswith("\n\n")
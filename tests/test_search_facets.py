@@ -0,0 +1,180 @@
+"""
+Tests for Search Facets
+
+Verifican las agregaciones de facetas de OpenSearch (documentos distintos
+por cubo), el parseo de la respuesta recortada con filter_path, la caché
+de consultas vacías y populares, y que cada chunk se indexa con los campos
+que leen las facetas.
+"""
+
+import sys
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.search_facets import (
+    FACETS_FILTER_PATH,
+    FacetCache,
+    build_facet_aggs,
+    index_source,
+    parse_facets,
+)
+from models.database_models import Document, DocumentChunk, DocumentClassification
+
+# Respuesta de OpenSearch tal como llega con FACETS_FILTER_PATH
+RESPONSE_AGGREGATIONS = {
+    "classification": {"buckets": [
+        {"key": "recibo_factura", "documents": {"value": 3}},
+        {"key": "contrato_proveedor", "documents": {"value": 12}},
+    ]},
+    "department": {"buckets": [{"key": "riesgos", "documents": {"value": 7}}]},
+    "uploaded_at": {"buckets": [
+        {"key": 1735689600000, "key_as_string": "2025-01-01T00:00:00.000Z", "documents": {"value": 4}},
+        {"key": 1738368000000, "key_as_string": "2025-02-01T00:00:00.000Z", "documents": {"value": 9}},
+    ]},
+    "total_documents": {"value": 15},
+}
+
+
+class TestFacetAggregations:
+    """Tests de la petición de agregaciones"""
+
+    def test_all_facets_in_one_request(self):
+        """Test: Una agregación por faceta, contando documentos distintos"""
+        aggs = build_facet_aggs(size=10, interval="week")
+
+        assert set(aggs) == {"classification", "department", "uploaded_by", "uploaded_at", "total_documents"}
+        assert aggs["department"]["terms"] == {"field": "department", "size": 10}
+        assert aggs["department"]["aggs"]["documents"] == {"cardinality": {"field": "document_id"}}
+        assert aggs["uploaded_at"]["date_histogram"]["calendar_interval"] == "week"
+
+    def test_invalid_interval(self):
+        """Test: Un intervalo desconocido da ValueError"""
+        with pytest.raises(ValueError):
+            build_facet_aggs(interval="fortnight")
+
+    def test_filter_path_keeps_only_bucket_counts(self):
+        """Test: filter_path descarta doc_count de chunks y metadatos de la respuesta"""
+        assert "aggregations.*.buckets.documents.value" in FACETS_FILTER_PATH
+        assert "doc_count" not in FACETS_FILTER_PATH
+
+
+class TestParseFacets:
+    """Tests del parseo de la respuesta"""
+
+    def test_document_counts(self):
+        """Test: Términos por número de documentos, fechas en orden cronológico"""
+        facets = parse_facets(RESPONSE_AGGREGATIONS)
+
+        assert facets["classification"] == [
+            {"value": "contrato_proveedor", "count": 12},
+            {"value": "recibo_factura", "count": 3},
+        ]
+        assert [bucket["value"] for bucket in facets["uploaded_at"]] == [
+            "2025-01-01T00:00:00.000Z", "2025-02-01T00:00:00.000Z"
+        ]
+        assert facets["total_documents"] == 15
+
+    def test_missing_aggregations(self):
+        """Test: Sin cubos (índice vacío) todas las facetas quedan vacías"""
+        facets = parse_facets(None)
+
+        assert facets["uploaded_by"] == []
+        assert facets["total_documents"] == 0
+
+
+class TestFacetCache:
+    """Tests de la caché de facetas"""
+
+    def test_empty_query_cached_immediately(self):
+        """Test: Las facetas iniciales (consulta vacía) se guardan a la primera"""
+        cache = FacetCache(ttl=60)
+        key = cache.key("", {})
+
+        assert cache.get(key) is None
+        assert cache.put(key, {"total_documents": 1})
+        assert cache.get(key) == {"total_documents": 1}
+
+    def test_query_cached_once_popular(self):
+        """Test: Una consulta no vacía se guarda a partir de min_hits peticiones"""
+        cache = FacetCache(ttl=60, min_hits=2)
+        key = cache.key("contrato  Alquiler", {"department": "riesgos"})
+
+        cache.get(key)
+        assert not cache.put(key, {"total_documents": 1})
+        cache.get(key)
+        assert cache.put(key, {"total_documents": 1})
+        assert cache.get(cache.key("contrato alquiler", {"department": "riesgos"})) is not None
+
+    def test_filters_and_interval_are_part_of_key(self):
+        """Test: Otros filtros u otro intervalo no comparten entrada"""
+        cache = FacetCache(ttl=60)
+        cache.get(cache.key("", {"department": "riesgos"}))
+        cache.put(cache.key("", {"department": "riesgos"}), {"total_documents": 1})
+
+        assert cache.get(cache.key("", {"department": "legal"})) is None
+        assert cache.get(cache.key("", {"department": "riesgos"}, interval="day")) is None
+
+    def test_entries_expire(self, monkeypatch):
+        """Test: Con TTL vencido se vuelve a consultar OpenSearch"""
+        import services.search_facets as facets_module
+        now = [1000.0]
+        monkeypatch.setattr(facets_module.time, "monotonic", lambda: now[0])
+        cache = FacetCache(ttl=60)
+        key = cache.key("", {})
+        cache.put(key, {"total_documents": 1})
+
+        now[0] += 61
+        assert cache.get(key) is None
+
+    def test_disabled_with_zero_ttl(self):
+        """Test: Con TTL 0 no se guarda nada"""
+        cache = FacetCache(ttl=0)
+
+        assert not cache.put(cache.key("", {}), {"total_documents": 1})
+
+
+class TestIndexSource:
+    """Tests de los campos indexados por chunk"""
+
+    def test_fields_from_document_columns(self):
+        """Test: Título, propietario, fecha de alta y metadata del documento"""
+        owner = uuid.uuid4()
+        document = Document(
+            id=uuid.uuid4(),
+            title="contrato_acme.pdf",
+            owner_id=owner,
+            department="riesgos",
+            classification=DocumentClassification.CONTRATO_PROVEEDOR,
+            created_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+            metadata_json={"source": "sharepoint"},
+        )
+        chunk = DocumentChunk(id=uuid.uuid4(), document_id=document.id, chunk_index=0, text="Cláusula 1")
+
+        assert index_source(document, chunk) == {
+            "document_id": str(document.id),
+            "chunk_id": str(chunk.id),
+            "content": "Cláusula 1",
+            "filename": "contrato_acme.pdf",
+            "classification": "contrato_proveedor",
+            "department": "riesgos",
+            "uploaded_by": str(owner),
+            "uploaded_at": "2026-03-01T00:00:00+00:00",
+            "metadata": {"source": "sharepoint"},
+        }
+
+    def test_unclassified_document_without_owner(self):
+        """Test: Sin clasificación ni propietario los campos quedan vacíos"""
+        document = Document(id=uuid.uuid4(), title="nota.txt")
+        chunk = DocumentChunk(id=uuid.uuid4(), document_id=document.id, chunk_index=0, text="nota")
+
+        source = index_source(document, chunk)
+
+        assert source["classification"] is None
+        assert source["uploaded_by"] is None
+        assert source["uploaded_at"] is None
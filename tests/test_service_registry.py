@@ -0,0 +1,141 @@
+"""
+Tests for Service Registry
+
+Verifican la carga perezosa de servicios: instancia única en el primer uso,
+warmup por rol, que importar los proxies de ``services.lazy``/``ml.lazy``
+no carga ningún servicio y que ``services.<nombre>`` es siempre el submódulo.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add backend to path
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '../backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from core.service_registry import ServiceRegistry
+
+
+class FakeModel:
+    """Servicio simulado que cuenta las cargas de pesos"""
+
+    def __init__(self):
+        self.weights_loaded = 0
+
+    def _load_model(self):
+        self.weights_loaded += 1
+
+
+class TestServiceRegistry:
+    """Tests del registro de servicios"""
+
+    def test_created_once_on_first_use(self):
+        """Test: La factoría se llama una vez, en el primer acceso"""
+        registry = ServiceRegistry()
+        created = []
+        registry.register("model", lambda: created.append(1) or FakeModel())
+        proxy = registry.proxy("model")
+
+        assert created == []
+        assert not registry.is_loaded("model")
+
+        proxy._load_model()
+        proxy._load_model()
+
+        assert created == [1]
+        assert registry.get("model").weights_loaded == 2
+        assert registry.status()["model"]["loaded"] is True
+
+    def test_proxy_forwards_setattr(self):
+        """Test: Asignar atributos en el proxy los asigna en el servicio"""
+        registry = ServiceRegistry()
+        registry.register("model", FakeModel)
+        proxy = registry.proxy("model")
+
+        proxy.threshold = 0.5
+
+        assert registry.get("model").threshold == 0.5
+
+    @pytest.mark.asyncio
+    async def test_warmup_by_role(self):
+        """Test: El warmup de un rol sólo carga sus servicios y ejecuta el hook"""
+        registry = ServiceRegistry()
+        registry.register("ner", FakeModel, roles=("process-worker",), warmup=lambda m: m._load_model())
+        registry.register("search", FakeModel, roles=("api",))
+
+        results = await registry.warmup(role="process-worker")
+
+        assert results == {"ner": "loaded"}
+        assert registry.get("ner").weights_loaded == 1
+        assert not registry.is_loaded("search")
+
+    @pytest.mark.asyncio
+    async def test_warmup_reports_errors(self):
+        """Test: Un servicio que falla no impide el warmup de los demás"""
+        def broken():
+            raise RuntimeError("model not found")
+
+        registry = ServiceRegistry()
+        registry.register("broken", broken, roles=("api",))
+        registry.register("ok", FakeModel, roles=("api",))
+
+        results = await registry.warmup(role="api")
+
+        assert results == {"broken": "error: model not found", "ok": "loaded"}
+
+    def test_unknown_service(self):
+        """Test: Pedir un servicio no registrado falla"""
+        with pytest.raises(KeyError):
+            ServiceRegistry().get("missing")
+
+    def test_packages_import_without_loading_services(self):
+        """Test: Importar los proxies de services y ml no importa los módulos de servicios"""
+        code = (
+            "import sys\n"
+            "from services.lazy import extract_service, classification_service, search_service, rag_service\n"
+            "from ml.lazy import ner_model, embedding_model\n"
+            "loaded = [m for m in sys.modules if m.startswith(('services.', 'ml.'))\n"
+            "          and m not in ('services.lazy', 'ml.lazy')]\n"
+            "print(sorted(loaded), type(extract_service).__name__)\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert out.strip() == "[] LazyService"
+
+    def test_package_attribute_is_always_the_submodule(self):
+        """Test: ``services.x`` es el submódulo antes y después de cargar el proxy"""
+        code = (
+            "from services.lazy import risk_service\n"
+            "risk_service.dimension_weights\n"
+            "from services import risk_service as module\n"
+            "import services.risk_service as risk_module\n"
+            "print(type(risk_service).__name__, type(module).__name__, module is risk_module,\n"
+            "      type(risk_module.risk_service).__name__)\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert out.strip() == "LazyService module True RiskService"
+
+    def test_patching_module_attributes_does_not_load_service(self):
+        """Test: ``patch("services.x.Clase")`` no crea el servicio del registro"""
+        code = (
+            "from unittest.mock import patch\n"
+            "from core.service_registry import service_registry\n"
+            "import services\n"
+            "with patch('services.risk_service.RiskService') as mocked:\n"
+            "    import services.risk_service as risk_module\n"
+            "    patched = risk_module.RiskService is mocked\n"
+            "print(patched, service_registry.is_loaded('risk_service'))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert out.strip() == "True False"
@@ -0,0 +1,231 @@
+"""
+Tests for SPARQL Executor
+
+Verifican la caché por consulta normalizada y versión de la ontología, la
+ejecución compartida de consultas idénticas, los plazos por consulta y que
+las consultas vencidas que siguen ocupando hilos no dejan encolar más.
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from core.sparql_executor import SPARQLBusyError, SPARQLExecutor, SPARQLTimeoutError, normalize_query
+from services.ontology_service import ontology_service
+
+
+class FakeOntology:
+    """Servicio mínimo que cuenta las ejecuciones"""
+
+    def __init__(self, delay: float = 0.0):
+        self.version = "v1"
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+
+    def query_sparql(self, sparql_query, deadline=None):
+        self.calls.append(sparql_query)
+        self.threads.add(threading.current_thread().name)
+        end = time.monotonic() + self.delay
+        while time.monotonic() < end:
+            if deadline is not None and time.monotonic() > deadline:
+                raise SPARQLTimeoutError("deadline")
+            time.sleep(0.01)
+        return [{"n": str(len(self.calls))}]
+
+
+class BlockingOntology(FakeOntology):
+    """Consulta que no devuelve filas hasta ``release`` (rdflib evaluando sin ceder)"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def query_sparql(self, sparql_query, deadline=None):
+        self.calls.append(sparql_query)
+        self.release.wait(timeout=5)
+        return []
+
+
+class TestNormalizeQuery:
+    """Tests de la clave de caché"""
+
+    def test_collapses_whitespace_and_comments(self):
+        """Test: Espacios y comentarios no cambian la clave"""
+        a = "SELECT ?c WHERE {\n    ?c a owl:Class .  # clases\n}"
+        b = "SELECT ?c WHERE { ?c a owl:Class . }"
+        assert normalize_query(a) == normalize_query(b)
+
+    def test_keeps_literals_and_iris(self):
+        """Test: Literales e IRIs (con '#') se conservan"""
+        query = 'SELECT ?c WHERE { ?c rdfs:label "Préstamo   # no" ; a <http://tefinancia.es/ontology#Documento> }'
+        normalized = normalize_query(query)
+        assert '"Préstamo   # no"' in normalized
+        assert "<http://tefinancia.es/ontology#Documento>" in normalized
+
+
+class TestSPARQLExecutor:
+    """Tests del executor"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_and_version_invalidation(self):
+        """Test: Se reutiliza el resultado hasta que cambia la versión"""
+        service = FakeOntology()
+        executor = SPARQLExecutor(max_workers=1)
+
+        first = await executor.query(service, "SELECT ?c WHERE { ?c a owl:Class }")
+        second = await executor.query(service, "SELECT ?c\nWHERE { ?c a owl:Class }")
+        service.version = "v2"
+        third = await executor.query(service, "SELECT ?c WHERE { ?c a owl:Class }")
+        executor.shutdown()
+
+        assert first == second == [{"n": "1"}]
+        assert third == [{"n": "2"}]
+        assert executor.stats()["hits"] == 1
+        assert service.threads == {"sparql_0"}
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_queries_share_execution(self):
+        """Test: Consultas idénticas simultáneas se ejecutan una sola vez"""
+        service = FakeOntology(delay=0.1)
+        executor = SPARQLExecutor(max_workers=2)
+
+        results = await asyncio.gather(*(executor.query(service, "SELECT * WHERE { ?s ?p ?o }") for _ in range(5)))
+        executor.shutdown()
+
+        assert len(service.calls) == 1
+        assert all(result == [{"n": "1"}] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_deadline_raises_timeout_and_is_not_cached(self):
+        """Test: Una consulta que supera su plazo falla y no se cachea"""
+        service = FakeOntology(delay=1.0)
+        executor = SPARQLExecutor(max_workers=1)
+
+        start = time.monotonic()
+        with pytest.raises(SPARQLTimeoutError):
+            await executor.query(service, "SELECT * WHERE { ?s ?p ?o }", timeout=0.05)
+        elapsed = time.monotonic() - start
+        executor.shutdown()
+
+        assert elapsed < 0.5
+        assert executor.stats()["timeouts"] == 1
+        assert executor.stats()["cached"] == 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Test: El bucle sigue atendiendo tareas durante una consulta lenta"""
+        service = FakeOntology(delay=0.3)
+        executor = SPARQLExecutor(max_workers=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await executor.query(service, "SELECT * WHERE { ?s ?p ?o }")
+        task.cancel()
+        executor.shutdown()
+
+        assert ticks >= 10
+
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self):
+        """Test: Modificar el resultado devuelto no altera la caché"""
+        service = FakeOntology()
+        executor = SPARQLExecutor(max_workers=1)
+
+        first = await executor.query(service, "SELECT * WHERE { ?s ?p ?o }")
+        first[0]["n"] = "modificado"
+        first.append({"n": "extra"})
+        second = await executor.query(service, "SELECT * WHERE { ?s ?p ?o }")
+        executor.shutdown()
+
+        assert second == [{"n": "1"}]
+
+    @pytest.mark.asyncio
+    async def test_runaway_queries_block_new_submissions(self):
+        """Test: Con el pool ocupado por consultas vencidas se rechaza sin encolar"""
+        blocking = BlockingOntology()
+        service = FakeOntology()
+        executor = SPARQLExecutor(max_workers=1)
+
+        with pytest.raises(SPARQLTimeoutError):
+            await executor.query(blocking, "SELECT * WHERE { ?s ?p ?o }", timeout=0.05)
+        assert executor.stats()["runaway"] == 1
+
+        with pytest.raises(SPARQLBusyError):
+            await executor.query(service, "SELECT ?c WHERE { ?c a owl:Class }")
+        assert service.calls == []
+
+        blocking.release.set()
+        while executor.stats()["runaway"]:
+            await asyncio.sleep(0.01)
+        result = await executor.query(service, "SELECT ?c WHERE { ?c a owl:Class }")
+        executor.shutdown()
+
+        assert result == [{"n": "1"}]
+        assert executor.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_query_expired_in_queue_is_not_run(self):
+        """Test: Una consulta cuyo plazo vence esperando en cola no llega a ejecutarse"""
+        slow = FakeOntology(delay=0.3)
+        service = FakeOntology()
+        executor = SPARQLExecutor(max_workers=1)
+
+        results = await asyncio.gather(
+            executor.query(slow, "SELECT * WHERE { ?s ?p ?o }"),
+            executor.query(service, "SELECT ?c WHERE { ?c a owl:Class }", timeout=0.05),
+            return_exceptions=True
+        )
+        executor.shutdown()
+
+        assert results[0] == [{"n": "1"}]
+        assert isinstance(results[1], SPARQLTimeoutError)
+        assert service.calls == []
+
+
+class TestOntologySPARQL:
+    """Tests de la ejecución sobre la ontología real"""
+
+    def test_expired_deadline_aborts_query(self):
+        """Test: La consulta se abandona al vencer el plazo"""
+        with pytest.raises(SPARQLTimeoutError):
+            ontology_service.query_sparql(
+                "SELECT ?c WHERE { ?c rdfs:subClassOf* tf:Documento }",
+                deadline=time.monotonic() - 1
+            )
+
+    def test_execute_sparql_returns_columns_and_rows(self):
+        """Test: execute_sparql devuelve columnas y filas"""
+        result = ontology_service.execute_sparql(
+            "SELECT ?c ?label WHERE { ?c rdfs:subClassOf tf:ContratoFinanciacion ; rdfs:label ?label }"
+        )
+
+        assert result["columns"] == ["c", "label"]
+        assert result["rows"] and all("c" in row for row in result["rows"])
+
+    def test_prepared_queries_match_ad_hoc_queries(self):
+        """Test: Las consultas preparadas dan el mismo resultado que las ad hoc"""
+        root = ontology_service.TF.Documento
+        prepared = {row["uri"] for row in ontology_service.get_subclasses(root, direct_only=False)}
+        ad_hoc = {
+            row["c"] for row in ontology_service.query_sparql(
+                f"SELECT ?c WHERE {{ ?c rdfs:subClassOf* <{root}> FILTER(?c != <{root}>) }}"
+            )
+        }
+
+        assert prepared == ad_hoc
+        assert ontology_service.get_statistics()["leaf_classes"] > 0
@@ -0,0 +1,160 @@
+"""
+Tests for Text Chunker
+
+Verifican el motor de chunking común: límites de frase y párrafo, offsets
+sobre el texto original, solapamiento, que ningún chunk de frases completas
+supera ``chunk_size`` y que backend y astra-vector-db producen exactamente
+los mismos chunks.
+"""
+
+import importlib.util
+import random
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../'))
+
+from backend.services.text_chunker import chunk_texts, iter_chunks, tokenizer_counter
+
+SAMPLE = (
+    "El prestatario se obliga a devolver el capital.  Los intereses se liquidan mensualmente.\n"
+    "La garantía es hipotecaria.\n\n"
+    "Segundo párrafo: el tipo de interés es variable! ¿Cómo se revisa? Cada doce meses."
+)
+
+
+def load_astra_module(name):
+    path = os.path.join(os.path.dirname(__file__), f'../services/astra-vector-db/{name}.py')
+    spec = importlib.util.spec_from_file_location(f"astra_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_astra_chunker():
+    return load_astra_module("text_chunker")
+
+
+class TestTextChunker:
+    """Tests del motor de chunking"""
+
+    def test_offsets_point_to_original_text(self):
+        """Test: Los offsets delimitan el texto del chunk en el original"""
+        for chunk in iter_chunks(SAMPLE, chunk_size=10, chunk_overlap=3):
+            original = SAMPLE[chunk.start:chunk.end]
+            assert " ".join(original.split()) == chunk.text
+            assert chunk.token_count == len(chunk.text.split())
+
+    def test_sentence_boundaries(self):
+        """Test: Los chunks no cortan frases que caben en un chunk"""
+        chunks = chunk_texts(SAMPLE, chunk_size=12)
+
+        assert chunks == [
+            "El prestatario se obliga a devolver el capital.",
+            "Los intereses se liquidan mensualmente. La garantía es hipotecaria.",
+            "Segundo párrafo: el tipo de interés es variable! ¿Cómo se revisa?",
+            "Cada doce meses.",
+        ]
+
+    def test_paragraph_closes_chunk(self):
+        """Test: Un párrafo terminado cierra el chunk si está medio lleno"""
+        chunks = chunk_texts(SAMPLE, chunk_size=30)
+
+        assert len(chunks) == 2
+        assert chunks[0].endswith("La garantía es hipotecaria.")
+        assert chunks[1].startswith("Segundo párrafo")
+
+    def test_overlap_repeats_last_sentences(self):
+        """Test: Las últimas frases se repiten al principio del siguiente chunk"""
+        chunks = list(iter_chunks(SAMPLE, chunk_size=16, chunk_overlap=5))
+
+        assert chunks[0].text.endswith("Los intereses se liquidan mensualmente.")
+        assert chunks[1].text.startswith("Los intereses se liquidan mensualmente.")
+        assert chunks[1].start < chunks[0].end
+        assert [c.index for c in chunks] == list(range(len(chunks)))
+
+    def test_long_sentence_split_by_words(self):
+        """Test: Una frase mayor que el chunk se trocea por palabras"""
+        text = " ".join(f"w{i}" for i in range(25)) + ". Fin."
+        chunks = list(iter_chunks(text, chunk_size=10, chunk_overlap=2))
+
+        assert [c.token_count for c in chunks[:3]] == [10, 10, 9]
+        assert chunks[1].text.split()[:2] == chunks[0].text.split()[-2:]
+        assert chunks[-1].text == "Fin."
+        assert all(c.token_count <= 10 for c in chunks)
+
+    def test_tokenizer_counter(self):
+        """Test: El tamaño se puede medir con el tokenizer del modelo"""
+
+        class CharTokenizer:
+            def encode(self, text, add_special_tokens=True):
+                return list(text.replace(" ", ""))
+
+        counter = tokenizer_counter(CharTokenizer())
+        chunks = list(iter_chunks(SAMPLE, chunk_size=80, token_counter=counter))
+
+        assert all(c.token_count <= 80 for c in chunks)
+        assert all(c.token_count == len(c.text.replace(" ", "")) for c in chunks)
+
+    def test_invalid_parameters(self):
+        """Test: Solapamiento mayor o igual que el chunk se rechaza"""
+        with pytest.raises(ValueError):
+            list(iter_chunks(SAMPLE, chunk_size=10, chunk_overlap=10))
+
+    def test_overlap_after_paragraph_end_respects_chunk_size(self):
+        """Test: Tras cerrar un párrafo la frase siguiente no desborda el chunk"""
+        text = "w1 w2 w3 w4. w5 w6 w7 w8.\n\nw9 w10 w11 w12 w13 w14 w15 w16 w17."
+
+        assert [c.token_count for c in iter_chunks(text, 10, 8)] == [8, 9]
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_chunks_never_exceed_chunk_size(self, seed):
+        """Test: Con frases más cortas que el chunk ningún chunk supera chunk_size"""
+        rng = random.Random(seed)
+        chunk_size = rng.randint(2, 30)
+        chunk_overlap = rng.randint(0, chunk_size - 1)
+        sentences = [
+            " ".join(f"w{i}" for i in range(rng.randint(1, chunk_size - 1))) + "."
+            for _ in range(rng.randint(1, 40))
+        ]
+        text = "".join(
+            sentence + rng.choice([" ", "\n", "\n\n"]) for sentence in sentences
+        )
+
+        for module in (sys.modules[iter_chunks.__module__], load_astra_chunker()):
+            chunks = list(module.iter_chunks(text, chunk_size, chunk_overlap))
+            assert chunks
+            for chunk in chunks:
+                assert chunk.token_count <= chunk_size
+                assert chunk.token_count == len(chunk.text.split())
+
+    def test_backend_and_astra_identical(self):
+        """Test: Backend y astra-vector-db producen los mismos chunks"""
+        astra = load_astra_chunker()
+        text = SAMPLE * 20
+
+        assert [tuple(vars(c).values()) for c in astra.iter_chunks(text, 40, 8)] == \
+            [tuple(vars(c).values()) for c in iter_chunks(text, 40, 8)]
+
+
+class TestAstraIngestRequest:
+    """Tests de validación de los parámetros de chunking en astra-vector-db"""
+
+    def ingest(self, **chunking):
+        models = load_astra_module("models")
+        return models.DocumentIngest(
+            content="Texto", metadata={"filename": "a.txt", "document_type": "txt"}, **chunking
+        )
+
+    def test_overlap_smaller_than_size(self):
+        assert self.ingest(chunk_size=200, chunk_overlap=150).chunk_overlap == 150
+
+    def test_overlap_not_smaller_than_size_is_rejected(self):
+        """Test: overlap >= size es un error de validación (422), no un 500 del chunker"""
+        from pydantic import ValidationError
+
+        with pytest.raises(ValidationError, match="chunk_overlap must be smaller than chunk_size"):
+            self.ingest(chunk_size=100, chunk_overlap=100)
@@ -0,0 +1,102 @@
+"""
+Tests for Validation Stats
+
+Verifican el upsert incremental del rollup diario, las consultas por tramos
+con date_trunc y el relleno con ceros de las series del dashboard.
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+from sqlalchemy.dialects import postgresql
+
+# Add backend (y la raíz del repo, para los imports ``backend.``) to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.validation.validation_stats import (
+    ALL_SOURCES,
+    bucket_counts_query,
+    daily_stats_upsert,
+    fill_buckets,
+    matched_sources,
+    period_start,
+)
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestDailyStatsUpsert:
+    """Tests del mantenimiento incremental del rollup"""
+
+    def test_upsert_increments_total_and_sources(self):
+        """Test: Una validación suma a la fila ALL y a cada fuente consultada"""
+        stmt = daily_stats_upsert(
+            datetime(2025, 3, 4, 23, 59),
+            True,
+            ["OFAC", "EU_SANCTIONS", "WORLD_BANK"],
+            [{"source": "OFAC", "name": "ACME"}],
+        )
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+
+        assert "ON CONFLICT (day, source) DO UPDATE" in sql
+        assert "validations = (validation_daily_stats.validations + excluded.validations)" in sql
+
+        params = compiled.params
+        rows = {
+            params[f"source_m{i}"]: (params[f"validations_m{i}"], params[f"flagged_m{i}"])
+            for i in range(4)
+        }
+        assert all(params[f"day_m{i}"] == date(2025, 3, 4) for i in range(4))
+        assert rows == {
+            ALL_SOURCES: (1, 1),
+            "OFAC": (1, 1),
+            "EU_SANCTIONS": (1, 0),
+            "WORLD_BANK": (1, 0),
+        }
+
+    def test_matched_sources_ignores_matches_without_source(self):
+        """Test: Fuentes con match únicas y sin vacíos"""
+        matches = [{"source": "OFAC"}, {"source": "OFAC"}, {"name": "x"}, {"source": "WORLD_BANK"}]
+        assert matched_sources(matches) == ["OFAC", "WORLD_BANK"]
+        assert matched_sources(None) == []
+
+
+class TestBucketSeries:
+    """Tests de las series temporales del dashboard"""
+
+    def test_bucket_query_is_single_group_by(self):
+        """Test: Un único GROUP BY date_trunc sobre la fila ALL del rollup"""
+        sql = _sql(bucket_counts_query(date(2025, 1, 1), "week"))
+
+        assert sql.count("SELECT") == 1
+        assert "date_trunc(" in sql
+        assert "GROUP BY CAST(date_trunc(" in sql
+        assert "validation_daily_stats.source = " in sql
+
+    def test_fill_buckets_zero_fills_missing_days(self):
+        """Test: Los días sin validaciones aparecen con ceros"""
+        counts = {date(2025, 1, 2): (10, 2)}
+        series = fill_buckets(counts, date(2025, 1, 1), date(2025, 1, 3))
+
+        assert [point["date"] for point in series] == ["2025-01-01", "2025-01-02", "2025-01-03"]
+        assert [point["validations"] for point in series] == [0, 10, 0]
+        assert series[0]["compliance_rate"] == 100
+        assert series[1]["compliance_rate"] == 80
+
+    def test_fill_buckets_weeks_start_on_monday(self):
+        """Test: Los tramos semanales empiezan en lunes, como date_trunc('week')"""
+        # 2025-01-01 es miércoles
+        series = fill_buckets({date(2024, 12, 30): (5, 1)}, date(2025, 1, 1), date(2025, 1, 14), "week")
+
+        assert [point["date"] for point in series] == ["2024-12-30", "2025-01-06", "2025-01-13"]
+        assert series[0]["flagged"] == 1
+
+    def test_period_start_includes_today(self):
+        """Test: Un periodo de 7d son los 7 días naturales que terminan hoy"""
+        assert period_start("7d", today=date(2025, 1, 7)) == date(2025, 1, 1)
+        assert period_start("unknown", today=date(2025, 1, 30)) == date(2025, 1, 1)